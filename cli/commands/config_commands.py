@@ -6,9 +6,11 @@ This module implements configuration-related commands including:
 - set: Set configuration value
 - list: List all configurations
 - reset: Reset configuration to defaults
+- tolerance: Manage price tolerance rules
 """
 
 import logging
+from decimal import Decimal
 
 import click
 
@@ -21,6 +23,8 @@ from cli.formatters import (
 from cli.prompts import prompt_for_confirmation
 from cli.exceptions import CLIError, ValidationError
 from database.models import Configuration, ConfigurationError, DatabaseError, DEFAULT_CONFIG
+from database.models import TOLERANCE_RULE_SCOPES, ToleranceRule
+from database.models import ValidationError as ModelValidationError
 
 
 logger = logging.getLogger(__name__)
@@ -550,6 +554,144 @@ def setup(ctx, interactive):
         raise CLIError(f"Failed to run setup: {e}")
 
 
+# Create tolerance rule command group
+@config_group.group(name='tolerance')
+def tolerance_group():
+    """Price tolerance rules by part number, category or item type."""
+    pass
+
+
+@tolerance_group.command(name='list')
+@click.option('--scope', '-s', type=click.Choice(TOLERANCE_RULE_SCOPES), help='Only list rules of this scope')
+@click.option('--format', '-f', type=click.Choice(['table', 'json']), default='table',
+              help='Output format')
+@pass_context
+def list_tolerance_rules(ctx, scope, format):
+    """
+    List price tolerance rules.
+    
+    Examples:
+        # List all tolerance rules
+        invoice-checker config tolerance list
+        
+        # List item type rules in JSON format
+        invoice-checker config tolerance list --scope item_type --format json
+    """
+    try:
+        db_manager = ctx.get_db_manager()
+        rules = db_manager.list_tolerance_rules(scope=scope)
+        
+        if not rules:
+            print_info("No tolerance rules defined; the global price_tolerance applies to every line.")
+            return
+        
+        if format == 'table':
+            click.echo(format_table([{
+                'Scope': rule.scope,
+                'Match': rule.match_value,
+                'Absolute': f"${rule.absolute_tolerance}" if rule.absolute_tolerance is not None else '',
+                'Percent': f"{rule.percent_tolerance}%" if rule.percent_tolerance is not None else '',
+                'Description': rule.description or '',
+                'Last Updated': rule.last_updated.strftime('%Y-%m-%d %H:%M:%S') if rule.last_updated else ''
+            } for rule in rules]))
+        else:
+            click.echo(format_json([rule.to_dict() for rule in rules]))
+        
+        print_info(f"Found {len(rules)} tolerance rule(s)")
+        
+    except DatabaseError as e:
+        raise CLIError(f"Database error: {e}")
+    except Exception as e:
+        logger.exception("Failed to list tolerance rules")
+        raise CLIError(f"Failed to list tolerance rules: {e}")
+
+
+@tolerance_group.command(name='set')
+@click.argument('scope', type=click.Choice(TOLERANCE_RULE_SCOPES))
+@click.argument('match_value', type=str)
+@click.option('--absolute', '-a', type=click.FloatRange(min=0), default=None,
+              help='Allowed price difference in dollars')
+@click.option('--percent', '-p', type=click.FloatRange(min=0, max=100), default=None,
+              help='Allowed price difference as a percentage of the authorized price')
+@click.option('--description', '-d', type=str, help='Note explaining the rule')
+@pass_context
+def set_tolerance_rule(ctx, scope, match_value, absolute, percent, description):
+    """
+    Create or replace a price tolerance rule.
+    
+    A line passes when its price is within the larger of the absolute and
+    percentage tolerances of the authorized price. Part number rules take
+    precedence over category rules, and category rules over item type rules.
+    
+    Examples:
+        # Judge ruin charges within 5% of the authorized price
+        invoice-checker config tolerance set item_type "Ruin Charge" --percent 5
+        
+        # Allow a few cents on one part number
+        invoice-checker config tolerance set part GS0448 --absolute 0.05
+    """
+    try:
+        db_manager = ctx.get_db_manager()
+        rule = db_manager.set_tolerance_rule(ToleranceRule(
+            scope=scope,
+            match_value=match_value,
+            absolute_tolerance=Decimal(str(absolute)) if absolute is not None else None,
+            percent_tolerance=Decimal(str(percent)) if percent is not None else None,
+            description=description
+        ))
+        
+        limits = []
+        if rule.absolute_tolerance is not None:
+            limits.append(f"${rule.absolute_tolerance}")
+        if rule.percent_tolerance is not None:
+            limits.append(f"{rule.percent_tolerance}%")
+        print_success(f"Tolerance rule set for {rule.scope} '{rule.match_value}': {' or '.join(limits)}")
+        
+    except ModelValidationError as e:
+        raise CLIError(f"Validation error: {e}")
+    except DatabaseError as e:
+        raise CLIError(f"Database error: {e}")
+    except Exception as e:
+        logger.exception("Failed to set tolerance rule")
+        raise CLIError(f"Failed to set tolerance rule: {e}")
+
+
+@tolerance_group.command(name='remove')
+@click.argument('scope', type=click.Choice(TOLERANCE_RULE_SCOPES))
+@click.argument('match_value', type=str)
+@click.option('--force', is_flag=True, help='Skip confirmation prompt')
+@pass_context
+def remove_tolerance_rule(ctx, scope, match_value, force):
+    """
+    Remove a price tolerance rule.
+    
+    Examples:
+        # Remove the rule for an item type
+        invoice-checker config tolerance remove item_type "Ruin Charge"
+    """
+    try:
+        db_manager = ctx.get_db_manager()
+        
+        if not force and not prompt_for_confirmation(
+            f"Remove the {scope} tolerance rule for '{match_value}'?", default=True
+        ):
+            print_info("Removal cancelled.")
+            return
+        
+        if not db_manager.delete_tolerance_rule(scope, match_value):
+            raise CLIError(f"No {scope} tolerance rule found for '{match_value}'")
+        
+        print_success(f"Tolerance rule removed for {scope} '{match_value}'")
+        
+    except CLIError:
+        raise
+    except DatabaseError as e:
+        raise CLIError(f"Database error: {e}")
+    except Exception as e:
+        logger.exception("Failed to remove tolerance rule")
+        raise CLIError(f"Failed to remove tolerance rule: {e}")
+
+
 def run_interactive_config_management(ctx):
     """
     Run interactive configuration management workflow.
@@ -46,6 +46,7 @@ def _verify_backup_integrity(backup_path: Path, db_manager) -> bool:
     import sqlite3
     import tempfile
     import shutil
+    from database.db_backup import materialized_backup
     
     try:
         # Check file exists and is readable
@@ -55,53 +56,55 @@ def _verify_backup_integrity(backup_path: Path, db_manager) -> bool:
         if backup_path.stat().st_size == 0:
             raise DatabaseError("Backup file is empty")
         
-        # Test SQLite file integrity
-        with sqlite3.connect(str(backup_path)) as conn:
-            cursor = conn.cursor()
-            
-            # Check database integrity
-            cursor.execute("PRAGMA integrity_check")
-            integrity_result = cursor.fetchone()
-            if integrity_result[0] != 'ok':
-                raise DatabaseError(f"Backup integrity check failed: {integrity_result[0]}")
-            
-            # Verify expected tables exist
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = {row[0] for row in cursor.fetchall()}
-            
-            expected_tables = {'parts', 'config', 'part_discovery_log'}
-            missing_tables = expected_tables - tables
-            if missing_tables:
-                raise DatabaseError(f"Backup missing required tables: {missing_tables}")
-            
-            # Verify table schemas
-            for table in expected_tables:
-                cursor.execute(f"PRAGMA table_info({table})")
-                columns = cursor.fetchall()
-                if not columns:
-                    raise DatabaseError(f"Table {table} has no columns")
-        
-        # Test restore capability with temporary database
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_file:
-            temp_path = Path(temp_file.name)
-        
-        try:
-            shutil.copy2(backup_path, temp_path)
-            
-            # Try to connect and perform basic operations
-            with sqlite3.connect(str(temp_path)) as conn:
+        # Compressed backups are checked against a decompressed temporary copy
+        with materialized_backup(backup_path) as db_file:
+            # Test SQLite file integrity
+            with sqlite3.connect(str(db_file)) as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM parts")
-                parts_count = cursor.fetchone()[0]
                 
-                cursor.execute("SELECT COUNT(*) FROM config")
-                config_count = cursor.fetchone()[0]
+                # Check database integrity
+                cursor.execute("PRAGMA integrity_check")
+                integrity_result = cursor.fetchone()
+                if integrity_result[0] != 'ok':
+                    raise DatabaseError(f"Backup integrity check failed: {integrity_result[0]}")
                 
-                logger.info(f"Backup verification: {parts_count} parts, {config_count} config entries")
-        
-        finally:
-            if temp_path.exists():
-                temp_path.unlink()
+                # Verify expected tables exist
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+                tables = {row[0] for row in cursor.fetchall()}
+                
+                expected_tables = {'parts', 'config', 'part_discovery_log'}
+                missing_tables = expected_tables - tables
+                if missing_tables:
+                    raise DatabaseError(f"Backup missing required tables: {missing_tables}")
+                
+                # Verify table schemas
+                for table in expected_tables:
+                    cursor.execute(f"PRAGMA table_info({table})")
+                    columns = cursor.fetchall()
+                    if not columns:
+                        raise DatabaseError(f"Table {table} has no columns")
+            
+            # Test restore capability with temporary database
+            with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as temp_file:
+                temp_path = Path(temp_file.name)
+            
+            try:
+                shutil.copy2(db_file, temp_path)
+                
+                # Try to connect and perform basic operations
+                with sqlite3.connect(str(temp_path)) as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT COUNT(*) FROM parts")
+                    parts_count = cursor.fetchone()[0]
+                    
+                    cursor.execute("SELECT COUNT(*) FROM config")
+                    config_count = cursor.fetchone()[0]
+                    
+                    logger.info(f"Backup verification: {parts_count} parts, {config_count} config entries")
+            
+            finally:
+                if temp_path.exists():
+                    temp_path.unlink()
         
         return True
         
@@ -120,13 +123,28 @@ def database_group():
 
 @database_group.command()
 @click.argument('output_path', type=click.Path(), required=False)
-@click.option('--compress', is_flag=True, help='Compress backup file')
-@click.option('--include-logs', is_flag=True, default=True,
+@click.option('--compress', is_flag=True, help='Compress backup file (gzip)')
+@click.option('--compression', type=click.Choice(['gzip', 'lzma']),
+              help='Compression format for the backup file')
+@click.option('--include-logs/--exclude-logs', default=True,
               help='Include discovery logs in backup')
+@click.option('--verify/--no-verify', default=True,
+              help='Verify backup integrity before saving it')
+@click.option('--incremental', is_flag=True,
+              help='Store a deduplicated backup in an incremental repository')
+@click.option('--repository', type=click.Path(file_okay=False),
+              help='Incremental backup repository (default: <database>_backups)')
 @pass_context
-def backup(ctx, output_path, compress, include_logs):
+def backup(ctx, output_path, compress, compression, include_logs, verify, incremental, repository):
     """
-    Create a backup of the database.
+    Create an online backup of the database.
+    
+    The backup is copied page-by-page through SQLite's backup API, so it can
+    run while invoices are being processed.
+    
+    Incremental backups only store the chunks that changed, but each one still
+    copies and hashes a full snapshot of the database, so they save disk space
+    rather than backup time.
     
     Examples:
         # Create automatic backup
@@ -137,23 +155,62 @@ def backup(ctx, output_path, compress, include_logs):
         
         # Create compressed backup
         invoice-checker database backup --compress
+        
+        # Create lzma-compressed backup without discovery logs
+        invoice-checker database backup --compression lzma --exclude-logs
+        
+        # Create an incremental backup that only stores changed pages
+        invoice-checker database backup --incremental
     """
     try:
+        from database.db_backup import COMPRESSION_SUFFIXES
+        from database.db_utils import DatabaseBackupManager
+        
         db_manager = ctx.get_db_manager()
         
-        with spinner("Creating database backup"):
-            backup_path = db_manager.create_backup(output_path)
+        if incremental:
+            _create_incremental_backup(db_manager, repository, include_logs, verify)
+            return
         
-        # Get backup file size
-        backup_size = Path(backup_path).stat().st_size
-        size_mb = backup_size / (1024 * 1024)
+        if compress and compression is None:
+            compression = 'gzip'
+        
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            suffix = COMPRESSION_SUFFIXES.get(compression, "")
+            output_path = f"{Path(db_manager.db_path).stem}_backup_{timestamp}.db{suffix}"
+        
+        message = "Creating database backup"
+        with spinner(message) as spin:
+            def update_progress(copied, total):
+                if total:
+                    spin.message = f"{message} ({copied * 100 // total}%)"
+            
+            result = DatabaseBackupManager(db_manager).create_backup(
+                output_path,
+                compression=compression,
+                include_logs=include_logs,
+                progress=update_progress,
+                verify=verify
+            )
+        
+        if not result['success']:
+            raise DatabaseError(result['error'])
+        
+        size_mb = result['backup_size'] / (1024 * 1024)
         
         print_success(f"Database backup created successfully!")
-        print_info(f"Backup file: {backup_path}")
+        print_info(f"Backup file: {result['backup_path']}")
         print_info(f"Backup size: {size_mb:.2f} MB")
         
+        if compression:
+            print_info(f"Compressed with {compression}")
+        if verify:
+            print_info("Backup integrity verified")
         if include_logs:
             print_info("Discovery logs included in backup")
+        else:
+            print_info("Discovery logs excluded from backup")
         
     except DatabaseError as e:
         raise CLIError(f"Database error: {e}")
@@ -162,6 +219,44 @@ def backup(ctx, output_path, compress, include_logs):
         raise CLIError(f"Failed to create backup: {e}")
 
 
+def _default_backup_repository(db_manager) -> Path:
+    """Return the default incremental backup repository for a database."""
+    db_path = Path(db_manager.db_path)
+    return db_path.parent / f"{db_path.stem}_backups"
+
+
+def _create_incremental_backup(db_manager, repository: Optional[str], include_logs: bool,
+                               verify: bool) -> None:
+    """Create an incremental backup and report deduplication results."""
+    from database.db_utils import DatabaseBackupManager
+    
+    repository_path = Path(repository) if repository else _default_backup_repository(db_manager)
+    
+    message = "Creating incremental backup"
+    with spinner(message) as spin:
+        def update_progress(copied, total):
+            if total:
+                spin.message = f"{message} ({copied * 100 // total}%)"
+        
+        result = DatabaseBackupManager(db_manager).create_incremental_backup(
+            str(repository_path),
+            include_logs=include_logs,
+            progress=update_progress,
+            verify=verify
+        )
+    
+    if not result['success']:
+        raise DatabaseError(result['error'])
+    
+    reused = result['chunks_total'] - result['chunks_written']
+    print_success("Incremental backup created successfully!")
+    print_info(f"Backup ID: {result['backup_id']}")
+    print_info(f"Manifest: {result['manifest_path']}")
+    print_info(f"Chunks: {result['chunks_total']} total, {result['chunks_written']} new, {reused} reused")
+    print_info(f"Stored: {result['bytes_written'] / (1024 * 1024):.2f} MB "
+               f"of {result['database_size'] / (1024 * 1024):.2f} MB database")
+
+
 @database_group.command()
 @click.argument('backup_path', type=click.Path(exists=True))
 @click.option('--force', is_flag=True, help='Skip confirmation prompt')
@@ -178,6 +273,9 @@ def restore(ctx, backup_path, force, verify):
         
         # Force restore without confirmation
         invoice-checker database restore backup.db --force
+        
+        # Restore an incremental backup from its manifest
+        invoice-checker database restore invoice_detection_backups/manifests/<backup_id>.json
     """
     try:
         backup_path = Path(backup_path)
@@ -220,7 +318,11 @@ def restore(ctx, backup_path, force, verify):
             if verify:
                 progress.start_step("Verifying backup", "Checking backup integrity")
                 try:
-                    _verify_backup_integrity(backup_path, db_manager)
+                    if backup_path.suffix == '.json':
+                        from database.backup_repository import BackupRepository
+                        BackupRepository(backup_path.parent.parent).verify_backup(backup_path)
+                    else:
+                        _verify_backup_integrity(backup_path, db_manager)
                     progress.complete_step(True, "Backup verified successfully")
                 except DatabaseError as e:
                     progress.complete_step(False, f"Backup verification failed: {e}")
@@ -258,6 +360,62 @@ def restore(ctx, backup_path, force, verify):
         raise CLIError(f"Failed to restore backup: {e}")
 
 
+@database_group.command(name='prune-backups')
+@click.option('--repository', type=click.Path(file_okay=False),
+              help='Incremental backup repository (default: <database>_backups)')
+@click.option('--retention-days', type=int,
+              help='Delete backups older than this many days (default: backup_retention_days)')
+@click.option('--keep-last', type=int, default=1, show_default=True,
+              help='Always keep this many of the newest backups')
+@pass_context
+def prune_backups(ctx, repository, retention_days, keep_last):
+    """
+    Prune an incremental backup repository.
+    
+    Deletes expired backup manifests and reclaims chunks that no remaining
+    backup references.
+    
+    Examples:
+        # Apply the configured retention policy
+        invoice-checker database prune-backups
+        
+        # Keep only the last 7 days, but never fewer than 3 backups
+        invoice-checker database prune-backups --retention-days 7 --keep-last 3
+    """
+    try:
+        from database.backup_repository import BackupRepository
+        
+        db_manager = ctx.get_db_manager()
+        repository_path = Path(repository) if repository else _default_backup_repository(db_manager)
+        
+        if not BackupRepository.is_repository(repository_path):
+            raise CLIError(f"Not an incremental backup repository: {repository_path}")
+        
+        if retention_days is None:
+            retention_days = int(db_manager.get_config_value('backup_retention_days', 30))
+        
+        with spinner("Pruning backups"):
+            result = BackupRepository(repository_path).prune(
+                retention_days=retention_days,
+                keep_last=keep_last
+            )
+        
+        print_success("Backup repository pruned!")
+        display_summary("Prune Results", {
+            'manifests_deleted': result['manifests_deleted'],
+            'chunks_deleted': result['chunks_deleted'],
+            'space_freed_mb': round(result['bytes_freed'] / (1024 * 1024), 2)
+        })
+        
+    except DatabaseError as e:
+        raise CLIError(f"Database error: {e}")
+    except CLIError:
+        raise
+    except Exception as e:
+        logger.exception("Failed to prune backups")
+        raise CLIError(f"Failed to prune backups: {e}")
+
+
 @database_group.command()
 @click.option('--to-version', type=str, default='latest',
               help='Target schema version')
@@ -129,50 +129,17 @@ def list_sessions(ctx, limit: int, detailed: bool):
         invoice-checker discovery sessions --limit 20 --detailed
     """
     try:
-        app_context = get_context()
-        
-        # Check if database manager is available
-        if not app_context.db_manager:
-            console.print(format_info("No discovery sessions found."))
-            return
+        db_manager = get_context().get_db_manager()
         
-        # Get recent discovery sessions from database logs
-        logs = app_context.db_manager.get_discovery_logs(limit=limit * 10)  # Get more to group by session
+        # Session summaries are maintained incrementally alongside the discovery log
+        session_list = db_manager.list_discovery_sessions(limit=limit)
         
-        if not logs:
+        if not session_list:
             console.print(format_info("No discovery sessions found."))
             return
         
-        # Group logs by session
-        sessions = {}
-        for log in logs:
-            session_id = log.processing_session_id
-            if session_id not in sessions:
-                sessions[session_id] = {
-                    'session_id': session_id,
-                    'parts_discovered': set(),
-                    'parts_added': 0,
-                    'first_seen': log.created_at,
-                    'last_seen': log.created_at
-                }
-            
-            sessions[session_id]['parts_discovered'].add(log.part_number)
-            if log.action_taken == 'added':
-                sessions[session_id]['parts_added'] += 1
-            
-            # Update time range
-            if log.created_at < sessions[session_id]['first_seen']:
-                sessions[session_id]['first_seen'] = log.created_at
-            if log.created_at > sessions[session_id]['last_seen']:
-                sessions[session_id]['last_seen'] = log.created_at
-        
-        # Convert to list and sort by most recent
-        session_list = list(sessions.values())
-        session_list.sort(key=lambda x: x['last_seen'], reverse=True)
-        session_list = session_list[:limit]
-        
         if detailed:
-            _display_detailed_sessions(session_list)
+            _display_detailed_sessions(session_list, db_manager)
         else:
             _display_sessions_table(session_list)
     
@@ -211,8 +178,7 @@ def discovery_stats(ctx, session_id: Optional[str], days: int):
             _display_session_stats(summary)
         else:
             # Show overall stats
-            logs = app_context.db_manager.get_discovery_logs(days=days)
-            stats = _calculate_discovery_stats(logs)
+            stats = app_context.get_db_manager().get_discovery_session_stats(days_back=days)
             _display_overall_stats(stats, days)
     
     except DatabaseError as e:
@@ -452,7 +418,7 @@ def _display_sessions_table(sessions: List[dict]):
     
     for session in sessions:
         session_id = session['session_id'][:18] + "..." if len(session['session_id']) > 20 else session['session_id']
-        parts_discovered = str(len(session['parts_discovered']))
+        parts_discovered = str(session['distinct_parts'])
         parts_added = str(session['parts_added'])
         first_seen = session['first_seen'].strftime('%Y-%m-%d %H:%M') if session['first_seen'] else "N/A"
         last_seen = session['last_seen'].strftime('%Y-%m-%d %H:%M') if session['last_seen'] else "N/A"
@@ -462,20 +428,22 @@ def _display_sessions_table(sessions: List[dict]):
     console.print(table)
 
 
-def _display_detailed_sessions(sessions: List[dict]):
+def _display_detailed_sessions(sessions: List[dict], db_manager):
     """Display detailed session information."""
     for session in sessions:
         panel_content = []
         panel_content.append(f"Session ID: {session['session_id']}")
-        panel_content.append(f"Parts Discovered: {len(session['parts_discovered'])}")
+        panel_content.append(f"Parts Discovered: {session['distinct_parts']}")
         panel_content.append(f"Parts Added: {session['parts_added']}")
+        panel_content.append(f"Parts Skipped: {session['parts_skipped']}")
         panel_content.append(f"First Seen: {session['first_seen'].strftime('%Y-%m-%d %H:%M:%S') if session['first_seen'] else 'N/A'}")
         panel_content.append(f"Last Seen: {session['last_seen'].strftime('%Y-%m-%d %H:%M:%S') if session['last_seen'] else 'N/A'}")
         
-        if session['parts_discovered']:
-            panel_content.append(f"Discovered Parts: {', '.join(list(session['parts_discovered'])[:5])}")
-            if len(session['parts_discovered']) > 5:
-                panel_content.append(f"... and {len(session['parts_discovered']) - 5} more")
+        if session['distinct_parts']:
+            sample_parts = db_manager.get_discovery_session_parts(session['session_id'], limit=5)
+            panel_content.append(f"Discovered Parts: {', '.join(sample_parts)}")
+            if session['distinct_parts'] > 5:
+                panel_content.append(f"... and {session['distinct_parts'] - 5} more")
         
         panel = Panel(
             "\n".join(panel_content),
@@ -527,41 +495,3 @@ def _display_overall_stats(stats: dict, days: int):
     )
     console.print(panel)
 
-
-def _calculate_discovery_stats(logs: List) -> dict:
-    """Calculate overall discovery statistics from logs."""
-    if not logs:
-        return {
-            'total_discoveries': 0,
-            'unique_parts': 0,
-            'parts_added': 0,
-            'parts_skipped': 0,
-            'success_rate': 0.0,
-            'active_sessions': 0
-        }
-    
-    unique_parts = set()
-    parts_added = 0
-    parts_skipped = 0
-    sessions = set()
-    
-    for log in logs:
-        unique_parts.add(log.part_number)
-        sessions.add(log.processing_session_id)
-        
-        if log.action_taken == 'added':
-            parts_added += 1
-        elif log.action_taken == 'skipped':
-            parts_skipped += 1
-    
-    total_processed = parts_added + parts_skipped
-    success_rate = (parts_added / total_processed * 100) if total_processed > 0 else 0
-    
-    return {
-        'total_discoveries': len(logs),
-        'unique_parts': len(unique_parts),
-        'parts_added': parts_added,
-        'parts_skipped': parts_skipped,
-        'success_rate': success_rate,
-        'active_sessions': len(sessions)
-    }
\ No newline at end of file
@@ -4,12 +4,16 @@ Invoice processing commands for the CLI interface.
 This module implements all invoice-related commands including:
 - process: Main invoice processing with parts-based validation
 - batch: Batch processing of multiple folders
+- watch: Continuous processing of invoices dropped into an inbox folder
+- runs: List journaled folder runs that can be resumed
 - interactive: Guided interactive processing
 - collect-unknowns: Collect unknown parts without validation
 """
 
+import os
 import uuid
 import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from decimal import Decimal
@@ -22,6 +26,7 @@ from cli.formatters import (
     print_success, print_warning, print_error, print_info,
     format_table, write_csv, display_summary
 )
+from processing.file_discovery import find_pdf_files, iter_pdf_files
 from processing.report_utils import get_documents_directory, get_report_summary_message
 from cli.progress import show_file_progress, MultiStepProgress
 from cli.prompts import (
@@ -162,9 +167,18 @@ def extract_parts(ctx, input_path, output):
               help='Threshold for threshold-based mode - uses config default if not specified')
 @click.option('--no-auto-open', is_flag=True,
               help='Disable automatic opening of generated reports')
+@click.option('--parallel', '-p', is_flag=True,
+              help='Extract folder invoices in parallel and review unknown parts once per batch')
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='Maximum worker processes for --parallel (defaults to CPU count)')
+@click.option('--incremental', is_flag=True,
+              help='Skip PDFs unchanged since their last successful processing')
+@click.option('--resume', 'resume_run_id', type=str, default=None, metavar='RUN_ID',
+              help='Resume an interrupted folder run, reusing results already journaled')
 @pass_context
 def process(ctx, input_path, output, format, collect_unknown,
-           session_id, validation_mode, threshold, no_auto_open):
+           session_id, validation_mode, threshold, no_auto_open, parallel, workers,
+           incremental, resume_run_id):
     """
     Process invoices with parts-based validation (primary command).
     
@@ -190,11 +204,30 @@ def process(ctx, input_path, output, format, collect_unknown,
         
         # Threshold-based processing for legacy mode
         invoice-checker process invoice.pdf --threshold 0.25 --validation-mode threshold_based
+        
+        # Use all CPU cores for a large folder
+        invoice-checker process ./invoices --parallel
+        
+        # Only process invoices added or changed since the last run
+        invoice-checker process ./invoices --incremental
+        
+        # Continue a folder run that was interrupted
+        invoice-checker process --resume 3f2b9c1e-...
     """
     try:
         # Get database manager first to access config
         db_manager = ctx.get_db_manager()
         
+        # A resumed run defaults to the folder it was started for
+        if resume_run_id:
+            run = db_manager.get_processing_run(resume_run_id)
+            if run is None:
+                raise CLIError(f"Processing run not found: {resume_run_id}")
+            if not input_path:
+                input_path = run.input_path
+            if output is None and run.output_path:
+                output = run.output_path
+        
         # Load configuration values and apply defaults
         config_values = _load_config_values(db_manager)
         
@@ -234,6 +267,10 @@ def process(ctx, input_path, output, format, collect_unknown,
         else:
             input_path = Path(input_path)
         
+        # Only folder runs are journaled
+        if resume_run_id and input_path.is_file():
+            raise CLIError(f"--resume applies to folder runs; {input_path} is a single file")
+        
         # Handle output path with config consideration
         if output is None:
             auto_output = config_values.get('auto_output_location', True)
@@ -262,7 +299,11 @@ def process(ctx, input_path, output, format, collect_unknown,
             collect_unknown=collect_unknown,
             session_id=session_id,
             db_manager=db_manager,
-            auto_open=not no_auto_open
+            auto_open=not no_auto_open,
+            parallel=parallel,
+            max_workers=workers,
+            incremental=incremental,
+            run_id=resume_run_id
         )
         
         # Display results
@@ -290,12 +331,14 @@ def process(ctx, input_path, output, format, collect_unknown,
               help='Output directory for reports')
 @click.option('--parallel', '-p', is_flag=True,
               help='Enable parallel processing')
-@click.option('--max-workers', type=int, default=4,
-              help='Maximum worker threads')
+@click.option('--max-workers', type=click.IntRange(min=1), default=None,
+              help='Maximum worker processes (default: number of CPUs)')
 @click.option('--continue-on-error', is_flag=True,
               help='Continue processing if individual folders fail')
+@click.option('--resume', 'resume_run_id', type=str, default=None, metavar='RUN_ID',
+              help='Resume an interrupted batch, reusing results already journaled')
 @pass_context
-def batch(ctx, input_path, output_dir, parallel, max_workers, continue_on_error):
+def batch(ctx, input_path, output_dir, parallel, max_workers, continue_on_error, resume_run_id):
     """
     Process multiple invoice folders in batch mode.
     
@@ -308,6 +351,9 @@ def batch(ctx, input_path, output_dir, parallel, max_workers, continue_on_error)
         
         # Process with custom output directory
         invoice-checker batch ./invoices --output-dir ./batch_reports
+        
+        # Continue a batch that was interrupted
+        invoice-checker batch ./invoices --resume 3f2b9c1e-...
     """
     try:
         input_path = Path(input_path)
@@ -327,6 +373,9 @@ def batch(ctx, input_path, output_dir, parallel, max_workers, continue_on_error)
         # Get database manager
         db_manager = ctx.get_db_manager()
         
+        run_id = resume_run_id or str(uuid.uuid4())
+        print_info(f"Batch run ID: {run_id} (if interrupted, continue with --resume {run_id})")
+        
         # Process folders
         results = _process_batch(
             folders=folders_to_process,
@@ -334,7 +383,8 @@ def batch(ctx, input_path, output_dir, parallel, max_workers, continue_on_error)
             parallel=parallel,
             max_workers=max_workers,
             continue_on_error=continue_on_error,
-            db_manager=db_manager
+            db_manager=db_manager,
+            run_id=run_id
         )
         
         # Display batch results
@@ -346,6 +396,113 @@ def batch(ctx, input_path, output_dir, parallel, max_workers, continue_on_error)
         raise CLIError(f"Batch processing failed: {e}")
 
 
+@invoice_group.command()
+@click.argument('inbox', type=click.Path(exists=True, file_okay=False), required=True)
+@click.option('--output-dir', '-o', type=click.Path(file_okay=False), default=None,
+              help='Directory for the rolling watch report (default: documents/)')
+@click.option('--settle', type=click.FloatRange(min=0), default=2.0,
+              help='Seconds a file must stay unchanged before it is processed')
+@click.option('--poll-interval', type=click.FloatRange(min=0.1), default=5.0,
+              help='Seconds between inbox scans when inotify is unavailable')
+@click.option('--polling', is_flag=True,
+              help='Always poll the inbox instead of using inotify')
+@pass_context
+def watch(ctx, inbox, output_dir, settle, poll_interval, polling):
+    """
+    Watch an inbox directory and process invoices as they arrive.
+
+    Runs until interrupted, keeping the PDF libraries, database connection
+    and parts cache loaded between invoices. Results are appended to a
+    daily CSV report. Files already processed successfully are skipped,
+    so the watcher can be restarted safely.
+
+    The watcher never prompts. Unknown parts are listed in the report and
+    logged for review with 'discovery review'; add them there or with
+    'parts add', and later invoices validate against them.
+
+    Examples:
+        # Watch an inbox folder
+        invoice-checker watch ./inbox
+
+        # Poll every 30 seconds and write the report elsewhere
+        invoice-checker invoice watch ./inbox --polling --poll-interval 30 -o ./reports
+    """
+    from processing.invoice_processor import InvoiceProcessor
+    from processing.folder_watcher import FolderWatcher, RollingReport
+    from database.parts_index import PartsIndex
+
+    try:
+        db_manager = ctx.get_db_manager()
+        parts_index = PartsIndex(db_manager)
+        parts_index.refresh()
+
+        processor = InvoiceProcessor(database_manager=db_manager, parts_index=parts_index,
+                                     defer_discovery=True)
+        report = RollingReport(Path(output_dir) if output_dir else get_documents_directory())
+        watcher = FolderWatcher(
+            processor,
+            Path(inbox),
+            report,
+            settle_seconds=settle,
+            poll_interval=poll_interval,
+            use_inotify=False if polling else None
+        )
+
+        print_info(f"Watching {inbox} ({len(parts_index)} parts loaded). Press Ctrl-C to stop.")
+        print_info(f"Results are appended to {report.current_path()}")
+        print_info(f"Unknown parts are not prompted for; review them with "
+                   f"'discovery review --session-id {watcher.discovery_session_id}'")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+
+        print_success(f"Stopped watching {inbox}: {watcher.files_processed} processed, "
+                      f"{watcher.files_failed} failed, {watcher.files_skipped} skipped")
+
+    except Exception as e:
+        logger.exception("Watch failed")
+        raise CLIError(f"Watch failed: {e}")
+
+
+@invoice_group.command(name='runs')
+@click.option('--status', type=click.Choice(['running', 'completed', 'interrupted']), default=None,
+              help='Only show runs with this status')
+@click.option('--limit', type=click.IntRange(min=1), default=20,
+              help='Maximum number of runs to show')
+@pass_context
+def list_runs(ctx, status, limit):
+    """
+    List journaled folder processing runs.
+
+    Runs that were interrupted can be continued with
+    'invoice process --resume RUN_ID'.
+    """
+    try:
+        db_manager = ctx.get_db_manager()
+        runs = db_manager.list_processing_runs(status=status, limit=limit)
+
+        if not runs:
+            print_info("No processing runs found.")
+            return
+
+        run_data = []
+        for run in runs:
+            completed_files = db_manager.count_run_files(run.run_id)
+            run_data.append({
+                'Run ID': run.run_id,
+                'Status': run.status,
+                'Files': f"{completed_files}/{run.total_files}",
+                'Started': run.started_date.strftime('%Y-%m-%d %H:%M:%S') if run.started_date else '',
+                'Folder': run.input_path
+            })
+        click.echo(format_table(run_data))
+
+    except Exception as e:
+        logger.exception("Listing processing runs failed")
+        raise CLIError(f"Failed to list processing runs: {e}")
+
+
 @invoice_group.command()
 @click.option('--preset', type=str, help='Use predefined settings preset')
 @click.option('--save-preset', type=str, help='Save current settings as preset')
@@ -519,7 +676,7 @@ def run_quick_processing(ctx, input_path=None, auto_open=True):
         
         # Validate input folder has PDF files
         if input_path.is_dir():
-            pdf_files = list(input_path.glob("*.pdf"))
+            pdf_files = find_pdf_files(input_path, recursive=False)
             if not pdf_files:
                 print_warning(f"No PDF files found in {input_path}")
                 raise CLIError(f"No PDF files found in {input_path}")
@@ -565,7 +722,7 @@ def run_quick_processing(ctx, input_path=None, auto_open=True):
             output_format=output_format,
             validation_mode=validation_mode,
             threshold=threshold,
-            interactive=True,  # Interactive discovery always enabled
+            interactive=not defer_discovery,
             collect_unknown=False,
             session_id=session_id,
             db_manager=db_manager,
@@ -655,7 +812,7 @@ def run_interactive_processing(ctx, preset=None, save_preset=None):
             pdf_files = [original_file]
         else:
             # Validate input folder has PDF files
-            pdf_files = list(input_path.glob("*.pdf"))
+            pdf_files = find_pdf_files(input_path, recursive=False)
             if not pdf_files:
                 print_warning(f"No PDF files found in {input_path}")
                 if not click.confirm("Continue anyway?", default=False):
@@ -789,7 +946,7 @@ def _discover_pdf_files(input_path: Path) -> List[Path]:
             raise ProcessingError(f"File is not a PDF: {input_path}")
     # Handle directory input
     else:
-        pdf_files = list(input_path.glob("*.pdf"))
+        pdf_files = find_pdf_files(input_path, recursive=False)
         if not pdf_files:
             raise ProcessingError(f"No PDF files found in directory: {input_path}")
         print_info(f"Found {len(pdf_files)} PDF files to process in directory: {input_path.name}")
@@ -1010,10 +1167,21 @@ def _generate_processing_results(validation_results: Dict[str, Any],
 
 def _process_invoices(input_path: Path, output_path: Path, output_format: str,
                      validation_mode: str, threshold: Decimal, interactive: bool,
-                     collect_unknown: bool, session_id: str, db_manager, auto_open: bool = True) -> Dict[str, Any]:
+                     collect_unknown: bool, session_id: str, db_manager, auto_open: bool = True,
+                     parallel: bool = False, max_workers: Optional[int] = None,
+                     incremental: bool = False, run_id: Optional[str] = None,
+                     defer_discovery: bool = False, discovery_session=None) -> Dict[str, Any]:
     """
     Core invoice processing logic using InvoiceProcessor.
 
+    Folder runs are journaled under ``run_id`` (generated when omitted) so an
+    interrupted run can be resumed with ``invoice process --resume``.
+
+    With ``defer_discovery`` unknown parts are not prompted for; they are
+    returned under ``deferred_unknown_parts`` for the caller to resolve.
+    A ``discovery_session`` shared between calls remembers which unknown
+    parts were already added or skipped, so they are not offered again.
+
     Steps:
     1) Discover PDFs
     2) Process using InvoiceProcessor
@@ -1033,17 +1201,44 @@ def _process_invoices(input_path: Path, output_path: Path, output_format: str,
             if total > 1:  # Only show progress for batch processing
                 print_info(f"[{current}/{total}] {message}")
         
-        # 3) Create InvoiceProcessor
+        # 3) Create InvoiceProcessor; the threshold is the global price tolerance,
+        # which tolerance rules override per part, category or item type
+        from processing.validation_models import ValidationConfiguration
+        validation_config = ValidationConfiguration()
+        if threshold is not None:
+            validation_config.price_tolerance = Decimal(str(threshold))
         processor = InvoiceProcessor(
             database_manager=db_manager,
-            progress_callback=progress_callback
+            progress_callback=progress_callback,
+            defer_discovery=defer_discovery,
+            discovery_session=discovery_session,
+            validation_config=validation_config
         )
         
-        # 4) Process invoices
-        if len(pdf_files) == 1:
+        # 4) Process invoices; a folder is a journaled run even with one PDF, unless a
+        # single file was picked from it
+        single_file = len(pdf_files) == 1 and (input_path.is_file() or
+                                               bool(getattr(input_path, 'pdf_files_override', None)))
+        if single_file and incremental and not processor.filter_unchanged_files(pdf_files)[0]:
+            print_info(f"Skipping {pdf_files[0].name}: unchanged since its last successful processing")
+            stats = {
+                'files_processed': 0,
+                'files_failed': 0,
+                'files_skipped': 1,
+                'anomalies_found': 0,
+                'unknown_parts': 0,
+                'total_overcharge': Decimal('0.00'),
+                'report_file': str(output_path),
+                'critical_anomalies': 0,
+                'warning_anomalies': 0,
+                'processing_time': 0.0
+            }
+        
+        elif single_file:
             # Single file processing
             pdf_file = pdf_files[0]
             result = processor.process_single_invoice(pdf_file, output_path if output_path.is_dir() else output_path.parent)
+            processor.record_processed_files([result])
             
             # Generate reports if processing was successful
             if result.success and result.validation_json:
@@ -1070,9 +1265,15 @@ def _process_invoices(input_path: Path, output_path: Path, output_format: str,
             
         else:
             # Directory/batch processing
+            run_id = run_id or str(uuid.uuid4())
+            print_info(f"Run ID: {run_id} (if interrupted, continue with --resume {run_id})")
             batch_result = processor.process_directory(
                 input_path,
-                output_path if output_path.is_dir() else output_path.parent
+                output_path if output_path.is_dir() else output_path.parent,
+                parallel=parallel,
+                max_workers=max_workers,
+                incremental=incremental,
+                run_id=run_id
             )
             
             # Convert to legacy format
@@ -1087,6 +1288,14 @@ def _process_invoices(input_path: Path, output_path: Path, output_format: str,
                 'warning_anomalies': batch_result.total_validation_errors,
                 'processing_time': batch_result.total_processing_time
             }
+            if incremental:
+                stats['files_skipped'] = batch_result.skipped_files
+            if batch_result.resumed_files:
+                stats['files_resumed'] = batch_result.resumed_files
+            stats['run_id'] = batch_result.run_id
+        
+        if defer_discovery:
+            stats['deferred_unknown_parts'] = processor.deferred_unknown_parts
         
         return stats
 
@@ -1100,7 +1309,8 @@ def _process_invoices(input_path: Path, output_path: Path, output_format: str,
 
 
 def _process_batch(folders: List[Path], output_dir: Path, parallel: bool,
-                  max_workers: int, continue_on_error: bool, db_manager) -> Dict[str, Any]:
+                  max_workers: Optional[int], continue_on_error: bool, db_manager,
+                  run_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Process multiple folders in batch mode with proper implementation.
     
@@ -1108,13 +1318,26 @@ def _process_batch(folders: List[Path], output_dir: Path, parallel: bool,
     separate reports for each folder. It supports both parallel and sequential
     processing modes with comprehensive error handling.
     
+    In parallel mode each folder runs in a worker process with its own
+    read-only database connection, so PDF extraction is not serialized by the
+    GIL. Workers never write to the database: their run journal, manifest and
+    rate statistics writes come back with the folder result and are committed
+    by the parent, one folder at a time. Nor do workers prompt for unknown
+    parts or add them; they send them back
+    and the parent offers every distinct unknown part once, after all folders
+    finish, committing new parts through its own database manager. Folders
+    with a part that was added are then processed again, so their reports
+    validate those lines against the new parts instead of leaving them UNKNOWN.
+    
     Args:
         folders: List of folder paths containing PDF files
         output_dir: Directory to write output reports
         parallel: Enable parallel processing
-        max_workers: Maximum number of worker threads for parallel processing
+        max_workers: Maximum number of worker processes (defaults to the CPU count)
         continue_on_error: Continue processing if individual folders fail
         db_manager: Database manager instance
+        run_id: Batch run identifier; each folder is journaled as ``<run_id>/<folder name>``
+            so that rerunning with the same ID resumes every folder where it stopped
         
     Returns:
         Dictionary containing processing statistics and results
@@ -1122,9 +1345,7 @@ def _process_batch(folders: List[Path], output_dir: Path, parallel: bool,
     Raises:
         ProcessingError: If batch processing fails critically
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    import uuid
-    from pathlib import Path
+    from concurrent.futures import as_completed
     
     stats = {
         'folders_processed': 0,
@@ -1134,68 +1355,33 @@ def _process_batch(folders: List[Path], output_dir: Path, parallel: bool,
         'processing_errors': []
     }
     
-    def process_single_folder(folder_path: Path) -> Dict[str, Any]:
-        """
-        Process a single folder and return results.
-        
-        Args:
-            folder_path: Path to folder containing PDF files
-            
-        Returns:
-            Dictionary containing processing results for the folder
-        """
-        try:
-            session_id = str(uuid.uuid4())
-            output_file = output_dir / f"{folder_path.name}_report.csv"
-            
-            logger.info(f"Processing folder: {folder_path}")
-            print_info(f"Processing folder: {folder_path.name}")
-            
-            # Load config values for batch processing
-            config_values = _load_config_values(db_manager)
-            
-            # Use existing _process_invoices function with config defaults
-            # Interactive discovery is always enabled
-            
-            result = _process_invoices(
-                input_path=folder_path,
-                output_path=output_file,
-                output_format=config_values.get('default_output_format', 'csv'),
-                validation_mode=config_values.get('validation_mode', 'parts_based'),
-                threshold=Decimal(str(config_values.get('price_tolerance', '0.001'))),
-                interactive=True,  # Interactive discovery always enabled
-                collect_unknown=False,
-                session_id=session_id,
-                db_manager=db_manager
-            )
-            
-            logger.info(f"Successfully processed folder {folder_path}: {result.get('files_processed', 0)} files")
-            
-            return {
-                'folder': folder_path,
-                'success': True,
-                'result': result,
-                'error': None
-            }
-            
-        except Exception as e:
-            logger.exception(f"Failed to process folder {folder_path}")
-            return {
-                'folder': folder_path,
-                'success': False,
-                'result': None,
-                'error': str(e)
-            }
+    def record_folder_result(result: Dict[str, Any]) -> None:
+        """Add one folder's outcome to the batch statistics."""
+        folder = result['folder']
+        if result['success']:
+            stats['folders_processed'] += 1
+            stats['total_files'] += result['result'].get('files_processed', 0)
+            stats['total_anomalies'] += result['result'].get('anomalies_found', 0)
+            print_info(f"✓ Completed: {folder.name}")
+        else:
+            stats['folders_failed'] += 1
+            stats['processing_errors'].append({
+                'folder': str(folder),
+                'error': result['error']
+            })
+            print_error(f"✗ Failed: {folder.name} - {result['error']}")
     
     if parallel and len(folders) > 1:
-        # Parallel processing using ThreadPoolExecutor
-        logger.info(f"Starting parallel batch processing with {max_workers} workers")
-        print_info(f"Processing {len(folders)} folders in parallel (max {max_workers} workers)")
+        # Parallel processing with one database connection per worker process
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(folders)))
+        logger.info(f"Starting parallel batch processing with {workers} workers")
+        print_info(f"Processing {len(folders)} folders in parallel (max {workers} workers)")
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        deferred_parts: Dict[Path, List[Dict[str, Any]]] = {}
+        with _create_folder_executor(workers, db_manager) as executor:
             # Submit all folder processing tasks
             future_to_folder = {
-                executor.submit(process_single_folder, folder): folder
+                executor.submit(_process_folder_in_worker, folder, output_dir, run_id): folder
                 for folder in folders
             }
             
@@ -1204,63 +1390,46 @@ def _process_batch(folders: List[Path], output_dir: Path, parallel: bool,
                 folder = future_to_folder[future]
                 try:
                     result = future.result()
-                    
-                    if result['success']:
-                        stats['folders_processed'] += 1
-                        stats['total_files'] += result['result'].get('files_processed', 0)
-                        stats['total_anomalies'] += result['result'].get('anomalies_found', 0)
-                        print_info(f"✓ Completed: {folder.name}")
-                    else:
-                        stats['folders_failed'] += 1
-                        stats['processing_errors'].append({
-                            'folder': str(folder),
-                            'error': result['error']
-                        })
-                        print_error(f"✗ Failed: {folder.name} - {result['error']}")
-                        
-                        if not continue_on_error:
-                            # Cancel remaining tasks
-                            for remaining_future in future_to_folder:
-                                remaining_future.cancel()
-                            raise ProcessingError(f"Batch processing failed on {folder}: {result['error']}")
-                            
                 except Exception as e:
-                    stats['folders_failed'] += 1
-                    error_msg = str(e)
-                    stats['processing_errors'].append({
-                        'folder': str(folder),
-                        'error': error_msg
-                    })
+                    # The worker process itself failed (e.g. it was killed)
                     logger.exception(f"Unexpected error processing folder {folder}")
-                    print_error(f"✗ Failed: {folder.name} - {error_msg}")
-                    
-                    if not continue_on_error:
-                        raise ProcessingError(f"Batch processing failed on {folder}: {error_msg}")
+                    result = {'folder': folder, 'success': False, 'result': None, 'error': str(e)}
+                
+                _commit_worker_writes(result, db_manager)
+                record_folder_result(result)
+                if result['success']:
+                    if result['result'].get('deferred_unknown_parts'):
+                        deferred_parts[folder] = result['result']['deferred_unknown_parts']
+                elif not continue_on_error:
+                    # Cancel remaining tasks
+                    for remaining_future in future_to_folder:
+                        remaining_future.cancel()
+                    raise ProcessingError(f"Batch processing failed on {folder}: {result['error']}")
+            
+            if deferred_parts:
+                stats['unknown_parts_found'] = _resolve_deferred_unknown_parts(
+                    [part for parts in deferred_parts.values() for part in parts], db_manager
+                )
+                _revalidate_folders(executor, _folders_with_added_parts(deferred_parts, db_manager),
+                                    output_dir, db_manager, run_id)
     else:
         # Sequential processing
+        from processing.part_discovery import BatchDiscoverySession
+        
         logger.info("Starting sequential batch processing")
         print_info(f"Processing {len(folders)} folders sequentially")
         
+        # Unknown parts added or skipped in one folder are not offered again in the next
+        discovery_session = BatchDiscoverySession()
         for i, folder in enumerate(folders, 1):
             print_info(f"[{i}/{len(folders)}] Processing: {folder.name}")
             
-            result = process_single_folder(folder)
+            result = _process_folder(folder, output_dir, db_manager, run_id,
+                                     discovery_session=discovery_session)
+            record_folder_result(result)
             
-            if result['success']:
-                stats['folders_processed'] += 1
-                stats['total_files'] += result['result'].get('files_processed', 0)
-                stats['total_anomalies'] += result['result'].get('anomalies_found', 0)
-                print_info(f"✓ Completed: {folder.name}")
-            else:
-                stats['folders_failed'] += 1
-                stats['processing_errors'].append({
-                    'folder': str(folder),
-                    'error': result['error']
-                })
-                print_error(f"✗ Failed: {folder.name} - {result['error']}")
-                
-                if not continue_on_error:
-                    raise ProcessingError(f"Batch processing failed on {folder}: {result['error']}")
+            if not result['success'] and not continue_on_error:
+                raise ProcessingError(f"Batch processing failed on {folder}: {result['error']}")
     
     # Log final statistics
     logger.info(f"Batch processing completed: {stats['folders_processed']} successful, {stats['folders_failed']} failed")
@@ -1268,6 +1437,205 @@ def _process_batch(folders: List[Path], output_dir: Path, parallel: bool,
     return stats
 
 
+def _process_folder(folder_path: Path, output_dir: Path, db_manager,
+                    run_id: Optional[str] = None, defer_discovery: bool = False,
+                    discovery_session=None) -> Dict[str, Any]:
+    """
+    Process a single batch folder and return results.
+    
+    Args:
+        folder_path: Path to folder containing PDF files
+        output_dir: Directory to write output reports
+        db_manager: Database manager instance
+        run_id: Batch run identifier the folder is journaled under
+        defer_discovery: Return unknown parts instead of prompting for them
+        discovery_session: Discovery session shared across the batch's folders
+        
+    Returns:
+        Dictionary containing processing results for the folder
+    """
+    try:
+        session_id = str(uuid.uuid4())
+        output_file = output_dir / f"{folder_path.name}_report.csv"
+        
+        logger.info(f"Processing folder: {folder_path}")
+        print_info(f"Processing folder: {folder_path.name}")
+        
+        # Load config values for batch processing
+        config_values = _load_config_values(db_manager)
+        
+        # Use existing _process_invoices function with config defaults; unknown
+        # parts are prompted for unless discovery is deferred to the parent
+        result = _process_invoices(
+            input_path=folder_path,
+            output_path=output_file,
+            output_format=config_values.get('default_output_format', 'csv'),
+            validation_mode=config_values.get('validation_mode', 'parts_based'),
+            threshold=Decimal(str(config_values.get('price_tolerance', '0.001'))),
+            interactive=not defer_discovery,
+            collect_unknown=False,
+            session_id=session_id,
+            db_manager=db_manager,
+            run_id=f"{run_id}/{folder_path.name}" if run_id else None,
+            defer_discovery=defer_discovery,
+            discovery_session=discovery_session
+        )
+        
+        logger.info(f"Successfully processed folder {folder_path}: {result.get('files_processed', 0)} files")
+        
+        return {
+            'folder': folder_path,
+            'success': True,
+            'result': result,
+            'error': None
+        }
+        
+    except Exception as e:
+        logger.exception(f"Failed to process folder {folder_path}")
+        return {
+            'folder': folder_path,
+            'success': False,
+            'result': None,
+            'error': str(e)
+        }
+
+
+# Database manager of the current folder worker, opened by _init_folder_worker
+_folder_worker_db = None
+
+
+def _create_folder_executor(max_workers: int, db_manager) -> Executor:
+    """
+    Create the executor that runs batch folders in parallel.
+    
+    Worker processes each open their own read-only DatabaseManager on the same
+    database file. An in-memory database cannot be shared between processes,
+    so it falls back to worker threads reading through ``db_manager``. Either
+    way workers queue their writes for the parent (see ``_init_folder_worker``).
+    
+    Args:
+        max_workers: Number of workers
+        db_manager: Database manager of the parent process
+        
+    Returns:
+        Executor whose workers are initialized by ``_init_folder_worker``
+    """
+    db_path = getattr(db_manager, 'db_path', None)
+    if db_path is None or str(db_path) == ":memory:":
+        return ThreadPoolExecutor(max_workers=max_workers, initializer=_init_folder_worker,
+                                  initargs=(db_manager,))
+    try:
+        return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_folder_worker,
+                                   initargs=(str(db_path),))
+    except OSError as e:
+        # Process pools can be unavailable in restricted environments
+        logger.warning(f"Process pool unavailable ({e}); processing folders in threads")
+        return ThreadPoolExecutor(max_workers=max_workers, initializer=_init_folder_worker,
+                                  initargs=(db_manager,))
+
+
+def _init_folder_worker(database) -> None:
+    """Open the worker's read-only database manager from a database path, or share a given manager."""
+    global _folder_worker_db
+    if isinstance(database, str):
+        from database.database import DatabaseManager
+        database = DatabaseManager(database, read_only=True)
+    _folder_worker_db = database
+
+
+def _process_folder_in_worker(folder_path: Path, output_dir: Path,
+                              run_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Process a batch folder in a worker, deferring part discovery and database writes to the parent.
+    
+    The folder reads the database through the worker's manager, while its
+    writes are queued and returned in the result's ``deferred_writes``.
+    """
+    from database.deferred_writes import DeferredWrites
+    
+    database = DeferredWrites(_folder_worker_db)
+    result = _process_folder(folder_path, output_dir, database, run_id, defer_discovery=True)
+    result['deferred_writes'] = database.take_writes()
+    return result
+
+
+def _commit_worker_writes(result: Dict[str, Any], db_manager) -> None:
+    """Commit the database writes a folder worker returned with its result."""
+    from database.deferred_writes import apply_writes
+    
+    writes = result.pop('deferred_writes', None)
+    if writes:
+        apply_writes(db_manager, writes)
+
+
+def _resolve_deferred_unknown_parts(unknown_parts: List[Dict[str, Any]], db_manager) -> int:
+    """
+    Offer unknown parts collected by folder workers, committing additions in this process.
+    
+    Parts are deduplicated across folders and checked against the database
+    again, so each distinct part is offered once.
+    
+    Args:
+        unknown_parts: Unknown part entries returned by the workers
+        db_manager: Database manager of the parent process
+        
+    Returns:
+        Number of distinct unknown parts offered
+    """
+    from processing.part_discovery import SimplePartDiscoveryService
+    
+    discovery_service = SimplePartDiscoveryService(db_manager)
+    try:
+        return discovery_service.discover_and_add_parts_batch([{'parts': unknown_parts}])
+    except (EOFError, KeyboardInterrupt):
+        print_warning("Part discovery cancelled; unknown parts were not added")
+        return 0
+
+
+def _folders_with_added_parts(deferred_parts: Dict[Path, List[Dict[str, Any]]], db_manager) -> List[Path]:
+    """Folders with a deferred unknown part that is now in the database."""
+    from processing.part_discovery import SimplePartDiscoveryService
+    
+    discovery_service = SimplePartDiscoveryService(db_manager)
+    return [folder for folder, parts in deferred_parts.items()
+            if len(discovery_service.find_unknown_parts_batch([{'parts': parts}])) < len(parts)]
+
+
+def _revalidate_folders(executor: Executor, folders: List[Path], output_dir: Path,
+                        db_manager, run_id: Optional[str] = None) -> None:
+    """
+    Process folders again after unknown parts were added, rewriting their reports.
+    
+    The folders' first results are journaled with the parts still unknown, so
+    they are processed under a journal of their own.
+    
+    Args:
+        executor: Executor of the batch's folder workers
+        folders: Folders whose reports include parts that were added since
+        output_dir: Directory to write output reports
+        db_manager: Database manager the workers' writes are committed through
+        run_id: Batch run identifier
+    """
+    from concurrent.futures import as_completed
+    
+    if not folders:
+        return
+    print_info(f"Re-validating {len(folders)} folder(s) against the parts just added")
+    revalidation_id = f"{run_id}/revalidated" if run_id else None
+    futures = {executor.submit(_process_folder_in_worker, folder, output_dir, revalidation_id): folder
+               for folder in folders}
+    for future in as_completed(futures):
+        folder = futures[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        _commit_worker_writes(result, db_manager)
+        if not result['success']:
+            print_warning(f"Could not re-validate {folder.name}: {result['error']}; "
+                          f"its report still lists the added parts as unknown")
+
+
 def _collect_unknown_parts(input_path: Path, output_path: Path,
                           suggest_prices: bool, db_manager) -> Dict[str, Any]:
     """Collect unknown parts from invoices using InvoiceProcessor."""
@@ -1324,8 +1692,8 @@ def _find_invoice_folders(base_path: Path) -> List[Path]:
     
     for item in base_path.iterdir():
         if item.is_dir():
-            pdf_files = list(item.glob("*.pdf"))
-            if pdf_files:
+            # Stop at the first PDF; the folder's files are enumerated when it is processed
+            if next(iter_pdf_files(item, recursive=False), None) is not None:
                 folders.append(item)
     
     return folders
@@ -1453,6 +1821,8 @@ def _interactive_parts_addition(session_id: str, db_manager):
     Raises:
         CLIError: If interactive addition workflow fails
     """
+    from processing.part_discovery import SimplePartDiscoveryService
+    
     try:
         # Get unknown parts from discovery logs
         logs = db_manager.get_discovery_logs(session_id=session_id)
@@ -1485,24 +1855,34 @@ def _interactive_parts_addition(session_id: str, db_manager):
         added_count = 0
         skipped_count = 0
         
+        # Price suggestions from the running rate statistics of each part
+        rate_stats = SimplePartDiscoveryService(db_manager).suggest_prices(parts_to_add)
+        
         print_info(f"Starting interactive addition of {len(parts_to_add)} parts...")
         
         for i, (part_number, data) in enumerate(parts_to_add.items(), 1):
             click.echo(f"\n--- Part {i}/{len(parts_to_add)}: {part_number} ---")
             
-            # Filter out None prices
-            prices = [p for p in data['prices'] if p is not None]
-            if not prices:
-                print_warning(f"No valid prices found for {part_number}, skipping...")
-                skipped_count += 1
-                continue
+            stats = rate_stats.get(part_number)
+            if stats is not None and stats.observation_count:
+                line_count = stats.observation_count
+                avg_price = stats.suggested_price
+                min_price = stats.min_price
+                max_price = stats.max_price
+            else:
+                # Parts not yet seen by validation fall back to this session's logged prices
+                prices = [p for p in data['prices'] if p is not None]
+                if not prices:
+                    print_warning(f"No valid prices found for {part_number}, skipping...")
+                    skipped_count += 1
+                    continue
+                line_count = len(prices)
+                avg_price = sum(prices) / len(prices)
+                min_price = min(prices)
+                max_price = max(prices)
             
             # Show price analysis
-            avg_price = sum(prices) / len(prices)
-            min_price = min(prices)
-            max_price = max(prices)
-            
-            click.echo(f"Found in {len(prices)} invoice line(s)")
+            click.echo(f"Found in {line_count} invoice line(s)")
             click.echo(f"Price range: ${min_price:.4f} - ${max_price:.4f}")
             click.echo(f"Average price: ${avg_price:.4f}")
             
@@ -540,7 +540,8 @@ def export(ctx, output_file, category, active_only, include_inactive, format):
         # Get parts from database
         parts = db_manager.list_parts(
             active_only=show_active_only,
-            category=category
+            category=category,
+            as_records=True
         )
 
         if not parts:
@@ -557,7 +558,7 @@ def export(ctx, output_file, category, active_only, include_inactive, format):
                 'category': part.category or '',
                 'source': part.source,
                 'first_seen_invoice': part.first_seen_invoice or '',
-                'is_active': part.is_active,
+                'is_active': bool(part.is_active),
                 'notes': part.notes or ''
             })
 
@@ -600,7 +601,7 @@ def stats(ctx, category, format):
         db_stats = db_manager.get_database_stats()
         
         # Calculate parts statistics
-        all_parts = db_manager.list_parts(active_only=False, category=category)
+        all_parts = db_manager.list_parts(active_only=False, category=category, as_records=True)
         active_parts = [p for p in all_parts if p.is_active]
         inactive_parts = [p for p in all_parts if not p.is_active]
         
@@ -564,6 +564,9 @@ cli.add_command(config_commands.config_group)
 cli.add_command(discovery_commands.discovery_group)
 cli.add_command(utils_commands.utils_group)
 
+# The inbox watcher is long-running, so expose it at the top level as well
+cli.add_command(invoice_commands.watch)
+
 # Add top-level commands for convenience (these are also available under utils)
 @cli.command()
 @click.argument('input_path', type=click.Path(exists=True), required=False)
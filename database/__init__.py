@@ -5,23 +5,46 @@ This package provides database management functionality including:
 - DatabaseManager for CRUD operations
 - Model classes for data structures
 - Migration utilities
+- In-memory parts index for long-running processes
+- In-memory price history index for as-of price validation
 - Database utilities
 """
 
 from .database import DatabaseManager
-from .models import Part, Configuration, PartDiscoveryLog, DEFAULT_CONFIG
+from .models import Part, PartRecord, Configuration, PartDiscoveryLog, ProcessedFile, DEFAULT_CONFIG
+from .models import ProcessingRun, RunFileResult, PartRateStats, PriceInterval, ToleranceRule
 from .models import ValidationError, DatabaseError, PartNotFoundError, ConfigurationError
+from .models import MONEY_SCALE, to_money_units, money_units_or_zero, money_units_to_decimal, money_units_to_float
+from .models import format_money_units
 from .db_migration import DatabaseMigration
+from .parts_index import PartsIndex
+from .price_history import PriceHistoryIndex, parse_invoice_date
 
 __all__ = [
     'DatabaseManager',
     'Part',
+    'PartRecord',
     'Configuration',
     'PartDiscoveryLog',
+    'ProcessedFile',
+    'ProcessingRun',
+    'RunFileResult',
+    'PartRateStats',
+    'PriceInterval',
+    'ToleranceRule',
     'DEFAULT_CONFIG',
     'ValidationError',
     'DatabaseError',
     'PartNotFoundError',
     'ConfigurationError',
-    'DatabaseMigration'
+    'MONEY_SCALE',
+    'to_money_units',
+    'money_units_or_zero',
+    'money_units_to_decimal',
+    'money_units_to_float',
+    'format_money_units',
+    'DatabaseMigration',
+    'PartsIndex',
+    'PriceHistoryIndex',
+    'parse_invoice_date'
 ]
\ No newline at end of file
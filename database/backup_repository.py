@@ -0,0 +1,434 @@
+"""
+Deduplicating incremental backup repository for the Invoice Rate Detection System.
+
+Each backup is an online snapshot (see ``database.db_backup``) split into
+fixed-size, page-aligned chunks. Chunks are stored once, addressed by the
+SHA-256 of their contents, and every backup records the ordered list of chunk
+digests in a JSON manifest. Unchanged pages therefore cost no storage after
+the first backup, and restores rebuild the database from the manifest.
+
+Deduplication saves storage, not backup time: every backup still copies the
+whole database into a temporary snapshot and hashes all of it. Snapshots
+without discovery logs are not compacted, since VACUUM renumbers pages and
+would defeat deduplication; the freed log pages are zeroed instead.
+
+Repository layout::
+
+    <root>/manifests/<backup_id>.json
+    <root>/chunks/<digest[:2]>/<digest>
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from database.db_backup import ProgressCallback, backup_database, restore_database, verify_backup as verify_database_file
+from database.models import DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT_VERSION = 1
+
+# Pages per chunk; with the default 4 KiB page size chunks are 256 KiB
+DEFAULT_PAGES_PER_CHUNK = 64
+
+# Chunks are cheap to compress and SQLite pages are usually sparse
+_CHUNK_COMPRESSION_LEVEL = 1
+
+
+@dataclass
+class BackupManifest:
+    """
+    Description of one backup stored in a BackupRepository.
+    """
+    backup_id: str
+    created: datetime
+    source: str
+    page_size: int
+    chunk_size: int
+    database_size: int
+    sha256: str
+    chunks: List[str] = field(default_factory=list)
+    include_logs: bool = True
+    format_version: int = MANIFEST_FORMAT_VERSION
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert manifest to a JSON-serializable dictionary."""
+        return {
+            'format_version': self.format_version,
+            'backup_id': self.backup_id,
+            'created': self.created.isoformat(),
+            'source': self.source,
+            'page_size': self.page_size,
+            'chunk_size': self.chunk_size,
+            'database_size': self.database_size,
+            'sha256': self.sha256,
+            'include_logs': self.include_logs,
+            'chunks': self.chunks,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BackupManifest':
+        """Create manifest from a dictionary."""
+        if data.get('format_version') != MANIFEST_FORMAT_VERSION:
+            raise DatabaseError(f"Unsupported backup manifest version: {data.get('format_version')}")
+        return cls(
+            backup_id=data['backup_id'],
+            created=datetime.fromisoformat(data['created']),
+            source=data['source'],
+            page_size=data['page_size'],
+            chunk_size=data['chunk_size'],
+            database_size=data['database_size'],
+            sha256=data['sha256'],
+            chunks=list(data['chunks']),
+            include_logs=data.get('include_logs', True),
+        )
+
+
+class BackupRepository:
+    """
+    Content-addressed store of database backups.
+
+    Pruning and garbage collection must not run concurrently with a backup
+    into the same repository, since a chunk being reused could be collected
+    before its manifest is written.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        """
+        Initialize the repository, creating its directories if needed.
+
+        Args:
+            root: Repository directory
+        """
+        self.root = Path(root)
+        self.manifests_dir = self.root / "manifests"
+        self.chunks_dir = self.root / "chunks"
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    @staticmethod
+    def is_repository(path: Union[str, Path]) -> bool:
+        """Return True if ``path`` looks like a backup repository."""
+        path = Path(path)
+        return (path / "manifests").is_dir() and (path / "chunks").is_dir()
+
+    # Backup creation
+
+    def create_backup(self, source: Union[str, Path, sqlite3.Connection],
+                      pages_per_chunk: int = DEFAULT_PAGES_PER_CHUNK,
+                      progress: Optional[ProgressCallback] = None,
+                      verify: bool = True,
+                      include_logs: bool = True) -> Dict[str, Any]:
+        """
+        Snapshot a database and store it as deduplicated chunks.
+
+        Args:
+            source: Database file path or open connection to back up
+            pages_per_chunk: Database pages per stored chunk
+            progress: Optional callback receiving (pages_copied, total_pages)
+            verify: Integrity-check the snapshot before storing it
+            include_logs: Whether to keep discovery log tables in the backup
+
+        Returns:
+            Dict[str, Any]: backup_id, manifest_path, database_size, chunks_total,
+            chunks_written, bytes_written and duration_seconds
+
+        Raises:
+            DatabaseError: If the snapshot or repository write fails
+        """
+        start_time = time.monotonic()
+        with self._temp_file() as snapshot_path:
+            backup_database(source, snapshot_path, progress=progress, verify=verify,
+                            include_logs=include_logs, compact=False)
+
+            conn = sqlite3.connect(str(snapshot_path))
+            try:
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            finally:
+                conn.close()
+
+            chunk_size = page_size * pages_per_chunk
+            file_hash = hashlib.sha256()
+            chunks = []
+            chunks_written = 0
+            bytes_written = 0
+
+            try:
+                with open(snapshot_path, 'rb') as f:
+                    while True:
+                        data = f.read(chunk_size)
+                        if not data:
+                            break
+                        file_hash.update(data)
+                        digest = hashlib.sha256(data).hexdigest()
+                        written = self._store_chunk(digest, data)
+                        if written:
+                            chunks_written += 1
+                            bytes_written += written
+                        chunks.append(digest)
+            except OSError as e:
+                raise DatabaseError(f"Failed to write backup chunks: {e}")
+
+            created = datetime.now()
+            manifest = BackupManifest(
+                backup_id=f"{created.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
+                created=created,
+                source=str(source) if not isinstance(source, sqlite3.Connection) else ":connection:",
+                page_size=page_size,
+                chunk_size=chunk_size,
+                database_size=snapshot_path.stat().st_size,
+                sha256=file_hash.hexdigest(),
+                chunks=chunks,
+                include_logs=include_logs,
+            )
+            manifest_path = self._write_manifest(manifest)
+
+        duration = time.monotonic() - start_time
+        self.logger.info(
+            f"Incremental backup {manifest.backup_id}: {len(chunks)} chunks, "
+            f"{chunks_written} new ({bytes_written} bytes written) in {duration:.2f}s"
+        )
+
+        return {
+            'backup_id': manifest.backup_id,
+            'manifest_path': str(manifest_path),
+            'database_size': manifest.database_size,
+            'chunks_total': len(chunks),
+            'chunks_written': chunks_written,
+            'bytes_written': bytes_written,
+            'duration_seconds': duration
+        }
+
+    # Manifest access
+
+    def list_backups(self) -> List[BackupManifest]:
+        """
+        List backups in the repository, oldest first.
+
+        Returns:
+            List[BackupManifest]: Stored manifests
+        """
+        manifests = [self._read_manifest(path) for path in self.manifests_dir.glob("*.json")]
+        manifests.sort(key=lambda manifest: manifest.created)
+        return manifests
+
+    def get_manifest(self, backup: Union[str, Path]) -> BackupManifest:
+        """
+        Load a manifest by backup ID or manifest file path.
+
+        Args:
+            backup: Backup ID or path to a manifest file
+
+        Returns:
+            BackupManifest: The requested manifest
+
+        Raises:
+            DatabaseError: If the manifest does not exist or is invalid
+        """
+        path = Path(backup)
+        if path.suffix != ".json":
+            path = self.manifests_dir / f"{backup}.json"
+        if not path.exists():
+            raise DatabaseError(f"Backup manifest not found: {backup}")
+        return self._read_manifest(path)
+
+    # Restore and verification
+
+    def verify_backup(self, backup: Union[str, Path], check_integrity: bool = True) -> BackupManifest:
+        """
+        Verify that a backup can be rebuilt exactly from its chunks.
+
+        Every chunk digest and the whole-file digest are checked; optionally the
+        rebuilt database is also run through ``PRAGMA integrity_check``.
+
+        Args:
+            backup: Backup ID or manifest path
+            check_integrity: Run SQLite's integrity check on the rebuilt file
+
+        Returns:
+            BackupManifest: The verified manifest
+
+        Raises:
+            DatabaseError: If any chunk is missing or corrupt
+        """
+        manifest = self.get_manifest(backup)
+        with self._temp_file() as rebuilt_path:
+            self._rebuild(manifest, rebuilt_path)
+            if check_integrity:
+                verify_database_file(rebuilt_path)
+        return manifest
+
+    def restore_backup(self, backup: Union[str, Path],
+                       target: Union[str, Path, sqlite3.Connection],
+                       progress: Optional[ProgressCallback] = None) -> BackupManifest:
+        """
+        Rebuild a backup from its manifest and restore it into a database.
+
+        Args:
+            backup: Backup ID or manifest path
+            target: Database file path or open connection to overwrite
+            progress: Optional callback receiving (pages_copied, total_pages)
+
+        Returns:
+            BackupManifest: The restored manifest
+
+        Raises:
+            DatabaseError: If rebuilding, verification or restore fails
+        """
+        manifest = self.get_manifest(backup)
+        with self._temp_file() as rebuilt_path:
+            self._rebuild(manifest, rebuilt_path)
+            restore_database(rebuilt_path, target, progress=progress, verify=True)
+        self.logger.info(f"Restored incremental backup {manifest.backup_id}")
+        return manifest
+
+    def _rebuild(self, manifest: BackupManifest, dest_path: Path) -> None:
+        """Reassemble a manifest's chunks into ``dest_path``, checking digests."""
+        file_hash = hashlib.sha256()
+        try:
+            with open(dest_path, 'wb') as f:
+                for index, digest in enumerate(manifest.chunks):
+                    data = self._load_chunk(digest)
+                    if hashlib.sha256(data).hexdigest() != digest:
+                        raise DatabaseError(f"Backup chunk {index} ({digest[:12]}) is corrupt")
+                    file_hash.update(data)
+                    f.write(data)
+        except OSError as e:
+            raise DatabaseError(f"Failed to rebuild backup {manifest.backup_id}: {e}")
+
+        if file_hash.hexdigest() != manifest.sha256:
+            raise DatabaseError(f"Backup {manifest.backup_id} checksum mismatch")
+        if dest_path.stat().st_size != manifest.database_size:
+            raise DatabaseError(f"Backup {manifest.backup_id} size mismatch")
+
+    # Retention
+
+    def delete_backup(self, backup: Union[str, Path]) -> None:
+        """
+        Delete a backup manifest; its chunks are reclaimed by garbage_collect().
+
+        Args:
+            backup: Backup ID or manifest path
+        """
+        manifest = self.get_manifest(backup)
+        (self.manifests_dir / f"{manifest.backup_id}.json").unlink()
+
+    def prune(self, retention_days: Optional[int] = None,
+              keep_last: int = 1) -> Dict[str, int]:
+        """
+        Delete expired backups and reclaim chunks no longer referenced.
+
+        Args:
+            retention_days: Delete backups older than this many days
+            keep_last: Always keep at least this many of the newest backups
+
+        Returns:
+            Dict[str, int]: manifests_deleted, chunks_deleted and bytes_freed
+        """
+        manifests = self.list_backups()
+        candidates = manifests[:max(len(manifests) - keep_last, 0)]
+
+        manifests_deleted = 0
+        if retention_days is not None:
+            cutoff = datetime.now() - timedelta(days=retention_days)
+            for manifest in candidates:
+                if manifest.created < cutoff:
+                    self.delete_backup(manifest.backup_id)
+                    manifests_deleted += 1
+
+        result = self.garbage_collect()
+        result['manifests_deleted'] = manifests_deleted
+        return result
+
+    def garbage_collect(self) -> Dict[str, int]:
+        """
+        Remove chunks that no manifest references.
+
+        Returns:
+            Dict[str, int]: chunks_deleted and bytes_freed
+        """
+        referenced = set()
+        for manifest in self.list_backups():
+            referenced.update(manifest.chunks)
+
+        chunks_deleted = 0
+        bytes_freed = 0
+        for chunk_path in self.chunks_dir.glob("*/*"):
+            if chunk_path.name not in referenced:
+                bytes_freed += chunk_path.stat().st_size
+                chunk_path.unlink()
+                chunks_deleted += 1
+
+        if chunks_deleted:
+            self.logger.info(f"Garbage collected {chunks_deleted} chunks ({bytes_freed} bytes)")
+        return {'chunks_deleted': chunks_deleted, 'bytes_freed': bytes_freed}
+
+    # Storage helpers
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunks_dir / digest[:2] / digest
+
+    def _store_chunk(self, digest: str, data: bytes) -> int:
+        """Store a chunk if absent; return bytes written (0 when deduplicated)."""
+        path = self._chunk_path(digest)
+        if path.exists():
+            return 0
+        path.parent.mkdir(exist_ok=True)
+        payload = zlib.compress(data, _CHUNK_COMPRESSION_LEVEL)
+        self._atomic_write(path, payload)
+        return len(payload)
+
+    def _load_chunk(self, digest: str) -> bytes:
+        path = self._chunk_path(digest)
+        if not path.exists():
+            raise DatabaseError(f"Backup chunk missing: {digest[:12]}")
+        try:
+            return zlib.decompress(path.read_bytes())
+        except zlib.error as e:
+            raise DatabaseError(f"Backup chunk {digest[:12]} is corrupt: {e}")
+
+    def _write_manifest(self, manifest: BackupManifest) -> Path:
+        path = self.manifests_dir / f"{manifest.backup_id}.json"
+        self._atomic_write(path, json.dumps(manifest.to_dict(), indent=2).encode('utf-8'))
+        return path
+
+    def _read_manifest(self, path: Path) -> BackupManifest:
+        try:
+            return BackupManifest.from_dict(json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, ValueError, KeyError) as e:
+            raise DatabaseError(f"Invalid backup manifest {path}: {e}")
+
+    def _atomic_write(self, path: Path, payload: bytes) -> None:
+        fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+    @contextmanager
+    def _temp_file(self):
+        """Yield a scratch file path inside the repository, removed on exit."""
+        fd, name = tempfile.mkstemp(prefix=".scratch.", suffix=".db", dir=str(self.root))
+        os.close(fd)
+        path = Path(name)
+        try:
+            yield path
+        finally:
+            path.unlink(missing_ok=True)
@@ -7,24 +7,57 @@ initialization, and CRUD operations for all database entities.
 
 import sqlite3
 import logging
-import shutil
 import uuid
 import csv
 from contextlib import contextmanager
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Union, Tuple
+from typing import Callable, Iterable, List, Optional, Dict, Any, Union, Tuple
 from decimal import Decimal
 
 from database.models import (
-    Part, Configuration, PartDiscoveryLog, DEFAULT_CONFIG,
+    Part, PartRecord, PART_RECORD_PRICE, Configuration, PartDiscoveryLog, ProcessedFile, ProcessingRun, RunFileResult,
+    PartRateStats, PriceInterval, ToleranceRule, DEFAULT_CONFIG,
+    MONEY_SCALE, build_composite_key, normalize_component, format_timestamp_text,
+    money_units_to_decimal, money_units_to_float, to_money_units,
     ValidationError, DatabaseError, PartNotFoundError, ConfigurationError
 )
+from database.db_backup import COMPRESSION_SUFFIXES, backup_database, restore_database
+from database.backup_repository import BackupRepository
 
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Minimum config 'database_version' this codebase can operate on
+REQUIRED_DATABASE_VERSION = "1.0"
+
+# Bump whenever REQUIRED_DATABASE_VERSION or the expected schema changes, so
+# databases verified by an older release are fully re-verified once
+SCHEMA_CHECK_REVISION = 8
+
+
+# Body of the parts triggers that keep part_price_history current. The open
+# interval of a part whose price changed is closed today and a new one opened;
+# a second change on the same day replaces that day's interval.
+_PRICE_HISTORY_TRIGGER_BODY = """
+                    UPDATE part_price_history SET effective_to = date('now', 'localtime')
+                    WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                      AND authorized_price <> NEW.authorized_price
+                      AND effective_from < date('now', 'localtime');
+                    INSERT OR REPLACE INTO part_price_history (composite_key, authorized_price, effective_from)
+                    SELECT NEW.composite_key, NEW.authorized_price, date('now', 'localtime')
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM part_price_history
+                        WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                          AND authorized_price = NEW.authorized_price
+                    );"""
+
+
+def _schema_fingerprint(schema_version: int) -> int:
+    """Combine SQLite's schema cookie with the check revision for user_version."""
+    return (schema_version * 256 + SCHEMA_CHECK_REVISION) & 0x7FFFFFFF
+
 
 class DatabaseManager:
     """
@@ -35,19 +68,34 @@ class DatabaseManager:
     and error handling.
     """
     
-    def __init__(self, db_path: str = "invoice_detection.db", skip_version_check: bool = False):
+    def __init__(self, db_path: str = "invoice_detection.db", skip_version_check: bool = False,
+                 read_only: bool = False):
         """
         Initialize the database manager.
         
         Args:
             db_path: Path to the SQLite database file
             skip_version_check: Skip version compatibility check (for migration operations)
+            read_only: Open an existing database file read-only, so that any write
+                fails; the schema is neither checked nor migrated (used by worker
+                processes whose writes are committed by the parent)
+            
+        Raises:
+            DatabaseError: If a read-only database does not exist
         """
         self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.read_only = read_only
         
         # For in-memory databases, keep a persistent connection
         self._memory_connection = None
+        
+        if read_only:
+            if str(self.db_path) == ":memory:" or not self.db_path.exists():
+                raise DatabaseError(f"Cannot open {self.db_path} read-only: database file not found")
+            logger.info(f"Using existing database at {self.db_path} read-only")
+            return
+        
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
         if str(self.db_path) == ":memory:":
             self._memory_connection = sqlite3.connect(":memory:")
             self._memory_connection.row_factory = sqlite3.Row
@@ -59,50 +107,158 @@ class DatabaseManager:
             self.initialize_database()
         else:
             logger.info(f"Using existing database at {self.db_path}")
-            # Migration: add item_type column if missing (only if parts table exists)
-            with sqlite3.connect(str(self.db_path)) as conn:
-                # Check if parts table exists first
-                cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='parts'")
-                if cursor.fetchone():
-                    cursor = conn.execute("PRAGMA table_info(parts)")
-                    columns = [row[1] for row in cursor.fetchall()]
-                    if "item_type" not in columns:
-                        logger.info("Migrating: Adding 'item_type' column to parts table")
-                        conn.execute("ALTER TABLE parts ADD COLUMN item_type TEXT")
-                        conn.commit()
-                else:
-                    # Parts table doesn't exist, initialize the database
-                    logger.info("Parts table not found, initializing database")
-                    # Don't close conn here, let the context manager handle it
-                    pass
-            # If we need to initialize, do it after the connection is closed
-            if not self.db_path.exists() or not self._has_parts_table():
-                self.initialize_database()
+            self._open_existing_database(skip_version_check)
+
+    def _open_existing_database(self, skip_version_check: bool) -> None:
+        """
+        Check, migrate and verify an existing database file.
+        
+        A single connection reads ``PRAGMA schema_version`` and ``PRAGMA
+        user_version``. After a successful full verification the schema
+        fingerprint is stored in ``user_version``; while the fingerprint still
+        matches, the schema walk, migrations and version check are skipped.
+        
+        Args:
+            skip_version_check: Skip version compatibility check (for migration operations)
+            
+        Raises:
+            DatabaseError: If schema verification fails
+            RuntimeError: If the database schema version is out of date
+        """
+        needs_initialization = False
+        conn = sqlite3.connect(str(self.db_path))
+        try:
+            cursor = conn.execute(
+                "SELECT (SELECT schema_version FROM pragma_schema_version), "
+                "(SELECT user_version FROM pragma_user_version)"
+            )
+            schema_version, stored_fingerprint = cursor.fetchone()
+            if schema_version and stored_fingerprint == _schema_fingerprint(schema_version):
+                logger.debug("Database schema fingerprint unchanged, skipping verification")
+                return
+            
+            cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            existing_tables = {row[0] for row in cursor.fetchall()}
+            
+            if 'parts' not in existing_tables:
+                logger.info("Parts table not found, initializing database")
+                needs_initialization = True
             else:
-                # Verify database integrity
-                self._verify_database_schema()
+                self._migrate_existing_schema(conn, existing_tables)
+                self._verify_database_schema(conn)
+                
+                if skip_version_check:
+                    return
+                self._check_database_version(conn)
+                self._record_schema_fingerprint(conn)
+        finally:
+            conn.close()
+        
+        if needs_initialization:
+            self.initialize_database()
 
-            # --- MIGRATION VERSION CHECK ---
-            if not skip_version_check:
-                try:
-                    with sqlite3.connect(str(self.db_path)) as conn:
-                        cursor = conn.execute("SELECT value FROM config WHERE key = 'database_version'")
-                        version_row = cursor.fetchone()
-                        current_version = version_row[0] if version_row else "1.0"
-                        # Set this to the required version for the codebase
-                        required_version = "1.0"
-                        if current_version < required_version:
-                            logger.error(
-                                f"Database schema is out of date (current: {current_version}, required: {required_version}). "
-                                "Please run 'invoice-checker database migrate' to update the schema."
-                            )
-                            raise RuntimeError(
-                                f"Database schema is out of date (current: {current_version}, required: {required_version}). "
-                                "Please run 'invoice-checker database migrate' to update the schema."
-                            )
-                except Exception as e:
-                    logger.error(f"Failed to check database version: {e}")
-                    raise
+    def _migrate_existing_schema(self, conn: sqlite3.Connection, existing_tables: set) -> None:
+        """
+        Apply in-place migrations to an existing database.
+        
+        Args:
+            conn: Open database connection
+            existing_tables: Names of tables already present
+        """
+        # Migration: add item_type column if missing
+        cursor = conn.execute("PRAGMA table_info(parts)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if "item_type" not in columns:
+            logger.info("Migrating: Adding 'item_type' column to parts table")
+            conn.execute("ALTER TABLE parts ADD COLUMN item_type TEXT")
+            conn.commit()
+        
+        # Migration: add discovery session summaries if missing
+        if 'discovery_sessions' not in existing_tables and 'part_discovery_log' in existing_tables:
+            logger.info("Migrating: Adding discovery session summary tables")
+            self._create_discovery_session_summary(conn)
+            conn.commit()
+        
+        # Migration: add processed files manifest if missing
+        if 'processed_files' not in existing_tables:
+            logger.info("Migrating: Adding processed files manifest table")
+            self._create_processed_files_table(conn)
+            conn.commit()
+        
+        # Migration: add processing run journal if missing
+        if 'processing_runs' not in existing_tables or 'processing_run_files' not in existing_tables:
+            logger.info("Migrating: Adding processing run journal tables")
+            self._create_processing_run_tables(conn)
+            conn.commit()
+        
+        # Migration: add per-part rate statistics if missing, or key them by composite key,
+        # or store their price range in ten-thousandths
+        cursor = conn.execute("PRAGMA table_info(part_rate_stats)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if ("composite_key" not in columns or "min_price_units" not in columns
+                or 'part_rate_invoices' not in existing_tables):
+            logger.info("Migrating: Adding part rate statistics tables")
+            self._create_part_rate_stats_table(conn)
+            conn.commit()
+        
+        # Migration: add authorized price history if missing, or skip parts without a key
+        cursor = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='trigger' AND name='record_part_price_insert'"
+        )
+        trigger = cursor.fetchone()
+        if 'part_price_history' not in existing_tables or not trigger or 'IS NOT NULL' not in trigger[0]:
+            logger.info("Migrating: Adding part price history table")
+            self._create_price_history_table(conn)
+            conn.commit()
+        
+        # Migration: add price tolerance rules if missing, or store absolute tolerances in ten-thousandths
+        cursor = conn.execute("PRAGMA table_info(tolerance_rules)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if "absolute_tolerance_units" not in columns:
+            logger.info("Migrating: Adding tolerance rules table")
+            self._create_tolerance_rules_table(conn)
+            conn.commit()
+
+    def _check_database_version(self, conn: sqlite3.Connection) -> None:
+        """
+        Ensure the stored database version satisfies the codebase.
+        
+        Args:
+            conn: Open database connection
+            
+        Raises:
+            RuntimeError: If the database schema version is out of date
+        """
+        try:
+            cursor = conn.execute("SELECT value FROM config WHERE key = 'database_version'")
+            version_row = cursor.fetchone()
+            current_version = version_row[0] if version_row else "1.0"
+            if current_version < REQUIRED_DATABASE_VERSION:
+                logger.error(
+                    f"Database schema is out of date (current: {current_version}, required: {REQUIRED_DATABASE_VERSION}). "
+                    "Please run 'invoice-checker database migrate' to update the schema."
+                )
+                raise RuntimeError(
+                    f"Database schema is out of date (current: {current_version}, required: {REQUIRED_DATABASE_VERSION}). "
+                    "Please run 'invoice-checker database migrate' to update the schema."
+                )
+        except Exception as e:
+            logger.error(f"Failed to check database version: {e}")
+            raise
+
+    def _record_schema_fingerprint(self, conn: sqlite3.Connection) -> None:
+        """
+        Store the fingerprint of the current, fully verified schema.
+        
+        Setting ``user_version`` does not change ``schema_version``, so the
+        fingerprint stays valid until the next schema change.
+        
+        Args:
+            conn: Open database connection
+        """
+        schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        conn.execute(f"PRAGMA user_version = {_schema_fingerprint(schema_version)}")
+        conn.commit()
 
     @contextmanager
     def get_connection(self):
@@ -123,14 +279,18 @@ class DatabaseManager:
                 # Don't set row_factory again as it's already set
                 yield conn
             else:
-                conn = sqlite3.connect(str(self.db_path))
+                if self.read_only:
+                    conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+                else:
+                    conn = sqlite3.connect(str(self.db_path))
                 conn.row_factory = sqlite3.Row  # Enable column access by name
                 
                 # Enable foreign key constraints
                 conn.execute("PRAGMA foreign_keys = ON")
                 
-                # Enable WAL mode for better concurrency
-                conn.execute("PRAGMA journal_mode = WAL")
+                # Enable WAL mode for better concurrency (set by the writer, not read-only handles)
+                if not self.read_only:
+                    conn.execute("PRAGMA journal_mode = WAL")
                 
                 # Set reasonable timeout
                 conn.execute("PRAGMA busy_timeout = 30000")
@@ -245,6 +405,24 @@ class DatabaseManager:
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_discovery_date ON part_discovery_log(discovery_date)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_discovery_session ON part_discovery_log(processing_session_id)")
                 
+                # Create discovery session summary tables and their maintenance triggers
+                self._create_discovery_session_summary(conn)
+                
+                # Create processed files manifest for incremental directory processing
+                self._create_processed_files_table(conn)
+                
+                # Create processing run journal for resumable directory processing
+                self._create_processing_run_tables(conn)
+                
+                # Create per-part rate statistics maintained as invoices are validated
+                self._create_part_rate_stats_table(conn)
+                
+                # Create authorized price history kept current by triggers on parts
+                self._create_price_history_table(conn)
+                
+                # Create price tolerance rules
+                self._create_tolerance_rules_table(conn)
+                
                 # Insert initial configuration data
                 config_data = [
                     ('validation_mode', 'parts_based', 'string', 'Validation mode: parts_based or threshold_based', 'validation'),
@@ -306,6 +484,7 @@ class DatabaseManager:
                 """)
                 
                 conn.commit()
+                self._record_schema_fingerprint(conn)
                 logger.info("Database initialized successfully")
                 
         except Exception as e:
@@ -377,6 +556,107 @@ class DatabaseManager:
         CREATE INDEX IF NOT EXISTS idx_discovery_date ON part_discovery_log(discovery_date);
         CREATE INDEX IF NOT EXISTS idx_discovery_session ON part_discovery_log(processing_session_id);
 
+        -- Create discovery session summary tables (maintained by triggers)
+        CREATE TABLE IF NOT EXISTS discovery_sessions (
+            session_id TEXT PRIMARY KEY,
+            first_seen TIMESTAMP,
+            last_seen TIMESTAMP,
+            total_entries INTEGER NOT NULL DEFAULT 0,
+            distinct_parts INTEGER NOT NULL DEFAULT 0,
+            parts_added INTEGER NOT NULL DEFAULT 0,
+            parts_skipped INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS discovery_session_parts (
+            session_id TEXT NOT NULL,
+            part_number TEXT NOT NULL,
+            PRIMARY KEY (session_id, part_number)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_discovery_sessions_last_seen ON discovery_sessions(last_seen);
+
+        -- Create processed files manifest for incremental directory processing
+        CREATE TABLE IF NOT EXISTS processed_files (
+            file_path TEXT PRIMARY KEY,
+            file_size INTEGER NOT NULL,
+            file_mtime_ns INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            extractor_version TEXT NOT NULL,
+            status TEXT NOT NULL CHECK (status IN ('success', 'failed')),
+            invoice_number TEXT,
+            processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            error_message TEXT
+        );
+
+        -- Create processing run journal for resumable directory processing
+        CREATE TABLE IF NOT EXISTS processing_runs (
+            run_id TEXT PRIMARY KEY,
+            input_path TEXT NOT NULL,
+            output_path TEXT,
+            status TEXT NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'completed', 'interrupted')),
+            total_files INTEGER NOT NULL DEFAULT 0,
+            started_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_date TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS processing_run_files (
+            run_id TEXT NOT NULL REFERENCES processing_runs(run_id) ON DELETE CASCADE,
+            file_path TEXT NOT NULL,
+            status TEXT NOT NULL CHECK (status IN ('success', 'failed')),
+            invoice_number TEXT,
+            processing_time REAL NOT NULL DEFAULT 0,
+            result_json TEXT NOT NULL,
+            completed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id, file_path)
+        );
+
+        -- Create per-part rate statistics maintained as invoices are validated
+        CREATE TABLE IF NOT EXISTS part_rate_stats (
+            composite_key TEXT PRIMARY KEY,
+            part_number TEXT NOT NULL,
+            observation_count INTEGER NOT NULL DEFAULT 0,
+            mean_price REAL NOT NULL DEFAULT 0,
+            m2 REAL NOT NULL DEFAULT 0,
+            min_price_units INTEGER,
+            max_price_units INTEGER,
+            last_seen TIMESTAMP,
+            last_invoice TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_part_rate_stats_part_number ON part_rate_stats(part_number);
+
+        -- Create invoices already folded into each part's rate statistics
+        CREATE TABLE IF NOT EXISTS part_rate_invoices (
+            composite_key TEXT NOT NULL,
+            invoice_number TEXT NOT NULL,
+            PRIMARY KEY (composite_key, invoice_number)
+        );
+
+        -- Create authorized price history with effective-date intervals
+        CREATE TABLE IF NOT EXISTS part_price_history (
+            composite_key TEXT NOT NULL,
+            authorized_price DECIMAL(10,4) NOT NULL CHECK (authorized_price > 0),
+            effective_from DATE NOT NULL,
+            effective_to DATE,
+            recorded_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (composite_key, effective_from)
+        );
+
+        INSERT OR IGNORE INTO part_price_history (composite_key, authorized_price, effective_from)
+        SELECT composite_key, authorized_price, COALESCE(date(created_date), date('now', 'localtime'))
+        FROM parts WHERE composite_key IS NOT NULL;
+
+        -- Create price tolerance rules by part number, category or item type
+        CREATE TABLE IF NOT EXISTS tolerance_rules (
+            scope TEXT NOT NULL CHECK (scope IN ('part', 'category', 'item_type')),
+            match_value TEXT NOT NULL,
+            absolute_tolerance_units INTEGER CHECK (absolute_tolerance_units >= 0),
+            percent_tolerance DECIMAL(7,4) CHECK (percent_tolerance BETWEEN 0 AND 100),
+            description TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (scope, match_value)
+        );
+
         -- Insert initial configuration data (only if not exists)
         INSERT OR IGNORE INTO config (key, value, data_type, description, category) VALUES
         ('validation_mode', 'parts_based', 'string', 'Validation mode: parts_based or threshold_based', 'validation'),
@@ -404,6 +684,75 @@ class DatabaseManager:
                 UPDATE config SET last_updated = CURRENT_TIMESTAMP WHERE key = NEW.key;
             END;
 
+        -- Create triggers to keep discovery session summaries current
+        DROP TRIGGER IF EXISTS update_discovery_session_summary;
+        CREATE TRIGGER update_discovery_session_summary
+            AFTER INSERT ON part_discovery_log
+            FOR EACH ROW
+            WHEN NEW.processing_session_id IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO discovery_sessions (session_id, first_seen, last_seen)
+                VALUES (NEW.processing_session_id, NEW.discovery_date, NEW.discovery_date);
+                UPDATE discovery_sessions SET
+                    first_seen = MIN(COALESCE(first_seen, NEW.discovery_date), COALESCE(NEW.discovery_date, first_seen)),
+                    last_seen = MAX(COALESCE(last_seen, NEW.discovery_date), COALESCE(NEW.discovery_date, last_seen)),
+                    total_entries = total_entries + 1,
+                    parts_added = parts_added + (NEW.action_taken = 'added'),
+                    parts_skipped = parts_skipped + (NEW.action_taken = 'skipped')
+                WHERE session_id = NEW.processing_session_id;
+                INSERT OR IGNORE INTO discovery_session_parts (session_id, part_number)
+                VALUES (NEW.processing_session_id, NEW.part_number);
+            END;
+
+        DROP TRIGGER IF EXISTS update_discovery_session_distinct_parts;
+        CREATE TRIGGER update_discovery_session_distinct_parts
+            AFTER INSERT ON discovery_session_parts
+            FOR EACH ROW
+            BEGIN
+                UPDATE discovery_sessions SET distinct_parts = distinct_parts + 1 WHERE session_id = NEW.session_id;
+            END;
+
+        -- Create triggers to record authorized price changes in part_price_history
+        DROP TRIGGER IF EXISTS record_part_price_insert;
+        CREATE TRIGGER record_part_price_insert
+            AFTER INSERT ON parts
+            FOR EACH ROW
+            WHEN NEW.composite_key IS NOT NULL
+            BEGIN
+                UPDATE part_price_history SET effective_to = date('now', 'localtime')
+                WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                  AND authorized_price <> NEW.authorized_price
+                  AND effective_from < date('now', 'localtime');
+                INSERT OR REPLACE INTO part_price_history (composite_key, authorized_price, effective_from)
+                SELECT NEW.composite_key, NEW.authorized_price, date('now', 'localtime')
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM part_price_history
+                    WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                      AND authorized_price = NEW.authorized_price
+                );
+            END;
+
+        DROP TRIGGER IF EXISTS record_part_price_update;
+        CREATE TRIGGER record_part_price_update
+            AFTER UPDATE OF authorized_price, composite_key ON parts
+            FOR EACH ROW
+            WHEN NEW.composite_key IS NOT NULL
+            BEGIN
+                UPDATE OR REPLACE part_price_history SET composite_key = NEW.composite_key
+                WHERE composite_key = OLD.composite_key AND NEW.composite_key IS NOT OLD.composite_key;
+                UPDATE part_price_history SET effective_to = date('now', 'localtime')
+                WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                  AND authorized_price <> NEW.authorized_price
+                  AND effective_from < date('now', 'localtime');
+                INSERT OR REPLACE INTO part_price_history (composite_key, authorized_price, effective_from)
+                SELECT NEW.composite_key, NEW.authorized_price, date('now', 'localtime')
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM part_price_history
+                    WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                      AND authorized_price = NEW.authorized_price
+                );
+            END;
+
         -- Create view for active parts (commonly used query)
         DROP VIEW IF EXISTS active_parts;
         CREATE VIEW active_parts AS
@@ -435,41 +784,47 @@ class DatabaseManager:
         except Exception:
             return False
 
-    def _verify_database_schema(self) -> None:
+    def _verify_database_schema(self, conn: Optional[sqlite3.Connection] = None) -> None:
         """
         Verify that the database schema is correct and up-to-date.
         
+        Args:
+            conn: Optional open connection to verify through
+            
         Raises:
             DatabaseError: If schema verification fails
         """
-        try:
+        if conn is None:
             with self.get_connection() as conn:
-                # Check if required tables exist
-                required_tables = ['parts', 'config', 'part_discovery_log']
-                
-                cursor = conn.execute("""
-                    SELECT name FROM sqlite_master
-                    WHERE type='table' AND name NOT LIKE 'sqlite_%'
-                """)
-                existing_tables = [row[0] for row in cursor.fetchall()]
-                
-                missing_tables = set(required_tables) - set(existing_tables)
-                if missing_tables:
-                    raise DatabaseError(f"Missing required tables: {missing_tables}")
-                
-                # Check database version
-                try:
-                    cursor = conn.execute("SELECT value FROM config WHERE key = 'database_version'")
-                    version_row = cursor.fetchone()
-                    if not version_row:
-                        logger.warning("Database version not found in config")
-                    else:
-                        logger.info(f"Database version: {version_row[0]}")
-                except sqlite3.Error:
-                    logger.warning("Could not retrieve database version")
-                
-                logger.debug("Database schema verification completed successfully")
-                
+                return self._verify_database_schema(conn)
+        
+        try:
+            # Check if required tables exist
+            required_tables = ['parts', 'config', 'part_discovery_log']
+            
+            cursor = conn.execute("""
+                SELECT name FROM sqlite_master
+                WHERE type='table' AND name NOT LIKE 'sqlite_%'
+            """)
+            existing_tables = [row[0] for row in cursor.fetchall()]
+            
+            missing_tables = set(required_tables) - set(existing_tables)
+            if missing_tables:
+                raise DatabaseError(f"Missing required tables: {missing_tables}")
+            
+            # Check database version
+            try:
+                cursor = conn.execute("SELECT value FROM config WHERE key = 'database_version'")
+                version_row = cursor.fetchone()
+                if not version_row:
+                    logger.warning("Database version not found in config")
+                else:
+                    logger.info(f"Database version: {version_row[0]}")
+            except sqlite3.Error:
+                logger.warning("Could not retrieve database version")
+            
+            logger.debug("Database schema verification completed successfully")
+            
         except Exception as e:
             logger.error(f"Database schema verification failed: {e}")
             raise DatabaseError(f"Schema verification failed: {e}")
@@ -508,7 +863,7 @@ class DatabaseManager:
                             first_seen_invoice, created_date, last_updated, is_active, notes
                         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """, (
-                        part.composite_key, part.part_number, float(part.authorized_price), part.description,
+                        part.composite_key, part.part_number, money_units_to_float(part.price_units), part.description,
                         part.item_type, part.category, part.source, part.first_seen_invoice,
                         part.created_date.isoformat(), part.last_updated.isoformat(),
                         part.is_active, part.notes
@@ -631,7 +986,7 @@ class DatabaseManager:
         """
         try:
             # Generate composite key from components
-            composite_key = Part.generate_identifier_from_components(item_type, description, part_number)
+            composite_key = build_composite_key(item_type, description, part_number)
             
             try:
                 return self.get_part_by_composite_key(composite_key)
@@ -642,6 +997,31 @@ class DatabaseManager:
             logger.error(f"Failed to find part by components: {e}")
             raise DatabaseError(f"Failed to find part by components: {e}")
 
+    def get_parts_fingerprint(self) -> Tuple[Any, ...]:
+        """
+        Get a cheap summary of the parts table that changes whenever parts change.
+
+        Used by in-memory caches of the parts table to detect inserts, deletes,
+        price changes and activation changes without reloading every row.
+
+        Returns:
+            Tuple: (count, latest last_updated, price total, active count)
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("""
+                    SELECT COUNT(*), MAX(last_updated), TOTAL(authorized_price), TOTAL(is_active)
+                    FROM parts
+                """).fetchone()
+                return tuple(row)
+
+        except Exception as e:
+            logger.error(f"Failed to get parts fingerprint: {e}")
+            raise DatabaseError(f"Failed to get parts fingerprint: {e}")
+
     def update_part(self, part_identifier_or_part: Union[str, Part], **kwargs) -> Part:
         """
         Update an existing part in the database.
@@ -673,7 +1053,7 @@ class DatabaseManager:
                             first_seen_invoice = ?, last_updated = ?, is_active = ?, notes = ?
                         WHERE composite_key = ?
                     """, (
-                        part.part_number, float(part.authorized_price), part.description, part.item_type, part.category,
+                        part.part_number, money_units_to_float(part.price_units), part.description, part.item_type, part.category,
                         part.source, part.first_seen_invoice, part.last_updated.isoformat(),
                         part.is_active, part.notes, part.composite_key
                     ))
@@ -725,7 +1105,7 @@ class DatabaseManager:
                             first_seen_invoice = ?, last_updated = ?, is_active = ?, notes = ?
                         WHERE composite_key = ?
                     """, (
-                        existing_part.composite_key, existing_part.part_number, float(existing_part.authorized_price),
+                        existing_part.composite_key, existing_part.part_number, money_units_to_float(existing_part.price_units),
                         existing_part.description, existing_part.item_type, existing_part.category,
                         existing_part.source, existing_part.first_seen_invoice, existing_part.last_updated.isoformat(),
                         existing_part.is_active, existing_part.notes, original_composite_key
@@ -787,7 +1167,8 @@ class DatabaseManager:
             raise DatabaseError(f"Failed to delete part: {e}")
 
     def list_parts(self, active_only: bool = False, category: Optional[str] = None,
-                   limit: Optional[int] = None, offset: int = 0) -> List[Part]:
+                   limit: Optional[int] = None, offset: int = 0,
+                   as_records: bool = False) -> Union[List[Part], List[PartRecord]]:
         """
         List parts with optional filtering.
         
@@ -796,17 +1177,20 @@ class DatabaseManager:
             category: Optional category filter
             limit: Maximum number of parts to return
             offset: Number of parts to skip
+            as_records: If True, return PartRecord tuples with values as stored
+                (prices in ten-thousandths) instead of Part instances
             
         Returns:
-            List[Part]: List of parts matching criteria
+            Union[List[Part], List[PartRecord]]: Parts matching criteria
             
         Raises:
             DatabaseError: If database operation fails
         """
         try:
             with self.get_connection() as conn:
-                query = """
-                    SELECT composite_key, part_number, authorized_price, description, item_type, category, source,
+                price_column = PART_RECORD_PRICE if as_records else 'authorized_price'
+                query = f"""
+                    SELECT composite_key, part_number, {price_column}, description, item_type, category, source,
                            first_seen_invoice, created_date, last_updated, is_active, notes
                     FROM parts
                     WHERE 1=1
@@ -830,10 +1214,14 @@ class DatabaseManager:
                         query += " OFFSET ?"
                         params.append(offset)
                 
-                cursor = conn.execute(query, params)
-                rows = cursor.fetchall()
+                # Plain tuples are much cheaper to build than sqlite3.Row objects
+                cursor = conn.cursor()
+                cursor.row_factory = None
+                rows = cursor.execute(query, params).fetchall()
                 
-                return [self._row_to_part(row) for row in rows]
+                if as_records:
+                    return list(map(PartRecord._make, rows))
+                return list(map(Part.from_trusted_row, rows))
                 
         except Exception as e:
             logger.error(f"Failed to list parts: {e}")
@@ -844,39 +1232,12 @@ class DatabaseManager:
         Convert a database row to a Part instance.
         
         Args:
-            row: Database row
+            row: Database row with columns in ``PART_COLUMNS`` order
             
         Returns:
             Part: Part instance
         """
-        created_date = None
-        if row['created_date']:
-            created_date = datetime.fromisoformat(row['created_date'])
-        
-        last_updated = None
-        if row['last_updated']:
-            last_updated = datetime.fromisoformat(row['last_updated'])
-        
-        # Create the Part instance without composite_key parameter
-        part = Part(
-            part_number=row['part_number'],
-            authorized_price=Decimal(str(row['authorized_price'])),
-            description=row['description'],
-            item_type=row['item_type'] if 'item_type' in row.keys() else None,
-            category=row['category'],
-            source=row['source'],
-            first_seen_invoice=row['first_seen_invoice'],
-            created_date=created_date,
-            last_updated=last_updated,
-            is_active=bool(row['is_active']),
-            notes=row['notes']
-        )
-        
-        # Set the composite_key directly if it exists in the row
-        if 'composite_key' in row.keys() and row['composite_key']:
-            part.composite_key = row['composite_key']
-        
-        return part
+        return Part.from_trusted_row(row)
 
     # Database utility methods
     
@@ -1474,12 +1835,22 @@ class DatabaseManager:
         """
         try:
             with self.transaction() as conn:
+                cutoff = "datetime('now', '-{} days')".format(retention_days)
+                cursor = conn.execute("""
+                    SELECT DISTINCT processing_session_id FROM part_discovery_log
+                    WHERE discovery_date < {} AND processing_session_id IS NOT NULL
+                """.format(cutoff))
+                affected_sessions = [row[0] for row in cursor.fetchall()]
+                
                 cursor = conn.execute("""
                     DELETE FROM part_discovery_log
-                    WHERE discovery_date < datetime('now', '-{} days')
-                """.format(retention_days))
+                    WHERE discovery_date < {}
+                """.format(cutoff))
                 
                 deleted_count = cursor.rowcount
+                
+                # Summaries only track inserts, so recompute the sessions that lost entries
+                self._rebuild_discovery_sessions(conn, affected_sessions)
                 logger.info(f"Cleaned up {deleted_count} old discovery log entries")
                 return deleted_count
                 
@@ -1523,102 +1894,1406 @@ class DatabaseManager:
             notes=row['notes']
         )
 
-    # Backup and Restore Operations
+    # Discovery Session Summary Operations
     
-    def create_backup(self, backup_path: Optional[str] = None) -> str:
+    def _create_discovery_session_summary(self, conn: sqlite3.Connection) -> None:
         """
-        Create a backup of the database.
+        Create the discovery session summary tables and maintenance triggers.
+        
+        The ``discovery_sessions`` table holds one row per processing session and
+        is kept current by triggers on ``part_discovery_log``, so session listings
+        and statistics never need to scan the raw log. When the summary table is
+        created on an existing database it is backfilled from the log.
         
         Args:
-            backup_path: Optional custom backup path
+            conn: Open database connection
+        """
+        cursor = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='discovery_sessions'"
+        )
+        needs_backfill = cursor.fetchone() is None
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS discovery_sessions (
+                session_id TEXT PRIMARY KEY,
+                first_seen TIMESTAMP,
+                last_seen TIMESTAMP,
+                total_entries INTEGER NOT NULL DEFAULT 0,
+                distinct_parts INTEGER NOT NULL DEFAULT 0,
+                parts_added INTEGER NOT NULL DEFAULT 0,
+                parts_skipped INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS discovery_session_parts (
+                session_id TEXT NOT NULL,
+                part_number TEXT NOT NULL,
+                PRIMARY KEY (session_id, part_number)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_discovery_sessions_last_seen ON discovery_sessions(last_seen)")
+        
+        conn.execute("DROP TRIGGER IF EXISTS update_discovery_session_summary")
+        conn.execute("""
+            CREATE TRIGGER update_discovery_session_summary
+                AFTER INSERT ON part_discovery_log
+                FOR EACH ROW
+                WHEN NEW.processing_session_id IS NOT NULL
+                BEGIN
+                    INSERT OR IGNORE INTO discovery_sessions (session_id, first_seen, last_seen)
+                    VALUES (NEW.processing_session_id, NEW.discovery_date, NEW.discovery_date);
+                    UPDATE discovery_sessions SET
+                        first_seen = MIN(COALESCE(first_seen, NEW.discovery_date), COALESCE(NEW.discovery_date, first_seen)),
+                        last_seen = MAX(COALESCE(last_seen, NEW.discovery_date), COALESCE(NEW.discovery_date, last_seen)),
+                        total_entries = total_entries + 1,
+                        parts_added = parts_added + (NEW.action_taken = 'added'),
+                        parts_skipped = parts_skipped + (NEW.action_taken = 'skipped')
+                    WHERE session_id = NEW.processing_session_id;
+                    INSERT OR IGNORE INTO discovery_session_parts (session_id, part_number)
+                    VALUES (NEW.processing_session_id, NEW.part_number);
+                END
+        """)
+        
+        # Ignored duplicates do not fire this trigger, so it counts distinct parts only
+        conn.execute("DROP TRIGGER IF EXISTS update_discovery_session_distinct_parts")
+        conn.execute("""
+            CREATE TRIGGER update_discovery_session_distinct_parts
+                AFTER INSERT ON discovery_session_parts
+                FOR EACH ROW
+                BEGIN
+                    UPDATE discovery_sessions SET distinct_parts = distinct_parts + 1 WHERE session_id = NEW.session_id;
+                END
+        """)
+        
+        if needs_backfill:
+            self._rebuild_discovery_sessions(conn)
+    
+    def _rebuild_discovery_sessions(self, conn: sqlite3.Connection,
+                                    session_ids: Optional[List[str]] = None) -> None:
+        """
+        Recompute discovery session summaries from the raw discovery log.
+        
+        Args:
+            conn: Open database connection
+            session_ids: Sessions to rebuild; rebuilds every session if None
+        """
+        if session_ids is None:
+            scopes = [("", [])]
+        else:
+            ids = [session_id for session_id in session_ids if session_id is not None]
+            scopes = []
+            # Stay well below SQLite's host parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                scopes.append((" IN ({})".format(", ".join("?" * len(chunk))), chunk))
+        
+        for clause, params in scopes:
+            session_filter = f"WHERE session_id{clause}" if clause else ""
+            log_filter = "WHERE processing_session_id IS NOT NULL"
+            if clause:
+                log_filter += f" AND processing_session_id{clause}"
+            
+            conn.execute(f"DELETE FROM discovery_session_parts {session_filter}", params)
+            conn.execute(f"DELETE FROM discovery_sessions {session_filter}", params)
+            conn.execute(f"""
+                INSERT INTO discovery_session_parts (session_id, part_number)
+                SELECT DISTINCT processing_session_id, part_number
+                FROM part_discovery_log {log_filter}
+            """, params)
+            conn.execute(f"""
+                INSERT INTO discovery_sessions (
+                    session_id, first_seen, last_seen, total_entries,
+                    distinct_parts, parts_added, parts_skipped
+                )
+                SELECT processing_session_id, MIN(discovery_date), MAX(discovery_date), COUNT(*),
+                       COUNT(DISTINCT part_number),
+                       SUM(action_taken = 'added'), SUM(action_taken = 'skipped')
+                FROM part_discovery_log {log_filter}
+                GROUP BY processing_session_id
+            """, params)
+    
+    def list_discovery_sessions(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List discovery session summaries, most recently active first.
+        
+        Args:
+            limit: Maximum number of sessions to return
             
         Returns:
-            str: Path to the created backup file
+            List[Dict[str, Any]]: Session summaries with session_id, first_seen,
+            last_seen, total_entries, distinct_parts, parts_added and parts_skipped
             
         Raises:
-            DatabaseError: If backup operation fails
+            DatabaseError: If database operation fails
         """
         try:
-            if backup_path is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_path = f"{self.db_path.stem}_backup_{timestamp}.db"
-            
-            backup_path = Path(backup_path)
-            
-            # Create backup directory if needed
-            backup_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Copy database file
-            shutil.copy2(self.db_path, backup_path)
-            
-            logger.info(f"Database backup created: {backup_path}")
-            return str(backup_path)
-            
+            with self.get_connection() as conn:
+                query = """
+                    SELECT session_id, first_seen, last_seen, total_entries,
+                           distinct_parts, parts_added, parts_skipped
+                    FROM discovery_sessions
+                    ORDER BY last_seen DESC
+                """
+                params = []
+                if limit:
+                    query += " LIMIT ?"
+                    params.append(limit)
+                
+                cursor = conn.execute(query, params)
+                return [self._row_to_discovery_session(row) for row in cursor.fetchall()]
+                
         except Exception as e:
-            logger.error(f"Failed to create backup: {e}")
-            raise DatabaseError(f"Failed to create backup: {e}")
-
-    def restore_backup(self, backup_path: str) -> None:
+            logger.error(f"Failed to list discovery sessions: {e}")
+            raise DatabaseError(f"Failed to list discovery sessions: {e}")
+    
+    def get_discovery_session_parts(self, session_id: str, limit: Optional[int] = None) -> List[str]:
         """
-        Restore database from a backup file.
+        Get the distinct part numbers logged in a discovery session.
         
         Args:
-            backup_path: Path to the backup file
+            session_id: Processing session ID
+            limit: Maximum number of part numbers to return
+            
+        Returns:
+            List[str]: Part numbers in ascending order
             
         Raises:
-            DatabaseError: If restore operation fails
+            DatabaseError: If database operation fails
         """
         try:
-            backup_path = Path(backup_path)
-            
-            if not backup_path.exists():
-                raise DatabaseError(f"Backup file not found: {backup_path}")
-            
-            # Create a backup of current database before restore
-            current_backup = self.create_backup(f"{self.db_path.stem}_pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
-            logger.info(f"Created pre-restore backup: {current_backup}")
-            
-            # Replace current database with backup
-            shutil.copy2(backup_path, self.db_path)
-            
-            # Verify restored database
-            self._verify_database_schema()
-            
-            logger.info(f"Database restored from backup: {backup_path}")
-            
+            with self.get_connection() as conn:
+                query = """
+                    SELECT part_number FROM discovery_session_parts
+                    WHERE session_id = ?
+                    ORDER BY part_number
+                """
+                params = [session_id]
+                if limit:
+                    query += " LIMIT ?"
+                    params.append(limit)
+                
+                cursor = conn.execute(query, params)
+                return [row[0] for row in cursor.fetchall()]
+                
         except Exception as e:
-            logger.error(f"Failed to restore backup: {e}")
-            raise DatabaseError(f"Failed to restore backup: {e}")
-
-    def cleanup_old_backups(self, backup_dir: str, retention_days: int = 30) -> int:
+            logger.error(f"Failed to get discovery session parts: {e}")
+            raise DatabaseError(f"Failed to get discovery session parts: {e}")
+    
+    def get_discovery_session_stats(self, days_back: Optional[int] = None) -> Dict[str, Any]:
         """
-        Clean up old backup files based on retention policy.
+        Aggregate discovery statistics over sessions active in a time window.
+        
+        Reads the session summary table rather than the discovery log, so the
+        cost grows with the number of sessions, not the number of log entries.
         
         Args:
-            backup_dir: Directory containing backup files
-            retention_days: Number of days to retain backup files
+            days_back: Only include sessions last active within this many days
             
         Returns:
-            int: Number of backup files deleted
+            Dict[str, Any]: total_discoveries, unique_parts, parts_added,
+            parts_skipped, success_rate and active_sessions
             
         Raises:
-            DatabaseError: If cleanup operation fails
+            DatabaseError: If database operation fails
         """
         try:
-            backup_dir = Path(backup_dir)
-            if not backup_dir.exists():
-                return 0
-            
-            cutoff_date = datetime.now() - timedelta(days=retention_days)
-            deleted_count = 0
+            with self.get_connection() as conn:
+                session_filter = ""
+                params = []
+                if days_back is not None:
+                    # last_seen holds both isoformat ('T') and CURRENT_TIMESTAMP (space) text,
+                    # so both sides are normalized before comparing
+                    session_filter = "WHERE datetime(last_seen) >= datetime(?)"
+                    params.append((datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d %H:%M:%S'))
+                
+                cursor = conn.execute(f"""
+                    SELECT COUNT(*), COALESCE(SUM(total_entries), 0),
+                           COALESCE(SUM(parts_added), 0), COALESCE(SUM(parts_skipped), 0)
+                    FROM discovery_sessions {session_filter}
+                """, params)
+                active_sessions, total_discoveries, parts_added, parts_skipped = cursor.fetchone()
+                
+                cursor = conn.execute(f"""
+                    SELECT COUNT(DISTINCT part_number) FROM discovery_session_parts
+                    WHERE session_id IN (SELECT session_id FROM discovery_sessions {session_filter})
+                """, params)
+                unique_parts = cursor.fetchone()[0]
+                
+                total_processed = parts_added + parts_skipped
+                success_rate = (parts_added / total_processed * 100) if total_processed > 0 else 0.0
+                
+                return {
+                    'total_discoveries': total_discoveries,
+                    'unique_parts': unique_parts,
+                    'parts_added': parts_added,
+                    'parts_skipped': parts_skipped,
+                    'success_rate': success_rate,
+                    'active_sessions': active_sessions
+                }
+                
+        except Exception as e:
+            logger.error(f"Failed to get discovery session stats: {e}")
+            raise DatabaseError(f"Failed to get discovery session stats: {e}")
+    
+    def _row_to_discovery_session(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """
+        Convert a discovery_sessions row to a summary dictionary.
+        
+        Args:
+            row: Database row
+            
+        Returns:
+            Dict[str, Any]: Session summary
+        """
+        return {
+            'session_id': row['session_id'],
+            'first_seen': datetime.fromisoformat(row['first_seen']) if row['first_seen'] else None,
+            'last_seen': datetime.fromisoformat(row['last_seen']) if row['last_seen'] else None,
+            'total_entries': row['total_entries'],
+            'distinct_parts': row['distinct_parts'],
+            'parts_added': row['parts_added'],
+            'parts_skipped': row['parts_skipped']
+        }
+
+    # Processed Files Manifest Operations
+    
+    def _create_processed_files_table(self, conn: sqlite3.Connection) -> None:
+        """
+        Create the processed files manifest table.
+        
+        Args:
+            conn: Open database connection
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS processed_files (
+                file_path TEXT PRIMARY KEY,
+                file_size INTEGER NOT NULL,
+                file_mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                extractor_version TEXT NOT NULL,
+                status TEXT NOT NULL CHECK (status IN ('success', 'failed')),
+                invoice_number TEXT,
+                processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                error_message TEXT
+            )
+        """)
+    
+    def get_processed_files(self, file_paths: Optional[List[str]] = None) -> Dict[str, ProcessedFile]:
+        """
+        Get manifest entries for previously processed files.
+        
+        Args:
+            file_paths: Paths to look up; all entries are returned when omitted
+            
+        Returns:
+            Dict[str, ProcessedFile]: Manifest entries keyed by file path
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                query = """
+                    SELECT file_path, file_size, file_mtime_ns, content_hash, extractor_version,
+                           status, invoice_number, processed_date, error_message
+                    FROM processed_files
+                """
+                if file_paths is None:
+                    rows = conn.execute(query).fetchall()
+                else:
+                    rows = []
+                    file_paths = list(file_paths)
+                    for start in range(0, len(file_paths), 500):
+                        chunk = file_paths[start:start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        rows.extend(conn.execute(
+                            f"{query} WHERE file_path IN ({placeholders})", chunk
+                        ).fetchall())
+                
+                return {row['file_path']: self._row_to_processed_file(row) for row in rows}
+                
+        except Exception as e:
+            logger.error(f"Failed to get processed files: {e}")
+            raise DatabaseError(f"Failed to get processed files: {e}")
+    
+    def record_processed_files(self, entries: List[ProcessedFile]) -> int:
+        """
+        Insert or replace manifest entries for processed files.
+        
+        Args:
+            entries: Manifest entries to store
+            
+        Returns:
+            int: Number of entries written
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        if not entries:
+            return 0
+        
+        try:
+            now = datetime.now()
+            with self.transaction() as conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO processed_files (
+                        file_path, file_size, file_mtime_ns, content_hash, extractor_version,
+                        status, invoice_number, processed_date, error_message
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (entry.file_path, entry.file_size, entry.file_mtime_ns, entry.content_hash,
+                     entry.extractor_version, entry.status, entry.invoice_number,
+                     (entry.processed_date or now).isoformat(), entry.error_message)
+                    for entry in entries
+                ])
+            
+            logger.debug(f"Recorded {len(entries)} processed files")
+            return len(entries)
+            
+        except Exception as e:
+            logger.error(f"Failed to record processed files: {e}")
+            raise DatabaseError(f"Failed to record processed files: {e}")
+    
+    def clear_processed_files(self, path_prefix: Optional[str] = None) -> int:
+        """
+        Remove manifest entries so the files are processed again.
+        
+        Args:
+            path_prefix: Only remove entries under this path; all entries when omitted
+            
+        Returns:
+            int: Number of entries removed
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.transaction() as conn:
+                if path_prefix is None:
+                    cursor = conn.execute("DELETE FROM processed_files")
+                else:
+                    cursor = conn.execute(
+                        "DELETE FROM processed_files WHERE substr(file_path, 1, ?) = ?",
+                        (len(path_prefix), path_prefix)
+                    )
+                deleted_count = cursor.rowcount
+            
+            logger.info(f"Cleared {deleted_count} processed file entries")
+            return deleted_count
+            
+        except Exception as e:
+            logger.error(f"Failed to clear processed files: {e}")
+            raise DatabaseError(f"Failed to clear processed files: {e}")
+    
+    def _row_to_processed_file(self, row: sqlite3.Row) -> ProcessedFile:
+        """
+        Convert a database row to a ProcessedFile instance.
+        
+        Args:
+            row: Database row
+            
+        Returns:
+            ProcessedFile: Manifest entry
+        """
+        processed_date = None
+        if row['processed_date']:
+            processed_date = datetime.fromisoformat(row['processed_date'])
+        
+        return ProcessedFile(
+            file_path=row['file_path'],
+            file_size=row['file_size'],
+            file_mtime_ns=row['file_mtime_ns'],
+            content_hash=row['content_hash'],
+            extractor_version=row['extractor_version'],
+            status=row['status'],
+            invoice_number=row['invoice_number'],
+            processed_date=processed_date,
+            error_message=row['error_message']
+        )
+
+    # Processing Run Journal Operations
+    
+    def _create_processing_run_tables(self, conn: sqlite3.Connection) -> None:
+        """
+        Create the processing run journal tables.
+        
+        Args:
+            conn: Open database connection
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS processing_runs (
+                run_id TEXT PRIMARY KEY,
+                input_path TEXT NOT NULL,
+                output_path TEXT,
+                status TEXT NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'completed', 'interrupted')),
+                total_files INTEGER NOT NULL DEFAULT 0,
+                started_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                completed_date TIMESTAMP
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS processing_run_files (
+                run_id TEXT NOT NULL REFERENCES processing_runs(run_id) ON DELETE CASCADE,
+                file_path TEXT NOT NULL,
+                status TEXT NOT NULL CHECK (status IN ('success', 'failed')),
+                invoice_number TEXT,
+                processing_time REAL NOT NULL DEFAULT 0,
+                result_json TEXT NOT NULL,
+                completed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (run_id, file_path)
+            )
+        """)
+    
+    def create_processing_run(self, run: ProcessingRun) -> ProcessingRun:
+        """
+        Create a new journaled processing run.
+        
+        Args:
+            run: Run to create
+            
+        Returns:
+            ProcessingRun: Created run
+            
+        Raises:
+            DatabaseError: If the run already exists or the operation fails
+        """
+        try:
+            with self.transaction() as conn:
+                conn.execute("""
+                    INSERT INTO processing_runs (
+                        run_id, input_path, output_path, status, total_files, started_date, completed_date
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (run.run_id, run.input_path, run.output_path, run.status, run.total_files,
+                      run.started_date.isoformat(),
+                      run.completed_date.isoformat() if run.completed_date else None))
+            
+            logger.info(f"Created processing run: {run.run_id}")
+            return run
+            
+        except sqlite3.IntegrityError:
+            raise DatabaseError(f"Processing run {run.run_id} already exists")
+        except Exception as e:
+            logger.error(f"Failed to create processing run {run.run_id}: {e}")
+            raise DatabaseError(f"Failed to create processing run: {e}")
+    
+    def get_processing_run(self, run_id: str) -> Optional[ProcessingRun]:
+        """
+        Get a processing run by ID.
+        
+        Args:
+            run_id: Run identifier
+            
+        Returns:
+            ProcessingRun if found, None otherwise
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("""
+                    SELECT run_id, input_path, output_path, status, total_files, started_date, completed_date
+                    FROM processing_runs WHERE run_id = ?
+                """, (run_id,)).fetchone()
+                return self._row_to_processing_run(row) if row else None
+                
+        except Exception as e:
+            logger.error(f"Failed to get processing run {run_id}: {e}")
+            raise DatabaseError(f"Failed to get processing run: {e}")
+    
+    def list_processing_runs(self, status: Optional[str] = None, limit: int = 20) -> List[ProcessingRun]:
+        """
+        List processing runs, most recent first.
+        
+        Args:
+            status: Optional status filter
+            limit: Maximum number of runs to return
+            
+        Returns:
+            List[ProcessingRun]: Matching runs
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                query = """
+                    SELECT run_id, input_path, output_path, status, total_files, started_date, completed_date
+                    FROM processing_runs
+                """
+                params: List[Any] = []
+                if status:
+                    query += " WHERE status = ?"
+                    params.append(status)
+                query += " ORDER BY started_date DESC LIMIT ?"
+                params.append(limit)
+                
+                return [self._row_to_processing_run(row) for row in conn.execute(query, params).fetchall()]
+                
+        except Exception as e:
+            logger.error(f"Failed to list processing runs: {e}")
+            raise DatabaseError(f"Failed to list processing runs: {e}")
+    
+    def update_processing_run(self, run_id: str, status: str,
+                              total_files: Optional[int] = None) -> None:
+        """
+        Update the status of a processing run.
+        
+        Args:
+            run_id: Run identifier
+            status: New status ('running', 'completed' or 'interrupted')
+            total_files: Optional new file count
+            
+        Raises:
+            DatabaseError: If the run does not exist or the operation fails
+        """
+        if status not in ('running', 'completed', 'interrupted'):
+            raise ValidationError("Status must be one of: running, completed, interrupted")
+        
+        try:
+            completed_date = datetime.now().isoformat() if status == 'completed' else None
+            with self.transaction() as conn:
+                cursor = conn.execute("""
+                    UPDATE processing_runs
+                    SET status = ?, completed_date = ?, total_files = COALESCE(?, total_files)
+                    WHERE run_id = ?
+                """, (status, completed_date, total_files, run_id))
+                if cursor.rowcount == 0:
+                    raise DatabaseError(f"Processing run {run_id} not found")
+                
+        except DatabaseError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to update processing run {run_id}: {e}")
+            raise DatabaseError(f"Failed to update processing run: {e}")
+    
+    def record_run_file(self, entry: RunFileResult) -> None:
+        """
+        Journal the completion of one file in a processing run.
+        
+        Each entry is committed on its own so that completed work survives a
+        crash or interruption of the run.
+        
+        Args:
+            entry: Journal entry to store
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.transaction() as conn:
+                conn.execute("""
+                    INSERT OR REPLACE INTO processing_run_files (
+                        run_id, file_path, status, invoice_number, processing_time, result_json, completed_date
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (entry.run_id, entry.file_path, entry.status, entry.invoice_number,
+                      entry.processing_time, entry.result_json,
+                      (entry.completed_date or datetime.now()).isoformat()))
+                
+        except Exception as e:
+            logger.error(f"Failed to journal {entry.file_path} for run {entry.run_id}: {e}")
+            raise DatabaseError(f"Failed to journal run file: {e}")
+    
+    def get_run_files(self, run_id: str) -> Dict[str, RunFileResult]:
+        """
+        Get the journaled file results of a processing run.
+        
+        Args:
+            run_id: Run identifier
+            
+        Returns:
+            Dict[str, RunFileResult]: Journal entries keyed by file path
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute("""
+                    SELECT run_id, file_path, status, invoice_number, processing_time, result_json, completed_date
+                    FROM processing_run_files WHERE run_id = ?
+                """, (run_id,)).fetchall()
+                
+                return {
+                    row['file_path']: RunFileResult(
+                        run_id=row['run_id'],
+                        file_path=row['file_path'],
+                        status=row['status'],
+                        result_json=row['result_json'],
+                        invoice_number=row['invoice_number'],
+                        processing_time=row['processing_time'],
+                        completed_date=datetime.fromisoformat(row['completed_date']) if row['completed_date'] else None
+                    )
+                    for row in rows
+                }
+                
+        except Exception as e:
+            logger.error(f"Failed to get files for processing run {run_id}: {e}")
+            raise DatabaseError(f"Failed to get run files: {e}")
+    
+    def count_run_files(self, run_id: str) -> int:
+        """
+        Count the files journaled as completed in a processing run.
+        
+        Args:
+            run_id: Run identifier
+            
+        Returns:
+            int: Number of journaled files
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                return conn.execute(
+                    "SELECT COUNT(*) FROM processing_run_files WHERE run_id = ?", (run_id,)
+                ).fetchone()[0]
+                
+        except Exception as e:
+            logger.error(f"Failed to count files for processing run {run_id}: {e}")
+            raise DatabaseError(f"Failed to count run files: {e}")
+    
+    def _row_to_processing_run(self, row: sqlite3.Row) -> ProcessingRun:
+        """
+        Convert a database row to a ProcessingRun instance.
+        
+        Args:
+            row: Database row
+            
+        Returns:
+            ProcessingRun: Processing run
+        """
+        return ProcessingRun(
+            run_id=row['run_id'],
+            input_path=row['input_path'],
+            status=row['status'],
+            output_path=row['output_path'],
+            total_files=row['total_files'],
+            started_date=datetime.fromisoformat(row['started_date']) if row['started_date'] else None,
+            completed_date=datetime.fromisoformat(row['completed_date']) if row['completed_date'] else None
+        )
+
+    # Part Rate Statistics Operations
+    
+    def _create_part_rate_stats_table(self, conn: sqlite3.Connection) -> None:
+        """
+        Create the per-part rate statistics tables.
+        
+        Statistics first kept by part number alone cannot be split by
+        composite key, so such a table is dropped and the statistics are
+        rebuilt as invoices are validated. A table keeping its price range
+        as decimals is rebuilt with the range in ten-thousandths.
+        
+        Args:
+            conn: Open database connection
+        """
+        cursor = conn.execute("PRAGMA table_info(part_rate_stats)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if columns and 'composite_key' not in columns:
+            logger.info("Migrating: Rebuilding part rate statistics by composite key")
+            conn.execute("DROP TABLE part_rate_stats")
+        elif 'min_price' in columns:
+            logger.info("Migrating: Storing part rate ranges in ten-thousandths")
+            conn.execute("ALTER TABLE part_rate_stats RENAME TO part_rate_stats_decimal")
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS part_rate_stats (
+                composite_key TEXT PRIMARY KEY,
+                part_number TEXT NOT NULL,
+                observation_count INTEGER NOT NULL DEFAULT 0,
+                mean_price REAL NOT NULL DEFAULT 0,
+                m2 REAL NOT NULL DEFAULT 0,
+                min_price_units INTEGER,
+                max_price_units INTEGER,
+                last_seen TIMESTAMP,
+                last_invoice TEXT
+            )
+        """)
+        if 'min_price' in columns:
+            conn.execute(f"""
+                INSERT INTO part_rate_stats (
+                    composite_key, part_number, observation_count, mean_price, m2, min_price_units,
+                    max_price_units, last_seen, last_invoice
+                )
+                SELECT composite_key, part_number, observation_count, mean_price, m2,
+                       CAST(ROUND(min_price * {MONEY_SCALE}) AS INTEGER),
+                       CAST(ROUND(max_price * {MONEY_SCALE}) AS INTEGER), last_seen, last_invoice
+                FROM part_rate_stats_decimal
+            """)
+            # Drops the old part number index with it, before it is recreated below
+            conn.execute("DROP TABLE part_rate_stats_decimal")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_part_rate_stats_part_number ON part_rate_stats(part_number)"
+        )
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS part_rate_invoices (
+                composite_key TEXT NOT NULL,
+                invoice_number TEXT NOT NULL,
+                PRIMARY KEY (composite_key, invoice_number)
+            )
+        """)
+    
+    def get_part_rate_stats(self, composite_keys: Iterable[str]) -> Dict[str, PartRateStats]:
+        """
+        Get the rate statistics of several parts.
+        
+        Args:
+            composite_keys: Composite keys of the parts to look up
+            
+        Returns:
+            Dict[str, PartRateStats]: Statistics keyed by composite key; parts
+            never observed are left out
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                return self._load_part_rate_stats(conn, 'composite_key', composite_keys)
+                
+        except Exception as e:
+            logger.error(f"Failed to get part rate statistics: {e}")
+            raise DatabaseError(f"Failed to get part rate statistics: {e}")
+    
+    def get_part_rate_stats_by_part_number(self, part_numbers: Iterable[str]) -> Dict[str, PartRateStats]:
+        """
+        Get the rate statistics of several part numbers.
+        
+        A part number invoiced under several composite keys is answered with
+        the statistics of the key observed most often.
+        
+        Args:
+            part_numbers: Part numbers to look up
+            
+        Returns:
+            Dict[str, PartRateStats]: Statistics keyed by part number; part
+            numbers never observed are left out
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                stats = self._load_part_rate_stats(conn, 'part_number', part_numbers)
+                
+        except Exception as e:
+            logger.error(f"Failed to get part rate statistics: {e}")
+            raise DatabaseError(f"Failed to get part rate statistics: {e}")
+        
+        by_part_number: Dict[str, PartRateStats] = {}
+        for part_stats in stats.values():
+            best = by_part_number.get(part_stats.part_number)
+            if best is None or part_stats.observation_count > best.observation_count:
+                by_part_number[part_stats.part_number] = part_stats
+        return by_part_number
+    
+    def record_part_rates(self, observations: Iterable[Tuple[str, str, Any, Optional[str]]],
+                          seen_at: Optional[datetime] = None) -> Dict[str, PartRateStats]:
+        """
+        Fold invoiced rates into the per-part statistics.
+        
+        Each observation updates its part's statistics in constant time, and
+        all of them are written in one transaction. The invoices folded into
+        each part's statistics are recorded alongside them, and lines of an
+        invoice already folded in before this call are skipped, so validating
+        invoices again (a re-run or ``--resume``) does not count their rates
+        twice. Every line of an invoice seen for the first time is counted.
+        Observations without an invoice number cannot be deduplicated and
+        are skipped.
+        
+        Args:
+            observations: (composite_key, part_number, rate, invoice_number)
+                of each invoice line; the invoice number may be any stable
+                key identifying the invoice
+            seen_at: When the rates were observed (defaults to now)
+            
+        Returns:
+            Dict[str, PartRateStats]: Updated statistics keyed by composite key
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        observations = [(composite_key, part_number, price, invoice_number)
+                        for composite_key, part_number, price, invoice_number in observations
+                        if composite_key and part_number and price is not None and invoice_number]
+        if not observations:
+            return {}
+        seen_at = seen_at or datetime.now()
+        
+        try:
+            with self.transaction() as conn:
+                keys = {composite_key for composite_key, _, _, _ in observations}
+                invoices = {(composite_key, invoice_number) for composite_key, _, _, invoice_number in observations}
+                folded = self._load_folded_invoices(conn, invoices)
+                stored = self._load_part_rate_stats(conn, 'composite_key', keys)
+                updated: Dict[str, PartRateStats] = {}
+                for composite_key, part_number, price, invoice_number in observations:
+                    if (composite_key, invoice_number) in folded:
+                        continue
+                    stats = updated.get(composite_key)
+                    if stats is None:
+                        stats = updated[composite_key] = stored.get(composite_key) or PartRateStats(
+                            part_number=part_number, composite_key=composite_key
+                        )
+                    stats.add(price, invoice_number, seen_at)
+                
+                conn.executemany("""
+                    INSERT OR REPLACE INTO part_rate_stats (
+                        composite_key, part_number, observation_count, mean_price, m2, min_price_units,
+                        max_price_units, last_seen, last_invoice
+                    ) VALUES (:composite_key, :part_number, :observation_count, :mean_price, :m2,
+                              :min_price_units, :max_price_units, :last_seen, :last_invoice)
+                """, [stats.to_dict() for stats in updated.values()])
+                conn.executemany(
+                    "INSERT OR IGNORE INTO part_rate_invoices (composite_key, invoice_number) VALUES (?, ?)",
+                    invoices - folded
+                )
+                return updated
+                
+        except Exception as e:
+            logger.error(f"Failed to record part rates: {e}")
+            raise DatabaseError(f"Failed to record part rates: {e}")
+    
+    def _load_folded_invoices(self, conn: sqlite3.Connection,
+                              invoices: Iterable[Tuple[str, str]]) -> set:
+        """Return those (composite_key, invoice_number) pairs already folded into the statistics."""
+        invoices = list(invoices)
+        folded = set()
+        # Two host parameters per pair; stay well below SQLite's limit
+        for start in range(0, len(invoices), 250):
+            chunk = invoices[start:start + 250]
+            rows = conn.execute(f"""
+                SELECT composite_key, invoice_number FROM part_rate_invoices
+                WHERE (composite_key, invoice_number) IN (VALUES {', '.join('(?, ?)' for _ in chunk)})
+            """, [value for pair in chunk for value in pair]).fetchall()
+            folded.update((row[0], row[1]) for row in rows)
+        return folded
+    
+    def _load_part_rate_stats(self, conn: sqlite3.Connection, column: str,
+                              values: Iterable[str]) -> Dict[str, PartRateStats]:
+        """Read the statistics whose ``column`` is one of ``values``, keyed by composite key."""
+        values = list(dict.fromkeys(values))
+        stats: Dict[str, PartRateStats] = {}
+        # Stay well below SQLite's host parameter limit
+        for start in range(0, len(values), 500):
+            chunk = values[start:start + 500]
+            rows = conn.execute(f"""
+                SELECT composite_key, part_number, observation_count, mean_price, m2, min_price_units,
+                       max_price_units, last_seen, last_invoice
+                FROM part_rate_stats WHERE {column} IN ({', '.join('?' * len(chunk))})
+            """, chunk).fetchall()
+            for row in rows:
+                stats[row['composite_key']] = PartRateStats(
+                    part_number=row['part_number'],
+                    composite_key=row['composite_key'],
+                    observation_count=row['observation_count'],
+                    mean_price=row['mean_price'],
+                    m2=row['m2'],
+                    min_price=money_units_to_decimal(row['min_price_units'])
+                    if row['min_price_units'] is not None else None,
+                    max_price=money_units_to_decimal(row['max_price_units'])
+                    if row['max_price_units'] is not None else None,
+                    last_seen=datetime.fromisoformat(row['last_seen']) if row['last_seen'] else None,
+                    last_invoice=row['last_invoice']
+                )
+        return stats
+
+    # Price History Operations
+    
+    def _create_price_history_table(self, conn: sqlite3.Connection) -> None:
+        """
+        Create the authorized price history table and its maintenance triggers.
+        
+        Each row is the price of a part over ``[effective_from, effective_to)``;
+        the current price has no ``effective_to``. Triggers on ``parts`` record
+        every price change, whichever code path makes it. When the table is
+        created on an existing database, each part gets an open interval
+        starting on its creation date.
+        
+        Args:
+            conn: Open database connection
+        """
+        cursor = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='part_price_history'"
+        )
+        needs_backfill = cursor.fetchone() is None
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS part_price_history (
+                composite_key TEXT NOT NULL,
+                authorized_price DECIMAL(10,4) NOT NULL CHECK (authorized_price > 0),
+                effective_from DATE NOT NULL,
+                effective_to DATE,
+                recorded_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (composite_key, effective_from)
+            )
+        """)
+        
+        conn.execute("DROP TRIGGER IF EXISTS record_part_price_insert")
+        conn.execute(f"""
+            CREATE TRIGGER record_part_price_insert
+                AFTER INSERT ON parts
+                FOR EACH ROW
+                WHEN NEW.composite_key IS NOT NULL
+                BEGIN{_PRICE_HISTORY_TRIGGER_BODY}
+                END
+        """)
+        
+        # History follows a part whose composite key is renamed
+        conn.execute("DROP TRIGGER IF EXISTS record_part_price_update")
+        conn.execute(f"""
+            CREATE TRIGGER record_part_price_update
+                AFTER UPDATE OF authorized_price, composite_key ON parts
+                FOR EACH ROW
+                WHEN NEW.composite_key IS NOT NULL
+                BEGIN
+                    UPDATE OR REPLACE part_price_history SET composite_key = NEW.composite_key
+                    WHERE composite_key = OLD.composite_key AND NEW.composite_key IS NOT OLD.composite_key;{_PRICE_HISTORY_TRIGGER_BODY}
+                END
+        """)
+        
+        if needs_backfill:
+            conn.execute("""
+                INSERT OR IGNORE INTO part_price_history (composite_key, authorized_price, effective_from)
+                SELECT composite_key, authorized_price, COALESCE(date(created_date), date('now', 'localtime'))
+                FROM parts WHERE composite_key IS NOT NULL
+            """)
+    
+    def get_price_history(self, composite_key: Optional[str] = None) -> List[PriceInterval]:
+        """
+        Get authorized price intervals.
+        
+        Args:
+            composite_key: Part to get the history of; all parts if None
+            
+        Returns:
+            List[PriceInterval]: Intervals ordered by composite key and start date
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        query = """
+            SELECT composite_key, authorized_price, effective_from, effective_to, recorded_date
+            FROM part_price_history
+        """
+        params: List[Any] = []
+        if composite_key is not None:
+            query += " WHERE composite_key = ?"
+            params.append(composite_key)
+        query += " ORDER BY composite_key, effective_from"
+        
+        try:
+            with self.get_connection() as conn:
+                return [self._row_to_price_interval(row) for row in conn.execute(query, params)]
+                
+        except Exception as e:
+            logger.error(f"Failed to get price history: {e}")
+            raise DatabaseError(f"Failed to get price history: {e}")
+    
+    def get_price_history_fingerprint(self) -> Tuple[Any, ...]:
+        """
+        Get a cheap summary of the price history that changes whenever it changes.
+        
+        Returns:
+            Tuple: (interval count, open interval count, latest start date, price total)
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("""
+                    SELECT COUNT(*), COUNT(*) - COUNT(effective_to), MAX(effective_from), TOTAL(authorized_price)
+                    FROM part_price_history
+                """).fetchone()
+                return tuple(row)
+                
+        except Exception as e:
+            logger.error(f"Failed to get price history fingerprint: {e}")
+            raise DatabaseError(f"Failed to get price history fingerprint: {e}")
+    
+    def get_price_on(self, composite_key: str, on_date: date) -> Optional[Decimal]:
+        """
+        Get the authorized price of a part in effect on a date.
+        
+        Args:
+            composite_key: Composite key of the part
+            on_date: Date to get the price for
+            
+        Returns:
+            Decimal: Price in effect on the date, or None if no interval of the
+            part covers it
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("""
+                    SELECT authorized_price FROM part_price_history
+                    WHERE composite_key = ? AND effective_from <= ?
+                      AND (effective_to IS NULL OR effective_to > ?)
+                    ORDER BY effective_from DESC LIMIT 1
+                """, (composite_key, on_date.isoformat(), on_date.isoformat())).fetchone()
+                return money_units_to_decimal(to_money_units(row[0])) if row else None
+                
+        except Exception as e:
+            logger.error(f"Failed to get price of {composite_key} on {on_date}: {e}")
+            raise DatabaseError(f"Failed to get price on date: {e}")
+    
+    def record_price_change(self, composite_key: str, authorized_price: Union[Decimal, float, str],
+                            effective_from: date) -> PriceInterval:
+        """
+        Record a price that took effect on a given date, such as a backdated contract price.
+        
+        The interval is inserted into the part's history and the end dates of
+        its intervals are recomputed. If it is now the part's latest interval,
+        the part's current price is updated to match.
+        
+        Args:
+            composite_key: Composite key of the part
+            authorized_price: Price that took effect
+            effective_from: Date the price took effect
+            
+        Returns:
+            PriceInterval: The recorded interval
+            
+        Raises:
+            PartNotFoundError: If the part doesn't exist
+            ValidationError: If the price is invalid or the date is in the future
+            DatabaseError: If database operation fails
+        """
+        try:
+            price_units = to_money_units(authorized_price)
+        except ValueError as e:
+            raise ValidationError(f"Invalid authorized price: {e}")
+        if price_units <= 0:
+            raise ValidationError("Authorized price must be positive")
+        if effective_from > date.today():
+            raise ValidationError("Effective date cannot be in the future")
+        
+        try:
+            with self.transaction() as conn:
+                if conn.execute("SELECT 1 FROM parts WHERE composite_key = ?", (composite_key,)).fetchone() is None:
+                    raise PartNotFoundError(f"Part with composite key '{composite_key}' not found")
+                
+                conn.execute("""
+                    INSERT OR REPLACE INTO part_price_history (composite_key, authorized_price, effective_from)
+                    VALUES (?, ?, ?)
+                """, (composite_key, money_units_to_float(price_units), effective_from.isoformat()))
+                
+                # Each interval ends where the next one starts; the latest stays open
+                conn.execute("""
+                    UPDATE part_price_history SET effective_to = (
+                        SELECT MIN(later.effective_from) FROM part_price_history AS later
+                        WHERE later.composite_key = part_price_history.composite_key
+                          AND later.effective_from > part_price_history.effective_from
+                    )
+                    WHERE composite_key = ?
+                """, (composite_key,))
+                
+                row = conn.execute("""
+                    SELECT composite_key, authorized_price, effective_from, effective_to, recorded_date
+                    FROM part_price_history WHERE composite_key = ? AND effective_from = ?
+                """, (composite_key, effective_from.isoformat())).fetchone()
+                interval = self._row_to_price_interval(row)
+                
+                # The open interval already carries this price, so the triggers add nothing
+                if interval.effective_to is None:
+                    conn.execute("UPDATE parts SET authorized_price = ? WHERE composite_key = ?",
+                                 (money_units_to_float(price_units), composite_key))
+                
+                logger.info(f"Recorded price {interval.authorized_price} for {composite_key} "
+                            f"effective {effective_from}")
+                return interval
+                
+        except (PartNotFoundError, ValidationError):
+            raise
+        except Exception as e:
+            logger.error(f"Failed to record price change for {composite_key}: {e}")
+            raise DatabaseError(f"Failed to record price change: {e}")
+    
+    def _row_to_price_interval(self, row: sqlite3.Row) -> PriceInterval:
+        """Convert a part_price_history row to a PriceInterval."""
+        return PriceInterval(
+            composite_key=row['composite_key'],
+            authorized_price=money_units_to_decimal(to_money_units(row['authorized_price'])),
+            effective_from=date.fromisoformat(row['effective_from']),
+            effective_to=date.fromisoformat(row['effective_to']) if row['effective_to'] else None,
+            recorded_date=datetime.fromisoformat(row['recorded_date']) if row['recorded_date'] else None
+        )
+
+    # Tolerance Rule Operations
+    
+    def _create_tolerance_rules_table(self, conn: sqlite3.Connection) -> None:
+        """
+        Create the price tolerance rules table.
+        
+        A table keeping absolute tolerances as decimals is rebuilt with them
+        in ten-thousandths.
+        
+        Args:
+            conn: Open database connection
+        """
+        cursor = conn.execute("PRAGMA table_info(tolerance_rules)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if 'absolute_tolerance' in columns:
+            logger.info("Migrating: Storing absolute tolerances in ten-thousandths")
+            conn.execute("ALTER TABLE tolerance_rules RENAME TO tolerance_rules_decimal")
+        
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tolerance_rules (
+                scope TEXT NOT NULL CHECK (scope IN ('part', 'category', 'item_type')),
+                match_value TEXT NOT NULL,
+                absolute_tolerance_units INTEGER CHECK (absolute_tolerance_units >= 0),
+                percent_tolerance DECIMAL(7,4) CHECK (percent_tolerance BETWEEN 0 AND 100),
+                description TEXT,
+                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (scope, match_value)
+            )
+        """)
+        if 'absolute_tolerance' in columns:
+            conn.execute(f"""
+                INSERT INTO tolerance_rules (
+                    scope, match_value, absolute_tolerance_units, percent_tolerance, description,
+                    created_date, last_updated
+                )
+                SELECT scope, match_value, CAST(ROUND(absolute_tolerance * {MONEY_SCALE}) AS INTEGER),
+                       percent_tolerance, description, created_date, last_updated
+                FROM tolerance_rules_decimal
+            """)
+            conn.execute("DROP TABLE tolerance_rules_decimal")
+    
+    def set_tolerance_rule(self, rule: ToleranceRule) -> ToleranceRule:
+        """
+        Create or replace the tolerance rule for a scope and match value.
+        
+        Args:
+            rule: Rule to store
+            
+        Returns:
+            ToleranceRule: Stored rule with updated timestamps
+            
+        Raises:
+            ValidationError: If rule data is invalid
+            DatabaseError: If database operation fails
+        """
+        rule.validate()
+        now = datetime.now()
+        
+        try:
+            with self.transaction() as conn:
+                row = conn.execute(
+                    "SELECT created_date FROM tolerance_rules WHERE scope = ? AND match_value = ?",
+                    (rule.scope, rule.match_value)
+                ).fetchone()
+                rule.created_date = datetime.fromisoformat(row['created_date']) if row and row['created_date'] else now
+                rule.last_updated = now
+                
+                conn.execute("""
+                    INSERT OR REPLACE INTO tolerance_rules (
+                        scope, match_value, absolute_tolerance_units, percent_tolerance, description,
+                        created_date, last_updated
+                    ) VALUES (:scope, :match_value, :absolute_tolerance_units, :percent_tolerance, :description,
+                              :created_date, :last_updated)
+                """, rule.to_dict())
+                
+                logger.info(f"Set {rule.scope} tolerance rule for {rule.match_value}")
+                return rule
+                
+        except Exception as e:
+            logger.error(f"Failed to set tolerance rule for {rule.scope} {rule.match_value}: {e}")
+            raise DatabaseError(f"Failed to set tolerance rule: {e}")
+    
+    def list_tolerance_rules(self, scope: Optional[str] = None) -> List[ToleranceRule]:
+        """
+        List tolerance rules.
+        
+        Args:
+            scope: Only list rules of this scope
+            
+        Returns:
+            List[ToleranceRule]: Rules ordered by scope and match value
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        query = """
+            SELECT scope, match_value, absolute_tolerance_units, percent_tolerance, description,
+                   created_date, last_updated
+            FROM tolerance_rules
+        """
+        params: List[Any] = []
+        if scope is not None:
+            query += " WHERE scope = ?"
+            params.append(scope)
+        query += " ORDER BY scope, match_value"
+        
+        try:
+            with self.get_connection() as conn:
+                return [ToleranceRule(
+                    scope=row['scope'],
+                    match_value=row['match_value'],
+                    absolute_tolerance=money_units_to_decimal(row['absolute_tolerance_units'])
+                    if row['absolute_tolerance_units'] is not None else None,
+                    percent_tolerance=Decimal(str(row['percent_tolerance']))
+                    if row['percent_tolerance'] is not None else None,
+                    description=row['description'],
+                    created_date=datetime.fromisoformat(row['created_date']) if row['created_date'] else None,
+                    last_updated=datetime.fromisoformat(row['last_updated']) if row['last_updated'] else None
+                ) for row in conn.execute(query, params)]
+                
+        except Exception as e:
+            logger.error(f"Failed to list tolerance rules: {e}")
+            raise DatabaseError(f"Failed to list tolerance rules: {e}")
+    
+    def delete_tolerance_rule(self, scope: str, match_value: str) -> bool:
+        """
+        Delete the tolerance rule for a scope and match value.
+        
+        Args:
+            scope: Rule scope
+            match_value: Part number, category or item type of the rule
+            
+        Returns:
+            bool: True if a rule was deleted
+            
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute(
+                    "DELETE FROM tolerance_rules WHERE scope = ? AND match_value = ?",
+                    (scope, normalize_component(match_value))
+                )
+                return cursor.rowcount > 0
+                
+        except Exception as e:
+            logger.error(f"Failed to delete tolerance rule for {scope} {match_value}: {e}")
+            raise DatabaseError(f"Failed to delete tolerance rule: {e}")
+
+    # Backup and Restore Operations
+    
+    def create_backup(self, backup_path: Optional[str] = None, compression: Optional[str] = None,
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      verify: bool = False) -> str:
+        """
+        Create an online backup of the database.
+        
+        Pages are copied through SQLite's backup API in small steps, so the
+        backup is consistent (including pages still in the WAL) and concurrent
+        writers are only blocked briefly.
+        
+        Args:
+            backup_path: Optional custom backup path
+            compression: Optional streaming compression ('gzip' or 'lzma')
+            progress: Optional callback receiving (pages_copied, total_pages)
+            verify: Run an integrity check on the snapshot before publishing it
+            
+        Returns:
+            str: Path to the created backup file
+            
+        Raises:
+            DatabaseError: If backup operation fails
+        """
+        try:
+            if backup_path is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                suffix = COMPRESSION_SUFFIXES.get(compression, "")
+                backup_path = f"{self.db_path.stem}_backup_{timestamp}.db{suffix}"
+            
+            source = self._memory_connection or str(self.db_path)
+            result = backup_database(source, backup_path, compression=compression,
+                                     progress=progress, verify=verify)
+            
+            logger.info(f"Database backup created: {result['backup_path']}")
+            return result['backup_path']
+            
+        except Exception as e:
+            logger.error(f"Failed to create backup: {e}")
+            raise DatabaseError(f"Failed to create backup: {e}")
+
+    def restore_backup(self, backup_path: str) -> None:
+        """
+        Restore database from a backup file.
+        
+        The backup is verified and then copied into the live database through
+        SQLite's backup API. Compressed (.gz/.xz) backups and incremental
+        backup manifests (.json) are supported.
+        
+        Args:
+            backup_path: Path to the backup file or manifest
+            
+        Raises:
+            DatabaseError: If restore operation fails
+        """
+        try:
+            backup_path = Path(backup_path)
+            
+            if not backup_path.exists():
+                raise DatabaseError(f"Backup file not found: {backup_path}")
+            
+            # Create a backup of current database before restore
+            current_backup = self.create_backup(f"{self.db_path.stem}_pre_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+            logger.info(f"Created pre-restore backup: {current_backup}")
+            
+            # Replace current database contents with the backup
+            target = self._memory_connection or str(self.db_path)
+            if backup_path.suffix == ".json":
+                # Incremental backup manifest stored in <repository>/manifests
+                BackupRepository(backup_path.parent.parent).restore_backup(backup_path, target)
+            else:
+                restore_database(backup_path, target)
+            
+            # Verify restored database
+            self._verify_database_schema()
+            
+            logger.info(f"Database restored from backup: {backup_path}")
+            
+        except Exception as e:
+            logger.error(f"Failed to restore backup: {e}")
+            raise DatabaseError(f"Failed to restore backup: {e}")
+
+    def cleanup_old_backups(self, backup_dir: str, retention_days: int = 30) -> int:
+        """
+        Clean up old backup files based on retention policy.
+        
+        If ``backup_dir`` is an incremental backup repository, expired manifests
+        are deleted (the newest is always kept) and chunks no longer referenced
+        by any remaining manifest are reclaimed.
+        
+        Args:
+            backup_dir: Directory containing backup files
+            retention_days: Number of days to retain backup files
+            
+        Returns:
+            int: Number of backup files deleted
+            
+        Raises:
+            DatabaseError: If cleanup operation fails
+        """
+        try:
+            backup_dir = Path(backup_dir)
+            if not backup_dir.exists():
+                return 0
+            
+            cutoff_date = datetime.now() - timedelta(days=retention_days)
+            deleted_count = 0
             
             # Find and delete old backup files
-            for backup_file in backup_dir.glob("*_backup_*.db"):
+            for backup_file in backup_dir.glob("*_backup_*.db*"):
                 if backup_file.stat().st_mtime < cutoff_date.timestamp():
                     backup_file.unlink()
                     deleted_count += 1
                     logger.debug(f"Deleted old backup: {backup_file}")
             
+            if BackupRepository.is_repository(backup_dir):
+                prune_result = BackupRepository(backup_dir).prune(retention_days=retention_days)
+                deleted_count += prune_result['manifests_deleted']
+            
             logger.info(f"Cleaned up {deleted_count} old backup files")
             return deleted_count
             
@@ -1715,7 +3390,7 @@ class DatabaseManager:
             csv_path.parent.mkdir(parents=True, exist_ok=True)
             
             # Get parts to export
-            parts = self.list_parts(active_only=active_only, category=category)
+            parts = self.list_parts(active_only=active_only, category=category, as_records=True)
             
             with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
                 fieldnames = [
@@ -1730,15 +3405,15 @@ class DatabaseManager:
                 for part in parts:
                     writer.writerow({
                         'part_number': part.part_number,
-                        'authorized_price': f"{part.authorized_price:.2f}",
+                        'authorized_price': f"{Decimal(str(part.authorized_price)):.2f}",
                         'description': part.description or '',
                         'item_type': part.item_type or '',
                         'category': part.category or '',
                         'source': part.source or '',
                         'first_seen_invoice': part.first_seen_invoice or '',
-                        'created_date': part.created_date.isoformat() if part.created_date else '',
-                        'last_updated': part.last_updated.isoformat() if part.last_updated else '',
-                        'is_active': str(part.is_active).lower(),
+                        'created_date': format_timestamp_text(part.created_date),
+                        'last_updated': format_timestamp_text(part.last_updated),
+                        'is_active': 'true' if part.is_active else 'false',
                         'notes': part.notes or ''
                     })
             
@@ -0,0 +1,363 @@
+"""
+Online backup support for the Invoice Rate Detection System.
+
+Backups are taken through SQLite's online backup API rather than by copying
+the database file. Pages are copied in small steps so concurrent writers are
+only blocked for the duration of a single step, and pages still sitting in the
+``-wal`` file are captured consistently. SQLite starts a stepped copy over
+whenever another connection writes to the source, so a copy that keeps
+restarting falls back to copying the remaining database in one step. Snapshots
+can be streamed through gzip or lzma and verified with
+``PRAGMA integrity_check`` before they are published under their final name.
+"""
+
+import gzip
+import logging
+import lzma
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from database.models import DatabaseError
+
+
+logger = logging.getLogger(__name__)
+
+# Compression formats supported for backup files, keyed by name
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'lzma': '.xz',
+}
+
+# Pages copied per backup step; with the default 4 KiB page size this is 1 MiB
+DEFAULT_PAGES_PER_STEP = 256
+
+# Seconds to yield to other connections between backup steps
+DEFAULT_STEP_SLEEP = 0.005
+
+# Restarts of a stepped copy tolerated before copying in a single step
+DEFAULT_MAX_RESTARTS = 3
+
+# Chunk size used when streaming snapshots through a compressor
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class _BackupRestarted(Exception):
+    """Raised from the progress callback to abandon a stepped copy that keeps restarting."""
+
+
+def detect_compression(path: Union[str, Path]) -> Optional[str]:
+    """
+    Determine the compression format of a backup file from its suffix.
+
+    Args:
+        path: Backup file path
+
+    Returns:
+        Optional[str]: 'gzip', 'lzma', or None for an uncompressed backup
+    """
+    suffix = Path(path).suffix.lower()
+    for name, compression_suffix in COMPRESSION_SUFFIXES.items():
+        if suffix == compression_suffix:
+            return name
+    return None
+
+
+def _open_compressed(path: Path, mode: str, compression: Optional[str]):
+    """Open a file for binary streaming through the requested compressor."""
+    if compression == 'gzip':
+        return gzip.open(path, mode)
+    if compression == 'lzma':
+        return lzma.open(path, mode)
+    return open(path, mode)
+
+
+def verify_backup(backup_path: Union[str, Path], quick: bool = False) -> None:
+    """
+    Verify that a backup file is a structurally sound SQLite database.
+
+    Compressed backups are decompressed to a temporary file first.
+
+    Args:
+        backup_path: Path to the backup file
+        quick: Run ``PRAGMA quick_check`` instead of the full integrity check
+
+    Raises:
+        DatabaseError: If the backup is missing or fails verification
+    """
+    backup_path = Path(backup_path)
+    if not backup_path.exists():
+        raise DatabaseError(f"Backup file not found: {backup_path}")
+
+    with materialized_backup(backup_path) as db_file:
+        _check_integrity(db_file, quick=quick)
+
+
+@contextmanager
+def materialized_backup(backup_path: Union[str, Path]):
+    """
+    Context manager yielding a plain SQLite file for a possibly compressed backup.
+
+    Uncompressed backups are yielded as-is; compressed backups are streamed
+    into a temporary file that is removed on exit.
+
+    Args:
+        backup_path: Path to the backup file
+
+    Yields:
+        Path: Path to an uncompressed SQLite database file
+    """
+    backup_path = Path(backup_path)
+    compression = detect_compression(backup_path)
+    if compression is None:
+        yield backup_path
+        return
+
+    fd, temp_name = tempfile.mkstemp(suffix='.db', dir=str(backup_path.parent))
+    os.close(fd)
+    temp_path = Path(temp_name)
+    try:
+        with _open_compressed(backup_path, 'rb', compression) as f_in:
+            with open(temp_path, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out, _COPY_CHUNK_SIZE)
+        yield temp_path
+    except (OSError, EOFError, lzma.LZMAError) as e:
+        raise DatabaseError(f"Failed to decompress backup {backup_path}: {e}")
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _sibling_temp_path(path: Path) -> Path:
+    """Create an empty hidden temporary file next to ``path`` and return its path."""
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=str(path.parent))
+    os.close(fd)
+    return Path(temp_name)
+
+
+def _check_integrity(db_file: Path, quick: bool = False) -> None:
+    """Run SQLite's integrity check against a database file."""
+    pragma = "quick_check" if quick else "integrity_check"
+    conn = sqlite3.connect(str(db_file))
+    try:
+        rows = conn.execute(f"PRAGMA {pragma}").fetchall()
+    except sqlite3.DatabaseError as e:
+        raise DatabaseError(f"Backup integrity check failed: {e}")
+    finally:
+        conn.close()
+
+    if not rows or rows[0][0] != 'ok':
+        problems = "; ".join(str(row[0]) for row in rows[:5])
+        raise DatabaseError(f"Backup integrity check failed: {problems}")
+
+
+def backup_database(source: Union[str, Path, sqlite3.Connection],
+                    backup_path: Union[str, Path],
+                    compression: Optional[str] = None,
+                    pages_per_step: int = DEFAULT_PAGES_PER_STEP,
+                    step_sleep: float = DEFAULT_STEP_SLEEP,
+                    progress: Optional[ProgressCallback] = None,
+                    verify: bool = True,
+                    include_logs: bool = True,
+                    max_restarts: int = DEFAULT_MAX_RESTARTS,
+                    compact: bool = True) -> Dict[str, Any]:
+    """
+    Take an online backup of a SQLite database.
+
+    The snapshot is written to a temporary file next to ``backup_path`` and
+    optionally verified. It is then renamed into place, or streamed through
+    the requested compressor into a second temporary file that is renamed
+    into place. A partially written backup is therefore never visible under
+    the final name.
+
+    SQLite restarts a stepped copy whenever another connection writes to the
+    source, so under constant writes it might never finish. After
+    ``max_restarts`` restarts the copy is redone in a single step, which
+    holds a read lock on the source for the whole copy.
+
+    Args:
+        source: Database file path or an open connection to back up
+        backup_path: Destination path for the backup file
+        compression: None, 'gzip' or 'lzma'
+        pages_per_step: Pages copied per step; -1 copies everything in one step
+        step_sleep: Seconds to sleep between steps so writers can proceed
+        progress: Optional callback receiving (pages_copied, total_pages)
+        verify: Run ``PRAGMA integrity_check`` on the snapshot before publishing
+        include_logs: Whether to keep discovery log tables in the backup
+        max_restarts: Restarts of the stepped copy tolerated before copying in one step
+        compact: VACUUM the snapshot after removing discovery logs; disable to
+            keep page numbers stable, e.g. for chunk deduplication
+
+    Returns:
+        Dict[str, Any]: backup_path, backup_size, database_size, page_count,
+        compression, verified and duration_seconds
+
+    Raises:
+        DatabaseError: If the backup or its verification fails
+    """
+    if compression is not None and compression not in COMPRESSION_SUFFIXES:
+        raise DatabaseError(f"Unsupported backup compression: {compression}")
+
+    backup_path = Path(backup_path)
+    backup_path.parent.mkdir(parents=True, exist_ok=True)
+    start_time = time.monotonic()
+
+    snapshot_path = _sibling_temp_path(backup_path)
+    compressed_path = None
+
+    try:
+        page_count = _copy_pages(source, snapshot_path, pages_per_step, step_sleep, progress,
+                                 include_logs, max_restarts, compact)
+        database_size = snapshot_path.stat().st_size
+
+        if verify:
+            _check_integrity(snapshot_path)
+
+        if compression is None:
+            os.replace(snapshot_path, backup_path)
+        else:
+            compressed_path = _sibling_temp_path(backup_path)
+            with open(snapshot_path, 'rb') as f_in:
+                with _open_compressed(compressed_path, 'wb', compression) as f_out:
+                    shutil.copyfileobj(f_in, f_out, _COPY_CHUNK_SIZE)
+            os.replace(compressed_path, backup_path)
+
+        duration = time.monotonic() - start_time
+        logger.info(f"Online backup written to {backup_path} ({page_count} pages, {duration:.2f}s)")
+
+        return {
+            'backup_path': str(backup_path),
+            'backup_size': backup_path.stat().st_size,
+            'database_size': database_size,
+            'page_count': page_count,
+            'compression': compression,
+            'verified': verify,
+            'duration_seconds': duration
+        }
+
+    except DatabaseError:
+        raise
+    except (sqlite3.Error, OSError) as e:
+        raise DatabaseError(f"Online backup failed: {e}")
+    finally:
+        snapshot_path.unlink(missing_ok=True)
+        if compressed_path is not None:
+            compressed_path.unlink(missing_ok=True)
+
+
+def _copy_pages(source: Union[str, Path, sqlite3.Connection], snapshot_path: Path,
+                pages_per_step: int, step_sleep: float,
+                progress: Optional[ProgressCallback], include_logs: bool,
+                max_restarts: int = DEFAULT_MAX_RESTARTS, compact: bool = True) -> int:
+    """Copy the source database into ``snapshot_path`` and return its page count."""
+    owns_source = not isinstance(source, sqlite3.Connection)
+    source_conn = sqlite3.connect(str(source)) if owns_source else source
+    dest_conn = sqlite3.connect(str(snapshot_path))
+    # Pages copied after the last step, and restarts seen while copying in steps
+    state = {'copied': 0, 'restarts': 0, 'stepped': pages_per_step > 0}
+
+    def report(status, remaining, total):
+        copied = total - remaining
+        # Every step copies at least one page, so no progress means the copy started over
+        if state['stepped'] and copied <= state['copied']:
+            state['restarts'] += 1
+            if state['restarts'] > max_restarts:
+                raise _BackupRestarted()
+        state['copied'] = copied
+        if progress is not None:
+            progress(copied, total)
+
+    try:
+        if owns_source:
+            source_conn.execute("PRAGMA busy_timeout = 30000")
+        try:
+            source_conn.backup(dest_conn, pages=pages_per_step, progress=report, sleep=step_sleep)
+        except _BackupRestarted:
+            logger.warning(f"Backup restarted {state['restarts']} times by concurrent writes; "
+                           f"copying in a single step")
+            state['stepped'] = False
+            source_conn.backup(dest_conn, pages=-1, progress=report)
+
+        # A WAL-mode source produces a WAL-mode copy; make the backup self-contained
+        dest_conn.execute("PRAGMA journal_mode = DELETE")
+
+        if not include_logs:
+            _strip_discovery_logs(dest_conn, compact)
+
+        return dest_conn.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        dest_conn.close()
+        if owns_source:
+            source_conn.close()
+
+
+def _strip_discovery_logs(conn: sqlite3.Connection, compact: bool = True) -> None:
+    """
+    Remove discovery log data from a snapshot.
+
+    Compacting renumbers every page after the first freed one. Without it the
+    freed pages are zeroed in place instead, so no log data is left behind.
+    """
+    tables = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    }
+    if not compact:
+        conn.execute("PRAGMA secure_delete = ON")
+    for table in ('part_discovery_log', 'discovery_session_parts', 'discovery_sessions'):
+        if table in tables:
+            conn.execute(f"DELETE FROM {table}")
+    conn.commit()
+    if compact:
+        conn.execute("VACUUM")
+
+
+def restore_database(backup_path: Union[str, Path],
+                     target: Union[str, Path, sqlite3.Connection],
+                     pages_per_step: int = -1,
+                     progress: Optional[ProgressCallback] = None,
+                     verify: bool = True) -> None:
+    """
+    Restore a backup into a database through the online backup API.
+
+    Restoring page-by-page into the live database, rather than replacing the
+    file, keeps any open ``-wal``/``-shm`` files consistent with the result.
+
+    Args:
+        backup_path: Path to the (optionally compressed) backup file
+        target: Database file path or open connection to overwrite
+        pages_per_step: Pages copied per step; -1 copies everything in one step
+        progress: Optional callback receiving (pages_copied, total_pages)
+        verify: Run ``PRAGMA integrity_check`` on the backup before restoring
+
+    Raises:
+        DatabaseError: If the backup is missing, invalid, or the restore fails
+    """
+    backup_path = Path(backup_path)
+    if not backup_path.exists():
+        raise DatabaseError(f"Backup file not found: {backup_path}")
+
+    def report(status, remaining, total):
+        if progress is not None:
+            progress(total - remaining, total)
+
+    with materialized_backup(backup_path) as db_file:
+        if verify:
+            _check_integrity(db_file)
+
+        owns_target = not isinstance(target, sqlite3.Connection)
+        source_conn = sqlite3.connect(str(db_file))
+        target_conn = sqlite3.connect(str(target)) if owns_target else target
+        try:
+            source_conn.backup(target_conn, pages=pages_per_step, progress=report)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Restore from {backup_path} failed: {e}")
+        finally:
+            source_conn.close()
+            if owns_target:
+                target_conn.close()
@@ -118,6 +118,107 @@ class DatabaseMigration:
         CREATE INDEX IF NOT EXISTS idx_discovery_date ON part_discovery_log(discovery_date);
         CREATE INDEX IF NOT EXISTS idx_discovery_session ON part_discovery_log(processing_session_id);
 
+        -- Create discovery session summary tables (maintained by triggers)
+        CREATE TABLE IF NOT EXISTS discovery_sessions (
+            session_id TEXT PRIMARY KEY,
+            first_seen TIMESTAMP,
+            last_seen TIMESTAMP,
+            total_entries INTEGER NOT NULL DEFAULT 0,
+            distinct_parts INTEGER NOT NULL DEFAULT 0,
+            parts_added INTEGER NOT NULL DEFAULT 0,
+            parts_skipped INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS discovery_session_parts (
+            session_id TEXT NOT NULL,
+            part_number TEXT NOT NULL,
+            PRIMARY KEY (session_id, part_number)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_discovery_sessions_last_seen ON discovery_sessions(last_seen);
+
+        -- Create processed files manifest for incremental directory processing
+        CREATE TABLE IF NOT EXISTS processed_files (
+            file_path TEXT PRIMARY KEY,
+            file_size INTEGER NOT NULL,
+            file_mtime_ns INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            extractor_version TEXT NOT NULL,
+            status TEXT NOT NULL CHECK (status IN ('success', 'failed')),
+            invoice_number TEXT,
+            processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            error_message TEXT
+        );
+
+        -- Create processing run journal for resumable directory processing
+        CREATE TABLE IF NOT EXISTS processing_runs (
+            run_id TEXT PRIMARY KEY,
+            input_path TEXT NOT NULL,
+            output_path TEXT,
+            status TEXT NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'completed', 'interrupted')),
+            total_files INTEGER NOT NULL DEFAULT 0,
+            started_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_date TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS processing_run_files (
+            run_id TEXT NOT NULL REFERENCES processing_runs(run_id) ON DELETE CASCADE,
+            file_path TEXT NOT NULL,
+            status TEXT NOT NULL CHECK (status IN ('success', 'failed')),
+            invoice_number TEXT,
+            processing_time REAL NOT NULL DEFAULT 0,
+            result_json TEXT NOT NULL,
+            completed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (run_id, file_path)
+        );
+
+        -- Create per-part rate statistics maintained as invoices are validated
+        CREATE TABLE IF NOT EXISTS part_rate_stats (
+            composite_key TEXT PRIMARY KEY,
+            part_number TEXT NOT NULL,
+            observation_count INTEGER NOT NULL DEFAULT 0,
+            mean_price REAL NOT NULL DEFAULT 0,
+            m2 REAL NOT NULL DEFAULT 0,
+            min_price_units INTEGER,
+            max_price_units INTEGER,
+            last_seen TIMESTAMP,
+            last_invoice TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_part_rate_stats_part_number ON part_rate_stats(part_number);
+
+        -- Create invoices already folded into each part's rate statistics
+        CREATE TABLE IF NOT EXISTS part_rate_invoices (
+            composite_key TEXT NOT NULL,
+            invoice_number TEXT NOT NULL,
+            PRIMARY KEY (composite_key, invoice_number)
+        );
+
+        -- Create authorized price history with effective-date intervals
+        CREATE TABLE IF NOT EXISTS part_price_history (
+            composite_key TEXT NOT NULL,
+            authorized_price DECIMAL(10,4) NOT NULL CHECK (authorized_price > 0),
+            effective_from DATE NOT NULL,
+            effective_to DATE,
+            recorded_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (composite_key, effective_from)
+        );
+
+        INSERT OR IGNORE INTO part_price_history (composite_key, authorized_price, effective_from)
+        SELECT composite_key, authorized_price, COALESCE(date(created_date), date('now', 'localtime'))
+        FROM parts WHERE composite_key IS NOT NULL;
+
+        -- Create price tolerance rules by part number, category or item type
+        CREATE TABLE IF NOT EXISTS tolerance_rules (
+            scope TEXT NOT NULL CHECK (scope IN ('part', 'category', 'item_type')),
+            match_value TEXT NOT NULL,
+            absolute_tolerance_units INTEGER CHECK (absolute_tolerance_units >= 0),
+            percent_tolerance DECIMAL(7,4) CHECK (percent_tolerance BETWEEN 0 AND 100),
+            description TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (scope, match_value)
+        );
+
         -- Insert initial configuration data
         INSERT OR IGNORE INTO config (key, value, data_type, description, category) VALUES
         ('validation_mode', 'parts_based', 'string', 'Validation mode: parts_based or threshold_based', 'validation'),
@@ -146,6 +247,71 @@ class DatabaseMigration:
                 UPDATE config SET last_updated = CURRENT_TIMESTAMP WHERE key = NEW.key;
             END;
 
+        -- Create triggers to keep discovery session summaries current
+        CREATE TRIGGER IF NOT EXISTS update_discovery_session_summary
+            AFTER INSERT ON part_discovery_log
+            FOR EACH ROW
+            WHEN NEW.processing_session_id IS NOT NULL
+            BEGIN
+                INSERT OR IGNORE INTO discovery_sessions (session_id, first_seen, last_seen)
+                VALUES (NEW.processing_session_id, NEW.discovery_date, NEW.discovery_date);
+                UPDATE discovery_sessions SET
+                    first_seen = MIN(COALESCE(first_seen, NEW.discovery_date), COALESCE(NEW.discovery_date, first_seen)),
+                    last_seen = MAX(COALESCE(last_seen, NEW.discovery_date), COALESCE(NEW.discovery_date, last_seen)),
+                    total_entries = total_entries + 1,
+                    parts_added = parts_added + (NEW.action_taken = 'added'),
+                    parts_skipped = parts_skipped + (NEW.action_taken = 'skipped')
+                WHERE session_id = NEW.processing_session_id;
+                INSERT OR IGNORE INTO discovery_session_parts (session_id, part_number)
+                VALUES (NEW.processing_session_id, NEW.part_number);
+            END;
+
+        CREATE TRIGGER IF NOT EXISTS update_discovery_session_distinct_parts
+            AFTER INSERT ON discovery_session_parts
+            FOR EACH ROW
+            BEGIN
+                UPDATE discovery_sessions SET distinct_parts = distinct_parts + 1 WHERE session_id = NEW.session_id;
+            END;
+
+        -- Create triggers to record authorized price changes in part_price_history
+        CREATE TRIGGER IF NOT EXISTS record_part_price_insert
+            AFTER INSERT ON parts
+            FOR EACH ROW
+            WHEN NEW.composite_key IS NOT NULL
+            BEGIN
+                UPDATE part_price_history SET effective_to = date('now', 'localtime')
+                WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                  AND authorized_price <> NEW.authorized_price
+                  AND effective_from < date('now', 'localtime');
+                INSERT OR REPLACE INTO part_price_history (composite_key, authorized_price, effective_from)
+                SELECT NEW.composite_key, NEW.authorized_price, date('now', 'localtime')
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM part_price_history
+                    WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                      AND authorized_price = NEW.authorized_price
+                );
+            END;
+
+        CREATE TRIGGER IF NOT EXISTS record_part_price_update
+            AFTER UPDATE OF authorized_price, composite_key ON parts
+            FOR EACH ROW
+            WHEN NEW.composite_key IS NOT NULL
+            BEGIN
+                UPDATE OR REPLACE part_price_history SET composite_key = NEW.composite_key
+                WHERE composite_key = OLD.composite_key AND NEW.composite_key IS NOT OLD.composite_key;
+                UPDATE part_price_history SET effective_to = date('now', 'localtime')
+                WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                  AND authorized_price <> NEW.authorized_price
+                  AND effective_from < date('now', 'localtime');
+                INSERT OR REPLACE INTO part_price_history (composite_key, authorized_price, effective_from)
+                SELECT NEW.composite_key, NEW.authorized_price, date('now', 'localtime')
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM part_price_history
+                    WHERE composite_key = NEW.composite_key AND effective_to IS NULL
+                      AND authorized_price = NEW.authorized_price
+                );
+            END;
+
         -- Create view for active parts (commonly used query)
         CREATE VIEW IF NOT EXISTS active_parts AS
         SELECT composite_key, part_number, authorized_price, description, item_type, category, source, first_seen_invoice, created_date, last_updated, notes
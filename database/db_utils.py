@@ -12,10 +12,14 @@ import uuid
 from datetime import datetime, timedelta
 from decimal import Decimal
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple, Union
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 
 from database import DatabaseManager
 from database.models import Part, Configuration, PartDiscoveryLog, ValidationError, DatabaseError
+from database.models import format_money_units, money_units_to_float, to_money_units
+from database.db_backup import backup_database, detect_compression, restore_database
+from database.db_backup import verify_backup as verify_backup_file
+from database.backup_repository import BackupRepository
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -328,8 +332,8 @@ class DatabaseUtils:
             Dict[str, Any]: Statistics about parts
         """
         try:
-            all_parts = self.db_manager.list_parts(active_only=False)
-            active_parts = self.db_manager.list_parts(active_only=True)
+            all_parts = self.db_manager.list_parts(active_only=False, as_records=True)
+            active_parts = [part for part in all_parts if part.is_active]
             
             if not all_parts:
                 return {
@@ -342,15 +346,15 @@ class DatabaseUtils:
                 }
             
             # Price statistics
-            active_prices = [part.authorized_price for part in active_parts]
+            active_prices = [part.price_units for part in active_parts]
             price_stats = {}
             
             if active_prices:
                 price_stats = {
-                    'min_price': float(min(active_prices)),
-                    'max_price': float(max(active_prices)),
-                    'avg_price': float(sum(active_prices) / len(active_prices)),
-                    'median_price': float(sorted(active_prices)[len(active_prices) // 2])
+                    'min_price': money_units_to_float(min(active_prices)),
+                    'max_price': money_units_to_float(max(active_prices)),
+                    'avg_price': money_units_to_float(sum(active_prices)) / len(active_prices),
+                    'median_price': money_units_to_float(sorted(active_prices)[len(active_prices) // 2])
                 }
             
             # Category distribution
@@ -482,7 +486,8 @@ class DatabaseUtils:
         try:
             # Check for orphaned discovery log entries
             logs = self.db_manager.get_discovery_logs()
-            part_numbers = {part.part_number for part in self.db_manager.list_parts(active_only=False)}
+            all_parts = self.db_manager.list_parts(active_only=False, as_records=True)
+            part_numbers = {part.part_number for part in all_parts}
             
             orphaned_logs = []
             for log in logs:
@@ -494,8 +499,8 @@ class DatabaseUtils:
             
             # Check for parts with invalid prices
             invalid_price_parts = []
-            for part in self.db_manager.list_parts(active_only=False):
-                if part.authorized_price <= 0:
+            for part in all_parts:
+                if part.price_units <= 0:
                     invalid_price_parts.append(part.part_number)
             
             if invalid_price_parts:
@@ -607,7 +612,7 @@ def format_price(price: Union[Decimal, float]) -> str:
     Returns:
         str: Formatted price string
     """
-    return f"${float(price):.4f}"
+    return f"${format_money_units(to_money_units(price), 4)}"
 
 
 def validate_part_number(part_number: str) -> bool:
@@ -645,12 +650,13 @@ def is_price_mismatch(discovered_price: Decimal, authorized_price: Decimal, tole
     Args:
         discovered_price: Price found in invoice
         authorized_price: Authorized price from database
-        tolerance: Tolerance for floating point comparison
+        tolerance: Largest difference still treated as a match
         
     Returns:
         bool: True if prices don't match within tolerance
     """
-    return abs(float(discovered_price - authorized_price)) > tolerance
+    difference = abs(to_money_units(discovered_price) - to_money_units(authorized_price))
+    return difference > to_money_units(tolerance)
 
 
 class DatabaseBackupManager:
@@ -669,48 +675,48 @@ class DatabaseBackupManager:
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
     
     def create_backup(self, backup_path: str, compress: bool = False,
-                     include_logs: bool = True) -> Dict[str, Any]:
+                     include_logs: bool = True, compression: Optional[str] = None,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     verify: bool = True) -> Dict[str, Any]:
         """
-        Create a database backup.
+        Create an online database backup.
         
         Args:
             backup_path: Path for the backup file
-            compress: Whether to compress the backup
+            compress: Whether to compress the backup (gzip unless compression is given)
             include_logs: Whether to include discovery logs
+            compression: Explicit compression format ('gzip' or 'lzma')
+            progress: Optional callback receiving (pages_copied, total_pages)
+            verify: Whether to integrity-check the snapshot before publishing it
             
         Returns:
             Dict[str, Any]: Backup operation results
         """
         try:
-            import shutil
-            import gzip
-            from pathlib import Path
-            
-            backup_path_obj = Path(backup_path)
-            backup_path_obj.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Create backup by copying database file
-            db_path = Path(self.db_manager.db_path)
-            
-            if compress and not backup_path.endswith('.gz'):
-                # Compress the backup
-                with open(db_path, 'rb') as f_in:
-                    with gzip.open(backup_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-            else:
-                # Regular copy
-                shutil.copy2(db_path, backup_path)
-            
-            backup_size = backup_path_obj.stat().st_size
+            if compress and compression is None:
+                compression = 'gzip'
+            
+            source = self.db_manager._memory_connection or str(self.db_manager.db_path)
+            result = backup_database(
+                source, backup_path,
+                compression=compression,
+                progress=progress,
+                verify=verify,
+                include_logs=include_logs
+            )
             
             self.logger.info(f"Backup created successfully: {backup_path}")
             
             return {
                 'success': True,
                 'backup_path': backup_path,
-                'backup_size': backup_size,
+                'backup_size': result['backup_size'],
                 'backup_time': datetime.now().isoformat(),
-                'compressed': compress
+                'compressed': compression is not None,
+                'compression': compression,
+                'page_count': result['page_count'],
+                'verified': result['verified'],
+                'include_logs': include_logs
             }
             
         except Exception as e:
@@ -735,12 +741,7 @@ class DatabaseBackupManager:
             Dict[str, Any]: Restore operation results
         """
         try:
-            import shutil
-            import gzip
-            from pathlib import Path
-            
             backup_path_obj = Path(backup_path)
-            target_path_obj = Path(target_path)
             
             if not backup_path_obj.exists():
                 return {
@@ -749,38 +750,12 @@ class DatabaseBackupManager:
                 }
             
             # Verify backup if requested
-            backup_verified = True
+            backup_verified = False
             if verify_backup:
                 try:
-                    # Try to open backup as SQLite database
-                    import sqlite3
-                    if backup_path.endswith('.gz'):
-                        # Decompress temporarily for verification
-                        temp_path = backup_path_obj.parent / f"temp_verify_{uuid.uuid4().hex}.db"
-                        with gzip.open(backup_path, 'rb') as f_in:
-                            with open(temp_path, 'wb') as f_out:
-                                shutil.copyfileobj(f_in, f_out)
-                        
-                        # Verify decompressed file
-                        with sqlite3.connect(str(temp_path)) as conn:
-                            conn.execute("SELECT COUNT(*) FROM sqlite_master")
-                        
-                        temp_path.unlink()  # Clean up
-                    else:
-                        # Verify regular backup - check if it's a valid SQLite file
-                        try:
-                            with sqlite3.connect(backup_path) as conn:
-                                conn.execute("SELECT COUNT(*) FROM sqlite_master")
-                        except sqlite3.DatabaseError as db_error:
-                            # Check if file contains invalid data (like text)
-                            with open(backup_path, 'rb') as f:
-                                first_bytes = f.read(16)
-                                if not first_bytes.startswith(b'SQLite format 3'):
-                                    raise sqlite3.DatabaseError("File is not a valid SQLite database - appears to be corrupted")
-                            raise db_error
-                    
+                    verify_backup_file(backup_path_obj)
                     backup_verified = True
-                except Exception as e:
+                except DatabaseError as e:
                     return {
                         'success': False,
                         'error': f'Backup verification failed: {e}',
@@ -790,15 +765,8 @@ class DatabaseBackupManager:
             # Close current database connection
             self.db_manager.close()
             
-            # Restore backup
-            if backup_path.endswith('.gz'):
-                # Decompress and restore
-                with gzip.open(backup_path, 'rb') as f_in:
-                    with open(target_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-            else:
-                # Regular copy
-                shutil.copy2(backup_path, target_path)
+            # Restore page-by-page so an open WAL stays consistent with the result
+            restore_database(backup_path_obj, target_path, verify=False)
             
             self.logger.info(f"Database restored from backup: {backup_path}")
             
@@ -808,6 +776,7 @@ class DatabaseBackupManager:
                 'target_path': target_path,
                 'backup_verified': backup_verified,
                 'forced': force,
+                'compression': detect_compression(backup_path_obj),
                 'restore_time': datetime.now().isoformat()
             }
             
@@ -818,6 +787,82 @@ class DatabaseBackupManager:
                 'error': str(e)
             }
     
+    def create_incremental_backup(self, repository_path: str, include_logs: bool = True,
+                                  progress: Optional[Callable[[int, int], None]] = None,
+                                  verify: bool = True) -> Dict[str, Any]:
+        """
+        Create a deduplicated backup in an incremental backup repository.
+        
+        Args:
+            repository_path: Backup repository directory
+            include_logs: Whether to include discovery logs
+            progress: Optional callback receiving (pages_copied, total_pages)
+            verify: Whether to integrity-check the snapshot before storing it
+            
+        Returns:
+            Dict[str, Any]: Backup operation results
+        """
+        try:
+            repository = BackupRepository(repository_path)
+            source = self.db_manager._memory_connection or str(self.db_manager.db_path)
+            result = repository.create_backup(source, progress=progress, verify=verify,
+                                              include_logs=include_logs)
+            
+            self.logger.info(f"Incremental backup created: {result['backup_id']}")
+            
+            result.update({
+                'success': True,
+                'repository_path': repository_path,
+                'backup_time': datetime.now().isoformat(),
+                'include_logs': include_logs
+            })
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"Incremental backup creation failed: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def restore_incremental_backup(self, manifest_path: str, target_path: str) -> Dict[str, Any]:
+        """
+        Restore a database from an incremental backup manifest.
+        
+        Every chunk is checked against its digest while the database is
+        rebuilt, and the result is integrity-checked before it is restored.
+        
+        Args:
+            manifest_path: Path to the backup manifest (inside <repository>/manifests)
+            target_path: Path to restore to
+            
+        Returns:
+            Dict[str, Any]: Restore operation results
+        """
+        try:
+            repository = BackupRepository(Path(manifest_path).parent.parent)
+            
+            self.db_manager.close()
+            manifest = repository.restore_backup(manifest_path, target_path)
+            
+            self.logger.info(f"Database restored from incremental backup: {manifest.backup_id}")
+            
+            return {
+                'success': True,
+                'backup_id': manifest.backup_id,
+                'backup_created': manifest.created.isoformat(),
+                'target_path': target_path,
+                'backup_verified': True,
+                'restore_time': datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Incremental backup restore failed: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
     def close(self):
         """Close the backup manager."""
         pass
@@ -0,0 +1,92 @@
+"""
+Database writes deferred to another process.
+
+Batch folder workers read the shared database but must not write to it: the
+parent process owns every commit. DeferredWrites stands in for the worker's
+DatabaseManager, serving reads from it and queueing the bookkeeping writes of
+directory processing (run journal, processed-files manifest and rate
+statistics). The worker returns the queued writes with its folder result and
+the parent replays them through its own manager with ``apply_writes``.
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+from database.database import DatabaseManager
+
+
+logger = logging.getLogger(__name__)
+
+
+# A queued write: DatabaseManager method name, positional and keyword arguments
+DeferredWrite = Tuple[str, tuple, Dict[str, Any]]
+
+
+class DeferredWrites:
+    """
+    Read-through, write-behind wrapper around a DatabaseManager.
+
+    Only the writes listed in ``DEFERRED_METHODS`` are queued; any other
+    attribute is served by the wrapped manager. Opening that manager
+    read-only makes an unexpected write fail instead of bypassing the parent.
+    """
+
+    # Writes queued for the parent, with the value returned to the caller in their place
+    DEFERRED_METHODS = {
+        'create_processing_run': lambda run, *args, **kwargs: run,
+        'update_processing_run': lambda *args, **kwargs: None,
+        'record_run_file': lambda *args, **kwargs: None,
+        'record_processed_files': lambda entries, *args, **kwargs: len(entries),
+        'record_part_rates': lambda *args, **kwargs: {},
+    }
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize the wrapper.
+
+        Args:
+            db_manager: Database manager serving reads, normally opened read-only
+        """
+        self.db_manager = db_manager
+        self._writes: List[DeferredWrite] = []
+
+    def __getattr__(self, name: str) -> Any:
+        placeholder = self.DEFERRED_METHODS.get(name)
+        if placeholder is None:
+            return getattr(self.db_manager, name)
+
+        def defer(*args, **kwargs):
+            self._writes.append((name, args, kwargs))
+            return placeholder(*args, **kwargs)
+        return defer
+
+    def take_writes(self) -> List[DeferredWrite]:
+        """Return the writes queued so far and start queueing afresh."""
+        writes, self._writes = self._writes, []
+        return writes
+
+
+def apply_writes(db_manager: DatabaseManager, writes: List[DeferredWrite]) -> int:
+    """
+    Replay writes queued by ``DeferredWrites`` in the order they were made.
+
+    Like the bookkeeping they come from, the writes are best-effort: a
+    failure is logged and the remaining writes are still applied.
+
+    Args:
+        db_manager: Database manager to commit the writes through
+        writes: Queued writes
+
+    Returns:
+        Number of writes applied
+    """
+    applied = 0
+    for name, args, kwargs in writes:
+        if name not in DeferredWrites.DEFERRED_METHODS:
+            raise ValueError(f"Not a deferred database write: {name}")
+        try:
+            getattr(db_manager, name)(*args, **kwargs)
+            applied += 1
+        except Exception as e:
+            logger.warning(f"Could not apply deferred {name}: {e}")
+    return applied
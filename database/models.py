@@ -6,9 +6,11 @@ including Parts, Configuration, and Part Discovery Log entries.
 """
 
 from dataclasses import dataclass, field
-from datetime import datetime
-from decimal import Decimal
-from typing import Optional, Literal, Any, Dict, Union
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Optional, Literal, Any, Dict, NamedTuple, Sequence, Union
+import math
 import re
 import json
 
@@ -33,6 +35,153 @@ class ConfigurationError(DatabaseError):
     pass
 
 
+# Bound on memoized normalization results; invoice descriptions repeat heavily
+# across wearers so a few thousand entries covers a typical batch
+COMPOSITE_KEY_CACHE_SIZE = 8192
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_PART_NUMBER_RE = re.compile(r'^[A-Za-z0-9_\-\.\s@]+$')
+
+
+@lru_cache(maxsize=COMPOSITE_KEY_CACHE_SIZE)
+def _normalize_text(text: str) -> str:
+    """Normalize a non-empty component string (memoized)."""
+    return _WHITESPACE_RE.sub(' ', text.strip().upper())
+
+
+def normalize_component(component: Optional[str]) -> str:
+    """
+    Normalize a component for composite key generation.
+
+    Whitespace is trimmed, runs of whitespace collapse to a single space and
+    the result is upper-cased. Results are memoized in a bounded LRU cache.
+
+    Args:
+        component: Component to normalize
+
+    Returns:
+        Normalized component string
+    """
+    if not component:
+        return ""
+    if type(component) is not str:
+        component = str(component)
+    return _normalize_text(component)
+
+
+@lru_cache(maxsize=COMPOSITE_KEY_CACHE_SIZE)
+def _build_key(item_type: Optional[str], description: Optional[str],
+               part_number: Optional[str]) -> str:
+    return (f"{normalize_component(item_type)}|{normalize_component(description)}|"
+            f"{normalize_component(part_number)}")
+
+
+def build_composite_key(item_type: Optional[str], description: Optional[str],
+                        part_number: Optional[str]) -> str:
+    """
+    Build a composite key (item_type|description|part_number) in a single call.
+
+    Keys are memoized as a whole, so repeated lines for the same part cost a
+    single cache lookup.
+
+    Args:
+        item_type: Item type component
+        description: Description component
+        part_number: Part number component
+
+    Returns:
+        Composite key string
+    """
+    try:
+        return _build_key(item_type, description, part_number)
+    except TypeError:
+        # Unhashable component values cannot be memoized
+        return _build_key.__wrapped__(item_type, description, part_number)
+
+
+def clear_composite_key_cache() -> None:
+    """Clear the memoized component and composite key caches."""
+    _normalize_text.cache_clear()
+    _build_key.cache_clear()
+
+
+
+# Prices are fixed-point integers of ten-thousandths of a currency unit, the
+# precision of the parts table's DECIMAL(10,4) columns
+MONEY_PLACES = 4
+MONEY_SCALE = 10 ** MONEY_PLACES
+
+
+def to_money_units(value: Union[Decimal, float, int, str]) -> int:
+    """
+    Convert a price to integer ten-thousandths.
+
+    Decimals and strings are rounded half up; floats are rounded to the
+    nearest unit, which recovers the exact value of any price stored with
+    four decimal places.
+
+    Args:
+        value: Price as Decimal, float, int or numeric string
+
+    Returns:
+        Price in ten-thousandths
+
+    Raises:
+        ValueError: If the value is not a finite number
+    """
+    value_type = type(value)
+    try:
+        if value_type is float:
+            return round(value * MONEY_SCALE)
+        if value_type is int:
+            return value * MONEY_SCALE
+        if value_type is not Decimal:
+            value = Decimal(value)
+        return int(value.scaleb(MONEY_PLACES).to_integral_value(ROUND_HALF_UP))
+    except (ArithmeticError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid money amount: {value!r}") from e
+
+
+def money_units_or_zero(value: Any) -> int:
+    """Convert an amount to ten-thousandths, treating values that are not numbers as zero."""
+    try:
+        return to_money_units(value)
+    except ValueError:
+        return 0
+
+
+def money_units_to_decimal(units: int) -> Decimal:
+    """Convert ten-thousandths to a Decimal with four decimal places."""
+    return Decimal(units).scaleb(-MONEY_PLACES)
+
+
+def money_units_to_float(units: int) -> float:
+    """Convert ten-thousandths to the nearest float."""
+    return units / MONEY_SCALE
+
+
+def format_money_units(units: int, places: int = 2) -> str:
+    """
+    Format ten-thousandths with a fixed number of decimal places.
+
+    Rounding is half up on the integer value, so amounts ending in exactly
+    half a cent always round the same way, unlike formatting a float.
+
+    Args:
+        units: Amount in ten-thousandths
+        places: Decimal places to show (at most four)
+
+    Returns:
+        Formatted amount without a currency symbol, e.g. ``-12.35``
+    """
+    step = 10 ** (MONEY_PLACES - places)
+    rounded = (abs(units) * 2 + step) // (2 * step)
+    sign = '-' if units < 0 else ''
+    if not places:
+        return f"{sign}{rounded}"
+    whole, fraction = divmod(rounded, 10 ** places)
+    return f"{sign}{whole}.{fraction:0{places}d}"
+
 @dataclass
 class Part:
     """
@@ -40,7 +189,8 @@ class Part:
 
     Attributes:
         part_number: Part identifier (can be empty for items without traditional part numbers)
-        authorized_price: Expected/authorized price with 4 decimal precision
+        authorized_price: Expected/authorized price with 4 decimal precision; a
+            Decimal view of ``price_units``, converted and checked when assigned
         description: Human-readable part description
         item_type: Type/category of the part (e.g., Rent, Charge, etc.)
         category: Optional categorization for parts organization
@@ -51,6 +201,7 @@ class Part:
         is_active: Soft delete flag for deactivating parts
         notes: Additional notes or comments about the part
         composite_key: Computed composite identifier (item_type|description|part_number)
+        price_units: Authorized price in integer ten-thousandths, as stored
     """
     part_number: Optional[str]
     authorized_price: Decimal
@@ -64,6 +215,7 @@ class Part:
     is_active: bool = True
     notes: Optional[str] = None
     composite_key: Optional[str] = field(init=False)
+    price_units: int = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Validate part data and generate composite key after initialization."""
@@ -81,16 +233,7 @@ class Part:
         Returns:
             Normalized component string
         """
-        if not component:
-            return ""
-        
-        # Strip whitespace and convert to uppercase for consistency
-        normalized = str(component).strip().upper()
-        
-        # Replace multiple spaces with single space
-        normalized = re.sub(r'\s+', ' ', normalized)
-        
-        return normalized
+        return normalize_component(component)
 
     def generate_composite_key(self) -> str:
         """
@@ -99,14 +242,7 @@ class Part:
         Returns:
             Composite key string in format: item_type|description|part_number
         """
-        item_type_norm = self.normalize_component(self.item_type)
-        description_norm = self.normalize_component(self.description)
-        part_number_norm = self.normalize_component(self.part_number)
-        
-        # Create composite key - all components are included even if empty
-        composite = f"{item_type_norm}|{description_norm}|{part_number_norm}"
-        
-        return composite
+        return build_composite_key(self.item_type, self.description, self.part_number)
 
     def validate(self) -> None:
         """
@@ -128,23 +264,14 @@ class Part:
                 raise ValidationError("Part number cannot be empty or whitespace only")
             
             # Basic part number format validation (alphanumeric with some special chars)
-            if not re.match(r'^[A-Za-z0-9_\-\.\s@]+$', self.part_number):
+            if not _PART_NUMBER_RE.match(self.part_number):
                 raise ValidationError(
                     "Part number can only contain letters, numbers, underscores, hyphens, periods, spaces, and @ symbols"
                 )
 
-        # Validate authorized price
-        if not isinstance(self.authorized_price, (Decimal, float, int)):
-            raise ValidationError("Authorized price must be a number")
-        
-        self.authorized_price = Decimal(str(self.authorized_price))
-        
-        if self.authorized_price <= 0:
+        # Validate authorized price; its type and precision were checked when it was assigned
+        if self.price_units <= 0:
             raise ValidationError("Authorized price must be positive")
-        
-        # Ensure 4 decimal places precision
-        if self.authorized_price.as_tuple().exponent < -4:
-            raise ValidationError("Authorized price cannot have more than 4 decimal places")
 
         # Validate source
         if self.source not in ('manual', 'discovered', 'imported'):
@@ -201,6 +328,42 @@ class Part:
             notes=data.get('notes')
         )
 
+    @classmethod
+    def from_trusted_row(cls, row: Sequence[Any]) -> 'Part':
+        """
+        Build a Part from a row already stored in the parts table.
+
+        Rows read back from the database were validated when they were written,
+        so this skips ``validate()`` and composite key regeneration and keeps the
+        stored key as-is. Timestamps are kept as their stored text and only
+        parsed to datetimes when first accessed.
+
+        Args:
+            row: Values in ``PART_COLUMNS`` order (sqlite3.Row or tuple)
+
+        Returns:
+            Part instance
+        """
+        (composite_key, part_number, authorized_price, description, item_type, category,
+         source, first_seen_invoice, created_date, last_updated, is_active, notes) = row
+
+        part = cls.__new__(cls)
+        part.__dict__.update(
+            part_number=part_number,
+            price_units=to_money_units(authorized_price),
+            description=description,
+            item_type=item_type,
+            category=category,
+            source=source,
+            first_seen_invoice=first_seen_invoice,
+            created_date=created_date,
+            last_updated=last_updated,
+            is_active=bool(is_active),
+            notes=notes,
+            composite_key=composite_key
+        )
+        return part
+
     @classmethod
     def create_from_line_item(cls, item_type: Optional[str], description: Optional[str],
                             part_number: Optional[str], authorized_price: Decimal,
@@ -250,11 +413,144 @@ class Part:
         Returns:
             Composite key string
         """
-        item_type_norm = cls.normalize_component(item_type)
-        description_norm = cls.normalize_component(description)
-        part_number_norm = cls.normalize_component(part_number)
-        
-        return f"{item_type_norm}|{description_norm}|{part_number_norm}"
+        return build_composite_key(item_type, description, part_number)
+
+
+def price_to_units(price: Union[Decimal, float, int]) -> int:
+    """
+    Convert an authorized price to integer ten-thousandths.
+
+    Args:
+        price: Price as Decimal, float or int
+
+    Returns:
+        Price in ten-thousandths
+
+    Raises:
+        ValidationError: If the price is not a number or has more than four decimal places
+    """
+    if not isinstance(price, (Decimal, float, int)):
+        raise ValidationError("Authorized price must be a number")
+    exact = Decimal(str(price))
+    if not exact.is_finite():
+        raise ValidationError("Authorized price must be a number")
+    if exact.as_tuple().exponent < -MONEY_PLACES:
+        raise ValidationError("Authorized price cannot have more than 4 decimal places")
+    return to_money_units(exact)
+
+
+class _PriceView:
+    """
+    Data descriptor presenting a stored ten-thousandths attribute as a Decimal.
+
+    Assigning a price converts it with ``price_to_units`` and stores the
+    units; reading it builds the Decimal with four decimal places.
+    """
+
+    def __init__(self, units_name: str):
+        self.units_name = units_name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return None
+        return money_units_to_decimal(obj.__dict__[self.units_name])
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.units_name] = price_to_units(value)
+
+
+class _LazyTimestamp:
+    """
+    Data descriptor that parses ISO timestamp text on first access.
+
+    Parts built with ``Part.from_trusted_row`` store the raw column text; the
+    value is converted to a datetime and cached the first time it is read.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return None
+        value = obj.__dict__.get(self.name)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+            obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
+
+
+Part.created_date = _LazyTimestamp('created_date')
+Part.last_updated = _LazyTimestamp('last_updated')
+Part.authorized_price = _PriceView('price_units')
+
+
+# Column order used by every parts SELECT; matches Part.from_trusted_row and PartRecord,
+# which reads the price column as ten-thousandths (see PART_RECORD_PRICE)
+PART_COLUMNS = (
+    'composite_key', 'part_number', 'authorized_price', 'description', 'item_type',
+    'category', 'source', 'first_seen_invoice', 'created_date', 'last_updated',
+    'is_active', 'notes'
+)
+
+# SQL expression selecting the parts price column as ten-thousandths, for PartRecord
+PART_RECORD_PRICE = f"CAST(ROUND(authorized_price * {MONEY_SCALE}) AS INTEGER)"
+
+
+class PartRecord(NamedTuple):
+    """
+    Lightweight read-only view of a parts table row.
+
+    Values are kept as stored, except that the price is read as integer
+    ten-thousandths (``price_units``) with ``authorized_price`` as its
+    Decimal view; timestamps are ISO text and ``is_active`` is 0/1.
+    Intended for listing, export and statistics over large part sets where
+    building full Part instances is not needed.
+    """
+    composite_key: str
+    part_number: Optional[str]
+    price_units: int
+    description: Optional[str]
+    item_type: Optional[str]
+    category: Optional[str]
+    source: str
+    first_seen_invoice: Optional[str]
+    created_date: Optional[str]
+    last_updated: Optional[str]
+    is_active: int
+    notes: Optional[str]
+
+    @property
+    def authorized_price(self) -> Decimal:
+        """Authorized price as a Decimal with four decimal places."""
+        return money_units_to_decimal(self.price_units)
+
+    def to_part(self) -> Part:
+        """Convert the record into a full Part instance."""
+        return Part.from_trusted_row(self._replace(price_units=self.authorized_price))
+
+
+def format_timestamp_text(value: Optional[str]) -> str:
+    """
+    Render stored timestamp text the way ``datetime.isoformat()`` would.
+
+    SQLite's CURRENT_TIMESTAMP uses a space separator while application
+    writes use ``isoformat()``; this normalizes both without parsing.
+
+    Args:
+        value: Timestamp text from the database
+
+    Returns:
+        ISO formatted timestamp, or an empty string for missing values
+    """
+    if not value:
+        return ''
+    if len(value) > 10 and value[10] == ' ':
+        return f"{value[:10]}T{value[11:]}"
+    return value
 
 
 @dataclass
@@ -514,6 +810,502 @@ class PartDiscoveryLog:
         )
 
 
+@dataclass
+class ProcessedFile:
+    """
+    Manifest entry for an invoice PDF processed by a previous run.
+    
+    Attributes:
+        file_path: Absolute path of the PDF
+        file_size: File size in bytes when processed
+        file_mtime_ns: Modification time in nanoseconds when processed
+        content_hash: SHA-256 of the file contents
+        extractor_version: Version of the extraction logic that processed the file
+        status: Outcome of the run ('success' or 'failed')
+        invoice_number: Invoice number extracted from the file
+        processed_date: When the file was processed
+        error_message: Error details for failed runs
+    """
+    file_path: str
+    file_size: int
+    file_mtime_ns: int
+    content_hash: str
+    extractor_version: str
+    status: Literal['success', 'failed']
+    invoice_number: Optional[str] = None
+    processed_date: Optional[datetime] = None
+    error_message: Optional[str] = None
+
+    def __post_init__(self):
+        """Validate manifest data after initialization."""
+        self.validate()
+
+    def validate(self) -> None:
+        """
+        Validate manifest entry data.
+        
+        Raises:
+            ValidationError: If validation fails
+        """
+        if not self.file_path or not isinstance(self.file_path, str):
+            raise ValidationError("File path must be a non-empty string")
+
+        if self.status not in ('success', 'failed'):
+            raise ValidationError("Status must be one of: success, failed")
+
+        if self.file_size < 0:
+            raise ValidationError("File size cannot be negative")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert manifest entry to dictionary for database operations."""
+        return {
+            'file_path': self.file_path,
+            'file_size': self.file_size,
+            'file_mtime_ns': self.file_mtime_ns,
+            'content_hash': self.content_hash,
+            'extractor_version': self.extractor_version,
+            'status': self.status,
+            'invoice_number': self.invoice_number,
+            'processed_date': self.processed_date.isoformat() if self.processed_date else None,
+            'error_message': self.error_message
+        }
+
+
+@dataclass
+class ProcessingRun:
+    """
+    Journaled directory processing run that can be resumed after interruption.
+
+    Attributes:
+        run_id: Unique run identifier
+        input_path: Directory being processed
+        status: Run state ('running', 'completed' or 'interrupted')
+        output_path: Directory reports are written to
+        total_files: Number of PDFs found when the run started
+        started_date: When the run started
+        completed_date: When the run completed
+    """
+    run_id: str
+    input_path: str
+    status: Literal['running', 'completed', 'interrupted'] = 'running'
+    output_path: Optional[str] = None
+    total_files: int = 0
+    started_date: Optional[datetime] = None
+    completed_date: Optional[datetime] = None
+
+    def __post_init__(self):
+        """Validate run data after initialization."""
+        if self.started_date is None:
+            self.started_date = datetime.now()
+        self.validate()
+
+    def validate(self) -> None:
+        """
+        Validate run data.
+
+        Raises:
+            ValidationError: If validation fails
+        """
+        if not self.run_id or not isinstance(self.run_id, str):
+            raise ValidationError("Run ID must be a non-empty string")
+
+        if not self.input_path or not isinstance(self.input_path, str):
+            raise ValidationError("Input path must be a non-empty string")
+
+        if self.status not in ('running', 'completed', 'interrupted'):
+            raise ValidationError("Status must be one of: running, completed, interrupted")
+
+        if self.total_files < 0:
+            raise ValidationError("Total files cannot be negative")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert run to dictionary for database operations."""
+        return {
+            'run_id': self.run_id,
+            'input_path': self.input_path,
+            'status': self.status,
+            'output_path': self.output_path,
+            'total_files': self.total_files,
+            'started_date': self.started_date.isoformat() if self.started_date else None,
+            'completed_date': self.completed_date.isoformat() if self.completed_date else None
+        }
+
+
+@dataclass
+class RunFileResult:
+    """
+    Journal entry for one file completed within a processing run.
+
+    Attributes:
+        run_id: Run the file belongs to
+        file_path: Absolute path of the PDF
+        status: Outcome ('success' or 'failed')
+        result_json: Serialized processing result, including validation output
+            (binary codec record, or JSON text in older journals)
+        invoice_number: Invoice number extracted from the file
+        processing_time: Seconds spent processing the file
+        completed_date: When the file completed
+    """
+    run_id: str
+    file_path: str
+    status: Literal['success', 'failed']
+    result_json: Union[str, bytes]
+    invoice_number: Optional[str] = None
+    processing_time: float = 0.0
+    completed_date: Optional[datetime] = None
+
+    def __post_init__(self):
+        """Validate journal data after initialization."""
+        self.validate()
+
+    def validate(self) -> None:
+        """
+        Validate journal entry data.
+
+        Raises:
+            ValidationError: If validation fails
+        """
+        if not self.run_id or not isinstance(self.run_id, str):
+            raise ValidationError("Run ID must be a non-empty string")
+
+        if not self.file_path or not isinstance(self.file_path, str):
+            raise ValidationError("File path must be a non-empty string")
+
+        if self.status not in ('success', 'failed'):
+            raise ValidationError("Status must be one of: success, failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert journal entry to dictionary for database operations."""
+        return {
+            'run_id': self.run_id,
+            'file_path': self.file_path,
+            'status': self.status,
+            'result_json': self.result_json,
+            'invoice_number': self.invoice_number,
+            'processing_time': self.processing_time,
+            'completed_date': self.completed_date.isoformat() if self.completed_date else None
+        }
+
+
+@dataclass
+class PartRateStats:
+    """
+    Running statistics of the rates a part has been invoiced at.
+
+    Mean and variance are maintained with Welford's algorithm, so each new
+    rate updates the statistics in constant time without revisiting earlier
+    invoices. Statistics are kept per composite key, so a part number billed
+    both as a rental and as a charge has separate statistics for each.
+
+    Attributes:
+        part_number: Part number the rates were invoiced under
+        composite_key: Composite key (item_type|description|part_number) of
+            the invoice lines; defaults to the part number alone
+        observation_count: Number of invoice lines observed
+        mean_price: Mean invoiced rate
+        m2: Sum of squared deviations from the mean (Welford's M2)
+        min_price: Lowest invoiced rate
+        max_price: Highest invoiced rate
+        last_seen: When the part was last observed
+        last_invoice: Invoice the part was last observed on
+    """
+    part_number: str
+    composite_key: Optional[str] = None
+    observation_count: int = 0
+    mean_price: float = 0.0
+    m2: float = 0.0
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    last_seen: Optional[datetime] = None
+    last_invoice: Optional[str] = None
+
+    def __post_init__(self):
+        """Default the composite key and validate statistics after initialization."""
+        if self.composite_key is None:
+            self.composite_key = self.part_number
+        self.validate()
+
+    def validate(self) -> None:
+        """
+        Validate statistics data.
+
+        Raises:
+            ValidationError: If validation fails
+        """
+        if not self.part_number or not isinstance(self.part_number, str):
+            raise ValidationError("Part number must be a non-empty string")
+
+        if self.observation_count < 0:
+            raise ValidationError("Observation count cannot be negative")
+
+    def add(self, price: Union[Decimal, float, int, str], invoice_number: Optional[str] = None,
+            seen_at: Optional[datetime] = None) -> None:
+        """
+        Add one invoiced rate to the statistics.
+
+        Args:
+            price: Invoiced rate
+            invoice_number: Invoice the rate was observed on
+            seen_at: When the rate was observed (defaults to now)
+
+        Raises:
+            ValueError: If the price cannot be converted
+        """
+        exact_price = money_units_to_decimal(to_money_units(price))
+        value = float(exact_price)
+
+        self.observation_count += 1
+        delta = value - self.mean_price
+        self.mean_price += delta / self.observation_count
+        self.m2 += delta * (value - self.mean_price)
+
+        if self.min_price is None or exact_price < self.min_price:
+            self.min_price = exact_price
+        if self.max_price is None or exact_price > self.max_price:
+            self.max_price = exact_price
+        self.last_seen = seen_at or datetime.now()
+        if invoice_number is not None:
+            self.last_invoice = invoice_number
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the invoiced rates (0 with fewer than two observations)."""
+        if self.observation_count < 2:
+            return 0.0
+        return max(self.m2, 0.0) / (self.observation_count - 1)
+
+    @property
+    def stddev(self) -> float:
+        """Sample standard deviation of the invoiced rates."""
+        return math.sqrt(self.variance)
+
+    @property
+    def suggested_price(self) -> Optional[Decimal]:
+        """Mean invoiced rate rounded to the precision of the parts table, if any rates were seen."""
+        if not self.observation_count:
+            return None
+        return money_units_to_decimal(to_money_units(self.mean_price))
+
+    def z_score(self, price: Union[Decimal, float, int, str]) -> Optional[float]:
+        """
+        Number of standard deviations a rate lies from the mean.
+
+        Args:
+            price: Rate to score
+
+        Returns:
+            Signed z-score; infinite if every earlier rate was identical and
+            this one differs, None with fewer than two observations
+        """
+        if self.observation_count < 2:
+            return None
+        units = to_money_units(price)
+        difference = units / MONEY_SCALE - self.mean_price
+        stddev = self.stddev
+        if stddev * MONEY_SCALE < 0.5:
+            # All rates so far were equal to the precision of the parts table
+            if units == to_money_units(self.mean_price):
+                return 0.0
+            return math.copysign(math.inf, difference)
+        return difference / stddev
+
+    def is_outlier(self, price: Union[Decimal, float, int, str], z_threshold: float,
+                   min_observations: int) -> bool:
+        """
+        Check whether a rate is a statistical outlier for this part.
+
+        Args:
+            price: Rate to check
+            z_threshold: Largest absolute z-score that is not an outlier
+            min_observations: Observations needed before any rate is flagged
+
+        Returns:
+            True if the rate deviates from the part's history by more than the threshold
+        """
+        if self.observation_count < max(min_observations, 2):
+            return False
+        z_score = self.z_score(price)
+        return z_score is not None and abs(z_score) > z_threshold
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert statistics to dictionary for database operations."""
+        return {
+            'composite_key': self.composite_key,
+            'part_number': self.part_number,
+            'observation_count': self.observation_count,
+            'mean_price': self.mean_price,
+            'm2': self.m2,
+            'min_price_units': to_money_units(self.min_price) if self.min_price is not None else None,
+            'max_price_units': to_money_units(self.max_price) if self.max_price is not None else None,
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None,
+            'last_invoice': self.last_invoice
+        }
+
+
+
+@dataclass
+class PriceInterval:
+    """
+    Authorized price of a part over an effective-date interval.
+
+    Attributes:
+        composite_key: Composite key of the part
+        authorized_price: Price authorized during the interval
+        effective_from: First date the price applies to
+        effective_to: Date the next price took effect (exclusive); None while
+            the price is current
+        recorded_date: When the interval was recorded
+    """
+    composite_key: str
+    authorized_price: Decimal
+    effective_from: date
+    effective_to: Optional[date] = None
+    recorded_date: Optional[datetime] = None
+
+    def __post_init__(self):
+        """Validate interval data after initialization."""
+        if not isinstance(self.authorized_price, Decimal):
+            self.authorized_price = Decimal(str(self.authorized_price))
+        self.validate()
+
+    def validate(self) -> None:
+        """
+        Validate interval data.
+
+        Raises:
+            ValidationError: If validation fails
+        """
+        if not self.composite_key or not isinstance(self.composite_key, str):
+            raise ValidationError("Composite key must be a non-empty string")
+
+        if self.authorized_price <= 0:
+            raise ValidationError("Authorized price must be positive")
+
+        if self.effective_to is not None and self.effective_to <= self.effective_from:
+            raise ValidationError("Interval must end after it starts")
+
+    @property
+    def price_units(self) -> int:
+        """Authorized price in integer ten-thousandths."""
+        return to_money_units(self.authorized_price)
+
+    def covers(self, on_date: date) -> bool:
+        """Check whether the price was in effect on a date."""
+        return self.effective_from <= on_date and (self.effective_to is None or on_date < self.effective_to)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert interval to dictionary for database operations."""
+        return {
+            'composite_key': self.composite_key,
+            'authorized_price': float(self.authorized_price),
+            'effective_from': self.effective_from.isoformat(),
+            'effective_to': self.effective_to.isoformat() if self.effective_to else None
+        }
+
+
+
+# Tolerance rule scopes, from most to least specific
+TOLERANCE_RULE_SCOPES = ('part', 'category', 'item_type')
+
+
+@dataclass
+class ToleranceRule:
+    """
+    Price tolerance for the parts of one part number, category or item type.
+
+    A line passes when its price differs from the authorized price by no more
+    than the larger of the rule's absolute and percentage tolerances. Rules
+    for a part number take precedence over category rules, which take
+    precedence over item type rules; lines without a rule use the global
+    price tolerance.
+
+    Attributes:
+        scope: What the rule matches ('part', 'category' or 'item_type')
+        match_value: Part number, category or item type matched, normalized
+            like composite key components
+        absolute_tolerance: Allowed price difference in dollars
+        percent_tolerance: Allowed price difference as a percentage of the
+            authorized price
+        description: Optional note explaining the rule
+        created_date: When the rule was created
+        last_updated: When the rule was last modified
+    """
+    scope: Literal['part', 'category', 'item_type']
+    match_value: str
+    absolute_tolerance: Optional[Decimal] = None
+    percent_tolerance: Optional[Decimal] = None
+    description: Optional[str] = None
+    created_date: Optional[datetime] = None
+    last_updated: Optional[datetime] = None
+
+    def __post_init__(self):
+        """Normalize and validate rule data after initialization."""
+        self.match_value = normalize_component(self.match_value)
+        if self.absolute_tolerance is not None and not isinstance(self.absolute_tolerance, Decimal):
+            self.absolute_tolerance = Decimal(str(self.absolute_tolerance))
+        if self.percent_tolerance is not None and not isinstance(self.percent_tolerance, Decimal):
+            self.percent_tolerance = Decimal(str(self.percent_tolerance))
+        self.validate()
+
+    def validate(self) -> None:
+        """
+        Validate rule data.
+
+        Raises:
+            ValidationError: If validation fails
+        """
+        if self.scope not in TOLERANCE_RULE_SCOPES:
+            raise ValidationError(f"Scope must be one of: {', '.join(TOLERANCE_RULE_SCOPES)}")
+
+        if not self.match_value:
+            raise ValidationError("Match value must be a non-empty string")
+
+        if self.absolute_tolerance is None and self.percent_tolerance is None:
+            raise ValidationError("A tolerance rule needs an absolute or a percentage tolerance")
+
+        if self.absolute_tolerance is not None and self.absolute_tolerance < 0:
+            raise ValidationError("Absolute tolerance cannot be negative")
+
+        if self.percent_tolerance is not None and not 0 <= self.percent_tolerance <= 100:
+            raise ValidationError("Percentage tolerance must be between 0 and 100")
+
+    @property
+    def absolute_units(self) -> int:
+        """Absolute tolerance in integer ten-thousandths (0 if not set)."""
+        return to_money_units(self.absolute_tolerance) if self.absolute_tolerance is not None else 0
+
+    @property
+    def percent_ppm(self) -> int:
+        """Percentage tolerance in parts per million (0 if not set)."""
+        if self.percent_tolerance is None:
+            return 0
+        return int((self.percent_tolerance * 10000).to_integral_value(rounding=ROUND_HALF_UP))
+
+    def tolerance_units(self, authorized_units: int) -> int:
+        """
+        Get the allowed price difference for an authorized price.
+
+        Args:
+            authorized_units: Authorized price in integer ten-thousandths
+
+        Returns:
+            int: Allowed difference in integer ten-thousandths
+        """
+        return max(self.absolute_units, abs(authorized_units) * self.percent_ppm // 1_000_000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert rule to dictionary for database operations."""
+        return {
+            'scope': self.scope,
+            'match_value': self.match_value,
+            'absolute_tolerance_units': self.absolute_units if self.absolute_tolerance is not None else None,
+            'percent_tolerance': float(self.percent_tolerance) if self.percent_tolerance is not None else None,
+            'description': self.description,
+            'created_date': self.created_date.isoformat() if self.created_date else None,
+            'last_updated': self.last_updated.isoformat() if self.last_updated else None
+        }
+
+
 # Default configuration values
 DEFAULT_CONFIG = {
     'validation_mode': Configuration(
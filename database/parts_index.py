@@ -0,0 +1,138 @@
+"""
+In-memory index of the parts table for long-running processes.
+
+Validation looks up every line item by composite key. A one-shot CLI run can
+afford a query per line item, but a resident process (such as the inbox
+watcher) validates invoice after invoice against a table that rarely changes.
+PartsIndex loads the table once and only reloads it when a cheap fingerprint
+query shows the table has changed.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from database.database import DatabaseManager
+from database.models import Part, PartNotFoundError, build_composite_key
+
+
+logger = logging.getLogger(__name__)
+
+
+class PartsIndex:
+    """
+    Cached composite key to Part mapping backed by a DatabaseManager.
+
+    Lookups that miss the cache fall through to the database, so parts added
+    since the last refresh (e.g. by interactive discovery) are found
+    immediately. Updates and deletions are picked up by ``refresh``.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize the index. Parts are loaded on first use.
+
+        Args:
+            db_manager: Database manager for parts operations
+        """
+        self.db_manager = db_manager
+        self._parts: Dict[str, Part] = {}
+        self._fingerprint: Optional[Tuple[Any, ...]] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._parts)
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the index currently holds a snapshot of the parts table."""
+        return self._fingerprint is not None
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the index if the parts table changed since it was loaded.
+
+        Args:
+            force: Reload even if the table appears unchanged
+
+        Returns:
+            bool: True if the index was reloaded
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        fingerprint = self.db_manager.get_parts_fingerprint()
+        with self._lock:
+            if not force and fingerprint == self._fingerprint:
+                return False
+
+            parts = self.db_manager.list_parts(active_only=False)
+            self._parts = {part.composite_key: part for part in parts}
+            self._fingerprint = fingerprint
+            self.loads += 1
+
+        logger.debug(f"Loaded {len(parts)} parts into parts index")
+        return True
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot so the next lookup reloads the table."""
+        with self._lock:
+            self._fingerprint = None
+
+    def get_part_by_composite_key(self, composite_key: str) -> Optional[Part]:
+        """
+        Look up a part by composite key.
+
+        Args:
+            composite_key: Composite key to look up
+
+        Returns:
+            Part if found, None otherwise
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        if not self.is_loaded:
+            self.refresh()
+
+        part = self._parts.get(composite_key)
+        if part is not None:
+            self.hits += 1
+            return part
+
+        self.misses += 1
+        try:
+            part = self.db_manager.get_part_by_composite_key(composite_key)
+        except PartNotFoundError:
+            return None
+
+        with self._lock:
+            self._parts[composite_key] = part
+        return part
+
+    def find_part_by_components(self, item_type: Optional[str], description: Optional[str],
+                                part_number: Optional[str]) -> Optional[Part]:
+        """
+        Find a part by its components, mirroring DatabaseManager.find_part_by_components.
+
+        Args:
+            item_type: Item type component
+            description: Description component
+            part_number: Part number component
+
+        Returns:
+            Part if found, None otherwise
+        """
+        return self.get_part_by_composite_key(build_composite_key(item_type, description, part_number))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache size and hit statistics."""
+        return {
+            'parts': len(self._parts),
+            'loads': self.loads,
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,170 @@
+"""
+In-memory index of authorized price history for as-of validation.
+
+A part's authorized price changes over time, and an invoice must be checked
+against the price that was in effect on its invoice date rather than today's.
+Re-validating a quarter of invoices would cost a history query per line, so
+PriceHistoryIndex loads the ``part_price_history`` table once into sorted
+arrays per composite key (interval start dates as ordinals and prices in
+integer ten-thousandths) and answers each lookup with a binary search. Like
+PartsIndex, it only reloads when a cheap fingerprint query shows the history
+has changed.
+"""
+
+import logging
+import threading
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+from database.database import DatabaseManager
+
+
+logger = logging.getLogger(__name__)
+
+# Invoice date formats, tried in order
+INVOICE_DATE_FORMATS = ('%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y', '%m-%d-%Y')
+
+
+def parse_invoice_date(value: Any) -> Optional[date]:
+    """
+    Parse an invoice date as extracted from a PDF or stored in JSON.
+
+    Args:
+        value: Date, datetime or string such as ``06/30/2025`` or ``2025-06-30``
+
+    Returns:
+        date, or None if the value is empty or not a recognized date
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    text = value.strip()
+    for date_format in INVOICE_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+class PriceHistoryIndex:
+    """
+    Cached price intervals per composite key backed by a DatabaseManager.
+
+    Lookups take the part's current price and only replace it when the date
+    falls before the start of the part's latest interval, so parts without
+    history, and invoices dated within the current interval, are validated
+    against the current price exactly as before. Dates before a part's first
+    interval get its earliest known price.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize the index. History is loaded on first use.
+
+        Args:
+            db_manager: Database manager for price history operations
+        """
+        self.db_manager = db_manager
+        # Per composite key: (interval start ordinals, prices in ten-thousandths)
+        self._intervals: Dict[str, Tuple[array, array]] = {}
+        self._fingerprint: Optional[Tuple[Any, ...]] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.lookups = 0
+        self.historical_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the index currently holds a snapshot of the price history."""
+        return self._fingerprint is not None
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the index if the price history changed since it was loaded.
+
+        Args:
+            force: Reload even if the history appears unchanged
+
+        Returns:
+            bool: True if the index was reloaded
+
+        Raises:
+            DatabaseError: If database operation fails
+        """
+        fingerprint = self.db_manager.get_price_history_fingerprint()
+        with self._lock:
+            if not force and fingerprint == self._fingerprint:
+                return False
+
+            intervals: Dict[str, Tuple[array, array]] = {}
+            history = self.db_manager.get_price_history()
+            # History is ordered by composite key and start date
+            for interval in history:
+                columns = intervals.get(interval.composite_key)
+                if columns is None:
+                    columns = intervals[interval.composite_key] = (array('l'), array('q'))
+                columns[0].append(interval.effective_from.toordinal())
+                columns[1].append(interval.price_units)
+            self._intervals = intervals
+            self._fingerprint = fingerprint
+            self.loads += 1
+
+        logger.debug(f"Loaded {len(history)} price intervals for {len(intervals)} parts into price history index")
+        return True
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot so the next lookup reloads the history."""
+        with self._lock:
+            self._fingerprint = None
+
+    def price_units_on(self, composite_key: str, on_date: Optional[date], current_units: int) -> int:
+        """
+        Get the authorized price of a part in effect on a date.
+
+        Args:
+            composite_key: Composite key of the part
+            on_date: Date to get the price for; None for the current price
+            current_units: Part's current price in ten-thousandths
+
+        Returns:
+            int: Price in effect on the date, in ten-thousandths
+
+        Raises:
+            DatabaseError: If the history has to be loaded and loading fails
+        """
+        if on_date is None:
+            return current_units
+        if not self.is_loaded:
+            self.refresh()
+
+        self.lookups += 1
+        columns = self._intervals.get(composite_key)
+        if columns is None:
+            return current_units
+
+        starts, prices = columns
+        position = bisect_right(starts, on_date.toordinal()) - 1
+        if position >= len(starts) - 1:
+            return current_units
+
+        self.historical_hits += 1
+        return prices[max(position, 0)]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index size and lookup statistics."""
+        return {
+            'parts': len(self._intervals),
+            'loads': self.loads,
+            'lookups': self.lookups,
+            'historical_hits': self.historical_hits
+        }
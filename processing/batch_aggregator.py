@@ -0,0 +1,153 @@
+"""
+Disk-backed aggregation of directory processing results.
+
+Building the batch report used to keep every invoice's validation JSON in
+memory until the run finished, so memory grew with the size of the batch.
+SpillingBatchAggregator instead appends each invoice's validation JSON to a
+temporary spill file as soon as its result is final and keeps only the
+batch counters and the file offsets of each record in memory. Records are
+written with the binary codec rather than as JSON text, since they are only
+read back by this class. The batch reports are then streamed from that file
+one invoice at a time. Each invoice's rollups by wearer, item code and item
+type are merged into the batch rollups as the invoice is added.
+"""
+
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from .binary_codec import decode_value, encode_value
+from .rollups import LineRollups
+
+
+# Counters summed from each invoice's validation summary
+_SUMMARY_COUNTERS = ('total_parts', 'passed_parts', 'failed_parts', 'unknown_parts')
+
+
+class SpillingBatchAggregator:
+    """
+    Collects per-invoice validation JSON on disk for batch reporting.
+
+    Invoices may be added in any order; they are read back in the order of
+    the index they were added with, so the batch report follows input order
+    even when results complete out of order. Adding an index again replaces
+    the earlier record.
+
+    Use as a context manager, or call ``close`` to delete the spill files.
+    """
+
+    def __init__(self, spill_dir: Optional[Union[str, Path]] = None):
+        """
+        Create the spill file.
+
+        Args:
+            spill_dir: Directory to create the temporary spill directory in
+                (defaults to the system temporary directory)
+        """
+        self._directory = Path(tempfile.mkdtemp(prefix='invoice_batch_', dir=spill_dir))
+        self.path = self._directory / 'invoices.bin'
+        self._file = open(self.path, 'w+b')
+        # Record location of each invoice by index: (offset, length)
+        self._offsets: Dict[int, Tuple[int, int]] = {}
+        self._summaries: Dict[int, Dict[str, int]] = {}
+        self.batch_summary = {name: 0 for name in _SUMMARY_COUNTERS}
+        self.batch_summary['total_invoices'] = 0
+        self.rollups = LineRollups()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __enter__(self) -> 'SpillingBatchAggregator':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def add(self, index: int, validation_json: Dict[str, Any]) -> None:
+        """
+        Spill one invoice's validation JSON and update the batch counters.
+
+        Args:
+            index: Position of the invoice in the batch
+            validation_json: Validation JSON of the invoice
+        """
+        record = encode_value(validation_json)
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        self._file.write(record)
+
+        summary = validation_json.get('validation_summary', {})
+        counters = {name: summary.get(name, 0) for name in _SUMMARY_COUNTERS}
+        previous = self._summaries.get(index)
+        if previous is None:
+            self.batch_summary['total_invoices'] += 1
+        else:
+            for name in _SUMMARY_COUNTERS:
+                self.batch_summary[name] -= previous[name]
+            self.rollups.merge(self._read(index).get('rollups', {}), sign=-1)
+        for name in _SUMMARY_COUNTERS:
+            self.batch_summary[name] += counters[name]
+        self.rollups.merge(validation_json.get('rollups', {}))
+
+        self._offsets[index] = (offset, len(record))
+        self._summaries[index] = counters
+
+    def _read(self, index: int) -> Dict[str, Any]:
+        """Read back the record spilled for an index."""
+        offset, length = self._offsets[index]
+        self._file.seek(offset)
+        return decode_value(self._file.read(length))
+
+    def iter_invoices(self) -> Iterator[Dict[str, Any]]:
+        """
+        Read the spilled invoices back one at a time.
+
+        Yields:
+            Validation JSON of each invoice, in index order
+        """
+        self._file.flush()
+        with open(self.path, 'rb') as reader:
+            for index in sorted(self._offsets):
+                offset, length = self._offsets[index]
+                reader.seek(offset)
+                yield decode_value(reader.read(length))
+
+    def iter_parts(self) -> Iterator[Dict[str, Any]]:
+        """Yield the parts of every invoice, in invoice order."""
+        for validation_json in self.iter_invoices():
+            yield from validation_json.get('parts', [])
+
+    def iter_error_lines(self) -> Iterator[Dict[str, Any]]:
+        """Yield the error lines of every invoice, in invoice order."""
+        for validation_json in self.iter_invoices():
+            yield from validation_json.get('error_lines', [])
+
+    def summary_json(self) -> Dict[str, Any]:
+        """
+        Build the batch validation JSON without the per-invoice arrays.
+
+        Returns:
+            Batch validation JSON with batch_metadata, batch_summary,
+            validation_summary and rollups; the invoices, parts and error_lines arrays
+            are streamed from disk by the report writer instead
+        """
+        batch_summary = dict(self.batch_summary)
+        return {
+            'batch_metadata': {
+                'total_invoices': batch_summary['total_invoices'],
+                'processing_timestamp': datetime.now().isoformat(),
+                'batch_type': 'directory_processing'
+            },
+            'batch_summary': batch_summary,
+            'validation_summary': batch_summary,  # For compatibility with report generator
+            'rollups': self.rollups.to_dict()
+        }
+
+    def close(self) -> None:
+        """Close and delete the spill file."""
+        if not self._file.closed:
+            self._file.close()
+        shutil.rmtree(self._directory, ignore_errors=True)
@@ -0,0 +1,134 @@
+"""
+Bounded queues and metrics for the staged batch processing pipeline.
+
+Directory processing is split into stages (extraction, validation, report
+writing) connected by bounded queues. A producer that gets ahead of its
+consumer blocks on ``put`` until space frees up, so memory stays bounded and
+slow stages throttle fast ones. Each queue records depth and blocking
+statistics that are reported with the batch result.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+# Default capacity of each inter-stage queue
+DEFAULT_QUEUE_SIZE = 8
+
+# Seconds between stop-flag checks while blocked on a full or empty queue
+_POLL_INTERVAL = 0.1
+
+
+class PipelineStopped(Exception):
+    """Raised inside a stage when the pipeline is shutting down."""
+    pass
+
+
+# Marker placed on a queue after the last item
+END_OF_STREAM = object()
+
+
+@dataclass
+class StageMetrics:
+    """Queue-depth and backpressure statistics for one pipeline stage."""
+    name: str
+    capacity: int
+    items: int = 0
+    max_depth: int = 0
+    depth_total: int = 0
+    blocked_puts: int = 0
+    blocked_seconds: float = 0.0
+
+    @property
+    def average_depth(self) -> float:
+        """Average queue depth observed when items were enqueued."""
+        return self.depth_total / self.items if self.items else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metrics to a dictionary for reporting."""
+        return {
+            'capacity': self.capacity,
+            'items': self.items,
+            'max_depth': self.max_depth,
+            'average_depth': round(self.average_depth, 2),
+            'blocked_puts': self.blocked_puts,
+            'blocked_seconds': round(self.blocked_seconds, 3)
+        }
+
+
+class MeteredQueue:
+    """
+    Bounded FIFO queue between two pipeline stages.
+
+    ``put`` blocks while the queue is full (backpressure) and both ``put`` and
+    ``get`` give up with PipelineStopped once the shared stop event is set, so
+    no stage can hang after another one fails.
+    """
+
+    def __init__(self, name: str, maxsize: int = DEFAULT_QUEUE_SIZE,
+                 stop_event: Optional[threading.Event] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            name: Stage name used in metrics
+            maxsize: Maximum number of queued items
+            stop_event: Event signalling pipeline shutdown
+        """
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop_event = stop_event or threading.Event()
+        self._lock = threading.Lock()
+        self.metrics = StageMetrics(name=name, capacity=maxsize)
+
+    @property
+    def depth(self) -> int:
+        """Current number of queued items."""
+        return self._queue.qsize()
+
+    def put(self, item: Any) -> None:
+        """
+        Enqueue an item, blocking while the queue is full.
+
+        Raises:
+            PipelineStopped: If the pipeline stops while waiting
+        """
+        blocked_since = None
+        while True:
+            if self._stop_event.is_set():
+                raise PipelineStopped(f"{self.metrics.name} stage stopped")
+            try:
+                self._queue.put(item, timeout=_POLL_INTERVAL if blocked_since else 0)
+                break
+            except queue.Full:
+                if blocked_since is None:
+                    blocked_since = time.monotonic()
+
+        if item is END_OF_STREAM:
+            return
+
+        with self._lock:
+            metrics = self.metrics
+            depth = self._queue.qsize()
+            metrics.items += 1
+            metrics.depth_total += depth
+            metrics.max_depth = max(metrics.max_depth, depth)
+            if blocked_since is not None:
+                metrics.blocked_puts += 1
+                metrics.blocked_seconds += time.monotonic() - blocked_since
+
+    def get(self) -> Any:
+        """
+        Dequeue the next item, blocking while the queue is empty.
+
+        Raises:
+            PipelineStopped: If the pipeline stops while waiting
+        """
+        while True:
+            try:
+                return self._queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    raise PipelineStopped(f"{self.metrics.name} stage stopped")
@@ -0,0 +1,425 @@
+"""
+Compact binary serialization for invoice data and validation results.
+
+JSON stays the format of the reports people read, but encoding and parsing
+indented JSON is wasted work on the hot paths that only move data between
+parts of the program: worker processes handing extraction results back,
+the batch spill file and the run journal. This module encodes the same
+values in a versioned binary format instead.
+
+Every record starts with a header (magic, format version, record kind),
+followed by a string table and the body. Each distinct string, such as a
+dict key or a description repeated on many lines, is stored once in the
+table and referred to by index. Integers are stored as variable-length
+zigzag numbers, floats as 8-byte IEEE doubles and Decimals exactly.
+
+``encode_value`` handles JSON-like values: dicts, lists, strings, numbers,
+booleans and None, which covers extraction JSON, validation JSON and
+processing result dicts. ``encode_invoice_data`` stores the line items of
+an InvoiceData as length-prefixed packed columns, in the layout of
+LineItemBatch, and ``encode_value`` stores an extraction JSON PartsArray
+the same way, and a validation JSON ValidatedParts as its parts and packed
+validation columns.
+
+Version 2 added the wearer column to invoice data records. Version 1
+records are still read, with no wearers. Version 3 added PartsArray values
+and version 4 ValidatedParts values.
+"""
+
+import struct
+import sys
+from array import array
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from .columnar_validation import ValidatedParts
+from .models import FormatSection, InvoiceData, LineItemBatch, PartsArray
+
+
+MAGIC = b'IVB'
+FORMAT_VERSION = 4
+# Versions that can still be decoded
+SUPPORTED_VERSIONS = (1, 2, 3, 4)
+
+# Record kinds
+KIND_VALUE = 0
+KIND_INVOICE_DATA = 1
+
+_HEADER = struct.Struct('<3sBB')
+_DOUBLE = struct.Struct('<d')
+
+# Value tags
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_LIST = 6
+_DICT = 7
+_DECIMAL = 8
+_BYTES = 9
+_PARTS = 10
+_VALIDATED_PARTS = 11
+
+# Packed columns are stored little-endian regardless of the host
+_SWAP_BYTES = sys.byteorder != 'little'
+
+
+class CodecError(ValueError):
+    """Raised when binary data is not a valid record of a supported version."""
+
+
+def is_encoded(data: Any) -> bool:
+    """Check whether data looks like a record produced by this module."""
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:3]) == MAGIC
+
+
+class _Writer:
+    """Builds the string table and body of one record."""
+
+    def __init__(self):
+        self.body = bytearray()
+        self.strings: Dict[str, int] = {}
+
+    def varint(self, value: int) -> None:
+        body = self.body
+        while value > 0x7F:
+            body.append((value & 0x7F) | 0x80)
+            value >>= 7
+        body.append(value)
+
+    def string_ref(self, value: str) -> None:
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        self.varint(index)
+
+    def optional_string(self, value: Optional[str]) -> None:
+        """Write a string reference shifted by one, so that 0 stands for None."""
+        if value is None:
+            self.body.append(0)
+            return
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        self.varint(index + 1)
+
+    def packed(self, column: Any) -> None:
+        """Write a typed array or bytearray as a length-prefixed little-endian block."""
+        if _SWAP_BYTES and isinstance(column, array):
+            column = array(column.typecode, column)
+            column.byteswap()
+        data = column.tobytes() if isinstance(column, array) else bytes(column)
+        self.varint(len(data))
+        self.body += data
+
+    def batch(self, batch: LineItemBatch) -> None:
+        """Write the columns of a LineItemBatch."""
+        self.varint(len(batch))
+        for column in (batch.item_codes, batch.descriptions, batch.item_types, batch.raw_texts, batch.wearers):
+            for text in column:
+                self.optional_string(text)
+        for line_number in batch.line_numbers:
+            self.value(line_number)
+        for column in (batch.rate_units, batch.quantities, batch.total_units, batch.has_rate, batch.has_total):
+            self.packed(column)
+
+    def value(self, value: Any) -> None:
+        body = self.body
+        if value is None:
+            body.append(_NONE)
+        elif value is True:
+            body.append(_TRUE)
+        elif value is False:
+            body.append(_FALSE)
+        elif isinstance(value, int):
+            body.append(_INT)
+            self.varint(value << 1 if value >= 0 else ((-value) << 1) - 1)
+        elif isinstance(value, float):
+            body.append(_FLOAT)
+            body += _DOUBLE.pack(value)
+        elif isinstance(value, str):
+            body.append(_STR)
+            self.string_ref(value)
+        elif isinstance(value, dict):
+            body.append(_DICT)
+            self.varint(len(value))
+            for key, item in value.items():
+                self.string_ref(key if isinstance(key, str) else str(key))
+                self.value(item)
+        elif isinstance(value, (list, tuple)):
+            body.append(_LIST)
+            self.varint(len(value))
+            for item in value:
+                self.value(item)
+        elif isinstance(value, Decimal):
+            body.append(_DECIMAL)
+            self.string_ref(str(value))
+        elif isinstance(value, (bytes, bytearray)):
+            body.append(_BYTES)
+            self.varint(len(value))
+            body += value
+        elif isinstance(value, PartsArray):
+            body.append(_PARTS)
+            self.value(value.first_seen_invoice)
+            self.batch(value.batch)
+        elif isinstance(value, ValidatedParts):
+            body.append(_VALIDATED_PARTS)
+            self.value(value.parts)
+            for column in (value.status, value.database_units, value.known, value.difference_units,
+                           value.compared):
+                self.packed(column)
+            self.varint(len(value.errors))
+            for row, message in value.errors.items():
+                self.varint(row)
+                self.string_ref(message)
+        else:
+            # Same fallback as json.dumps(default=str)
+            body.append(_STR)
+            self.string_ref(str(value))
+
+    def finish(self, kind: int) -> bytes:
+        header = _Writer()
+        header.body += _HEADER.pack(MAGIC, FORMAT_VERSION, kind)
+        header.varint(len(self.strings))
+        for string in self.strings:
+            encoded = string.encode('utf-8', 'surrogatepass')
+            header.varint(len(encoded))
+            header.body += encoded
+        return bytes(header.body + self.body)
+
+
+class _Reader:
+    """Reads the string table and body of one record."""
+
+    def __init__(self, data: bytes, kind: int):
+        self.data = memoryview(data)
+        if len(self.data) < _HEADER.size:
+            raise CodecError("Record is too short")
+        magic, version, record_kind = _HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise CodecError("Not an encoded record")
+        if version not in SUPPORTED_VERSIONS:
+            raise CodecError(f"Unsupported format version {version}")
+        if record_kind != kind:
+            raise CodecError(f"Expected record kind {kind}, found {record_kind}")
+        self.version = version
+        self.position = _HEADER.size
+
+        count = self.varint()
+        self.strings: List[str] = []
+        for _ in range(count):
+            length = self.varint()
+            self.strings.append(str(self.take(length), 'utf-8', 'surrogatepass'))
+
+    def take(self, length: int) -> memoryview:
+        end = self.position + length
+        if end > len(self.data):
+            raise CodecError("Record is truncated")
+        chunk = self.data[self.position:end]
+        self.position = end
+        return chunk
+
+    def varint(self) -> int:
+        data = self.data
+        result = 0
+        shift = 0
+        try:
+            while True:
+                byte = data[self.position]
+                self.position += 1
+                result |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    return result
+                shift += 7
+        except IndexError:
+            raise CodecError("Record is truncated") from None
+
+    def string_ref(self) -> str:
+        index = self.varint()
+        try:
+            return self.strings[index]
+        except IndexError:
+            raise CodecError(f"String reference {index} out of range") from None
+
+    def optional_string(self) -> Optional[str]:
+        index = self.varint()
+        if not index:
+            return None
+        try:
+            return self.strings[index - 1]
+        except IndexError:
+            raise CodecError(f"String reference {index - 1} out of range") from None
+
+    def packed(self, typecode: Optional[str] = None) -> Any:
+        data = self.take(self.varint())
+        if typecode is None:
+            return bytearray(data)
+        column = array(typecode)
+        column.frombytes(data)
+        if _SWAP_BYTES:
+            column.byteswap()
+        return column
+
+    def batch(self) -> LineItemBatch:
+        """Read the columns written by ``_Writer.batch``."""
+        batch = LineItemBatch()
+        count = self.varint()
+        for column in (batch.item_codes, batch.descriptions, batch.item_types, batch.raw_texts):
+            column.extend(self.optional_string() for _ in range(count))
+        if self.version >= 2:
+            batch.wearers.extend(self.optional_string() for _ in range(count))
+        else:
+            batch.wearers.extend([None] * count)
+        batch.line_numbers.extend(self.value() for _ in range(count))
+        batch.rate_units = self.packed('q')
+        batch.quantities = self.packed('d')
+        batch.total_units = self.packed('q')
+        batch.has_rate = self.packed()
+        batch.has_total = self.packed()
+        columns: Tuple[Any, ...] = (batch.rate_units, batch.quantities, batch.total_units,
+                                    batch.has_rate, batch.has_total)
+        if any(len(column) != count for column in columns):
+            raise CodecError("Line item columns have inconsistent lengths")
+        return batch
+
+    def value(self) -> Any:
+        tag = self.take(1)[0]
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            zigzag = self.varint()
+            return zigzag >> 1 if not zigzag & 1 else -((zigzag + 1) >> 1)
+        if tag == _FLOAT:
+            return _DOUBLE.unpack(self.take(_DOUBLE.size))[0]
+        if tag == _STR:
+            return self.string_ref()
+        if tag == _DICT:
+            return {self.string_ref(): self.value() for _ in range(self.varint())}
+        if tag == _LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == _DECIMAL:
+            return Decimal(self.string_ref())
+        if tag == _BYTES:
+            return bytes(self.take(self.varint()))
+        if tag == _PARTS:
+            first_seen_invoice = self.value()
+            return PartsArray(self.batch(), first_seen_invoice)
+        if tag == _VALIDATED_PARTS:
+            parts = self.value()
+            columns = (self.packed(), self.packed('q'), self.packed(), self.packed('q'), self.packed())
+            if any(len(column) != len(parts) for column in columns):
+                raise CodecError("Validation columns have inconsistent lengths")
+            errors = {}
+            for _ in range(self.varint()):
+                row = self.varint()
+                errors[row] = self.string_ref()
+            return ValidatedParts(parts, *columns, errors)
+        raise CodecError(f"Unknown value tag {tag}")
+
+    def end(self) -> None:
+        if self.position != len(self.data):
+            raise CodecError("Unexpected data after the record")
+
+
+def encode_value(value: Any) -> bytes:
+    """
+    Encode a JSON-like value.
+
+    Tuples are encoded as lists, non-string dict keys and values of other
+    types as their ``str()``, as ``json.dumps(default=str)`` would. Decimals
+    and bytes are kept as they are.
+
+    Args:
+        value: Value to encode, such as extraction or validation JSON
+
+    Returns:
+        Encoded record
+    """
+    writer = _Writer()
+    writer.value(value)
+    return writer.finish(KIND_VALUE)
+
+
+def decode_value(data: bytes) -> Any:
+    """
+    Decode a record produced by ``encode_value``.
+
+    Raises:
+        CodecError: If the data is not a valid value record
+    """
+    reader = _Reader(data, KIND_VALUE)
+    value = reader.value()
+    reader.end()
+    return value
+
+
+def encode_invoice_data(invoice_data: InvoiceData) -> bytes:
+    """
+    Encode an InvoiceData with its line items as packed columns.
+
+    Args:
+        invoice_data: Invoice data to encode; line items may be a list or a LineItemBatch
+
+    Returns:
+        Encoded record
+    """
+    writer = _Writer()
+    timestamp = invoice_data.extraction_timestamp
+    writer.value({
+        'invoice_number': invoice_data.invoice_number,
+        'invoice_date': invoice_data.invoice_date,
+        'customer_number': invoice_data.customer_number,
+        'customer_name': invoice_data.customer_name,
+        'pdf_path': invoice_data.pdf_path,
+        'extraction_timestamp': timestamp.isoformat() if timestamp else None,
+        'raw_text': invoice_data.raw_text,
+        'page_count': invoice_data.page_count,
+        'processing_notes': invoice_data.processing_notes,
+        'format_sections': [[section.section_type, section.amount, section.raw_text, section.line_number]
+                            for section in invoice_data.format_sections]
+    })
+
+    batch = invoice_data.line_items
+    if not isinstance(batch, LineItemBatch):
+        batch = LineItemBatch(batch)
+    writer.batch(batch)
+    return writer.finish(KIND_INVOICE_DATA)
+
+
+def decode_invoice_data(data: bytes) -> InvoiceData:
+    """
+    Decode a record produced by ``encode_invoice_data``.
+
+    Returns:
+        InvoiceData whose line items are a LineItemBatch
+
+    Raises:
+        CodecError: If the data is not a valid invoice data record
+    """
+    reader = _Reader(data, KIND_INVOICE_DATA)
+    fields = reader.value()
+    batch = reader.batch()
+    reader.end()
+
+    timestamp = fields.get('extraction_timestamp')
+    return InvoiceData(
+        invoice_number=fields.get('invoice_number'),
+        invoice_date=fields.get('invoice_date'),
+        customer_number=fields.get('customer_number'),
+        customer_name=fields.get('customer_name'),
+        line_items=batch,
+        format_sections=[FormatSection(section_type, amount, raw_text, line_number)
+                         for section_type, amount, raw_text, line_number in fields.get('format_sections', [])],
+        pdf_path=fields.get('pdf_path'),
+        extraction_timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+        raw_text=fields.get('raw_text'),
+        page_count=fields.get('page_count'),
+        processing_notes=fields.get('processing_notes', [])
+    )
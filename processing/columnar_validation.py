@@ -0,0 +1,322 @@
+"""
+Columnar price validation of an invoice's lines.
+
+The per-line validation path builds a nested result dict for every part it
+checks. Here the prices, quantities and line totals of an invoice's lines
+are gathered into NumPy columns instead (read straight from the columns of
+a PartsArray when extraction produced one), each distinct part is resolved
+and priced once, and the PASSED/FAILED/UNKNOWN statuses, price differences
+and extended totals of every line are computed in one vectorized step.
+
+The validated parts array is a ValidatedParts: it reads as the list of dicts
+``ValidationEngine.validate_invoice_json`` produces, but builds each dict
+when it is read, so only the error lines are materialized while validating.
+"""
+
+from array import array
+from collections.abc import Sequence
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from database.models import (
+    build_composite_key, money_units_or_zero, money_units_to_decimal, money_units_to_float, to_money_units
+)
+
+from .models import PartsArray, quantity_or_one, quantity_value
+
+
+# Status codes of the status column, indexing STATUS_NAMES
+PASSED = 0
+FAILED = 1
+UNKNOWN = 2
+STATUS_NAMES = ('PASSED', 'FAILED', 'UNKNOWN')
+
+UNKNOWN_PART_MESSAGE = 'Part not found in database (user skipped adding)'
+
+
+class LineColumns:
+    """
+    Validation inputs of an invoice's lines, one entry per line.
+
+    Attributes:
+        part_numbers: Part number of each line
+        item_types: Item type of each line
+        descriptions: Description of each line
+        wearers: Wearer of each line
+        keys: Composite key of each line, None without a part number
+        extracted_units: Invoiced price in ten-thousandths, 0 without one
+        has_price: Whether the line has a valid invoiced price
+        invalid_price: Conversion error of each line whose invoiced price is not a number
+        quantities: Quantity of each line, missing or zero counted as one
+        line_total_units: Invoiced line total in ten-thousandths, 0 without one
+    """
+
+    __slots__ = ('part_numbers', 'item_types', 'descriptions', 'wearers', 'keys', 'extracted_units', 'has_price',
+                 'invalid_price', 'quantities', 'line_total_units')
+
+    def __init__(self, parts: Sequence):
+        """
+        Gather the columns of an extraction JSON parts array.
+
+        Args:
+            parts: PartsArray, whose batch columns are read directly, or list of part dicts
+        """
+        if isinstance(parts, PartsArray):
+            batch = parts.batch
+            self.part_numbers: List[Optional[str]] = list(batch.item_codes)
+            self.item_types: List[Optional[str]] = list(batch.item_types)
+            self.wearers: List[Optional[str]] = list(batch.wearers)
+            self.descriptions: List[Optional[str]] = list(batch.descriptions)
+            self.extracted_units = np.array(batch.rate_units, dtype=np.int64)
+            # PartsArray reports a zero rate as no price
+            self.has_price = self.extracted_units != 0
+            self.invalid_price: Dict[int, str] = {}
+            self.quantities: List[Any] = [quantity_or_one(quantity_value(quantity)) for quantity in batch.quantities]
+            self.line_total_units = np.array(batch.total_units, dtype=np.int64)
+        else:
+            self.part_numbers = []
+            self.item_types = []
+            self.wearers = []
+            self.descriptions = []
+            extracted: List[int] = []
+            has_price: List[bool] = []
+            self.invalid_price = {}
+            self.quantities = []
+            line_totals: List[int] = []
+            for row, part_data in enumerate(parts):
+                db_fields = part_data.get('database_fields', {})
+                line_fields = part_data.get('lineitem_fields', {})
+                self.part_numbers.append(db_fields.get('part_number'))
+                self.item_types.append(db_fields.get('item_type'))
+                self.wearers.append(line_fields.get('wearer'))
+                self.descriptions.append(db_fields.get('description', ''))
+                price = db_fields.get('authorized_price')
+                units = 0
+                if price is not None:
+                    try:
+                        units = to_money_units(price)
+                    except ValueError as e:
+                        price = None
+                        self.invalid_price[row] = str(e)
+                extracted.append(units)
+                has_price.append(price is not None)
+                self.quantities.append(quantity_or_one(line_fields.get('quantity')))
+                line_totals.append(money_units_or_zero(line_fields.get('total', 0) or 0))
+            self.extracted_units = np.array(extracted, dtype=np.int64)
+            self.has_price = np.array(has_price, dtype=bool)
+            self.line_total_units = np.array(line_totals, dtype=np.int64)
+
+        self.keys: List[Optional[str]] = [
+            build_composite_key(item_type, description, part_number) if part_number else None
+            for item_type, description, part_number in zip(self.item_types, self.descriptions, self.part_numbers)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class LineResults:
+    """
+    Statuses and totals of validated lines, from ``evaluate``.
+
+    ``actual_total_units`` and ``expected_total_units`` are the line totals
+    reported on error lines and rolled up, in ten-thousandths.
+    """
+
+    __slots__ = ('status', 'database_units', 'known', 'difference_units', 'compared',
+                 'actual_total_units', 'expected_total_units', 'errors')
+
+    def __init__(self, status: np.ndarray, database_units: np.ndarray, known: np.ndarray,
+                 difference_units: np.ndarray, compared: np.ndarray, actual_total_units: np.ndarray,
+                 expected_total_units: np.ndarray, errors: Dict[int, str]):
+        self.status = status
+        self.database_units = database_units
+        self.known = known
+        self.difference_units = difference_units
+        self.compared = compared
+        self.actual_total_units = actual_total_units
+        self.expected_total_units = expected_total_units
+        self.errors = errors
+
+
+def evaluate(columns: LineColumns, database_units: np.ndarray, known: np.ndarray,
+             tolerance_units: np.ndarray, errors: Dict[int, str]) -> LineResults:
+    """
+    Compute the statuses and totals of every line in one vectorized step.
+
+    Prices and totals are compared as integer ten-thousandths, so the
+    tolerance check is exact.
+
+    Args:
+        columns: Gathered line columns
+        database_units: Authorized price of each line's part, 0 for unknown parts
+        known: Whether each line's part is in the database
+        tolerance_units: Largest passing price difference of each line
+        errors: Messages of lines that fail before their price is compared, by row;
+            lines of known parts with an invalid invoiced price are added to it
+
+    Returns:
+        LineResults of the lines
+    """
+    for row, message in columns.invalid_price.items():
+        if known[row] and row not in errors:
+            errors[row] = f'Validation error: {message}'
+    compared = known & columns.has_price
+    difference_units = np.abs(columns.extracted_units - database_units)
+
+    status = np.full(len(columns), UNKNOWN, dtype=np.int8)
+    status[known] = PASSED
+    status[compared & (difference_units > tolerance_units)] = FAILED
+    if errors:
+        status[np.fromiter(errors, dtype=np.intp, count=len(errors))] = FAILED
+
+    # Extended totals: the invoiced total, or price times quantity without one
+    quantities = np.array(columns.quantities, dtype=np.float64)
+    extended_units = np.rint(columns.extracted_units * quantities).astype(np.int64)
+    actual_units = np.where(columns.line_total_units > 0, columns.line_total_units, extended_units)
+    expected_units = np.where(database_units > 0, np.rint(database_units * quantities).astype(np.int64),
+                              actual_units)
+
+    return LineResults(status, database_units, known, difference_units, compared,
+                       actual_units, expected_units, errors)
+
+
+def _int_column(values: np.ndarray) -> array:
+    """Copy a NumPy integer column into a typed array of Python-int elements."""
+    column = array('q')
+    column.frombytes(values.astype(np.int64).tobytes())
+    return column
+
+
+class ValidatedParts(Sequence):
+    """
+    Validation JSON parts array backed by validation columns.
+
+    Reads as the list of validated part dicts ``validate_invoice_json``
+    builds, each dict built from the extraction part and the line's columns
+    when it is read. The parts are read-only; compare equal to a list
+    holding the same dicts.
+    """
+
+    __slots__ = ('parts', 'status', 'database_units', 'known', 'difference_units', 'compared', 'errors')
+
+    def __init__(self, parts: Sequence, status: bytearray, database_units: array, known: bytearray,
+                 difference_units: array, compared: bytearray, errors: Dict[int, str]):
+        """
+        Args:
+            parts: Extraction JSON parts array the lines were validated from
+            status: Status code of each line
+            database_units: Authorized price of each line, in ten-thousandths
+            known: 1 where the line's part is in the database
+            difference_units: Price difference of each line, in ten-thousandths
+            compared: 1 where the line's price was compared
+            errors: Messages of lines that failed before their price was compared, by row
+        """
+        self.parts = parts
+        self.status = status
+        self.database_units = database_units
+        self.known = known
+        self.difference_units = difference_units
+        self.compared = compared
+        self.errors = errors
+
+    @classmethod
+    def from_results(cls, parts: Sequence, results: LineResults) -> 'ValidatedParts':
+        """Build the parts array of lines evaluated by ``evaluate``."""
+        return cls(parts, bytearray(results.status.astype(np.uint8).tobytes()),
+                   _int_column(results.database_units), bytearray(results.known.astype(np.uint8).tobytes()),
+                   _int_column(results.difference_units), bytearray(results.compared.astype(np.uint8).tobytes()),
+                   dict(results.errors))
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._part(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("part index out of range")
+        return self._part(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self)):
+            yield self._part(row)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (list, ValidatedParts)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ValidatedParts({len(self)} parts)"
+
+    def status_name(self, row: int) -> str:
+        """Validation status of a line."""
+        return STATUS_NAMES[self.status[row]]
+
+    def _messages(self, row: int, extracted_price: Any) -> List[str]:
+        if row in self.errors:
+            return [self.errors[row]]
+        status = self.status[row]
+        if status == FAILED:
+            return [f'Price mismatch: expected ${money_units_to_float(self.database_units[row])}, '
+                    f'got ${extracted_price}']
+        if status == UNKNOWN:
+            return [UNKNOWN_PART_MESSAGE]
+        return []
+
+    def _part(self, row: int) -> Dict[str, Any]:
+        part_data = self.parts[row]
+        db_fields = part_data.get('database_fields', {})
+        line_fields = part_data.get('lineitem_fields', {})
+        extracted_price = db_fields.get('authorized_price')
+        return {
+            'database_fields': {
+                'part_number': db_fields.get('part_number'),
+                'description': db_fields.get('description', ''),
+                'item_type': db_fields.get('item_type'),
+                'authorized_price': extracted_price,
+                'category': db_fields.get('category'),
+                'source': db_fields.get('source', 'extracted'),
+                'first_seen_invoice': db_fields.get('first_seen_invoice')
+            },
+            'lineitem_fields': {
+                'line_number': line_fields.get('line_number'),
+                'quantity': line_fields.get('quantity'),
+                'total': line_fields.get('total'),
+                'raw_text': line_fields.get('raw_text'),
+                'wearer': line_fields.get('wearer')
+            },
+            'validation_status': STATUS_NAMES[self.status[row]],
+            'validation_errors': self._messages(row, extracted_price),
+            'database_price': money_units_to_float(self.database_units[row]) if self.known[row] else None,
+            'price_difference': money_units_to_float(self.difference_units[row]) if self.compared[row] else None
+        }
+
+    def rate_observations(self, source_key: str) -> List[Tuple[str, str, Decimal, str]]:
+        """
+        Build the rate observations of the lines that did not fail, without building their dicts.
+
+        Args:
+            source_key: Invoice key the rates are deduplicated by
+
+        Returns:
+            ``(composite_key, part_number, price, source_key)`` tuples for
+            ``DatabaseManager.record_part_rates``
+        """
+        columns = LineColumns(self.parts)
+        return [
+            (key, part_number, money_units_to_decimal(int(columns.extracted_units[row])), source_key)
+            for row, (key, part_number) in enumerate(zip(columns.keys, columns.part_numbers))
+            if key and columns.has_price[row] and self.status[row] != FAILED
+        ]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Materialize the parts as a list of dicts."""
+        return list(self)
@@ -0,0 +1,113 @@
+"""
+Single-pass PDF discovery for directory processing.
+
+Directories are walked with ``os.scandir``, which returns file type
+information with each entry, so no extra ``stat`` call is needed per file and
+each directory is read only once regardless of how many extensions match.
+Files are yielded as they are found, in the same order ``sorted()`` would put
+their paths in.
+"""
+
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple, Union
+
+
+# File extensions treated as PDF invoices, compared case-insensitively
+PDF_EXTENSIONS = ('.pdf',)
+
+
+def is_pdf_name(name: str) -> bool:
+    """Check whether a file name has a PDF extension, ignoring case."""
+    return name.lower().endswith(PDF_EXTENSIONS)
+
+
+def iter_pdf_files(directory: Union[str, Path], recursive: bool = True) -> Iterator[Path]:
+    """
+    Yield PDF files under a directory in sorted path order.
+
+    Entries of each directory are sorted by name and subdirectories are
+    descended into in place, which yields paths in the same order as sorting
+    the complete list. Symbolic links to directories are not followed, so
+    link cycles cannot cause an endless walk; links to files are included.
+    Directories that cannot be read are skipped.
+
+    Args:
+        directory: Directory to search
+        recursive: Whether to search subdirectories
+
+    Yields:
+        Path: Each PDF file found
+    """
+    # Stack of pending directory listings, deepest last
+    stack: List[Iterator[Tuple[str, bool, str]]] = [_sorted_entries(str(directory))]
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        name, is_dir, path = entry
+        if is_dir:
+            if recursive:
+                stack.append(_sorted_entries(path))
+        elif is_pdf_name(name):
+            yield Path(path)
+
+
+def _sorted_entries(directory: str) -> Iterator[Tuple[str, bool, str]]:
+    """Return (name, is_directory, path) for the entries of a directory, sorted by name."""
+    entries = []
+    try:
+        with os.scandir(directory) as scanner:
+            for entry in scanner:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    if not is_dir and not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                entries.append((entry.name, is_dir, entry.path))
+    except OSError:
+        return iter(())
+
+    entries.sort()
+    return iter(entries)
+
+
+def find_pdf_files(directory: Union[str, Path], recursive: bool = True) -> List[Path]:
+    """
+    Find all PDF files under a directory.
+
+    Args:
+        directory: Directory to search
+        recursive: Whether to search subdirectories
+
+    Returns:
+        List[Path]: PDF files in sorted path order
+    """
+    return list(iter_pdf_files(directory, recursive))
+
+
+def order_by_cost(pdf_files: Iterable[Path]) -> List[Path]:
+    """
+    Order files by estimated processing cost, most expensive first.
+
+    File size stands in for cost (page count and embedded images both grow
+    it), and it is available without opening the PDF. Starting the largest
+    invoices first keeps one slow file from running alone at the end of a
+    parallel batch. Files that cannot be read sort last.
+
+    Args:
+        pdf_files: Files to order
+
+    Returns:
+        List[Path]: Files from largest to smallest, ties kept in input order
+    """
+    def file_size(path: Path) -> int:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return -1
+
+    return sorted(pdf_files, key=file_size, reverse=True)
@@ -0,0 +1,147 @@
+"""
+Processed-files manifest for incremental directory processing.
+
+Every PDF handled by directory processing is recorded with its size,
+modification time, content hash, extractor version and outcome. Incremental
+runs use these fingerprints to skip files that were processed successfully
+and have not changed since.
+"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from database.database import DatabaseManager
+from database.models import ProcessedFile
+from .pdf_processor import EXTRACTOR_VERSION
+
+
+# Read size used when hashing file contents
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """
+    Compute the SHA-256 digest of a file's contents.
+    
+    Args:
+        path: File to hash
+        
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_key(path: Path) -> str:
+    """Return the manifest key (absolute, resolved path) for a file."""
+    return str(Path(path).resolve())
+
+
+class ProcessedFilesManifest:
+    """
+    Decides which files need processing and records processing outcomes.
+    
+    Files are compared cheaply first: an unchanged size and modification time
+    means the file is unchanged. When only the modification time differs the
+    content hash decides, so files that were merely touched or copied are
+    still skipped.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager,
+                 extractor_version: str = EXTRACTOR_VERSION,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the manifest.
+        
+        Args:
+            db_manager: Database manager holding the processed_files table
+            extractor_version: Extractor version recorded with each entry
+            logger: Optional logger instance
+        """
+        self.db_manager = db_manager
+        self.extractor_version = extractor_version
+        self.logger = logger or logging.getLogger(__name__)
+    
+    def partition(self, pdf_files: List[Path]) -> Tuple[List[Path], List[Path]]:
+        """
+        Split files into those needing processing and those unchanged since a successful run.
+        
+        Args:
+            pdf_files: Candidate PDF files
+            
+        Returns:
+            Tuple of (files to process, unchanged files to skip), each in input order
+        """
+        entries = self.db_manager.get_processed_files([manifest_key(p) for p in pdf_files])
+        to_process = []
+        unchanged = []
+        touched = []
+        
+        for pdf_file in pdf_files:
+            entry = entries.get(manifest_key(pdf_file))
+            if (entry is None or entry.status != 'success'
+                    or entry.extractor_version != self.extractor_version):
+                to_process.append(pdf_file)
+                continue
+            
+            try:
+                stat = os.stat(pdf_file)
+                if stat.st_size != entry.file_size:
+                    to_process.append(pdf_file)
+                elif stat.st_mtime_ns == entry.file_mtime_ns:
+                    unchanged.append(pdf_file)
+                elif hash_file(pdf_file) == entry.content_hash:
+                    # Touched but identical; remember the new mtime to avoid rehashing
+                    unchanged.append(pdf_file)
+                    entry.file_mtime_ns = stat.st_mtime_ns
+                    touched.append(entry)
+                else:
+                    to_process.append(pdf_file)
+            except OSError:
+                to_process.append(pdf_file)
+        
+        if touched:
+            self.db_manager.record_processed_files(touched)
+        
+        self.logger.info(f"Incremental run: {len(to_process)} files to process, {len(unchanged)} unchanged")
+        return to_process, unchanged
+    
+    def record(self, results: Iterable) -> int:
+        """
+        Record the outcome of processed files.
+        
+        Args:
+            results: ProcessingResult objects from a processing run
+            
+        Returns:
+            Number of manifest entries written
+        """
+        entries = []
+        for result in results:
+            path = Path(result.invoice_path)
+            try:
+                stat = os.stat(path)
+                content_hash = hash_file(path)
+            except OSError as e:
+                self.logger.debug(f"Not recording {path} in manifest: {e}")
+                continue
+            
+            entries.append(ProcessedFile(
+                file_path=manifest_key(path),
+                file_size=stat.st_size,
+                file_mtime_ns=stat.st_mtime_ns,
+                content_hash=content_hash,
+                extractor_version=self.extractor_version,
+                status='success' if result.success else 'failed',
+                invoice_number=result.invoice_number,
+                error_message=result.error_message
+            ))
+        
+        return self.db_manager.record_processed_files(entries)
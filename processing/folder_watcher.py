@@ -0,0 +1,427 @@
+"""
+Inbox folder watcher for continuous invoice processing.
+
+FolderWatcher keeps a single InvoiceProcessor (and with it the PDF libraries,
+database connections and a cached PartsIndex) resident, and processes PDFs as
+they land in an inbox directory. On Linux the directory is watched with
+inotify; elsewhere, or if inotify is unavailable, the directory is polled.
+
+Files are only processed once their size and modification time have stayed
+unchanged for a settle period, so invoices still being copied or scanned into
+the inbox are not picked up half written. Each outcome is appended to a
+rolling CSV report that starts a new file every day.
+
+The watcher runs unattended, so it never prompts for unknown parts. Its
+processor defers discovery; unknown parts are listed in the report and
+logged under the watcher's discovery session, to be resolved later with
+'discovery review' or 'parts add'.
+"""
+
+import csv
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database.models import PartDiscoveryLog
+
+from .file_discovery import is_pdf_name
+from .invoice_processor import InvoiceProcessor, ProcessingResult
+
+
+# Seconds a file's size and mtime must stay unchanged before it is processed
+DEFAULT_SETTLE_SECONDS = 2.0
+
+# Seconds between directory scans when polling
+DEFAULT_POLL_INTERVAL = 5.0
+
+# Seconds between safety rescans when inotify is delivering events
+_INOTIFY_RESCAN_INTERVAL = 60.0
+
+# inotify event masks (see <sys/inotify.h>)
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+REPORT_FIELDS = [
+    'processed_at', 'file_path', 'invoice_number', 'status', 'line_items',
+    'unknown_parts', 'unknown_part_numbers', 'validation_errors', 'processing_time', 'error_message'
+]
+
+FileSignature = Tuple[int, int]
+
+
+class PollingEventSource:
+    """Change source that simply waits out the poll interval between scans."""
+
+    name = 'polling'
+
+    def __init__(self, poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+
+    def wait(self, timeout: Optional[float] = None,
+             stop_event: Optional[threading.Event] = None) -> None:
+        """Block until the next scan is due or the watcher is stopped."""
+        timeout = self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+        if stop_event is not None:
+            stop_event.wait(timeout)
+        else:
+            time.sleep(timeout)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyEventSource:
+    """Change source backed by Linux inotify, loaded through ctypes."""
+
+    name = 'inotify'
+
+    def __init__(self, directory: Path):
+        """
+        Start watching a directory.
+
+        Raises:
+            OSError: If inotify is not available or the watch cannot be added
+        """
+        libc_name = ctypes.util.find_library('c')
+        if libc_name is None:
+            raise OSError(errno.ENOSYS, "C library not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, "inotify is not supported on this platform")
+
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+
+        watch = libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), _WATCH_MASK)
+        if watch < 0:
+            err = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(err, f"inotify_add_watch failed: {os.strerror(err)}")
+
+    def wait(self, timeout: Optional[float] = None,
+             stop_event: Optional[threading.Event] = None) -> None:
+        """Block until the directory changes, the timeout expires or the watcher is stopped."""
+        deadline = time.monotonic() + (_INOTIFY_RESCAN_INTERVAL if timeout is None else timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (stop_event is not None and stop_event.is_set()):
+                return
+            # Wake periodically so a stop request is noticed promptly
+            readable, _, _ = select.select([self._fd], [], [], min(remaining, 0.5))
+            if readable:
+                self._drain()
+                return
+
+    def _drain(self) -> None:
+        """Discard queued events; the watcher rescans the directory itself."""
+        try:
+            while os.read(self._fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_event_source(directory: Path, use_inotify: Optional[bool] = None,
+                        poll_interval: float = DEFAULT_POLL_INTERVAL,
+                        logger: Optional[logging.Logger] = None):
+    """
+    Create the best available change source for a directory.
+
+    Args:
+        directory: Directory to watch
+        use_inotify: True to require inotify, False to force polling,
+            None to use inotify when available
+        poll_interval: Seconds between scans when polling
+        logger: Optional logger
+
+    Returns:
+        InotifyEventSource or PollingEventSource
+    """
+    logger = logger or logging.getLogger(__name__)
+    if use_inotify is not False:
+        try:
+            return InotifyEventSource(directory)
+        except (OSError, AttributeError) as e:
+            if use_inotify:
+                raise
+            logger.info(f"inotify unavailable ({e}); polling every {poll_interval}s")
+    return PollingEventSource(poll_interval)
+
+
+def unknown_part_numbers(result: ProcessingResult) -> List[str]:
+    """Distinct part numbers of an invoice's lines that were not in the database."""
+    parts = (result.validation_json or {}).get('parts', [])
+    return list(dict.fromkeys(
+        part['database_fields']['part_number'] for part in parts
+        if part.get('validation_status') == 'UNKNOWN' and part.get('database_fields', {}).get('part_number')
+    ))
+
+
+class RollingReport:
+    """Append-only CSV report of watch results, one file per day."""
+
+    def __init__(self, output_dir: Path, prefix: str = 'invoice_watch'):
+        self.output_dir = Path(output_dir)
+        self.prefix = prefix
+
+    def current_path(self, now: Optional[datetime] = None) -> Path:
+        """Path of the report file that results processed at ``now`` go to."""
+        now = now or datetime.now()
+        return self.output_dir / f"{self.prefix}_{now.strftime('%Y%m%d')}.csv"
+
+    def append(self, results: List[ProcessingResult]) -> Path:
+        """
+        Append processing results to the current report file.
+
+        Args:
+            results: Results to append
+
+        Returns:
+            Path: Report file written to
+        """
+        now = datetime.now()
+        path = self.current_path(now)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        write_header = not path.exists() or path.stat().st_size == 0
+
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+            if write_header:
+                writer.writeheader()
+            for result in results:
+                writer.writerow({
+                    'processed_at': now.isoformat(timespec='seconds'),
+                    'file_path': result.invoice_path,
+                    'invoice_number': result.invoice_number or '',
+                    'status': 'success' if result.success else 'failed',
+                    'line_items': result.line_items_count,
+                    'unknown_parts': result.unknown_parts_found,
+                    'unknown_part_numbers': ' '.join(unknown_part_numbers(result)),
+                    'validation_errors': result.validation_errors,
+                    'processing_time': f"{result.processing_time:.2f}",
+                    'error_message': result.error_message or ''
+                })
+        return path
+
+
+class FolderWatcher:
+    """
+    Processes PDFs dropped into an inbox directory with a resident InvoiceProcessor.
+
+    Files already recorded as successfully processed in the processed-files
+    manifest are skipped, so restarting the watcher does not reprocess the
+    inbox. A file is processed again only if its contents change.
+
+    The processor must defer discovery (``defer_discovery=True``); unknown
+    parts of each invoice are logged as discovered under
+    ``discovery_session_id``.
+    """
+
+    def __init__(self,
+                 processor: InvoiceProcessor,
+                 inbox: Path,
+                 report: RollingReport,
+                 settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 use_inotify: Optional[bool] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            processor: Invoice processor kept resident for all files
+            inbox: Directory to watch for new PDFs
+            report: Rolling report that results are appended to
+            settle_seconds: Seconds a file must stay unchanged before processing
+            poll_interval: Seconds between scans when inotify is unavailable
+            use_inotify: True to require inotify, False to force polling,
+                None to use inotify when available
+            logger: Optional logger
+        """
+        self.processor = processor
+        self.inbox = Path(inbox)
+        self.report = report
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.logger = logger or logging.getLogger(__name__)
+        self.discovery_session_id = str(uuid.uuid4())
+
+        # Files waiting to settle: path -> (signature, monotonic time first seen with it)
+        self._pending: Dict[Path, Tuple[FileSignature, float]] = {}
+        # Signatures of files already handled in this session
+        self._handled: Dict[Path, FileSignature] = {}
+
+        self.files_processed = 0
+        self.files_failed = 0
+        self.files_skipped = 0
+
+    def scan(self) -> List[Path]:
+        """
+        Scan the inbox and return files that have settled and need processing.
+
+        Returns:
+            List[Path]: Settled PDF files, in name order
+        """
+        now = time.monotonic()
+        present = set()
+        ready = []
+
+        try:
+            entries = list(os.scandir(self.inbox))
+        except OSError as e:
+            self.logger.warning(f"Cannot scan inbox {self.inbox}: {e}")
+            return []
+
+        for entry in entries:
+            if not is_pdf_name(entry.name) or entry.name.startswith('.'):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+
+            path = Path(entry.path)
+            present.add(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+
+            if self._handled.get(path) == signature:
+                continue
+
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                self._pending[path] = (signature, now)
+            elif stat.st_size > 0 and now - pending[1] >= self.settle_seconds:
+                ready.append(path)
+
+        # Forget files that were moved away or deleted
+        for path in list(self._pending):
+            if path not in present:
+                del self._pending[path]
+        for path in list(self._handled):
+            if path not in present:
+                del self._handled[path]
+
+        return sorted(ready)
+
+    def process_ready_files(self, ready: List[Path]) -> List[ProcessingResult]:
+        """
+        Process settled files and append their results to the rolling report.
+
+        Args:
+            ready: Settled files returned by ``scan``
+
+        Returns:
+            List[ProcessingResult]: Results for files that were processed
+        """
+        signatures = {path: self._pending.pop(path)[0] for path in ready}
+        to_process, unchanged = self.processor.filter_unchanged_files(ready)
+        self.files_skipped += len(unchanged)
+        for path in unchanged:
+            self._handled[path] = signatures[path]
+
+        if to_process:
+            self.processor.validation_engine.reload_tolerance_rules()
+
+        results = []
+        for path in to_process:
+            if self.processor.parts_index is not None:
+                try:
+                    self.processor.parts_index.refresh()
+                except Exception as e:
+                    self.logger.warning(f"Could not refresh parts index: {e}")
+
+            result = self.processor.process_single_invoice(path)
+            self.processor.record_processed_files([result])
+            self._handled[path] = signatures[path]
+            results.append(result)
+            self._log_unknown_parts(result, self.processor.take_deferred_unknown_parts())
+
+            if result.success:
+                self.files_processed += 1
+                self.logger.info(f"Processed {path.name}: invoice {result.invoice_number}, "
+                                 f"{result.validation_errors} validation errors")
+            else:
+                self.files_failed += 1
+                self.logger.warning(f"Failed to process {path.name}: {result.error_message}")
+
+        if results:
+            self.report.append(results)
+        return results
+
+    def _log_unknown_parts(self, result: ProcessingResult, unknown_parts: List[Dict[str, Any]]) -> None:
+        """Log an invoice's unknown parts as discovered, for review after the fact."""
+        if not unknown_parts:
+            return
+        for part_data in unknown_parts:
+            db_fields = part_data.get('database_fields', {})
+            price = db_fields.get('authorized_price')
+            try:
+                self.processor.db_manager.create_discovery_log(PartDiscoveryLog(
+                    part_number=db_fields.get('part_number'),
+                    action_taken='discovered',
+                    invoice_number=result.invoice_number,
+                    discovered_price=Decimal(str(price)) if price else None,
+                    processing_session_id=self.discovery_session_id,
+                    notes=db_fields.get('description')
+                ))
+            except Exception as e:
+                self.logger.warning(f"Could not log unknown part {db_fields.get('part_number')}: {e}")
+        self.logger.info(f"{len(unknown_parts)} unknown part(s) on invoice {result.invoice_number}; "
+                         f"review with 'discovery review --session-id {self.discovery_session_id}'")
+
+    def poll_once(self) -> List[ProcessingResult]:
+        """Scan the inbox once and process any settled files."""
+        return self.process_ready_files(self.scan())
+
+    def run(self, stop_event: Optional[threading.Event] = None,
+            max_cycles: Optional[int] = None) -> None:
+        """
+        Watch the inbox until stopped.
+
+        Args:
+            stop_event: Event that ends the loop when set
+            max_cycles: Optional number of scan cycles after which to return
+        """
+        stop_event = stop_event or threading.Event()
+        source = create_event_source(self.inbox, self.use_inotify, self.poll_interval, self.logger)
+        self.logger.info(f"Watching {self.inbox} using {source.name}")
+
+        cycles = 0
+        try:
+            while not stop_event.is_set():
+                self.poll_once()
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    break
+
+                # While files are settling, rescan as soon as they could be ready
+                timeout = self.settle_seconds if self._pending else None
+                source.wait(timeout, stop_event)
+        finally:
+            source.close()
@@ -110,19 +110,35 @@ Error Handling:
 
 import logging
 import json
+import os
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Callable, Union
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 import time
 
+from .binary_codec import decode_value, encode_value
+from .models import LineItemBatch
 from .pdf_processor import PDFProcessor
 from .validation_engine import ValidationEngine
-from .part_discovery import SimplePartDiscoveryService
+from .validation_models import ValidationConfiguration
+from .part_discovery import BatchDiscoverySession, SimplePartDiscoveryService
+from .batch_aggregator import SpillingBatchAggregator
+from .rollups import LineRollups
+from .batch_pipeline import DEFAULT_QUEUE_SIZE, END_OF_STREAM, MeteredQueue, PipelineStopped
+from .file_discovery import find_pdf_files, order_by_cost
+from .file_manifest import ProcessedFilesManifest, hash_file, manifest_key
+from .run_journal import RunJournal, split_journaled_files
 from .report_generator import SimpleReportGenerator
 from .exceptions import PDFProcessingError
 from .report_utils import get_documents_directory, get_report_summary_message
 from database.database import DatabaseManager
+from database.models import Part, build_composite_key
+from database.parts_index import PartsIndex
 
 
 @dataclass
@@ -153,7 +169,11 @@ class BatchProcessingResult:
     total_line_items: int = 0
     total_unknown_parts: int = 0
     total_validation_errors: int = 0
+    skipped_files: int = 0
+    resumed_files: int = 0
+    run_id: Optional[str] = None
     report_files: Dict[str, Path] = field(default_factory=dict)
+    stage_metrics: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
 
 class InvoiceProcessor:
@@ -167,7 +187,13 @@ class InvoiceProcessor:
     def __init__(self,
                  database_manager: DatabaseManager,
                  progress_callback: Optional[Callable[[int, int, str], None]] = None,
-                 logger: Optional[logging.Logger] = None):
+                 logger: Optional[logging.Logger] = None,
+                 pipeline_queue_size: int = DEFAULT_QUEUE_SIZE,
+                 parts_index: Optional[PartsIndex] = None,
+                 largest_first: bool = True,
+                 defer_discovery: bool = False,
+                 discovery_session: Optional[BatchDiscoverySession] = None,
+                 validation_config: Optional[ValidationConfiguration] = None):
         """
         Initialize the invoice processor.
         
@@ -175,16 +201,37 @@ class InvoiceProcessor:
             database_manager: Database manager for parts operations
             progress_callback: Callback function for progress updates (current, total, message)
             logger: Optional logger instance
+            pipeline_queue_size: Capacity of each queue between directory processing stages
+            parts_index: Optional cached parts index shared across invoices
+            largest_first: Start the largest PDFs first in parallel extraction so a
+                slow invoice does not run alone at the end of the batch
+            defer_discovery: Collect unknown parts in ``deferred_unknown_parts``
+                instead of prompting, for the caller to resolve later (used in
+                worker processes, which have no terminal to prompt on)
+            discovery_session: Optional discovery session to share with other
+                processors, e.g. across the folders of a batch; otherwise each
+                directory run or single invoice gets its own session
+            validation_config: Optional validation configuration, e.g. with the
+                price tolerance chosen on the command line
         """
         self.db_manager = database_manager
         self.progress_callback = progress_callback
         self.logger = logger or self._create_default_logger()
+        self.pipeline_queue_size = pipeline_queue_size
+        self.parts_index = parts_index
+        self.largest_first = largest_first
+        self.defer_discovery = defer_discovery
+        self.discovery_session = discovery_session
+        self._deferred_unknown_parts: Dict[str, Dict[str, Any]] = {}
         
         # Initialize processing components - interactive mode is always enabled
         self.pdf_processor = PDFProcessor(self.logger)
-        self.validation_engine = ValidationEngine(self.db_manager)
         self.discovery_service = SimplePartDiscoveryService(self.db_manager)
+        self.validation_engine = ValidationEngine(
+            self.db_manager, validation_config, parts_index=parts_index, discovery_service=self.discovery_service
+        )
         self.report_generator = SimpleReportGenerator()
+        self.manifest = ProcessedFilesManifest(self.db_manager, logger=self.logger)
         
         # Processing statistics
         self.reset_statistics()
@@ -202,6 +249,17 @@ class InvoiceProcessor:
             logger.setLevel(logging.INFO)
         return logger
     
+    @property
+    def deferred_unknown_parts(self) -> List[Dict[str, Any]]:
+        """Unknown parts collected while discovery is deferred, one per composite key."""
+        return list(self._deferred_unknown_parts.values())
+    
+    def take_deferred_unknown_parts(self) -> List[Dict[str, Any]]:
+        """Return the unknown parts collected so far and start collecting afresh."""
+        unknown_parts = self.deferred_unknown_parts
+        self._deferred_unknown_parts.clear()
+        return unknown_parts
+    
     def reset_statistics(self):
         """Reset processing statistics."""
         self.total_invoices_processed = 0
@@ -240,19 +298,8 @@ class InvoiceProcessor:
             result.invoice_number = extraction_json.get('invoice_metadata', {}).get('invoice_number')
             result.line_items_count = len(extraction_json.get('parts', []))
             
-            # Step 2: Discover unknown parts (with human-in-the-loop if enabled)
-            extraction_json = self._discover_parts(extraction_json)
-            
-            # Step 3: Validate against database
-            validation_json = self._validate_invoice(extraction_json)
-            result.validation_json = validation_json
-            
-            # Update statistics
-            result.unknown_parts_found = validation_json.get('validation_summary', {}).get('unknown_parts', 0)
-            result.validation_errors = validation_json.get('validation_summary', {}).get('failed_parts', 0)
-            
-            # Mark as successful
-            result.success = True
+            # Steps 2 and 3: Discover unknown parts and validate against database
+            self._complete_invoice(result)
             result.processing_time = time.time() - start_time
             
             self.logger.info(f"Successfully processed invoice {result.invoice_number}")
@@ -268,17 +315,111 @@ class InvoiceProcessor:
         
         return result
     
+    def _complete_invoice(self, result: ProcessingResult, interactive_discovery: bool = True,
+                          resolved_parts: Optional[Dict[str, Optional[Part]]] = None) -> None:
+        """
+        Run discovery and validation for an extracted invoice and record the outcome.
+        
+        Args:
+            result: Processing result holding the extraction JSON
+            interactive_discovery: Whether to prompt for unknown parts; disabled when
+                discovery already ran for the whole batch
+            resolved_parts: Part map already resolved for the invoice, e.g. for the
+                whole batch; parts missing from it are resolved here
+        """
+        extraction_json = result.extraction_json
+        
+        # Resolve every distinct part once; discovery and validation share the map
+        resolved_parts = self.validation_engine.resolve_parts(extraction_json.get('parts', []), resolved_parts)
+        
+        if interactive_discovery and self.defer_discovery:
+            self._defer_unknown_parts([extraction_json], resolved_parts)
+            interactive_discovery = False
+        
+        # Within a directory run this joins the run's session
+        with self.discovery_service.batch_session(self.discovery_session):
+            # Step 2: Discover unknown parts (with human-in-the-loop if enabled)
+            if interactive_discovery:
+                extraction_json = self._discover_parts(extraction_json, resolved_parts)
+            
+            # Step 3: Validate against database
+            validation_json = self._validate_invoice(extraction_json, interactive_discovery=interactive_discovery,
+                                                     resolved_parts=resolved_parts)
+        result.validation_json = validation_json
+        self._record_rates(result)
+        
+        # Update statistics
+        result.unknown_parts_found = validation_json.get('validation_summary', {}).get('unknown_parts', 0)
+        result.validation_errors = validation_json.get('validation_summary', {}).get('failed_parts', 0)
+        
+        # Mark as successful
+        result.success = True
+    
+    def _record_rates(self, result: ProcessingResult) -> None:
+        """
+        Fold a validated invoice's rates into the per-part statistics.
+        
+        Rates are deduplicated by invoice number; an invoice without one is
+        keyed by the content hash of its PDF, so processing it again is not
+        counted twice either.
+        
+        Args:
+            result: Processing result holding the final validation JSON
+        """
+        if not self.validation_engine.config.track_rate_stats:
+            return
+        source_key = result.invoice_number
+        if not source_key:
+            try:
+                source_key = f"sha256:{hash_file(Path(result.invoice_path))}"
+            except OSError as e:
+                self.logger.debug(f"Not recording rates of {result.invoice_path}: {e}")
+                return
+        self.validation_engine.record_rates(result.validation_json, source_key)
+    
     def process_directory(self, 
                          input_dir: Union[str, Path],
                          output_path: Optional[Union[str, Path]] = None,
-                         recursive: bool = True) -> BatchProcessingResult:
+                         recursive: bool = True,
+                         parallel: bool = False,
+                         max_workers: Optional[int] = None,
+                         incremental: bool = False,
+                         run_id: Optional[str] = None) -> BatchProcessingResult:
         """
         Process all PDF invoices in a directory.
         
+        Invoices flow through a staged pipeline: an extraction stage feeds a
+        bounded queue, the validation stage (which owns database access and
+        interactive prompts) runs in the calling thread, and a report-writer
+        thread writes per-invoice reports as results arrive.
+        
+        In parallel mode extraction runs in a process pool, unknown parts from
+        all invoices are collected and offered for discovery once, and
+        validation then runs over the complete set of extractions.
+        
+        Every processed file is recorded in the processed-files manifest. In
+        incremental mode files that were processed successfully and have not
+        changed since are skipped.
+        
+        The run is journaled: each file's result is stored as soon as it is
+        final. Passing the ``run_id`` of an interrupted run resumes it, reusing
+        the journaled results instead of extracting those files again.
+        
+        When reports are written, each invoice's validation JSON is spilled to
+        a temporary file as soon as it is final and the batch reports are
+        streamed from there, so memory use does not grow with the batch. The
+        extraction and validation JSON of the returned results is released
+        once it has been written out; ``aggregated_validation_json`` then
+        holds the batch summary only.
+        
         Args:
             input_dir: Directory containing PDF invoices
             output_path: Optional output directory for reports
             recursive: Whether to search subdirectories
+            parallel: Extract invoices in a process pool with deferred discovery
+            max_workers: Maximum worker processes (defaults to the CPU count)
+            incremental: Skip files unchanged since a successful earlier run
+            run_id: Run to resume or start; a new run ID is generated when omitted
             
         Returns:
             BatchProcessingResult with aggregated results and reports
@@ -309,63 +450,455 @@ class InvoiceProcessor:
             failed_files=0
         )
         
-        # Process each file
-        all_validation_results = []
+        if incremental:
+            pdf_files, unchanged_files = self.filter_unchanged_files(pdf_files)
+            batch_result.skipped_files = len(unchanged_files)
+            if not pdf_files:
+                self.logger.info("All PDF files are unchanged since the last successful run")
+                batch_result.total_processing_time = time.time() - start_time
+                return batch_result
         
-        for i, pdf_file in enumerate(pdf_files, 1):
-            # Update progress
-            if self.progress_callback:
-                self.progress_callback(i, len(pdf_files), f"Processing {pdf_file.name}")
-            
-            # Process single invoice
-            result = self.process_single_invoice(pdf_file, output_path)
-            batch_result.processing_results.append(result)
-            
-            # Update batch statistics
-            if result.success:
-                batch_result.successful_files += 1
-                batch_result.total_line_items += result.line_items_count
-                batch_result.total_unknown_parts += result.unknown_parts_found
-                batch_result.total_validation_errors += result.validation_errors
-                
-                # Collect validation results for aggregation
-                if result.validation_json:
-                    all_validation_results.append(result.validation_json)
-            else:
-                batch_result.failed_files += 1
-            
-            self.logger.info(f"Processed {i}/{len(pdf_files)}: {pdf_file.name} "
-                           f"({'SUCCESS' if result.success else 'FAILED'})")
+        output_path = Path(output_path) if output_path else None
+        journal = self.open_run_journal(run_id or str(uuid.uuid4()), input_dir, output_path, len(pdf_files))
+        batch_result.run_id = journal.run_id if journal else None
+        
+        # Spill validation results to disk for the batch report as they complete
+        aggregator = SpillingBatchAggregator() if output_path else None
         
-        # Generate individual reports for each invoice AND batch reports
-        if output_path:
-            output_path = Path(output_path)
-            
-            # Generate individual reports for each successful invoice
-            for result in batch_result.processing_results:
-                if result.success and result.validation_json:
-                    invoice_base_name = Path(result.invoice_path).stem
-                    individual_reports = self.generate_reports(
-                        result.validation_json,
-                        output_path,
-                        f"{invoice_base_name}_validation"
-                    )
-                    self.logger.info(f"Generated individual reports for {invoice_base_name}: {list(individual_reports.keys())}")
+        try:
+            restored = self._restore_journaled_results(journal)
+            pending_files = split_journaled_files(pdf_files, restored)
+            batch_result.resumed_files = len(pdf_files) - len(pending_files)
+            if batch_result.resumed_files:
+                self.logger.info(f"Reusing {batch_result.resumed_files} journaled results, "
+                               f"{len(pending_files)} files remaining")
             
-            # Generate consolidated batch reports
-            if all_validation_results:
-                batch_result.aggregated_validation_json = self._create_batch_validation_json(all_validation_results)
-                batch_result.report_files = self._generate_batch_reports(
-                    batch_result.aggregated_validation_json,
-                    output_path
+            positions = {pdf_file: index for index, pdf_file in enumerate(pdf_files)}
+            
+            def on_result(index: int, result: ProcessingResult) -> None:
+                if journal:
+                    journal.record(result)
+                if aggregator is not None:
+                    self._aggregate_result(aggregator, positions[pending_files[index]], result)
+            
+            for pdf_file in pdf_files:
+                if aggregator is not None and manifest_key(pdf_file) in restored:
+                    self._aggregate_result(aggregator, positions[pdf_file], restored[manifest_key(pdf_file)])
+            
+            new_results = []
+            if pending_files:
+                new_results, batch_result.stage_metrics = self._run_pipeline(
+                    pending_files, output_path, parallel and len(pending_files) > 1, max_workers, on_result
                 )
+            
+            new_by_key = {manifest_key(Path(result.invoice_path)): result for result in new_results}
+            results = [restored.get(manifest_key(pdf_file)) or new_by_key[manifest_key(pdf_file)]
+                       for pdf_file in pdf_files]
+            
+            for result in results:
+                self._add_batch_result(batch_result, result)
+            self.record_processed_files(new_results)
+            
+            # Generate consolidated batch reports
+            if aggregator is not None and len(aggregator):
+                batch_result.aggregated_validation_json = aggregator.summary_json()
+                batch_result.report_files = self._generate_batch_reports(aggregator, output_path)
+        except BaseException:
+            if journal:
+                journal.finish('interrupted')
+                self.logger.warning(f"Processing run {journal.run_id} interrupted; "
+                                  f"resume it to continue where it stopped")
+            raise
+        finally:
+            if aggregator is not None:
+                aggregator.close()
         
+        if journal:
+            journal.finish('completed')
         batch_result.total_processing_time = time.time() - start_time
         
         self.logger.info(f"Directory processing complete: {batch_result.successful_files}/{batch_result.total_files} successful")
         
         return batch_result
     
+    def filter_unchanged_files(self, pdf_files: List[Path]):
+        """
+        Split files into those needing processing and those unchanged since a successful run.
+        
+        Args:
+            pdf_files: Candidate PDF files
+            
+        Returns:
+            Tuple of (files to process, unchanged files)
+        """
+        try:
+            return self.manifest.partition(pdf_files)
+        except Exception as e:
+            self.logger.warning(f"Could not read processed files manifest, processing all files: {e}")
+            return list(pdf_files), []
+    
+    def record_processed_files(self, results: List[ProcessingResult]) -> None:
+        """
+        Record processing outcomes in the processed-files manifest.
+        
+        Failures are logged rather than raised so bookkeeping never fails a run.
+        
+        Args:
+            results: Results of the files that were processed
+        """
+        try:
+            self.manifest.record(results)
+        except Exception as e:
+            self.logger.warning(f"Could not update processed files manifest: {e}")
+    
+    def open_run_journal(self, run_id: str, input_dir: Path, output_path: Optional[Path],
+                         total_files: int) -> Optional[RunJournal]:
+        """
+        Start or resume the journal for a directory run.
+        
+        Failures are logged rather than raised; the run then proceeds unjournaled.
+        
+        Args:
+            run_id: Run identifier
+            input_dir: Directory being processed
+            output_path: Directory reports are written to
+            total_files: Number of PDFs in the run
+            
+        Returns:
+            RunJournal, or None if the journal is unavailable
+        """
+        try:
+            return RunJournal.open(self.db_manager, run_id, input_dir, output_path, total_files, self.logger)
+        except Exception as e:
+            self.logger.warning(f"Could not open run journal, run cannot be resumed: {e}")
+            return None
+    
+    def _restore_journaled_results(self, journal: Optional[RunJournal]) -> Dict[str, ProcessingResult]:
+        """Rebuild ProcessingResults for files already completed in a journaled run."""
+        if journal is None:
+            return {}
+        
+        try:
+            completed = journal.completed_results()
+        except Exception as e:
+            self.logger.warning(f"Could not read run journal, processing all files: {e}")
+            return {}
+        
+        field_names = {f.name for f in fields(ProcessingResult)}
+        return {
+            key: ProcessingResult(**{name: value for name, value in data.items() if name in field_names})
+            for key, data in completed.items()
+        }
+    
+    def _add_batch_result(self, batch_result: BatchProcessingResult, result: ProcessingResult) -> None:
+        """Record a single invoice result in the batch totals."""
+        batch_result.processing_results.append(result)
+        
+        if result.success:
+            batch_result.successful_files += 1
+            batch_result.total_line_items += result.line_items_count
+            batch_result.total_unknown_parts += result.unknown_parts_found
+            batch_result.total_validation_errors += result.validation_errors
+        else:
+            batch_result.failed_files += 1
+    
+    def _aggregate_result(self, aggregator: SpillingBatchAggregator, position: int,
+                          result: ProcessingResult) -> None:
+        """
+        Spill a final result to the batch aggregator and release its extraction data.
+        
+        The validation JSON of successful results is released by the report
+        writer once the individual reports are written.
+        """
+        if result.success and result.validation_json:
+            aggregator.add(position, result.validation_json)
+        else:
+            result.validation_json = None
+        result.extraction_json = None
+    
+    def _run_pipeline(self, pdf_files: List[Path], output_path: Optional[Path],
+                      parallel: bool, max_workers: Optional[int],
+                      on_result: Optional[Callable[[int, ProcessingResult], None]] = None):
+        """
+        Run the extract -> validate -> report pipeline over a list of PDFs.
+        
+        Args:
+            pdf_files: PDF files to process
+            output_path: Directory for per-invoice reports, or None to skip them
+            parallel: Extract in a process pool and defer discovery to one batch pass
+            max_workers: Maximum worker processes for parallel extraction
+            on_result: Optional callback receiving ``(index, result)`` as each result is final
+            
+        Returns:
+            Tuple of (ProcessingResult per file in input order, stage metrics by stage name)
+        """
+        stop_event = threading.Event()
+        extracted_queue = MeteredQueue('extraction', self.pipeline_queue_size, stop_event)
+        report_queue = MeteredQueue('reports', self.pipeline_queue_size, stop_event) if output_path else None
+        report_errors: List[BaseException] = []
+        
+        extractor = threading.Thread(
+            target=self._extraction_stage,
+            args=(pdf_files, extracted_queue, parallel, max_workers),
+            name='invoice-extraction',
+            daemon=True
+        )
+        writer = None
+        if report_queue is not None:
+            writer = threading.Thread(
+                target=self._report_stage,
+                args=(report_queue, output_path, report_errors, stop_event),
+                name='invoice-reports',
+                daemon=True
+            )
+            writer.start()
+        extractor.start()
+        
+        try:
+            # One discovery session for the run, so each unknown part is offered once
+            with self.discovery_service.batch_session(self.discovery_session):
+                if parallel:
+                    results = self._validation_stage_deferred(pdf_files, extracted_queue, report_queue, on_result)
+                else:
+                    results = self._validation_stage(pdf_files, extracted_queue, report_queue, on_result)
+            if report_queue is not None:
+                report_queue.put(END_OF_STREAM)
+        except PipelineStopped:
+            # Another stage failed and stopped the pipeline; its error is raised below
+            if not report_errors:
+                raise
+        except BaseException:
+            stop_event.set()
+            raise
+        finally:
+            if writer is not None:
+                writer.join()
+            extractor.join()
+        
+        if report_errors:
+            raise report_errors[0]
+        
+        stage_metrics = {extracted_queue.metrics.name: extracted_queue.metrics.to_dict()}
+        if report_queue is not None:
+            stage_metrics[report_queue.metrics.name] = report_queue.metrics.to_dict()
+        self.logger.debug(f"Pipeline stage metrics: {stage_metrics}")
+        
+        return results, stage_metrics
+    
+    def _extraction_stage(self, pdf_files: List[Path], extracted_queue: MeteredQueue,
+                          parallel: bool, max_workers: Optional[int]) -> None:
+        """Extract invoices and feed ``(index, outcome)`` pairs to the validation stage."""
+        try:
+            if parallel:
+                self._extract_in_pool(pdf_files, extracted_queue, max_workers)
+            else:
+                for index, pdf_file in enumerate(pdf_files):
+                    extracted_queue.put((index, _run_extraction(self.pdf_processor, pdf_file, self.logger)))
+        except PipelineStopped:
+            self.logger.debug("Extraction stage stopped")
+            return
+        except Exception as e:
+            # Invoices never handed over are reported as failed by the validation stage
+            self.logger.error(f"Extraction stage failed: {e}")
+        
+        try:
+            extracted_queue.put(END_OF_STREAM)
+        except PipelineStopped:
+            pass
+    
+    def _extract_in_pool(self, pdf_files: List[Path], extracted_queue: MeteredQueue,
+                         max_workers: Optional[int]) -> None:
+        """Extract invoices in a process pool, keeping at most a bounded number in flight."""
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(pdf_files)))
+        remaining = set(range(len(pdf_files)))
+        self.logger.info(f"Extracting {len(pdf_files)} invoices with {workers} worker processes")
+        
+        # Submission order only; results keep their input positions
+        schedule = list(range(len(pdf_files)))
+        if self.largest_first:
+            position = {pdf_file: index for index, pdf_file in enumerate(pdf_files)}
+            schedule = [position[pdf_file] for pdf_file in order_by_cost(pdf_files)]
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                in_flight = {}
+                next_slot = 0
+                while next_slot < len(schedule) or in_flight:
+                    # Submit only as much work as the workers can absorb; a full
+                    # queue blocks the loop below and stops further submissions
+                    while next_slot < len(schedule) and len(in_flight) < workers * 2:
+                        index = schedule[next_slot]
+                        future = executor.submit(_extract_invoice_worker, str(pdf_files[index]))
+                        in_flight[future] = index
+                        next_slot += 1
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        index = in_flight.pop(future)
+                        extracted_queue.put((index, decode_value(future.result())))
+                        remaining.discard(index)
+        except (OSError, BrokenProcessPool) as e:
+            # Pools can be unavailable (restricted environments) or die mid-run;
+            # finish whatever is left in this process
+            self.logger.warning(f"Process pool unavailable ({e}); extracting remaining invoices serially")
+            for index in sorted(remaining):
+                extracted_queue.put((index, _run_extraction(self.pdf_processor, pdf_files[index], self.logger)))
+    
+    def _validation_stage(self, pdf_files: List[Path], extracted_queue: MeteredQueue,
+                          report_queue: Optional[MeteredQueue],
+                          on_result: Optional[Callable[[int, ProcessingResult], None]] = None) -> List[ProcessingResult]:
+        """Discover and validate each invoice as its extraction arrives."""
+        results: List[Optional[ProcessingResult]] = [None] * len(pdf_files)
+        processed = 0
+        
+        while True:
+            item = extracted_queue.get()
+            if item is END_OF_STREAM:
+                break
+            index, outcome = item
+            pdf_file = pdf_files[index]
+            processed += 1
+            
+            # Update progress
+            if self.progress_callback:
+                self.progress_callback(processed, len(pdf_files), f"Processing {pdf_file.name}")
+            
+            result = ProcessingResult(success=False, invoice_path=str(pdf_file))
+            self._apply_extraction_outcome(result, outcome)
+            if result.extraction_json is not None:
+                start_time = time.time()
+                try:
+                    self._complete_invoice(result)
+                    self.logger.info(f"Successfully processed invoice {result.invoice_number}")
+                except Exception as e:
+                    result.error_message = str(e)
+                    result.error_type = type(e).__name__
+                    self.logger.error(f"Error processing invoice {pdf_file}: {e}")
+                result.processing_time += time.time() - start_time
+            
+            results[index] = result
+            if on_result:
+                on_result(index, result)
+            self._queue_report(report_queue, result)
+            
+            self.logger.info(f"Processed {processed}/{len(pdf_files)}: {pdf_file.name} "
+                           f"({'SUCCESS' if result.success else 'FAILED'})")
+        
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = ProcessingResult(
+                    success=False,
+                    invoice_path=str(pdf_files[index]),
+                    error_message="Extraction did not complete",
+                    error_type='PDFProcessingError'
+                )
+        
+        return results
+    
+    def _validation_stage_deferred(self, pdf_files: List[Path], extracted_queue: MeteredQueue,
+                                   report_queue: Optional[MeteredQueue],
+                                   on_result: Optional[Callable[[int, ProcessingResult], None]] = None) -> List[ProcessingResult]:
+        """Collect every extraction, run one batch discovery pass, then validate."""
+        results = [ProcessingResult(success=False, invoice_path=str(pdf_file)) for pdf_file in pdf_files]
+        extracted_count = 0
+        
+        # Step 1: Collect extractions as the worker processes finish them
+        while True:
+            item = extracted_queue.get()
+            if item is END_OF_STREAM:
+                break
+            index, outcome = item
+            extracted_count += 1
+            self._apply_extraction_outcome(results[index], outcome)
+            
+            if self.progress_callback:
+                self.progress_callback(extracted_count, len(pdf_files), f"Extracted {pdf_files[index].name}")
+        
+        incomplete = set()
+        for index, result in enumerate(results):
+            if result.extraction_json is None and result.error_message is None:
+                result.error_message = "Extraction did not complete"
+                result.error_type = 'PDFProcessingError'
+                incomplete.add(index)
+        
+        extracted = [result for result in results if result.extraction_json is not None]
+        
+        # Step 2: Discover unknown parts across the whole batch with a single prompt session
+        if extracted:
+            try:
+                self.logger.debug("Step 2: Discovering unknown parts across batch")
+                extraction_jsons = [result.extraction_json for result in extracted]
+                if self.defer_discovery:
+                    self._defer_unknown_parts(extraction_jsons)
+                else:
+                    self.discovery_service.discover_and_add_parts_batch(extraction_jsons)
+            except Exception as e:
+                self.logger.error(f"Batch part discovery failed: {e}")
+        
+        # Step 3: Validate every extracted invoice against the updated database,
+        # resolving each distinct part of the batch once
+        resolved_parts: Dict[str, Optional[Part]] = {}
+        for index, result in enumerate(results):
+            if result.extraction_json is not None:
+                start_time = time.time()
+                try:
+                    # Unknown parts were already offered once for the whole batch
+                    self._complete_invoice(result, interactive_discovery=False, resolved_parts=resolved_parts)
+                except Exception as e:
+                    result.error_message = str(e)
+                    result.error_type = type(e).__name__
+                    self.logger.error(f"Error validating invoice {result.invoice_path}: {e}")
+                result.processing_time += time.time() - start_time
+            # Files whose extraction never finished stay unjournaled so a resume retries them
+            if on_result and index not in incomplete:
+                on_result(index, result)
+            self._queue_report(report_queue, result)
+        
+        return results
+    
+    def _queue_report(self, report_queue: Optional[MeteredQueue], result: ProcessingResult) -> None:
+        """Hand a validated invoice to the report writer."""
+        if report_queue is not None and result.success and result.validation_json:
+            report_queue.put(result)
+    
+    def _report_stage(self, report_queue: MeteredQueue, output_path: Path,
+                      errors: List[BaseException], stop_event: threading.Event) -> None:
+        """Write individual reports for each invoice as results arrive."""
+        try:
+            while True:
+                result = report_queue.get()
+                if result is END_OF_STREAM:
+                    return
+                invoice_base_name = Path(result.invoice_path).stem
+                individual_reports = self.generate_reports(
+                    result.validation_json,
+                    output_path,
+                    f"{invoice_base_name}_validation"
+                )
+                # The batch report reads this invoice from the spill file
+                result.validation_json = None
+                self.logger.info(f"Generated individual reports for {invoice_base_name}: {list(individual_reports.keys())}")
+        except PipelineStopped:
+            self.logger.debug("Report stage stopped")
+        except Exception as e:
+            self.logger.error(f"Report writer failed: {e}")
+            errors.append(e)
+            stop_event.set()
+    
+    def _apply_extraction_outcome(self, result: ProcessingResult, outcome: Dict[str, Any]) -> None:
+        """Copy an extraction outcome onto a processing result."""
+        result.processing_time = outcome['processing_time']
+        extraction_json = outcome.get('extraction_json')
+        if extraction_json is None:
+            result.error_message = outcome.get('error_message')
+            result.error_type = outcome.get('error_type')
+            self.logger.error(f"Error processing invoice {result.invoice_path}: {result.error_message}")
+            return
+        
+        result.extraction_json = extraction_json
+        result.invoice_number = extraction_json.get('invoice_metadata', {}).get('invoice_number')
+        result.line_items_count = len(extraction_json.get('parts', []))
+    
     def process_with_discovery(self,
                              input_path: Union[str, Path],
                              output_path: Optional[Union[str, Path]] = None) -> Union[ProcessingResult, BatchProcessingResult]:
@@ -453,6 +986,8 @@ class InvoiceProcessor:
             output_files['txt'] = output_dir / date_folder / f"{base_name}_report_{timestamp}.txt"
         if generate_all_formats or preferred_format == 'csv':
             output_files['csv'] = output_dir / date_folder / f"{base_name}_analysis_{timestamp}.csv"
+        if 'rollups_csv' in reports:
+            output_files['rollups_csv'] = output_dir / date_folder / f"{base_name}_analysis_{timestamp}_rollups.csv"
         
         self.logger.info(f"Generated reports in directory: {output_dir / date_folder}")
         return output_files
@@ -472,58 +1007,26 @@ class InvoiceProcessor:
         # Process the PDF to get structured data
         invoice_data = self.pdf_processor.process_pdf(pdf_path)
         
-        # Convert to extraction JSON format expected by validation engine
-        extraction_json = {
-            'invoice_metadata': {
-                'invoice_number': invoice_data.invoice_number,
-                'invoice_date': invoice_data.invoice_date,
-                'customer_number': invoice_data.customer_number,
-                'customer_name': invoice_data.customer_name,
-                'total_line_items': len(invoice_data.line_items),
-                'pdf_path': str(pdf_path),
-                'extraction_timestamp': invoice_data.extraction_timestamp.isoformat() if invoice_data.extraction_timestamp else None
-            },
-            'format_sections': [section.to_dict() for section in invoice_data.format_sections],
-            'parts': []
-        }
-        
-        # Convert line items to parts format
-        for i, line_item in enumerate(invoice_data.line_items):
-            self.logger.info(f"[H3] Processing line item {i+1}: item_code='{line_item.item_code}', rate={line_item.rate}, description='{line_item.description}'")
-            
-            if line_item.is_valid():
-                part_data = {
-                    'database_fields': {
-                        'part_number': line_item.item_code,
-                        'authorized_price': float(line_item.rate) if line_item.rate else None,
-                        'description': line_item.description,
-                        'item_type': line_item.item_type,
-                        'category': None,  # Will be determined by database lookup
-                        'source': 'extracted',
-                        'first_seen_invoice': invoice_data.invoice_number
-                    },
-                    'lineitem_fields': {
-                        'line_number': line_item.line_number,
-                        'quantity': line_item.quantity,
-                        'total': float(line_item.total) if line_item.total else None,
-                        'raw_text': line_item.raw_text
-                    }
-                }
-                
-                self.logger.info(f"[H3] Line item {i+1} mapped to part_data: part_number='{part_data['database_fields']['part_number']}', authorized_price={part_data['database_fields']['authorized_price']}")
-                extraction_json['parts'].append(part_data)
-            else:
-                self.logger.warning(f"[H3] Line item {i+1} is invalid and will be skipped: {line_item}")
-        
-        self.logger.debug(f"Extracted {len(extraction_json['parts'])} valid parts from invoice {invoice_data.invoice_number}")
-        return extraction_json
+        return build_extraction_json(invoice_data, pdf_path, self.logger)
+    
+    def _defer_unknown_parts(self, extraction_jsons: List[Dict[str, Any]],
+                             resolved_parts: Optional[Dict[str, Any]] = None) -> None:
+        """Collect unknown parts for later resolution instead of prompting."""
+        for part_data in self.discovery_service.find_unknown_parts_batch(extraction_jsons, resolved_parts):
+            db_fields = part_data.get('database_fields', {})
+            composite_key = build_composite_key(
+                db_fields.get('item_type'), db_fields.get('description'), db_fields.get('part_number')
+            )
+            self._deferred_unknown_parts.setdefault(composite_key, part_data)
     
-    def _discover_parts(self, extraction_json: Dict[str, Any]) -> Dict[str, Any]:
+    def _discover_parts(self, extraction_json: Dict[str, Any],
+                        resolved_parts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Step 2: Discover unknown parts and optionally add to database.
         
         Args:
             extraction_json: Extraction data from step 1
+            resolved_parts: Part map from the invoice's resolution pass
             
         Returns:
             Same extraction JSON (discovery service doesn't modify it)
@@ -531,25 +1034,31 @@ class InvoiceProcessor:
         self.logger.debug("Step 2: Discovering unknown parts")
         
         # Discover and process unknown parts
-        result_json = self.discovery_service.discover_and_add_parts(extraction_json)
+        result_json = self.discovery_service.discover_and_add_parts(extraction_json, resolved_parts)
         
         self.logger.debug("Part discovery completed")
         return result_json
     
-    def _validate_invoice(self, extraction_json: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_invoice(self, extraction_json: Dict[str, Any],
+                          interactive_discovery: bool = True,
+                          resolved_parts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Step 3: Validate parts against database.
         
         Args:
             extraction_json: Extraction data from previous steps
+            interactive_discovery: Prompt for unknown parts met during validation
+            resolved_parts: Part map from the invoice's resolution pass
             
         Returns:
             Validation JSON with error_lines and validation_summary
         """
         self.logger.debug("Step 3: Validating parts against database")
         
-        # Validate the invoice
-        validation_json = self.validation_engine.validate_invoice_json(extraction_json)
+        # Validate the invoice's lines as columns; only unknown parts are handled per line
+        validation_json = self.validation_engine.validate_columnar(
+            extraction_json, interactive_discovery=interactive_discovery, resolved_parts=resolved_parts
+        )
         
         summary = validation_json.get('validation_summary', {})
         self.logger.debug(f"Validation completed: {summary.get('passed_parts', 0)} passed, "
@@ -562,28 +1071,16 @@ class InvoiceProcessor:
         """
         Find all PDF files in a directory.
         
+        The tree is walked once, matching the extension case-insensitively.
+        
         Args:
             directory: Directory to search
             recursive: Whether to search subdirectories
             
         Returns:
-            List of PDF file paths
+            List of PDF file paths in sorted order
         """
-        pdf_files = []
-        
-        if recursive:
-            # Use rglob for recursive search
-            pdf_files = list(directory.rglob("*.pdf"))
-            pdf_files.extend(list(directory.rglob("*.PDF")))
-        else:
-            # Use glob for non-recursive search
-            pdf_files = list(directory.glob("*.pdf"))
-            pdf_files.extend(list(directory.glob("*.PDF")))
-        
-        # Remove duplicates and sort
-        pdf_files = sorted(list(set(pdf_files)))
-        
-        return pdf_files
+        return find_pdf_files(directory, recursive)
     
     def _create_batch_validation_json(self, validation_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -610,6 +1107,7 @@ class InvoiceProcessor:
         # Collect ALL parts and error lines from all invoices for batch CSV
         all_parts = []
         all_error_lines = []
+        rollups = LineRollups()
         
         for validation_json in validation_results:
             summary = validation_json.get('validation_summary', {})
@@ -617,6 +1115,7 @@ class InvoiceProcessor:
             batch_summary['passed_parts'] += summary.get('passed_parts', 0)
             batch_summary['failed_parts'] += summary.get('failed_parts', 0)
             batch_summary['unknown_parts'] += summary.get('unknown_parts', 0)
+            rollups.merge(validation_json.get('rollups', {}))
             
             # Collect ALL parts from this invoice for the merged batch CSV
             parts = validation_json.get('parts', [])
@@ -637,7 +1136,8 @@ class InvoiceProcessor:
             'invoices': validation_results,  # Array of complete invoice validation objects (each with their own error_lines)
             'parts': all_parts,  # ALL parts from ALL invoices merged for CSV generation
             'error_lines': all_error_lines,  # ALL error lines from ALL invoices merged for CSV generation
-            'validation_summary': batch_summary  # For compatibility with report generator
+            'validation_summary': batch_summary,  # For compatibility with report generator
+            'rollups': rollups.to_dict()
         }
         
         return batch_validation
@@ -648,21 +1148,106 @@ class InvoiceProcessor:
         """
         return self._create_batch_validation_json(validation_results)
     
-    def _generate_batch_reports(self, aggregated_validation_json: Dict[str, Any], output_dir: Path) -> Dict[str, Path]:
+    def _generate_batch_reports(self, aggregator: SpillingBatchAggregator, output_dir: Path) -> Dict[str, Path]:
         """
-        Generate batch reports for aggregated validation results.
+        Generate batch reports by streaming the spilled validation results.
         
         Args:
-            aggregated_validation_json: Aggregated validation results
+            aggregator: Aggregator holding the batch's validation results
             output_dir: Directory to save reports
             
         Returns:
             Dictionary mapping format to output file path
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base_name = f"batch_validation_report_{timestamp}"
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.logger.info(f"Using output directory: {output_dir}")
         
-        return self.generate_reports(aggregated_validation_json, output_dir, base_name)
+        return self.report_generator.write_batch_reports(aggregator, str(output_dir))
+
+
+def build_extraction_json(invoice_data, pdf_path: Path,
+                          logger: Optional[logging.Logger] = None) -> Dict[str, Any]:
+    """
+    Convert extracted invoice data to the extraction JSON used by discovery and validation.
+    
+    Args:
+        invoice_data: InvoiceData returned by PDFProcessor.process_pdf
+        pdf_path: Path of the source PDF
+        logger: Optional logger for per-line diagnostics
+        
+    Returns:
+        Extraction JSON with invoice metadata and parts data
+    """
+    logger = logger or logging.getLogger('invoice_processor')
+    
+    # Convert to extraction JSON format expected by validation engine
+    extraction_json = {
+        'invoice_metadata': {
+            'invoice_number': invoice_data.invoice_number,
+            'invoice_date': invoice_data.invoice_date,
+            'customer_number': invoice_data.customer_number,
+            'customer_name': invoice_data.customer_name,
+            'total_line_items': len(invoice_data.line_items),
+            'pdf_path': str(pdf_path),
+            'extraction_timestamp': invoice_data.extraction_timestamp.isoformat() if invoice_data.extraction_timestamp else None
+        },
+        'format_sections': [section.to_dict() for section in invoice_data.format_sections],
+        'reconciliation': invoice_data.reconcile().to_dict(),
+        'parts': []
+    }
+    
+    # Parts are read straight from the line item columns, without a dict per line
+    line_items = invoice_data.line_items
+    if not isinstance(line_items, LineItemBatch):
+        line_items = LineItemBatch(line_items)
+    extraction_json['parts'] = line_items.to_parts_json(invoice_data.invoice_number)
+    skipped = len(line_items) - len(extraction_json['parts'])
+    if skipped:
+        logger.warning(f"[H3] {skipped} invalid line items will be skipped")
+    
+    logger.debug(f"Extracted {len(extraction_json['parts'])} valid parts from invoice {invoice_data.invoice_number}")
+    return extraction_json
+
+
+def _run_extraction(pdf_processor: PDFProcessor, pdf_path: Path,
+                    logger: logging.Logger) -> Dict[str, Any]:
+    """
+    Extract one invoice and report the outcome as plain, picklable data.
+    
+    Returns:
+        Dictionary with extraction_json (None on failure), error_message,
+        error_type and processing_time
+    """
+    start_time = time.time()
+    outcome = {'extraction_json': None, 'error_message': None, 'error_type': None}
+    try:
+        invoice_data = pdf_processor.process_pdf(pdf_path)
+        outcome['extraction_json'] = build_extraction_json(invoice_data, pdf_path, logger)
+    except Exception as e:
+        outcome['error_message'] = str(e)
+        outcome['error_type'] = type(e).__name__
+    outcome['processing_time'] = time.time() - start_time
+    return outcome
+
+
+# PDFProcessor reused by every task a worker process runs
+_worker_pdf_processor: Optional[PDFProcessor] = None
+
+
+def _extract_invoice_worker(pdf_path: str) -> bytes:
+    """
+    Process pool entry point for parallel directory processing.
+    
+    Returns:
+        The extraction outcome encoded with ``encode_value``, which is
+        cheaper to pass between processes than the nested dicts
+    """
+    global _worker_pdf_processor
+    logger = logging.getLogger('invoice_processor')
+    if _worker_pdf_processor is None:
+        _worker_pdf_processor = PDFProcessor(logger)
+    return encode_value(_run_extraction(_worker_pdf_processor, Path(pdf_path), logger))
 
 
 # Convenience functions for CLI integration
@@ -706,7 +1291,10 @@ def process_directory_batch(input_dir: Union[str, Path],
                           database_manager: DatabaseManager,
                           output_path: Optional[Union[str, Path]] = None,
                           recursive: bool = True,
-                          progress_callback: Optional[Callable[[int, int, str], None]] = None) -> BatchProcessingResult:
+                          progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                          parallel: bool = False,
+                          max_workers: Optional[int] = None,
+                          incremental: bool = False) -> BatchProcessingResult:
     """
     Convenience function to process a directory of PDF files.
     
@@ -716,9 +1304,14 @@ def process_directory_batch(input_dir: Union[str, Path],
         output_path: Optional output directory
         recursive: Search subdirectories
         progress_callback: Optional progress callback for CLI
+        parallel: Extract invoices in a process pool with deferred discovery
+        max_workers: Maximum worker processes (defaults to the CPU count)
+        incremental: Skip files unchanged since a successful earlier run
         
     Returns:
         BatchProcessingResult with aggregated results (interactive mode always enabled)
     """
     processor = create_invoice_processor(database_manager, progress_callback)
-    return processor.process_directory(input_dir, output_path, recursive)
\ No newline at end of file
+    return processor.process_directory(input_dir, output_path, recursive,
+                                       parallel=parallel, max_workers=max_workers,
+                                       incremental=incremental)
\ No newline at end of file
@@ -5,13 +5,40 @@ This module defines the data structures used to represent extracted invoice data
 including invoice metadata, line items, and format sections.
 """
 
-from dataclasses import dataclass, field
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Union, overload, TYPE_CHECKING
 import re
 
+from database.models import money_units_to_decimal, to_money_units
 
+if TYPE_CHECKING:
+    from .reconciliation import InvoiceReconciliation
+
+
+def _slotted(cls):
+    """
+    Recreate a dataclass with ``__slots__`` for its fields.
+
+    Equivalent to ``@dataclass(slots=True)``, which needs Python 3.10.
+    Slotted instances have no per-instance ``__dict__``, which keeps the
+    records produced per invoice line small.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    namespace['__slots__'] = names
+    for name in names:
+        # Field defaults live in the generated __init__; class attributes would clash with the slots
+        namespace.pop(name, None)
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_slotted
 @dataclass
 class LineItem:
     """
@@ -26,6 +53,7 @@ class LineItem:
         total: Total price (rate * quantity, calculated automatically)
         line_number: Original line number in invoice (for debugging)
         raw_text: Original text line (for debugging)
+        wearer: Name of the wearer the garment is issued to, if any
     """
     item_code: Optional[str] = None
     description: Optional[str] = None
@@ -35,6 +63,7 @@ class LineItem:
     total: Optional[Decimal] = None
     line_number: Optional[int] = None
     raw_text: Optional[str] = None
+    wearer: Optional[str] = None
 
     def __post_init__(self):
         """Validate and normalize line item data after initialization."""
@@ -96,10 +125,397 @@ class LineItem:
             'quantity': self.quantity,
             'total': float(self.total) if self.total else None,
             'line_number': self.line_number,
-            'raw_text': self.raw_text
+            'raw_text': self.raw_text,
+            'wearer': self.wearer
+        }
+
+
+def quantity_value(quantity: float) -> Union[int, float]:
+    """Return a stored quantity as an int when it is a whole number."""
+    return int(quantity) if quantity.is_integer() else quantity
+
+
+def quantity_or_one(value: Any) -> Union[int, float]:
+    """Return a line quantity as a number, treating missing, zero or invalid quantities as one."""
+    if type(value) is int or type(value) is float:
+        return value or 1
+    try:
+        return float(value) or 1
+    except (TypeError, ValueError):
+        return 1
+
+
+# LineItem field names, in declaration order
+_LINE_ITEM_FIELDS = tuple(f.name for f in fields(LineItem))
+
+
+def _text_column(column: str) -> property:
+    """Property reading and writing a row's value in one of the batch's list columns."""
+    def get(self):
+        return getattr(self.batch, column)[self.row]
+
+    def set(self, value):
+        getattr(self.batch, column)[self.row] = value
+        self.batch.version += 1
+    return property(get, set)
+
+
+def _money_column(units_column: str, flags_column: str) -> property:
+    """Property reading and writing a row's amount as a Decimal in a units column."""
+    def get(self):
+        if not getattr(self.batch, flags_column)[self.row]:
+            return None
+        return money_units_to_decimal(getattr(self.batch, units_column)[self.row])
+
+    def set(self, value):
+        units = to_money_units(value) if value is not None else None
+        getattr(self.batch, units_column)[self.row] = units or 0
+        getattr(self.batch, flags_column)[self.row] = units is not None
+        self.batch.version += 1
+    return property(get, set)
+
+
+class LineItemRow:
+    """
+    Write-through view of one row of a LineItemBatch.
+
+    Has the attributes and methods of LineItem and compares equal to a
+    LineItem with the same values, but reads and writes the batch's columns:
+    a line edited through ``batch[index]`` is edited in the batch, which
+    counts the change in its version. ``to_line_item`` makes a detached copy.
+    """
+
+    __slots__ = ('batch', 'row')
+
+    def __init__(self, batch: 'LineItemBatch', row: int):
+        self.batch = batch
+        self.row = row
+
+    item_code = _text_column('item_codes')
+    description = _text_column('descriptions')
+    item_type = _text_column('item_types')
+    rate = _money_column('rate_units', 'has_rate')
+    total = _money_column('total_units', 'has_total')
+    line_number = _text_column('line_numbers')
+    raw_text = _text_column('raw_texts')
+    wearer = _text_column('wearers')
+
+    @property
+    def quantity(self) -> Union[int, float]:
+        return quantity_value(self.batch.quantities[self.row])
+
+    @quantity.setter
+    def quantity(self, value: Any) -> None:
+        self.batch.quantities[self.row] = LineItemBatch._quantity(value)
+        self.batch.version += 1
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in _LINE_ITEM_FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (LineItem, LineItemRow)):
+            return self._values() == tuple(getattr(other, name) for name in _LINE_ITEM_FIELDS)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        values = ', '.join(f"{name}={value!r}" for name, value in zip(_LINE_ITEM_FIELDS, self._values()))
+        return f"LineItemRow({values})"
+
+    def is_valid(self) -> bool:
+        """Check the row the way ``LineItem.is_valid`` does."""
+        return self.batch.is_valid(self.row)
+
+    def to_line_item(self) -> LineItem:
+        """Copy the row into a LineItem that does not write back to the batch."""
+        return LineItem(*self._values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the row to a dictionary for serialization."""
+        return self.to_line_item().to_dict()
+
+
+class LineItemBatch:
+    """
+    Columnar container for the line items of an invoice.
+
+    Each LineItem field is held in one parallel column instead of one object
+    per line: rates and totals as integer ten-thousandths and quantities in
+    typed arrays, text fields in lists. Extractors append to the batch
+    directly; indexing or iterating yields LineItemRow views of the rows, so
+    a batch can stand in wherever a list of line items is expected and lines
+    edited in place are edited in the batch.
+
+    The columns serve reconciliation, the binary invoice codec and the
+    extraction JSON parts array, which ``to_parts_json`` returns as a
+    PartsArray over a copy of the valid rows' columns.
+
+    Rates and totals are held to four decimal places, the precision of the
+    parts table.
+
+    ``version`` counts the changes made through the batch's methods, so
+    results derived from the columns (see ``InvoiceData.reconcile``) can be
+    cached until the batch changes.
+    """
+
+    # Parallel columns, one entry per line item
+    COLUMNS = ('item_codes', 'descriptions', 'item_types', 'rate_units', 'quantities',
+               'total_units', 'line_numbers', 'raw_texts', 'wearers', 'has_rate', 'has_total')
+    __slots__ = COLUMNS + ('version',)
+
+    def __init__(self, line_items: Optional[Iterable[LineItem]] = None):
+        """
+        Create an empty batch, optionally filled from existing line items.
+
+        Args:
+            line_items: Optional LineItem objects to add
+        """
+        self.item_codes: List[Optional[str]] = []
+        self.descriptions: List[Optional[str]] = []
+        self.item_types: List[Optional[str]] = []
+        self.rate_units = array('q')
+        self.quantities = array('d')
+        self.total_units = array('q')
+        self.line_numbers: List[Any] = []
+        self.raw_texts: List[Optional[str]] = []
+        self.wearers: List[Optional[str]] = []
+        # 1 where the rate/total column holds a value, 0 where the field is None
+        self.has_rate = bytearray()
+        self.has_total = bytearray()
+        self.version = 0
+        if line_items is not None:
+            for line_item in line_items:
+                self.append(line_item)
+
+    def __len__(self) -> int:
+        return len(self.item_codes)
+
+    def __repr__(self) -> str:
+        return f"LineItemBatch({len(self)} line items)"
+
+    @overload
+    def __getitem__(self, index: int) -> LineItemRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[LineItemRow]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [LineItemRow(self, row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line item index out of range")
+        return LineItemRow(self, index)
+
+    def __iter__(self) -> Iterator[LineItemRow]:
+        for row in range(len(self)):
+            yield LineItemRow(self, row)
+
+    def add(self, item_code: Optional[str] = None, description: Optional[str] = None,
+            item_type: Optional[str] = None, rate: Any = None, quantity: Any = 1,
+            total: Any = None, line_number: Any = None, raw_text: Optional[str] = None,
+            wearer: Optional[str] = None) -> None:
+        """
+        Append one line item from its field values.
+
+        Values are normalized the way LineItem does it: unparseable rates and
+        totals become None, a missing or unparseable quantity becomes 1 and a
+        missing total is computed as rate times quantity.
+        """
+        rate_units, quantity, total_units = self._amounts(rate, quantity, total)
+        self.item_codes.append(item_code)
+        self.descriptions.append(description)
+        self.item_types.append(item_type)
+        self.rate_units.append(rate_units or 0)
+        self.has_rate.append(rate_units is not None)
+        self.quantities.append(quantity)
+        self.total_units.append(total_units or 0)
+        self.has_total.append(total_units is not None)
+        self.line_numbers.append(line_number)
+        self.raw_texts.append(raw_text)
+        self.wearers.append(wearer)
+        self.version += 1
+
+    def __setitem__(self, index: int, line_item: Union[LineItem, LineItemRow]) -> None:
+        """Replace the values of one row with those of a LineItem."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line item index out of range")
+        rate_units, quantity, total_units = self._amounts(line_item.rate, line_item.quantity, line_item.total)
+        self.item_codes[index] = line_item.item_code
+        self.descriptions[index] = line_item.description
+        self.item_types[index] = line_item.item_type
+        self.rate_units[index] = rate_units or 0
+        self.has_rate[index] = rate_units is not None
+        self.quantities[index] = quantity
+        self.total_units[index] = total_units or 0
+        self.has_total[index] = total_units is not None
+        self.line_numbers[index] = line_item.line_number
+        self.raw_texts[index] = line_item.raw_text
+        self.wearers[index] = line_item.wearer
+        self.version += 1
+
+    @staticmethod
+    def _quantity(quantity: Any) -> Union[int, float]:
+        """Normalize a quantity the way LineItem does: missing or unparseable becomes 1."""
+        if quantity is None:
+            return 1
+        if isinstance(quantity, str):
+            try:
+                return int(float(quantity))
+            except (ValueError, TypeError):
+                return 1
+        return quantity
+
+    @classmethod
+    def _amounts(cls, rate: Any, quantity: Any, total: Any):
+        """Normalize a row's rate, quantity and total to (rate units, quantity, total units)."""
+        rate_units = None
+        if rate is not None:
+            try:
+                rate_units = to_money_units(rate)
+            except ValueError:
+                pass
+
+        quantity = cls._quantity(quantity)
+
+        total_units = None
+        if total is not None:
+            try:
+                total_units = to_money_units(total)
+            except ValueError:
+                pass
+        if total_units is None and rate_units is not None:
+            total_units = round(rate_units * quantity)
+        return rate_units, quantity, total_units
+
+    def append(self, line_item: LineItem) -> None:
+        """Append a LineItem's values to the columns."""
+        self.add(line_item.item_code, line_item.description, line_item.item_type, line_item.rate,
+                 line_item.quantity, line_item.total, line_item.line_number, line_item.raw_text,
+                 line_item.wearer)
+
+    def is_valid(self, index: int) -> bool:
+        """Check a row the way ``LineItem.is_valid`` does."""
+        description = self.descriptions[index]
+        return (self.quantities[index] != 0 and
+                bool(self.has_rate[index]) and
+                description is not None and
+                description.strip() != "")
+
+    def valid_rows(self) -> List[int]:
+        """Indices of the rows that are valid line items."""
+        return [row for row in range(len(self)) if self.is_valid(row)]
+
+    def take(self, rows: Iterable[int]) -> 'LineItemBatch':
+        """Copy the given rows, in the given order, into a new batch."""
+        rows = list(rows)
+        batch = LineItemBatch()
+        for column in self.COLUMNS:
+            values = getattr(self, column)
+            taken = [values[row] for row in rows]
+            if isinstance(values, array):
+                taken = array(values.typecode, taken)
+            elif isinstance(values, bytearray):
+                taken = bytearray(taken)
+            setattr(batch, column, taken)
+        return batch
+
+    def to_parts_json(self, first_seen_invoice: Optional[str] = None) -> 'PartsArray':
+        """
+        Build the extraction JSON parts array for the valid rows.
+
+        Args:
+            first_seen_invoice: Invoice number recorded on each part
+
+        Returns:
+            PartsArray over a copy of the valid rows, reading as the parts
+            ``build_extraction_json`` produced from LineItem objects
+        """
+        return PartsArray(self.take(self.valid_rows()), first_seen_invoice)
+
+
+class PartsArray(Sequence):
+    """
+    Extraction JSON parts array backed by the columns of a LineItemBatch.
+
+    Reads as a list of part dicts, but each dict is built when it is read
+    and not kept, so the parts of an invoice cost its columns rather than
+    two nested dicts per line. Columnar consumers (price validation, the
+    binary codec) read ``batch`` directly. Prices and totals are exact
+    Decimals with four decimal places. The parts are read-only; compare
+    equal to a list holding the same dicts.
+    """
+
+    __slots__ = ('batch', 'first_seen_invoice')
+
+    def __init__(self, batch: LineItemBatch, first_seen_invoice: Optional[str] = None):
+        """
+        Args:
+            batch: Rows of the parts, one part per row
+            first_seen_invoice: Invoice number recorded on each part
+        """
+        self.batch = batch
+        self.first_seen_invoice = first_seen_invoice
+
+    def __len__(self) -> int:
+        return len(self.batch)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._part(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("part index out of range")
+        return self._part(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self)):
+            yield self._part(row)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (list, PartsArray)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PartsArray({len(self)} parts)"
+
+    def _part(self, row: int) -> Dict[str, Any]:
+        batch = self.batch
+        rate_units = batch.rate_units[row]
+        total_units = batch.total_units[row]
+        return {
+            'database_fields': {
+                'part_number': batch.item_codes[row],
+                'authorized_price': money_units_to_decimal(rate_units) if rate_units else None,
+                'description': batch.descriptions[row],
+                'item_type': batch.item_types[row],
+                'category': None,  # Will be determined by database lookup
+                'source': 'extracted',
+                'first_seen_invoice': self.first_seen_invoice
+            },
+            'lineitem_fields': {
+                'line_number': batch.line_numbers[row],
+                'quantity': quantity_value(batch.quantities[row]),
+                'total': money_units_to_decimal(total_units) if total_units else None,
+                'raw_text': batch.raw_texts[row],
+                'wearer': batch.wearers[row]
+            }
         }
 
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Materialize the parts as a list of dicts."""
+        return list(self)
 
+
+@_slotted
 @dataclass
 class FormatSection:
     """
@@ -134,6 +550,22 @@ class FormatSection:
         }
 
 
+def index_format_sections(format_sections: Iterable[FormatSection]) -> Dict[str, FormatSection]:
+    """
+    Map section types to sections.
+
+    Args:
+        format_sections: Format sections of an invoice
+
+    Returns:
+        First section of each type, keyed by upper-case section type
+    """
+    index: Dict[str, FormatSection] = {}
+    for section in format_sections:
+        index.setdefault(section.section_type.upper(), section)
+    return index
+
+
 @dataclass
 class InvoiceData:
     """
@@ -144,31 +576,75 @@ class InvoiceData:
         invoice_date: Invoice date
         customer_number: Customer account number
         customer_name: Customer name
-        line_items: List of line items
+        line_items: Line items, as a list or a LineItemBatch
         format_sections: List of format sections (SUBTOTAL, FREIGHT, TAX, TOTAL)
         pdf_path: Path to source PDF file
         extraction_timestamp: When the data was extracted
         raw_text: Complete extracted text (for debugging)
         page_count: Number of pages in PDF
         processing_notes: Any notes from processing
+
+    The format section index and the reconciliation are cached. The index is
+    rebuilt when a section is added, replaced or edited; the reconciliation
+    also when a LineItemBatch changes version. Plain lists of line items
+    cannot be tracked, so their reconciliation is computed on every call.
     """
     invoice_number: Optional[str] = None
     invoice_date: Optional[str] = None
     customer_number: Optional[str] = None
     customer_name: Optional[str] = None
-    line_items: List[LineItem] = field(default_factory=list)
+    line_items: Union[List[LineItem], 'LineItemBatch'] = field(default_factory=list)
     format_sections: List[FormatSection] = field(default_factory=list)
     pdf_path: Optional[str] = None
     extraction_timestamp: Optional[datetime] = None
     raw_text: Optional[str] = None
     page_count: Optional[int] = None
     processing_notes: List[str] = field(default_factory=list)
+    # Cached section index and reconciliation, with the state they were computed from
+    _sections: Optional[Dict[str, FormatSection]] = field(default=None, init=False, repr=False, compare=False)
+    _sections_state: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    _reconciliation: Optional['InvoiceReconciliation'] = field(default=None, init=False, repr=False,
+                                                               compare=False)
+    _reconciliation_state: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Set extraction timestamp if not provided."""
         if self.extraction_timestamp is None:
             self.extraction_timestamp = datetime.now()
 
+    def _sections_key(self) -> tuple:
+        """State of the format sections; adding, replacing or editing a section changes it."""
+        # The cached index keeps the sections alive, so their ids are not reused
+        return tuple((id(section), section.section_type, section.amount) for section in self.format_sections)
+
+    def _section_index(self) -> Dict[str, FormatSection]:
+        """Get the format sections keyed by upper-case type, rebuilt when the sections change."""
+        state = self._sections_key()
+        if self._sections is None or self._sections_state != state:
+            self._sections = index_format_sections(self.format_sections)
+            self._sections_state = state
+        return self._sections
+
+    def reconcile(self) -> 'InvoiceReconciliation':
+        """
+        Reconcile line totals, subtotal, freight, tax and total in one vectorized pass.
+
+        Returns:
+            InvoiceReconciliation of this invoice as it is now
+        """
+        from .reconciliation import reconcile_invoice
+
+        line_items = self.line_items
+        if not isinstance(line_items, LineItemBatch):
+            return reconcile_invoice(line_items, self._section_index())
+
+        # Holding the batch in the state keeps a replaced batch from matching by identity
+        state = (line_items, line_items.version, self._sections_key())
+        if self._reconciliation is None or self._reconciliation_state != state:
+            self._reconciliation = reconcile_invoice(line_items, self._section_index())
+            self._reconciliation_state = state
+        return self._reconciliation
+
     def is_valid(self) -> bool:
         """Check if invoice data has minimum required information."""
         return (
@@ -181,13 +657,12 @@ class InvoiceData:
 
     def get_format_section(self, section_type: str) -> Optional[FormatSection]:
         """Get a specific format section by type."""
-        for section in self.format_sections:
-            if section.section_type.upper() == section_type.upper():
-                return section
-        return None
+        return self._section_index().get(section_type.upper())
 
     def get_valid_line_items(self) -> List[LineItem]:
         """Get only valid line items."""
+        if isinstance(self.line_items, LineItemBatch):
+            return [self.line_items[row] for row in self.line_items.valid_rows()]
         return [item for item in self.line_items if item.is_valid()]
 
     def get_total_amount(self) -> Optional[Decimal]:
@@ -212,14 +687,8 @@ class InvoiceData:
 
     def calculate_expected_total(self) -> Optional[Decimal]:
         """Calculate expected total as Subtotal + Freight + Tax."""
-        subtotal = self.get_subtotal_amount()
-        freight = self.get_freight_amount()
-        tax = self.get_tax_amount()
-        
-        if subtotal is None or freight is None or tax is None:
-            return None
-            
-        return subtotal + freight + tax
+        expected_units = self.reconcile().expected_total_units
+        return money_units_to_decimal(expected_units) if expected_units is not None else None
 
     def validate_total_calculation(self, tolerance: Decimal = Decimal('0.01')) -> bool:
         """
@@ -231,14 +700,7 @@ class InvoiceData:
         Returns:
             True if calculation is valid, False otherwise
         """
-        expected_total = self.calculate_expected_total()
-        actual_total = self.get_total_amount()
-        
-        if expected_total is None or actual_total is None:
-            return False
-            
-        difference = abs(expected_total - actual_total)
-        return difference <= tolerance
+        return self.reconcile().is_balanced(to_money_units(tolerance))
 
     def get_total_calculation_discrepancy(self) -> Optional[Decimal]:
         """
@@ -248,13 +710,8 @@ class InvoiceData:
             Difference amount (positive if actual > expected, negative if actual < expected)
             None if calculation cannot be performed
         """
-        expected_total = self.calculate_expected_total()
-        actual_total = self.get_total_amount()
-        
-        if expected_total is None or actual_total is None:
-            return None
-            
-        return actual_total - expected_total
+        discrepancy_units = self.reconcile().total_discrepancy_units
+        return money_units_to_decimal(discrepancy_units) if discrepancy_units is not None else None
 
     def validate_format_sequence(self) -> bool:
         """Validate that format sections are in correct order."""
@@ -368,6 +825,7 @@ def validate_part_number(part_number: str) -> bool:
 # Legacy classes kept for backward compatibility with existing CLI code
 # These will be removed once all CLI code is updated to use the JSON-based approach
 
+@_slotted
 @dataclass
 class InvoiceLineItem:
     """Legacy class for backward compatibility."""
@@ -428,6 +886,7 @@ class InvoiceLineItem:
         )
 
 
+@_slotted
 @dataclass
 class ProcessingResult:
     """Legacy class for backward compatibility."""
@@ -7,16 +7,64 @@ interactive prompts to add them to the database.
 
 import json
 import logging
+from contextlib import contextmanager
 from decimal import Decimal
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, Iterator, List, Any, Optional
 
 from database.database import DatabaseManager
-from database.models import Part
+from database.models import Part, PartRateStats, build_composite_key
 
 
 logger = logging.getLogger(__name__)
 
 
+class BatchDiscoverySession:
+    """
+    Remembers part discovery outcomes by composite key for the length of a batch.
+    
+    Once a composite key has been found in the database, added, skipped or
+    failed to add, later invoices in the batch answer it from memory instead
+    of looking it up again or prompting for it again.
+    """
+    
+    KNOWN = 'known'
+    ADDED = 'added'
+    SKIPPED = 'skipped'
+    FAILED = 'failed'
+    
+    def __init__(self):
+        self._outcomes: Dict[str, str] = {}
+        self.cancelled = False
+        self.lookups_saved = 0
+    
+    def __len__(self) -> int:
+        return len(self._outcomes)
+    
+    def __contains__(self, composite_key: str) -> bool:
+        return composite_key in self._outcomes
+    
+    def get(self, composite_key: str) -> Optional[str]:
+        """Get the remembered outcome for a composite key, or None if unresolved."""
+        return self._outcomes.get(composite_key)
+    
+    def remember(self, composite_key: str, outcome: str) -> None:
+        """Record the outcome for a composite key."""
+        self._outcomes[composite_key] = outcome
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get counts of remembered outcomes.
+        
+        Returns:
+            Dictionary with a count per outcome and the number of lookups saved
+        """
+        stats = {outcome: 0 for outcome in (self.KNOWN, self.ADDED, self.SKIPPED, self.FAILED)}
+        for outcome in self._outcomes.values():
+            stats[outcome] += 1
+        stats['lookups_saved'] = self.lookups_saved
+        return stats
+
+
 class SimplePartDiscoveryService:
     """
     Simple part discovery service that works directly with PDF extraction JSON.
@@ -36,19 +84,50 @@ class SimplePartDiscoveryService:
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         self.active_sessions = {}
         self.prompt_handler = None  # For testing
+        self.session: Optional[BatchDiscoverySession] = None
     
-    def discover_and_add_parts(self, extraction_json: Dict[str, Any]) -> Dict[str, Any]:
+    @contextmanager
+    def batch_session(self, session: Optional[BatchDiscoverySession] = None) -> Iterator[BatchDiscoverySession]:
+        """
+        Share discovery outcomes across every invoice processed inside the block.
+        
+        Nested blocks reuse the session that is already active.
+        
+        Args:
+            session: Session to use, e.g. one shared across several folders;
+                a new session is started when omitted
+            
+        Yields:
+            The active BatchDiscoverySession
+        """
+        if self.session is not None:
+            yield self.session
+            return
+        
+        self.session = session if session is not None else BatchDiscoverySession()
+        try:
+            yield self.session
+        finally:
+            stats = self.session.get_stats()
+            self.logger.debug(f"Discovery session ended: {stats}")
+            self.session = None
+    
+    def discover_and_add_parts(self, extraction_json: Dict[str, Any],
+                               resolved_parts: Optional[Dict[str, Optional[Part]]] = None) -> Dict[str, Any]:
         """
         Discover unknown parts from extraction JSON and add them to database.
         
         Args:
             extraction_json: PDF extraction JSON with parts array
+            resolved_parts: Optional map of composite key to Part (None when not
+                in the database) from the invoice's resolution pass; keys in it
+                are not looked up again, and parts added here are recorded in it
             
         Returns:
             Original input JSON (unchanged)
         """
         # Find unknown parts
-        unknown_parts = self._find_unknown_parts(extraction_json)
+        unknown_parts = self._find_unknown_parts(extraction_json, resolved_parts)
         
         if not unknown_parts:
             self.logger.info("No unknown parts found")
@@ -57,12 +136,54 @@ class SimplePartDiscoveryService:
         self.logger.info(f"Found {len(unknown_parts)} unknown parts")
         
         # Process unknown parts interactively (always enabled)
-        self._process_unknown_parts_interactive(unknown_parts)
+        self._process_unknown_parts_interactive(unknown_parts, resolved_parts)
         
         # Return original input unchanged
         return extraction_json
     
-    def _find_unknown_parts(self, extraction_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def discover_and_add_parts_batch(self, extraction_jsons: List[Dict[str, Any]]) -> int:
+        """
+        Discover unknown parts across several invoices and prompt once.
+        
+        Parts are deduplicated by composite key over the whole batch, so a part
+        that appears on many invoices is only offered to the user once.
+        
+        Args:
+            extraction_jsons: PDF extraction JSON for each invoice in the batch
+            
+        Returns:
+            Number of distinct unknown parts found
+        """
+        unknown_parts = self.find_unknown_parts_batch(extraction_jsons)
+        
+        if not unknown_parts:
+            self.logger.info("No unknown parts found")
+            return 0
+        
+        self.logger.info(f"Found {len(unknown_parts)} unknown parts across {len(extraction_jsons)} invoices")
+        self._process_unknown_parts_interactive(unknown_parts)
+        return len(unknown_parts)
+    
+    def find_unknown_parts_batch(self, extraction_jsons: List[Dict[str, Any]],
+                                 resolved_parts: Optional[Dict[str, Optional[Part]]] = None) -> List[Dict[str, Any]]:
+        """
+        Find unknown parts across several invoices without prompting.
+        
+        Args:
+            extraction_jsons: PDF extraction JSON for each invoice in the batch
+            resolved_parts: Optional part map whose keys are not looked up again
+            
+        Returns:
+            Part entries not in the database, one per distinct composite key
+        """
+        combined_json = {
+            'parts': [part for extraction_json in extraction_jsons
+                      for part in extraction_json.get('parts', [])]
+        }
+        return self._find_unknown_parts(combined_json, resolved_parts)
+    
+    def _find_unknown_parts(self, extraction_json: Dict[str, Any],
+                            resolved_parts: Optional[Dict[str, Optional[Part]]] = None) -> List[Dict[str, Any]]:
         """Find parts that don't exist in the database."""
         unknown_parts = []
         seen_composite_keys = set()  # Track parts we've already processed
@@ -79,21 +200,30 @@ class SimplePartDiscoveryService:
             description = db_fields.get('description')
             
             # Generate composite key for this part (item_type|description|part_number)
-            from database.models import Part
-            composite_key = Part.generate_identifier_from_components(item_type, description, part_number)
+            composite_key = build_composite_key(item_type, description, part_number)
             
             # Skip if we've already processed this exact composite key in this session
             if composite_key in seen_composite_keys:
                 self.logger.debug(f"Duplicate part {part_number} (composite: {composite_key}) already processed in this session, skipping")
                 continue
             
+            # Skip parts already resolved earlier in the batch, without a lookup
+            if self.session is not None and composite_key in self.session:
+                self.session.lookups_saved += 1
+                seen_composite_keys.add(composite_key)
+                continue
+            
             # Check if part exists in database using composite key components
             try:
-                existing_part = self.db_manager.find_part_by_components(item_type, description, part_number)
+                if resolved_parts is not None and composite_key in resolved_parts:
+                    existing_part = resolved_parts[composite_key]
+                else:
+                    existing_part = self.db_manager.find_part_by_components(item_type, description, part_number)
                 if existing_part:
                     # Part exists in database, skip it completely
                     self.logger.debug(f"Part {part_number} (composite: {existing_part.composite_key}) already exists in database, skipping")
                     seen_composite_keys.add(composite_key)  # Mark as seen to avoid duplicates
+                    self._remember(composite_key, BatchDiscoverySession.KNOWN)
                     continue
                 else:
                     # Part doesn't exist in database, add to unknown list
@@ -109,10 +239,15 @@ class SimplePartDiscoveryService:
         
         return unknown_parts
     
-    def _process_unknown_parts_interactive(self, unknown_parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _process_unknown_parts_interactive(self, unknown_parts: List[Dict[str, Any]],
+                                           resolved_parts: Optional[Dict[str, Optional[Part]]] = None) -> List[Dict[str, Any]]:
         """Process unknown parts with user interaction and verification."""
         results = []
         
+        if self.session is not None and self.session.cancelled:
+            self.logger.info(f"Discovery was quit earlier in this batch; not prompting for {len(unknown_parts)} unknown parts")
+            return results
+        
         print(f"\n🔍 Found {len(unknown_parts)} unknown parts")
         print("=" * 50)
         
@@ -123,6 +258,9 @@ class SimplePartDiscoveryService:
             part_number = db_fields.get('part_number', 'UNKNOWN')
             description = db_fields.get('description', 'No description')
             discovered_price = db_fields.get('authorized_price', 0.0)
+            composite_key = build_composite_key(
+                db_fields.get('item_type'), db_fields.get('description'), db_fields.get('part_number')
+            )
             
             print(f"\nPart {i}/{len(unknown_parts)}: {part_number}")
             print(f"Description: {description}")
@@ -147,6 +285,9 @@ class SimplePartDiscoveryService:
                         )
                         
                         self.db_manager.create_part(part)
+                        self._remember(composite_key, BatchDiscoverySession.ADDED)
+                        if resolved_parts is not None:
+                            resolved_parts[part.composite_key] = part
                         print(f"✅ Added {part_number} to database with price ${discovered_price}")
                         
                         results.append({
@@ -158,6 +299,7 @@ class SimplePartDiscoveryService:
                         break
                         
                     except Exception as e:
+                        self._remember(composite_key, BatchDiscoverySession.FAILED)
                         print(f"❌ Failed to add {part_number}: {e}")
                         results.append({
                             'part_number': part_number,
@@ -228,6 +370,7 @@ class SimplePartDiscoveryService:
                     continue
                 
                 elif choice == 'S':
+                    self._remember(composite_key, BatchDiscoverySession.SKIPPED)
                     print(f"⏭️  Skipped {part_number}")
                     results.append({
                         'part_number': part_number,
@@ -236,6 +379,10 @@ class SimplePartDiscoveryService:
                     break
                 
                 elif choice == 'Q':
+                    self._remember(composite_key, BatchDiscoverySession.SKIPPED)
+                    if self.session is not None:
+                        # Do not prompt again for the rest of the batch
+                        self.session.cancelled = True
                     print("🛑 Discovery cancelled by user")
                     results.append({
                         'part_number': part_number,
@@ -248,6 +395,11 @@ class SimplePartDiscoveryService:
         
         return results
     
+    def _remember(self, composite_key: str, outcome: str) -> None:
+        """Record a discovery outcome in the active batch session, if any."""
+        if self.session is not None:
+            self.session.remember(composite_key, outcome)
+    
     def _process_unknown_parts_batch(self, unknown_parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process unknown parts in batch mode (no auto-add; record for review)."""
         results = []
@@ -306,6 +458,28 @@ class SimplePartDiscoveryService:
         self.active_sessions[session_id] = session
         return session_id
 
+    def suggest_prices(self, part_numbers: Iterable[str]) -> Dict[str, PartRateStats]:
+        """
+        Suggest authorized prices for parts from their invoiced rate history.
+        
+        Answered from the running per-part rate statistics in one query;
+        discovery logs are not scanned. A part number invoiced under several
+        composite keys is suggested the prices of the key seen most often.
+        
+        Args:
+            part_numbers: Part numbers to suggest prices for
+            
+        Returns:
+            Dict mapping part number to its PartRateStats, whose
+            ``suggested_price``, ``min_price`` and ``max_price`` are the
+            suggestions; parts never invoiced are left out
+        """
+        try:
+            return self.db_manager.get_part_rate_stats_by_part_number(part_numbers)
+        except Exception as e:
+            self.logger.debug(f"Could not load part rate statistics: {e}")
+            return {}
+
     def check_part_exists(self, part_number: str) -> bool:
         """Check if a part exists in the database."""
         try:
@@ -14,7 +14,7 @@ from datetime import datetime
 
 import pdfplumber
 
-from .models import InvoiceData, LineItem, FormatSection, InvoiceLineItem
+from .models import InvoiceData, LineItem, LineItemBatch, FormatSection, InvoiceLineItem
 from .exceptions import (
     PDFProcessingError,
     PDFReadabilityError,
@@ -27,6 +27,11 @@ from .exceptions import (
 )
 
 
+# Version of the extraction logic; bump whenever extracted output changes so
+# incremental runs re-extract files processed by an older version
+EXTRACTOR_VERSION = "1"
+
+
 class PDFProcessor:
     """
     Main class for processing PDF invoices and extracting structured data.
@@ -839,7 +844,7 @@ class PDFProcessor:
         
         return similarity >= similarity_threshold
     
-    def _extract_line_items_from_tables(self, tables: List[List[List[str]]]) -> List[LineItem]:
+    def _extract_line_items_from_tables(self, tables: List[List[List[str]]]) -> LineItemBatch:
         """
         Extract line items from table data.
         
@@ -847,10 +852,10 @@ class PDFProcessor:
             tables: List of tables extracted from PDF
             
         Returns:
-            List of LineItem objects extracted from tables
+            LineItemBatch holding the line items extracted from tables
         """
 
-        line_items = []
+        line_items = LineItemBatch()
         
         for table_idx, table in enumerate(tables):
             if not table:
@@ -1228,6 +1233,7 @@ class PDFProcessor:
             item_type = None
             rate = None
             total = None
+            wearer = None
             quantity = 1  # Default quantity
             
             # Get item code
@@ -1240,6 +1246,10 @@ class PDFProcessor:
                 description = row[column_mapping['description']].strip() if row[column_mapping['description']] else None
                 self.logger.debug(f"[H2] Row {line_number} description: '{description}'")
             
+            # Get wearer name
+            if 'wearer' in column_mapping:
+                wearer = row[column_mapping['wearer']].strip() if row[column_mapping['wearer']] else None
+            
             # Get item type
             if 'type' in column_mapping:
                 item_type = row[column_mapping['type']].strip() if row[column_mapping['type']] else None
@@ -1294,7 +1304,8 @@ class PDFProcessor:
                 quantity=quantity,
                 total=total,
                 line_number=line_number,
-                raw_text=' | '.join(row)  # Join row cells for debugging
+                raw_text=' | '.join(row),  # Join row cells for debugging
+                wearer=wearer or None
             )
             
             self.logger.debug(f"[H2] Row {line_number} SUCCESS: created LineItem with code='{item_code}', desc='{description}', rate={rate}")
@@ -1378,7 +1389,7 @@ class PDFProcessor:
         Raises:
             LineItemParsingError: If line items cannot be parsed
         """
-        line_items = []
+        line_items = LineItemBatch()
         lines = text.split('\n')
         
         for line_num, line in enumerate(lines, 1):
@@ -1471,8 +1482,11 @@ class PDFProcessor:
                     description=description,
                     item_type=item_type,
                     rate=rate,
+                    quantity=quantity,
+                    total=total,
                     line_number=line_num,
-                    raw_text=line
+                    raw_text=line,
+                    wearer=wearer_name
                 )
             except (ValueError, InvalidOperation) as e:
                 self.logger.warning(f"Error parsing primary pattern at line {line_num}: {e}")
@@ -1493,8 +1507,11 @@ class PDFProcessor:
                     description=charge_type,
                     item_type="Charge",
                     rate=rate,
+                    quantity=quantity,
+                    total=total,
                     line_number=line_num,
-                    raw_text=line
+                    raw_text=line,
+                    wearer=wearer_name
                 )
             except (ValueError, InvalidOperation) as e:
                 self.logger.warning(f"Error parsing special charge at line {line_num}: {e}")
@@ -1515,6 +1532,8 @@ class PDFProcessor:
                     description=description,
                     item_type=item_type,
                     rate=rate,
+                    quantity=quantity,
+                    total=total,
                     line_number=line_num,
                     raw_text=line
                 )
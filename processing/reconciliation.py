@@ -0,0 +1,206 @@
+"""
+Vectorized reconciliation of invoice totals.
+
+``reconcile_invoice`` reads the rate, quantity and total columns of an
+invoice's LineItemBatch as NumPy arrays and, in one pass, computes every
+line's extended total (rate times quantity) and its difference from the
+printed line total, the sum of the line totals against SUBTOTAL, SUBTOTAL +
+FREIGHT + TAX against TOTAL, and the subtotal of each wearer. Amounts are
+integer ten-thousandths, as in price validation.
+
+Extraction reconciles each invoice once, see ``InvoiceData.reconcile``.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from database.models import money_units_to_float, to_money_units
+
+from .models import FormatSection, LineItem, LineItemBatch, index_format_sections
+
+
+# Section types that make up the invoice total
+SECTION_TYPES = ('SUBTOTAL', 'FREIGHT', 'TAX', 'TOTAL')
+
+# Allowed difference between reconciled amounts: one cent
+DEFAULT_TOLERANCE_UNITS = 100
+
+# Reconciliation statuses
+BALANCED = 'PASSED'
+UNBALANCED = 'FAILED'
+INCOMPLETE = 'INCOMPLETE'
+
+
+class InvoiceReconciliation:
+    """
+    Reconciled amounts of one invoice.
+
+    Line columns have one entry per line item, in invoice order. Section
+    amounts are None when the invoice has no such section.
+    """
+
+    def __init__(self, line_numbers: List[Any], wearers: List[Optional[str]],
+                 extended_units: np.ndarray, line_total_units: np.ndarray, line_checked: np.ndarray,
+                 section_units: Dict[str, Optional[int]], wearer_subtotals: Dict[str, int],
+                 wearer_line_counts: Dict[str, int]):
+        self.line_numbers = line_numbers
+        self.wearers = wearers
+        # Rate times quantity, and the printed line total
+        self.extended_units = extended_units
+        self.line_total_units = line_total_units
+        # True where the line has both a rate and a total to compare
+        self.line_checked = line_checked
+        self.line_delta_units = np.where(line_checked, line_total_units - extended_units, 0)
+        self.line_sum_units = int(line_total_units.sum())
+        self.section_units = section_units
+        self.wearer_subtotals = wearer_subtotals
+        self.wearer_line_counts = wearer_line_counts
+
+    def __len__(self) -> int:
+        return len(self.line_numbers)
+
+    @property
+    def subtotal_units(self) -> Optional[int]:
+        return self.section_units['SUBTOTAL']
+
+    @property
+    def freight_units(self) -> Optional[int]:
+        return self.section_units['FREIGHT']
+
+    @property
+    def tax_units(self) -> Optional[int]:
+        return self.section_units['TAX']
+
+    @property
+    def total_units(self) -> Optional[int]:
+        return self.section_units['TOTAL']
+
+    @property
+    def expected_total_units(self) -> Optional[int]:
+        """SUBTOTAL + FREIGHT + TAX, or None if any of them is missing."""
+        parts = (self.subtotal_units, self.freight_units, self.tax_units)
+        if any(amount is None for amount in parts):
+            return None
+        return sum(parts)
+
+    @property
+    def total_discrepancy_units(self) -> Optional[int]:
+        """TOTAL minus SUBTOTAL + FREIGHT + TAX (positive if the total is higher)."""
+        expected = self.expected_total_units
+        if expected is None or self.total_units is None:
+            return None
+        return self.total_units - expected
+
+    @property
+    def subtotal_discrepancy_units(self) -> Optional[int]:
+        """SUBTOTAL minus the sum of the line totals (positive if the subtotal is higher)."""
+        if self.subtotal_units is None:
+            return None
+        return self.subtotal_units - self.line_sum_units
+
+    def mismatched_lines(self, tolerance_units: int = DEFAULT_TOLERANCE_UNITS) -> np.ndarray:
+        """Positions of the lines whose printed total differs from rate times quantity."""
+        return np.flatnonzero(np.abs(self.line_delta_units) > tolerance_units)
+
+    def is_balanced(self, tolerance_units: int = DEFAULT_TOLERANCE_UNITS) -> bool:
+        """Check that TOTAL equals SUBTOTAL + FREIGHT + TAX within the tolerance."""
+        discrepancy = self.total_discrepancy_units
+        return discrepancy is not None and abs(discrepancy) <= tolerance_units
+
+    def status(self, tolerance_units: int = DEFAULT_TOLERANCE_UNITS) -> str:
+        """
+        Overall result of the reconciliation.
+
+        Returns:
+            INCOMPLETE if a format section is missing, FAILED if the total,
+            the subtotal or any line total is off by more than the tolerance,
+            otherwise PASSED
+        """
+        if any(amount is None for amount in self.section_units.values()):
+            return INCOMPLETE
+        if (not self.is_balanced(tolerance_units) or
+                abs(self.subtotal_discrepancy_units) > tolerance_units or
+                len(self.mismatched_lines(tolerance_units))):
+            return UNBALANCED
+        return BALANCED
+
+    def to_dict(self, tolerance_units: int = DEFAULT_TOLERANCE_UNITS) -> Dict[str, Any]:
+        """Convert the reconciliation to a dictionary for validation JSON."""
+        def amount(units: Optional[int]) -> Optional[float]:
+            return money_units_to_float(units) if units is not None else None
+
+        return {
+            'status': self.status(tolerance_units),
+            'line_count': len(self),
+            'line_total': amount(self.line_sum_units),
+            'subtotal': amount(self.subtotal_units),
+            'freight': amount(self.freight_units),
+            'tax': amount(self.tax_units),
+            'total': amount(self.total_units),
+            'expected_total': amount(self.expected_total_units),
+            'subtotal_discrepancy': amount(self.subtotal_discrepancy_units),
+            'total_discrepancy': amount(self.total_discrepancy_units),
+            'line_discrepancies': [{
+                'line_number': self.line_numbers[row],
+                'wearer': self.wearers[row],
+                'expected_total': amount(int(self.extended_units[row])),
+                'actual_total': amount(int(self.line_total_units[row])),
+                'difference': amount(int(self.line_delta_units[row]))
+            } for row in self.mismatched_lines(tolerance_units).tolist()],
+            'wearer_subtotals': [{
+                'wearer': wearer,
+                'line_count': self.wearer_line_counts[wearer],
+                'subtotal': amount(units)
+            } for wearer, units in self.wearer_subtotals.items()]
+        }
+
+
+def reconcile_invoice(line_items: Union[List[LineItem], LineItemBatch],
+                      format_sections: Union[Iterable[FormatSection], Dict[str, FormatSection]]) -> InvoiceReconciliation:
+    """
+    Reconcile the line and section amounts of an invoice.
+
+    Args:
+        line_items: Line items, as a list or a LineItemBatch
+        format_sections: Format sections, or an index of them by type
+
+    Returns:
+        InvoiceReconciliation of the invoice
+    """
+    batch = line_items if isinstance(line_items, LineItemBatch) else LineItemBatch(line_items)
+    sections = format_sections if isinstance(format_sections, dict) else index_format_sections(format_sections)
+    count = len(batch)
+
+    rate_units = np.array(batch.rate_units, dtype=np.int64)
+    quantities = np.array(batch.quantities, dtype=np.float64)
+    has_rate = np.array(batch.has_rate, dtype=bool)
+    has_total = np.array(batch.has_total, dtype=bool)
+    extended = np.where(has_rate, np.rint(rate_units * quantities), 0).astype(np.int64)
+    line_totals = np.where(has_total, np.array(batch.total_units, dtype=np.int64), 0)
+
+    # Wearers are numbered in order of first appearance, then summed by number
+    codes: Dict[Optional[str], int] = {}
+    wearer_index = np.fromiter((codes.setdefault(wearer, len(codes)) for wearer in batch.wearers),
+                               dtype=np.intp, count=count)
+    subtotals = np.zeros(len(codes), dtype=np.int64)
+    np.add.at(subtotals, wearer_index, line_totals)
+    line_counts = np.bincount(wearer_index, minlength=len(codes))
+    wearer_subtotals = {wearer: int(subtotals[code]) for wearer, code in codes.items() if wearer}
+    wearer_line_counts = {wearer: int(line_counts[code]) for wearer, code in codes.items() if wearer}
+
+    section_units = {}
+    for section_type in SECTION_TYPES:
+        section = sections.get(section_type)
+        section_units[section_type] = to_money_units(section.amount) if section is not None else None
+
+    return InvoiceReconciliation(
+        line_numbers=list(batch.line_numbers),
+        wearers=list(batch.wearers),
+        extended_units=extended,
+        line_total_units=line_totals,
+        line_checked=has_rate & has_total,
+        section_units=section_units,
+        wearer_subtotals=wearer_subtotals,
+        wearer_line_counts=wearer_line_counts
+    )
@@ -10,10 +10,17 @@ Reports are automatically saved to the documents/ directory and opened in the de
 import json
 import csv
 import io
+import itertools
+import textwrap
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from decimal import Decimal
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
+from database.models import format_money_units, money_units_or_zero
+
+from .models import quantity_or_one
+from .rollups import ROLLUP_DIMENSIONS
 from .report_utils import (
     get_documents_directory,
     get_default_report_path,
@@ -22,6 +29,41 @@ from .report_utils import (
 )
 
 
+# Columns of the validation CSV report
+BATCH_CSV_FIELDS = [
+    'Invoice Number', 'Invoice Date', 'Line Number', 'Part Number',
+    'Description', 'Item Type', 'Quantity', 'Actual Rate', 'Actual Total',
+    'Expected Rate', 'Expected Total', 'Delta', 'Status', 'Raw Text'
+]
+
+# Columns of the rollups CSV report written next to the line CSV
+ROLLUP_CSV_FIELDS = [
+    'Rollup', 'Key', 'Lines', 'Quantity', 'Actual Total', 'Expected Total', 'Overcharge', 'Failed Lines'
+]
+
+# Titles of the rollup dimensions
+ROLLUP_TITLES = {'wearer': 'Wearer', 'item_code': 'Item Code', 'item_type': 'Item Type'}
+
+
+def _format_money(units: int) -> str:
+    """Format an amount in ten-thousandths as dollars and cents."""
+    return f"${format_money_units(units)}"
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize Decimal amounts as numbers and lazily built parts arrays as lists."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'to_list'):
+        return value.to_list()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _has_rollups(rollups: Optional[Dict[str, Any]]) -> bool:
+    """Check whether validation rollups have any groups to report."""
+    return bool(rollups) and any(rollups.get(dimension) for dimension in ROLLUP_DIMENSIONS)
+
+
 class SimpleReportGenerator:
     """Simple report generator for validation JSON objects."""
     
@@ -50,6 +92,9 @@ class SimpleReportGenerator:
                 'txt': self.generate_txt_report(validation_data),
                 'csv': self.generate_csv_report(validation_data)
             }
+            rollups_csv = self.generate_rollups_csv_report(validation_data)
+            if rollups_csv:
+                reports['rollups_csv'] = rollups_csv
         else:
             # Generate only the preferred format
             if preferred_format == 'json':
@@ -58,6 +103,9 @@ class SimpleReportGenerator:
                 reports['txt'] = self.generate_txt_report(validation_data)
             else:  # default to csv
                 reports['csv'] = self.generate_csv_report(validation_data)
+                rollups_csv = self.generate_rollups_csv_report(validation_data)
+                if rollups_csv:
+                    reports['rollups_csv'] = rollups_csv
         
         # CRITICAL: Do NOT fallback to documents directory - use the provided path
         if output_base_path is None:
@@ -73,35 +121,39 @@ class SimpleReportGenerator:
     
     def generate_json_report(self, validation_data: Dict[str, Any]) -> str:
         """Return the validation JSON object unchanged."""
-        return json.dumps(validation_data, indent=2, ensure_ascii=False)
+        return json.dumps(validation_data, indent=2, ensure_ascii=False, default=_json_default)
     
     def generate_txt_report(self, validation_data: Dict[str, Any]) -> str:
         """Generate human-readable text summary."""
-        lines = []
-        
+        return "\n".join(self._iter_txt_report(validation_data, validation_data.get('error_lines', [])))
+    
+    def _iter_txt_report(self, validation_data: Dict[str, Any],
+                         error_lines: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """Yield the text report one line at a time."""
         # Header
         invoice_num = validation_data.get('invoice_metadata', {}).get('invoice_number', 'Unknown')
         invoice_date = validation_data.get('invoice_metadata', {}).get('invoice_date', 'Unknown')
         
-        lines.extend([
+        yield from [
             "INVOICE VALIDATION REPORT",
             "=" * 50,
             f"Invoice: {invoice_num}",
             f"Date: {invoice_date}",
             f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
             ""
-        ])
+        ]
         
         # Invoice totals validation
-        lines.extend(self._generate_format_section(validation_data))
+        yield from self._generate_format_section(validation_data)
         
         # Line items with errors
-        lines.extend(self._generate_error_lines_section(validation_data))
+        yield from self._iter_error_lines_section(error_lines)
         
         # Summary
-        lines.extend(self._generate_summary_section(validation_data))
+        yield from self._generate_summary_section(validation_data)
         
-        return "\n".join(lines)
+        # Rollups by wearer, item code and item type
+        yield from self._iter_rollup_section(validation_data.get('rollups'))
     
     def generate_csv_report(self, validation_data: Dict[str, Any]) -> str:
         """Generate CSV representation of validation data with enhanced error reporting."""
@@ -110,13 +162,7 @@ class SimpleReportGenerator:
         # Add UTF-8 BOM for Excel compatibility
         output.write('\ufeff')
         
-        fieldnames = [
-            'Invoice Number', 'Invoice Date', 'Line Number', 'Part Number',
-            'Description', 'Item Type', 'Quantity', 'Actual Rate', 'Actual Total',
-            'Expected Rate', 'Expected Total', 'Delta', 'Status', 'Raw Text'
-        ]
-        
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
+        writer = csv.DictWriter(output, fieldnames=BATCH_CSV_FIELDS)
         writer.writeheader()
         
         # Check if this is batch processing (has 'invoices' array)
@@ -137,9 +183,10 @@ class SimpleReportGenerator:
         
         # Process all parts and merge with error data
         parts = validation_data.get('parts', [])
-        actual_grand_total = 0.0
-        expected_grand_total = 0.0
-        total_delta = 0.0
+        # Totals are summed in fixed-point ten-thousandths
+        actual_grand_total = 0
+        expected_grand_total = 0
+        total_delta = 0
         
         for part in parts:
             line_number = part.get('lineitem_fields', {}).get('line_number')
@@ -148,14 +195,16 @@ class SimpleReportGenerator:
             if error_data:
                 # This line has validation errors
                 row = self._create_enhanced_csv_row(part, error_data, invoice_num, invoice_date, 'ERROR')
-                actual_grand_total += error_data.get('actual_total', 0)
-                expected_grand_total += error_data.get('expected_total', 0)
-                total_delta += (error_data.get('expected_total', 0) - error_data.get('actual_total', 0))
+                actual_total = money_units_or_zero(error_data.get('actual_total', 0))
+                expected_total = money_units_or_zero(error_data.get('expected_total', 0))
+                actual_grand_total += actual_total
+                expected_grand_total += expected_total
+                total_delta += expected_total - actual_total
             else:
                 # This line passed validation
                 row = self._create_enhanced_csv_row(part, None, invoice_num, invoice_date, 'VALID')
                 # For valid lines, actual = expected
-                line_total = part.get('lineitem_fields', {}).get('total', 0)
+                line_total = money_units_or_zero(part.get('lineitem_fields', {}).get('total', 0))
                 actual_grand_total += line_total
                 expected_grand_total += line_total
             
@@ -171,12 +220,12 @@ class SimpleReportGenerator:
             'Item Type': '',
             'Quantity': '',
             'Actual Rate': '',
-            'Actual Total': f"${actual_grand_total:.2f}",
+            'Actual Total': _format_money(actual_grand_total),
             'Expected Rate': '',
-            'Expected Total': f"${expected_grand_total:.2f}",
-            'Delta': f"${total_delta:.2f}",
+            'Expected Total': _format_money(expected_grand_total),
+            'Delta': _format_money(total_delta),
             'Status': 'SUMMARY',
-            'Raw Text': f"Total Delta: ${total_delta:.2f}"
+            'Raw Text': f"Total Delta: {_format_money(total_delta)}"
         }
         writer.writerow(summary_row)
         
@@ -184,10 +233,52 @@ class SimpleReportGenerator:
     
     def _generate_batch_csv(self, validation_data: Dict[str, Any], writer, output) -> str:
         """Generate CSV for batch processing with individual invoice sections."""
-        invoices = validation_data.get('invoices', [])
-        batch_actual_total = 0.0
-        batch_expected_total = 0.0
-        batch_delta = 0.0
+        self._write_batch_csv_rows(validation_data.get('invoices', []), writer)
+        return output.getvalue()
+    
+    def generate_rollups_csv_report(self, validation_data: Dict[str, Any]) -> str:
+        """
+        Generate the rollups CSV that accompanies the line CSV.
+        
+        Rollups have their own columns, so they go in a separate file rather
+        than after the line rows, keeping each CSV a single table.
+        
+        Returns:
+            The CSV text, or an empty string if the validation has no rollups
+        """
+        rollups = validation_data.get('rollups')
+        if not _has_rollups(rollups):
+            return ""
+        
+        output = io.StringIO()
+        # Add UTF-8 BOM for Excel compatibility
+        output.write('\ufeff')
+        self._write_rollup_csv_rows(rollups, output)
+        return output.getvalue()
+    
+    def _write_rollup_csv_rows(self, rollups: Dict[str, Any], output) -> None:
+        """Write the rollups header and one row per group."""
+        writer = csv.writer(output)
+        writer.writerow(ROLLUP_CSV_FIELDS)
+        for dimension in ROLLUP_DIMENSIONS:
+            for group in rollups.get(dimension, []):
+                writer.writerow([
+                    ROLLUP_TITLES[dimension],
+                    group.get('key', ''),
+                    group.get('line_count', 0),
+                    group.get('quantity', 0),
+                    _format_money(money_units_or_zero(group.get('actual_total', 0))),
+                    _format_money(money_units_or_zero(group.get('expected_total', 0))),
+                    _format_money(money_units_or_zero(group.get('overcharge', 0))),
+                    group.get('failed_lines', 0)
+                ])
+    
+    def _write_batch_csv_rows(self, invoices: Iterable[Dict[str, Any]], writer) -> None:
+        """Write per-invoice sections and the grand total row for a batch, one invoice at a time."""
+        # Totals are summed in fixed-point ten-thousandths
+        batch_actual_total = 0
+        batch_expected_total = 0
+        batch_delta = 0
         
         for invoice_data in invoices:
             invoice_metadata = invoice_data.get('invoice_metadata', {})
@@ -200,9 +291,9 @@ class SimpleReportGenerator:
             
             # Process all parts for this invoice
             parts = invoice_data.get('parts', [])
-            invoice_actual_total = 0.0
-            invoice_expected_total = 0.0
-            invoice_delta = 0.0
+            invoice_actual_total = 0
+            invoice_expected_total = 0
+            invoice_delta = 0
             
             for part in parts:
                 line_number = part.get('lineitem_fields', {}).get('line_number')
@@ -211,14 +302,16 @@ class SimpleReportGenerator:
                 if error_data:
                     # This line has validation errors
                     row = self._create_enhanced_csv_row(part, error_data, invoice_num, invoice_date, 'ERROR')
-                    invoice_actual_total += error_data.get('actual_total', 0)
-                    invoice_expected_total += error_data.get('expected_total', 0)
-                    invoice_delta += (error_data.get('expected_total', 0) - error_data.get('actual_total', 0))
+                    actual_total = money_units_or_zero(error_data.get('actual_total', 0))
+                    expected_total = money_units_or_zero(error_data.get('expected_total', 0))
+                    invoice_actual_total += actual_total
+                    invoice_expected_total += expected_total
+                    invoice_delta += expected_total - actual_total
                 else:
                     # This line passed validation
                     row = self._create_enhanced_csv_row(part, None, invoice_num, invoice_date, 'VALID')
                     # For valid lines, actual = expected
-                    line_total = part.get('lineitem_fields', {}).get('total', 0)
+                    line_total = money_units_or_zero(part.get('lineitem_fields', {}).get('total', 0))
                     invoice_actual_total += line_total
                     invoice_expected_total += line_total
                 
@@ -234,12 +327,12 @@ class SimpleReportGenerator:
                 'Item Type': '',
                 'Quantity': '',
                 'Actual Rate': '',
-                'Actual Total': f"${invoice_actual_total:.2f}",
+                'Actual Total': _format_money(invoice_actual_total),
                 'Expected Rate': '',
-                'Expected Total': f"${invoice_expected_total:.2f}",
-                'Delta': f"${invoice_delta:.2f}",
+                'Expected Total': _format_money(invoice_expected_total),
+                'Delta': _format_money(invoice_delta),
                 'Status': 'SUB-TOTAL',
-                'Raw Text': f"Invoice Delta: ${invoice_delta:.2f}"
+                'Raw Text': f"Invoice Delta: {_format_money(invoice_delta)}"
             }
             writer.writerow(sub_summary_row)
             
@@ -261,16 +354,14 @@ class SimpleReportGenerator:
             'Item Type': '',
             'Quantity': '',
             'Actual Rate': '',
-            'Actual Total': f"${batch_actual_total:.2f}",
+            'Actual Total': _format_money(batch_actual_total),
             'Expected Rate': '',
-            'Expected Total': f"${batch_expected_total:.2f}",
-            'Delta': f"${batch_delta:.2f}",
+            'Expected Total': _format_money(batch_expected_total),
+            'Delta': _format_money(batch_delta),
             'Status': 'GRAND TOTAL',
-            'Raw Text': f"Batch Total Delta: ${batch_delta:.2f}"
+            'Raw Text': f"Batch Total Delta: {_format_money(batch_delta)}"
         }
         writer.writerow(batch_summary_row)
-        
-        return output.getvalue()
     
     def _generate_format_section(self, validation_data: Dict[str, Any]) -> List[str]:
         """Generate format sections validation text."""
@@ -279,6 +370,11 @@ class SimpleReportGenerator:
             "-" * 26,
         ]
         
+        reconciliation = validation_data.get('reconciliation')
+        if reconciliation:
+            lines.extend(self._iter_reconciliation_lines(reconciliation))
+            return lines
+        
         format_sections = validation_data.get('format_sections', [])
         if format_sections:
             validation_status = "PASSED"
@@ -306,37 +402,69 @@ class SimpleReportGenerator:
         
         return lines
     
+    def _iter_reconciliation_lines(self, reconciliation: Dict[str, Any]) -> Iterator[str]:
+        """Yield the invoice totals reconciliation, with per-wearer subtotals."""
+        def money(value: Optional[float]) -> str:
+            return _format_money(money_units_or_zero(value)) if value is not None else "[Not found]"
+        
+        yield f"Line Items: {money(reconciliation.get('line_total'))} ({reconciliation.get('line_count', 0)} lines)"
+        for key in ('subtotal', 'freight', 'tax', 'total'):
+            yield f"{key.title()}: {money(reconciliation.get(key))}"
+        if reconciliation.get('subtotal_discrepancy'):
+            yield f"Subtotal - Line Items: {money(reconciliation['subtotal_discrepancy'])}"
+        if reconciliation.get('total_discrepancy'):
+            yield f"Total - (Subtotal + Freight + Tax): {money(reconciliation['total_discrepancy'])}"
+        for line in reconciliation.get('line_discrepancies', []):
+            yield (f"Line {line.get('line_number')}: total {money(line.get('actual_total'))}, "
+                   f"rate x quantity {money(line.get('expected_total'))}")
+        yield f"Validation: {reconciliation.get('status', 'INCOMPLETE')}"
+        
+        wearer_subtotals = reconciliation.get('wearer_subtotals', [])
+        if wearer_subtotals:
+            yield ""
+            yield "Subtotals by Wearer:"
+            for wearer in wearer_subtotals:
+                yield f"  {wearer.get('wearer')}: {money(wearer.get('subtotal'))} ({wearer.get('line_count', 0)} lines)"
+        yield ""
+    
     def _generate_error_lines_section(self, validation_data: Dict[str, Any]) -> List[str]:
         """Generate error lines section using enhanced error_lines data."""
-        error_lines = validation_data.get('error_lines', [])
+        return list(self._iter_error_lines_section(validation_data.get('error_lines', [])))
+    
+    def _iter_error_lines_section(self, error_lines: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """Yield the error lines section one line at a time."""
+        error_lines = iter(error_lines)
+        first_error = next(error_lines, None)
         
-        if not error_lines:
-            return [
+        if first_error is None:
+            yield from [
                 "RATE VALIDATION ERRORS:",
                 "-" * 24,
                 "No validation errors found - all rates match authorized prices.",
                 ""
             ]
+            return
         
-        lines = [
+        yield from [
             "RATE VALIDATION ERRORS:",
             "-" * 24,
             ""
         ]
         
-        total_delta = 0.0
-        actual_grand_total = 0.0
-        expected_grand_total = 0.0
+        # Totals are summed in fixed-point ten-thousandths
+        total_delta = 0
+        actual_grand_total = 0
+        expected_grand_total = 0
         
-        for error in error_lines:
+        for error in itertools.chain([first_error], error_lines):
             line_number = error.get('line_number', 'Unknown')
             part_number = error.get('part_number', 'Unknown')
             description = error.get('description', 'No description')
             qty = error.get('qty', 1)
             expected_price = error.get('expected_price', 0)
             actual_price = error.get('actual_price', 0)
-            expected_total = error.get('expected_total', 0)
-            actual_total = error.get('actual_total', 0)
+            expected_total = money_units_or_zero(error.get('expected_total', 0))
+            actual_total = money_units_or_zero(error.get('actual_total', 0))
             raw_text = error.get('raw_text', '')
             
             # Calculate delta for this line (negative = overcharge)
@@ -346,31 +474,30 @@ class SimpleReportGenerator:
             expected_grand_total += expected_total
             
             # Handle None values safely
-            expected_price_str = f"${expected_price:.2f}" if expected_price is not None else "N/A"
-            actual_price_str = f"${actual_price:.2f}" if actual_price is not None else "N/A"
-            expected_total_str = f"${expected_total:.2f}" if expected_total is not None else "N/A"
-            actual_total_str = f"${actual_total:.2f}" if actual_total is not None else "N/A"
-            line_delta_str = f"{'+' if line_delta >= 0 else ''}${line_delta:.2f}" if line_delta is not None else "N/A"
+            expected_price_str = (_format_money(money_units_or_zero(expected_price))
+                                  if expected_price is not None else "N/A")
+            actual_price_str = _format_money(money_units_or_zero(actual_price)) if actual_price is not None else "N/A"
+            expected_total_str = _format_money(expected_total)
+            actual_total_str = _format_money(actual_total)
+            line_delta_str = f"{'+' if line_delta >= 0 else ''}{_format_money(line_delta)}"
             
-            lines.extend([
+            yield from [
                 f"Line {line_number}: {part_number} - {description}",
                 f"  Expected: {qty} × {expected_price_str} = {expected_total_str}",
                 f"  Actual:   {qty} × {actual_price_str} = {actual_total_str}",
                 f"  Delta:    {line_delta_str}",
                 f"  Raw: {raw_text}",
                 ""
-            ])
+            ]
         
-        lines.extend([
+        yield from [
             "INVOICE SUMMARY:",
             "-" * 16,
-            f"Invoice Grand Total:   ${actual_grand_total:.2f}",
-            f"Total Delta:           {'+' if total_delta >= 0 else ''}${total_delta:.2f}",
-            f"Correct Grand Total:   ${expected_grand_total:.2f}",
+            f"Invoice Grand Total:   {_format_money(actual_grand_total)}",
+            f"Total Delta:           {'+' if total_delta >= 0 else ''}{_format_money(total_delta)}",
+            f"Correct Grand Total:   {_format_money(expected_grand_total)}",
             ""
-        ])
-        
-        return lines
+        ]
     
     def _generate_summary_section(self, validation_data: Dict[str, Any]) -> List[str]:
         """Generate summary section."""
@@ -395,6 +522,28 @@ class SimpleReportGenerator:
         
         return lines
     
+    def _iter_rollup_section(self, rollups: Optional[Dict[str, Any]]) -> Iterator[str]:
+        """Yield the rollup section of the text report."""
+        if not _has_rollups(rollups):
+            return
+        
+        yield "ROLLUPS:"
+        yield "-" * 8
+        for dimension in ROLLUP_DIMENSIONS:
+            groups = rollups.get(dimension, [])
+            if not groups:
+                continue
+            yield f"By {ROLLUP_TITLES[dimension]}:"
+            for group in groups:
+                overcharge = money_units_or_zero(group.get('overcharge', 0))
+                line = (f"  {group.get('key')}: {group.get('line_count', 0)} lines, "
+                        f"{_format_money(money_units_or_zero(group.get('actual_total', 0)))} invoiced, "
+                        f"{_format_money(money_units_or_zero(group.get('expected_total', 0)))} expected")
+                if overcharge:
+                    line += f", {_format_money(overcharge)} overcharged ({group.get('failed_lines', 0)} failed)"
+                yield line
+            yield ""
+    
     def _parse_rate_and_quantity(self, raw_text: str) -> tuple:
         """Parse rate and quantity from raw text line."""
         if not raw_text:
@@ -444,26 +593,26 @@ class SimpleReportGenerator:
         if error_data:
             # Use enhanced error data
             quantity = error_data.get('qty', 1)
-            actual_rate = error_data.get('actual_price', 0)
-            expected_rate = error_data.get('expected_price', 0)
-            actual_total = error_data.get('actual_total', 0)
-            expected_total = error_data.get('expected_total', 0)
+            actual_rate = money_units_or_zero(error_data.get('actual_price', 0))
+            expected_rate = money_units_or_zero(error_data.get('expected_price', 0))
+            actual_total = money_units_or_zero(error_data.get('actual_total', 0))
+            expected_total = money_units_or_zero(error_data.get('expected_total', 0))
             delta = expected_total - actual_total
         else:
             # Valid line - extract from part data with proper defaults
             quantity = line_fields.get('quantity', 1) or 1
-            actual_rate = db_fields.get('authorized_price', 0) or 0
+            actual_rate = money_units_or_zero(db_fields.get('authorized_price', 0))
             expected_rate = actual_rate  # Same for valid lines
             
             # Calculate totals if not provided
-            line_total = line_fields.get('total', 0) or 0
+            line_total = money_units_or_zero(line_fields.get('total', 0))
             if line_total > 0:
                 actual_total = line_total
             else:
-                actual_total = actual_rate * quantity
+                actual_total = round(actual_rate * quantity_or_one(quantity))
             
             expected_total = actual_total  # Same for valid lines
-            delta = 0.0
+            delta = 0
         
         return {
             'Invoice Number': invoice_num,
@@ -473,11 +622,11 @@ class SimpleReportGenerator:
             'Description': description,
             'Item Type': item_type,
             'Quantity': str(quantity) if quantity else '',
-            'Actual Rate': f"${actual_rate:.2f}" if actual_rate is not None else '$0.00',
-            'Actual Total': f"${actual_total:.2f}" if actual_total is not None else '$0.00',
-            'Expected Rate': f"${expected_rate:.2f}" if expected_rate is not None else '$0.00',
-            'Expected Total': f"${expected_total:.2f}" if expected_total is not None else '$0.00',
-            'Delta': f"${delta:.2f}" if delta is not None else '$0.00',
+            'Actual Rate': _format_money(actual_rate),
+            'Actual Total': _format_money(actual_total),
+            'Expected Rate': _format_money(expected_rate),
+            'Expected Total': _format_money(expected_total),
+            'Delta': _format_money(delta),
             'Status': status,
             'Raw Text': raw_text
         }
@@ -495,6 +644,43 @@ class SimpleReportGenerator:
         Returns:
             Dictionary mapping format to file path for auto-opening
         """
+        paths = self._report_file_paths(base_path, validation_data)
+        report_files = {}
+        
+        # Write only the formats that were generated
+        if 'json' in reports:
+            with open(paths['json'], 'w', encoding='utf-8') as f:
+                f.write(reports['json'])
+            report_files['json'] = paths['json']
+        
+        if 'txt' in reports:
+            with open(paths['txt'], 'w', encoding='utf-8') as f:
+                f.write(reports['txt'])
+            report_files['txt'] = paths['txt']
+        
+        if 'csv' in reports:
+            with open(paths['csv'], 'w', encoding='utf-8', newline='') as f:
+                f.write(reports['csv'])
+            report_files['csv'] = paths['csv']
+        
+        if 'rollups_csv' in reports:
+            with open(paths['rollups_csv'], 'w', encoding='utf-8', newline='') as f:
+                f.write(reports['rollups_csv'])
+            report_files['rollups_csv'] = paths['rollups_csv']
+        
+        return report_files
+    
+    def _report_file_paths(self, base_path: str, validation_data: Dict[str, Any]) -> Dict[str, Path]:
+        """
+        Build report file paths under a date-based subdirectory, creating it.
+        
+        Args:
+            base_path: Base path for output files
+            validation_data: Validation data containing invoice metadata
+            
+        Returns:
+            Dictionary mapping format to file path
+        """
         base_path = Path(base_path)
         
         # Create date-based subdirectory: selected_destination/YYYYMMDD/
@@ -512,28 +698,89 @@ class SimpleReportGenerator:
             
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        report_files = {}
+        return {
+            'json': output_dir / f"{base_name}_validation_{timestamp}.json",
+            'txt': output_dir / f"{base_name}_report_{timestamp}.txt",
+            'csv': output_dir / f"{base_name}_analysis_{timestamp}.csv",
+            'rollups_csv': output_dir / f"{base_name}_analysis_{timestamp}_rollups.csv"
+        }
+    
+    def write_batch_reports(self, batch, output_base_path: str, auto_open: bool = True,
+                            preferred_format: str = "csv") -> Dict[str, Path]:
+        """
+        Stream batch reports to disk from a spilled batch, one invoice at a time.
         
-        # Write only the formats that were generated
-        if 'json' in reports:
-            json_path = output_dir / f"{base_name}_validation_{timestamp}.json"
-            with open(json_path, 'w', encoding='utf-8') as f:
-                f.write(reports['json'])
-            report_files['json'] = json_path
+        Produces the same files as ``generate_reports`` does for a batch
+        validation JSON, without ever holding the whole batch in memory.
         
-        if 'txt' in reports:
-            txt_path = output_dir / f"{base_name}_report_{timestamp}.txt"
-            with open(txt_path, 'w', encoding='utf-8') as f:
-                f.write(reports['txt'])
-            report_files['txt'] = txt_path
+        Args:
+            batch: SpillingBatchAggregator holding the batch's invoice results
+            output_base_path: Base path for output files
+            auto_open: Whether to automatically open the generated reports
+            preferred_format: Preferred format for auto-opening
+            
+        Returns:
+            Dictionary mapping format to file path
+        """
+        summary_json = batch.summary_json()
+        paths = self._report_file_paths(output_base_path, summary_json)
+        
+        with open(paths['json'], 'w', encoding='utf-8') as f:
+            self._write_batch_json(batch, summary_json, f)
+        
+        with open(paths['txt'], 'w', encoding='utf-8') as f:
+            for index, line in enumerate(self._iter_txt_report(summary_json, batch.iter_error_lines())):
+                f.write(line if index == 0 else "\n" + line)
+        
+        with open(paths['csv'], 'w', encoding='utf-8', newline='') as f:
+            # Add UTF-8 BOM for Excel compatibility
+            f.write('\ufeff')
+            writer = csv.DictWriter(f, fieldnames=BATCH_CSV_FIELDS)
+            writer.writeheader()
+            self._write_batch_csv_rows(batch.iter_invoices(), writer)
+        
+        rollups = summary_json.get('rollups')
+        if _has_rollups(rollups):
+            with open(paths['rollups_csv'], 'w', encoding='utf-8', newline='') as f:
+                f.write('\ufeff')
+                self._write_rollup_csv_rows(rollups, f)
+        else:
+            del paths['rollups_csv']
         
-        if 'csv' in reports:
-            csv_path = output_dir / f"{base_name}_analysis_{timestamp}.csv"
-            with open(csv_path, 'w', encoding='utf-8', newline='') as f:
-                f.write(reports['csv'])
-            report_files['csv'] = csv_path
+        if auto_open:
+            auto_open_reports(paths, primary_format=preferred_format)
         
-        return report_files
+        return paths
+    
+    def _write_batch_json(self, batch, summary_json: Dict[str, Any], f) -> None:
+        """Write the batch JSON report with the layout of ``generate_json_report``."""
+        def dump(value: Any, depth: int) -> str:
+            # Indent nested lines to the value's depth inside the top-level object
+            return textwrap.indent(json.dumps(value, indent=2, ensure_ascii=False, default=_json_default),
+                                   '  ' * depth).lstrip()
+        
+        def write_array(key: str, items: Iterable[Any]) -> None:
+            f.write(f'  "{key}": [')
+            separator = "\n"
+            empty = True
+            for item in items:
+                f.write(separator + "    " + dump(item, 2))
+                separator = ",\n"
+                empty = False
+            f.write("]" if empty else "\n  ]")
+        
+        f.write("{\n")
+        f.write(f'  "batch_metadata": {dump(summary_json["batch_metadata"], 1)},\n')
+        f.write(f'  "batch_summary": {dump(summary_json["batch_summary"], 1)},\n')
+        write_array("invoices", batch.iter_invoices())
+        f.write(",\n")
+        write_array("parts", batch.iter_parts())
+        f.write(",\n")
+        write_array("error_lines", batch.iter_error_lines())
+        f.write(",\n")
+        f.write(f'  "validation_summary": {dump(summary_json["validation_summary"], 1)},\n')
+        f.write(f'  "rollups": {dump(summary_json.get("rollups", {}), 1)}\n')
+        f.write("}")
 
 
 def generate_reports(validation_data: Dict[str, Any], output_path: str = None) -> Dict[str, str]:
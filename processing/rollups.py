@@ -0,0 +1,132 @@
+"""
+Per-wearer, per-item code and per-item type rollups of validated lines.
+
+Finance reviews invoices by wearer and by item as well as line by line.
+LineRollups keeps one hash map per dimension from key to a small list of
+running totals (lines, quantity, actual and expected totals, overcharge and
+failed lines). Validation adds each line as it is validated, so building the
+rollups costs no extra pass over the lines or the stored results. Batches
+merge each invoice's rollups as the invoice's result arrives.
+
+Amounts are integer ten-thousandths. Overcharge is the amount by which a
+failed line's total exceeds its expected total.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from database.models import money_units_or_zero, money_units_to_float
+
+
+# Dimensions lines are rolled up by, in report order
+ROLLUP_DIMENSIONS = ('wearer', 'item_code', 'item_type')
+
+# Key of lines with no value for a dimension, e.g. non-garment items have no wearer
+NO_KEY = '(none)'
+
+# Positions of the running totals in each group
+_LINES, _QUANTITY, _ACTUAL, _EXPECTED, _OVERCHARGE, _FAILED = range(6)
+
+# Running totals that hold amounts in ten-thousandths
+_AMOUNTS = (('actual_total', _ACTUAL), ('expected_total', _EXPECTED), ('overcharge', _OVERCHARGE))
+
+
+class LineRollups:
+    """Running totals of validated lines grouped by wearer, item code and item type."""
+
+    __slots__ = ('groups',)
+
+    def __init__(self):
+        self.groups: Dict[str, Dict[str, List[Any]]] = {dimension: {} for dimension in ROLLUP_DIMENSIONS}
+
+    def __len__(self) -> int:
+        """Number of lines added, counted on the wearer dimension."""
+        return sum(totals[_LINES] for totals in self.groups['wearer'].values())
+
+    def add_line(self, wearer: Optional[str], item_code: Optional[str], item_type: Optional[str],
+                 quantity: float, actual_units: int, expected_units: int, failed: bool) -> None:
+        """
+        Add one validated line to its groups.
+
+        Args:
+            wearer: Wearer of the line
+            item_code: Item code (part number) of the line
+            item_type: Item type of the line
+            quantity: Quantity of the line
+            actual_units: Invoiced line total in ten-thousandths
+            expected_units: Line total at the authorized price in ten-thousandths
+            failed: Whether the line failed price validation
+        """
+        overcharge = actual_units - expected_units if failed and actual_units > expected_units else 0
+        for groups, key in ((self.groups['wearer'], wearer), (self.groups['item_code'], item_code),
+                            (self.groups['item_type'], item_type)):
+            totals = groups.get(key or NO_KEY)
+            if totals is None:
+                totals = groups[key or NO_KEY] = [0, 0, 0, 0, 0, 0]
+            totals[_LINES] += 1
+            totals[_QUANTITY] += quantity
+            totals[_ACTUAL] += actual_units
+            totals[_EXPECTED] += expected_units
+            totals[_OVERCHARGE] += overcharge
+            totals[_FAILED] += failed
+
+    def add_columns(self, wearers: Iterable[Optional[str]], item_codes: Iterable[Optional[str]],
+                    item_types: Iterable[Optional[str]], quantities: Iterable[float],
+                    actual_units: Iterable[int], expected_units: Iterable[int], failed: Iterable[bool]) -> None:
+        """Add validated lines given as parallel columns, one entry per line, as ``add_line`` does."""
+        for line in zip(wearers, item_codes, item_types, quantities, actual_units, expected_units, failed):
+            self.add_line(*line)
+
+    def merge(self, rollups: Dict[str, List[Dict[str, Any]]], sign: int = 1) -> None:
+        """
+        Add rollups from ``to_dict`` of another LineRollups, e.g. one invoice's into a batch's.
+
+        Args:
+            rollups: Rollups dictionary to add
+            sign: -1 to subtract the rollups instead, e.g. when a result is replaced
+        """
+        for dimension in ROLLUP_DIMENSIONS:
+            groups = self.groups[dimension]
+            for row in rollups.get(dimension, []):
+                key = row.get('key') or NO_KEY
+                totals = groups.get(key)
+                if totals is None:
+                    totals = groups[key] = [0, 0, 0, 0, 0, 0]
+                totals[_LINES] += sign * row.get('line_count', 0)
+                totals[_QUANTITY] += sign * row.get('quantity', 0)
+                for name, position in _AMOUNTS:
+                    totals[position] += sign * money_units_or_zero(row.get(name, 0))
+                totals[_FAILED] += sign * row.get('failed_lines', 0)
+                if totals[_LINES] <= 0:
+                    del groups[key]
+
+    def iter_groups(self, dimension: str) -> Iterator[Tuple[str, List[Any]]]:
+        """
+        Yield the groups of a dimension, largest overcharge first.
+
+        Yields:
+            (key, totals) pairs; amounts in totals are ten-thousandths
+        """
+        groups = self.groups[dimension]
+        yield from sorted(groups.items(), key=lambda item: (-item[1][_OVERCHARGE], -item[1][_ACTUAL], item[0]))
+
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Convert the rollups to a dictionary for validation JSON."""
+        return {
+            dimension: [{
+                'key': key,
+                'line_count': totals[_LINES],
+                'quantity': totals[_QUANTITY],
+                'actual_total': money_units_to_float(totals[_ACTUAL]),
+                'expected_total': money_units_to_float(totals[_EXPECTED]),
+                'overcharge': money_units_to_float(totals[_OVERCHARGE]),
+                'failed_lines': totals[_FAILED]
+            } for key, totals in self.iter_groups(dimension)]
+            for dimension in ROLLUP_DIMENSIONS
+        }
+
+    @classmethod
+    def from_dict(cls, rollups: Dict[str, List[Dict[str, Any]]]) -> 'LineRollups':
+        """Create LineRollups from ``to_dict`` output."""
+        result = cls()
+        result.merge(rollups)
+        return result
@@ -0,0 +1,164 @@
+"""
+Crash-safe journal for directory processing runs.
+
+Each directory run is registered in the ``processing_runs`` table and every
+file is journaled in ``processing_run_files`` as soon as its result is final,
+with the validation output serialized by the binary codec. If the run is interrupted
+(Ctrl-C, crash, or a PDF that hangs extraction), resuming it restores the
+journaled results instead of extracting those files again, processes only
+the remaining files, and rebuilds the batch report from the complete set.
+"""
+
+import dataclasses
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from database.database import DatabaseManager
+from database.models import ProcessingRun, RunFileResult
+from .binary_codec import CodecError, decode_value, encode_value, is_encoded
+from .file_manifest import manifest_key
+
+
+# Result fields not worth journaling; the raw extraction is never needed to rebuild reports
+_UNJOURNALED_FIELDS = ('extraction_json',)
+
+
+class RunJournal:
+    """
+    Journals per-file completion of a directory processing run.
+
+    Journal writes are best-effort: a failure is logged and processing
+    continues, since losing the ability to resume must never fail a run.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, run: ProcessingRun,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the journal for an existing run record.
+
+        Args:
+            db_manager: Database manager holding the journal tables
+            run: Run being journaled
+            logger: Optional logger
+        """
+        self.db_manager = db_manager
+        self.run = run
+        self.logger = logger or logging.getLogger(__name__)
+
+    @property
+    def run_id(self) -> str:
+        """Identifier of the journaled run."""
+        return self.run.run_id
+
+    @classmethod
+    def open(cls, db_manager: DatabaseManager, run_id: str, input_dir: Path,
+             output_path: Optional[Path], total_files: int,
+             logger: Optional[logging.Logger] = None) -> 'RunJournal':
+        """
+        Resume the run with the given ID, or start it if it does not exist yet.
+
+        Args:
+            db_manager: Database manager holding the journal tables
+            run_id: Run identifier
+            input_dir: Directory being processed
+            output_path: Directory reports are written to
+            total_files: Number of PDFs found for this run
+            logger: Optional logger
+
+        Returns:
+            RunJournal for the run, marked as running
+
+        Raises:
+            DatabaseError: If the journal cannot be read or written
+        """
+        logger = logger or logging.getLogger(__name__)
+        run = db_manager.get_processing_run(run_id)
+
+        if run is None:
+            run = db_manager.create_processing_run(ProcessingRun(
+                run_id=run_id,
+                input_path=str(input_dir),
+                output_path=str(output_path) if output_path else None,
+                total_files=total_files
+            ))
+        else:
+            if Path(run.input_path) != Path(input_dir):
+                logger.warning(f"Run {run_id} was started for {run.input_path}, resuming with {input_dir}")
+            db_manager.update_processing_run(run_id, 'running', total_files=total_files)
+            run.status = 'running'
+            logger.info(f"Resuming processing run {run_id}")
+
+        return cls(db_manager, run, logger)
+
+    def completed_results(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the journaled results of files already completed in this run.
+
+        Returns:
+            Dict mapping manifest keys (resolved file paths) to ProcessingResult
+            field dictionaries
+        """
+        results = {}
+        for file_path, entry in self.db_manager.get_run_files(self.run_id).items():
+            try:
+                if is_encoded(entry.result_json):
+                    results[file_path] = decode_value(entry.result_json)
+                else:
+                    # Journals written before the binary codec hold JSON text
+                    results[file_path] = json.loads(entry.result_json)
+            except (CodecError, ValueError) as e:
+                self.logger.warning(f"Ignoring unreadable journal entry for {file_path}: {e}")
+        return results
+
+    def record(self, result: Any) -> None:
+        """
+        Journal the final result of one file.
+
+        Args:
+            result: ProcessingResult of the file
+        """
+        data = dataclasses.asdict(result)
+        for field_name in _UNJOURNALED_FIELDS:
+            data.pop(field_name, None)
+
+        try:
+            self.db_manager.record_run_file(RunFileResult(
+                run_id=self.run_id,
+                file_path=manifest_key(Path(result.invoice_path)),
+                status='success' if result.success else 'failed',
+                result_json=encode_value(data),
+                invoice_number=result.invoice_number,
+                processing_time=result.processing_time
+            ))
+        except Exception as e:
+            self.logger.warning(f"Could not journal {result.invoice_path} for run {self.run_id}: {e}")
+
+    def finish(self, status: str = 'completed') -> None:
+        """
+        Mark the run as completed or interrupted.
+
+        Args:
+            status: Final run status ('completed' or 'interrupted')
+        """
+        try:
+            self.db_manager.update_processing_run(self.run_id, status)
+            self.run.status = status
+        except Exception as e:
+            self.logger.warning(f"Could not mark run {self.run_id} as {status}: {e}")
+
+
+def split_journaled_files(pdf_files: List[Path],
+                          completed: Dict[str, Dict[str, Any]]) -> List[Path]:
+    """
+    Return the files that still need processing in a resumed run.
+
+    Args:
+        pdf_files: All PDF files of the run
+        completed: Journaled results keyed by manifest key
+
+    Returns:
+        Files without a journaled result, in input order
+    """
+    return [pdf_file for pdf_file in pdf_files if manifest_key(pdf_file) not in completed]
@@ -0,0 +1,125 @@
+"""
+Compiled price tolerance rules for validation.
+
+Tolerance rules are stored per part number, category or item type, so ruin
+charges can be judged more loosely than rentals, for example. Resolving a
+line's rule from the stored rules would mean checking three scopes in order
+of precedence for every line. ToleranceTable instead compiles the rules once
+per run into packed arrays of absolute tolerances and percentages, indexed
+through two dicts: one keyed by part number and one keyed by (item type,
+category), both as stored on the part. Each dict is filled the first time a
+part number or combination is seen with the rule that wins for it, so after
+that every line resolves its tolerance with at most two dict lookups.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database.models import Part, ToleranceRule, normalize_component
+
+
+# Rule index meaning "no rule applies"
+NO_RULE = -1
+
+
+class ToleranceTable:
+    """Tolerance rules compiled into arrays for per-line lookup."""
+
+    def __init__(self, rules: Iterable[ToleranceRule] = ()):
+        """
+        Compile tolerance rules.
+
+        Args:
+            rules: Rules to compile; a later rule for the same scope and
+                match value replaces an earlier one
+        """
+        self.rules: List[ToleranceRule] = []
+        # Packed tolerances by rule index
+        self.absolute_units = array('q')
+        self.percent_ppm = array('q')
+
+        scoped: Dict[str, Dict[str, int]] = {'part': {}, 'category': {}, 'item_type': {}}
+        for rule in rules:
+            index = scoped[rule.scope].get(rule.match_value)
+            if index is None:
+                index = scoped[rule.scope][rule.match_value] = len(self.rules)
+                self.rules.append(rule)
+                self.absolute_units.append(rule.absolute_units)
+                self.percent_ppm.append(rule.percent_ppm)
+            else:
+                self.rules[index] = rule
+                self.absolute_units[index] = rule.absolute_units
+                self.percent_ppm[index] = rule.percent_ppm
+
+        self._part_rules = scoped['part']
+        self._category_rules = scoped['category']
+        self._item_type_rules = scoped['item_type']
+        # Resolved part number rule by part number as stored on parts
+        self._by_part: Dict[Optional[str], int] = {}
+        # Winning category or item type rule by (item_type, category) as stored on parts
+        self._by_class: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _part_rule(self, part_number: Optional[str]) -> int:
+        """Resolve and remember the rule of a part number."""
+        index = self._part_rules.get(normalize_component(part_number), NO_RULE)
+        self._by_part[part_number] = index
+        return index
+
+    def _class_rule(self, item_type: Optional[str], category: Optional[str]) -> int:
+        """Resolve and remember the rule of an item type and category combination."""
+        index = self._category_rules.get(normalize_component(category), NO_RULE)
+        if index == NO_RULE:
+            index = self._item_type_rules.get(normalize_component(item_type), NO_RULE)
+        self._by_class[(item_type, category)] = index
+        return index
+
+    def rule_index(self, part_number: Optional[str], item_type: Optional[str],
+                   category: Optional[str]) -> int:
+        """
+        Get the index of the rule that applies to a part.
+
+        Args:
+            part_number: Part number of the part
+            item_type: Item type of the part
+            category: Category of the part
+
+        Returns:
+            int: Rule index, or NO_RULE if no rule applies
+        """
+        if self._part_rules:
+            index = self._by_part.get(part_number)
+            if index is None:
+                index = self._part_rule(part_number)
+            if index != NO_RULE:
+                return index
+        index = self._by_class.get((item_type, category))
+        if index is None:
+            index = self._class_rule(item_type, category)
+        return index
+
+    def rule_for(self, part: Part) -> Optional[ToleranceRule]:
+        """Get the rule that applies to a part, or None if the default tolerance applies."""
+        index = self.rule_index(part.part_number, part.item_type, part.category)
+        return self.rules[index] if index != NO_RULE else None
+
+    def tolerance_units(self, part: Part, authorized_units: int, default_units: int) -> int:
+        """
+        Get the allowed price difference for a line of a known part.
+
+        Args:
+            part: Part the line was matched to
+            authorized_units: Authorized price in integer ten-thousandths
+            default_units: Tolerance used when no rule applies
+
+        Returns:
+            int: Allowed difference in integer ten-thousandths
+        """
+        if not self.rules:
+            return default_units
+        index = self.rule_index(part.part_number, part.item_type, part.category)
+        if index == NO_RULE:
+            return default_units
+        return max(self.absolute_units[index], abs(authorized_units) * self.percent_ppm[index] // 1_000_000)
@@ -36,12 +36,19 @@ Usage Examples:
 import logging
 import json
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterable, List, Any, Optional, Tuple, Union
+
+import numpy as np
 
 from database.database import DatabaseManager
-from database.models import Part
+from database.parts_index import PartsIndex
+from database.price_history import PriceHistoryIndex, parse_invoice_date
+from database.models import (
+    Part, PartRateStats, build_composite_key, money_units_or_zero, money_units_to_decimal, money_units_to_float,
+    to_money_units
+)
 from .validation_models import (
     ValidationConfiguration, 
     InvoiceValidationResult,
@@ -50,6 +57,10 @@ from .validation_models import (
     AnomalyType
 )
 from .part_discovery import SimplePartDiscoveryService
+from .columnar_validation import FAILED, PASSED, LineColumns, ValidatedParts, evaluate
+from .models import PartsArray, quantity_or_one
+from .rollups import LineRollups
+from .tolerance_rules import ToleranceTable
 
 
 logger = logging.getLogger(__name__)
@@ -65,27 +76,45 @@ class ValidationEngine:
     
     def __init__(self,
                  db_manager: DatabaseManager,
-                 config: Optional[ValidationConfiguration] = None):
+                 config: Optional[ValidationConfiguration] = None,
+                 parts_index: Optional[PartsIndex] = None,
+                 discovery_service: Optional[SimplePartDiscoveryService] = None,
+                 price_history: Optional[PriceHistoryIndex] = None):
         """
         Initialize the validation engine.
         
         Args:
             db_manager: Database manager for parts operations
             config: Optional validation configuration
+            parts_index: Optional cached parts index used for part lookups
+                instead of querying the database per line item
+            discovery_service: Optional discovery service to share, so unknown
+                parts resolved before validation are not prompted for again
+            price_history: Optional price history index to share; one is
+                created for the engine when omitted
         """
         self.db_manager = db_manager
         self.config = config or ValidationConfiguration()
+        self.parts_lookup = parts_index if parts_index is not None else db_manager
+        self.price_history = price_history if price_history is not None else PriceHistoryIndex(db_manager)
+        self._tolerance_table: Optional[ToleranceTable] = None
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         
         # Always initialize discovery service - interactive discovery always enabled
-        self.discovery_service = SimplePartDiscoveryService(db_manager)
+        self.discovery_service = discovery_service or SimplePartDiscoveryService(db_manager)
     
-    def validate_invoice_json(self, extraction_json: Dict[str, Any]) -> Dict[str, Any]:
+    def validate_invoice_json(self, extraction_json: Dict[str, Any],
+                              interactive_discovery: bool = True,
+                              resolved_parts: Optional[Dict[str, Optional[Part]]] = None) -> Dict[str, Any]:
         """
         Validate invoice extraction JSON against database.
         
         Args:
             extraction_json: Invoice extraction data with parts array
+            interactive_discovery: Prompt for unknown parts while validating; disable
+                when discovery has already run for the invoice (e.g. batch discovery)
+            resolved_parts: Part map from ``resolve_parts``, shared with discovery;
+                resolved here when omitted
             
         Returns:
             Validation JSON with error_lines and validation_summary
@@ -105,6 +134,7 @@ class ValidationEngine:
             'validation_mode': validation_mode,
             'parts': [],
             'error_lines': [],
+            'rate_outliers': [],
             'validation_summary': {
                 'total_parts': 0,
                 'passed_parts': 0,
@@ -113,14 +143,27 @@ class ValidationEngine:
                 'validation_errors': []
             }
         }
+        if 'reconciliation' in extraction_json:
+            validation_result['reconciliation'] = extraction_json['reconciliation']
         
         # Process each part
         parts = extraction_json.get('parts', [])
         validation_result['validation_summary']['total_parts'] = len(parts)
+        if resolved_parts is None:
+            resolved_parts = self.resolve_parts(parts)
+        rate_stats = self._load_rate_stats(self._rate_key(part_data.get('database_fields', {})) for part_data in parts)
+        price_date = self._price_date(invoice_metadata) if self._refresh_price_history() else None
+        rollups = LineRollups()
         
         for part_data in parts:
-            validated_part = self._validate_single_part(part_data, validation_mode)
+            validated_part = self._validate_single_part(part_data, validation_mode, interactive_discovery,
+                                                        resolved_parts, price_date)
             validation_result['parts'].append(validated_part)
+            line_totals = self._add_to_rollups(rollups, validated_part)
+            
+            rate_outlier = self._check_rate_outlier(validated_part, rate_stats)
+            if rate_outlier is not None:
+                validation_result['rate_outliers'].append(rate_outlier)
             
             # Update summary statistics
             if validated_part.get('validation_status') == 'PASSED':
@@ -128,14 +171,16 @@ class ValidationEngine:
             elif validated_part.get('validation_status') == 'FAILED':
                 validation_result['validation_summary']['failed_parts'] += 1
                 # Add to error_lines for CSV reporting
-                error_line = self._create_error_line(validated_part, invoice_metadata)
+                error_line = self._create_error_line(validated_part, invoice_metadata, line_totals)
                 validation_result['error_lines'].append(error_line)
             elif validated_part.get('validation_status') == 'UNKNOWN':
                 validation_result['validation_summary']['unknown_parts'] += 1
                 # Add to error_lines for CSV reporting
-                error_line = self._create_error_line(validated_part, invoice_metadata)
+                error_line = self._create_error_line(validated_part, invoice_metadata, line_totals)
                 validation_result['error_lines'].append(error_line)
         
+        validation_result['rollups'] = rollups.to_dict()
+        
         self.logger.debug(f"Validation completed for invoice {invoice_number}: "
                          f"{validation_result['validation_summary']['passed_parts']} passed, "
                          f"{validation_result['validation_summary']['failed_parts']} failed, "
@@ -143,6 +188,153 @@ class ValidationEngine:
         
         return validation_result
     
+    def validate_columnar(self, extraction_json: Dict[str, Any],
+                          interactive_discovery: bool = True,
+                          resolved_parts: Optional[Dict[str, Optional[Part]]] = None) -> Dict[str, Any]:
+        """
+        Validate invoice extraction JSON in one vectorized pass over its lines.
+        
+        Produces the validation JSON of ``validate_invoice_json`` (summary,
+        error lines, rollups and rate outliers), but each distinct part is
+        resolved and priced once and the prices of all lines are compared as
+        NumPy columns, read straight from the batch of a PartsArray. The
+        ``parts`` array is a ValidatedParts that builds each line's dict when
+        it is read, so only error lines are materialized here. Lines whose
+        part is not in the database fall back to per-line discovery.
+        
+        Args:
+            extraction_json: Invoice extraction data with parts array
+            interactive_discovery: Prompt for unknown parts while validating; disable
+                when discovery has already run for the invoice (e.g. batch discovery)
+            resolved_parts: Part map from ``resolve_parts``, shared with discovery;
+                resolved here when omitted
+            
+        Returns:
+            Validation JSON with error_lines and validation_summary
+        """
+        self.logger.debug("Starting columnar invoice validation")
+        
+        validation_mode = self._get_validation_mode()
+        invoice_metadata = extraction_json.get('invoice_metadata', {})
+        invoice_number = invoice_metadata.get('invoice_number', 'UNKNOWN')
+        parts = extraction_json.get('parts', [])
+        if resolved_parts is None:
+            resolved_parts = self.resolve_parts(parts)
+        columns = LineColumns(parts)
+        
+        # Resolve the part of each line; only unknown parts go through discovery
+        line_parts: List[Optional[Part]] = []
+        errors: Dict[int, str] = {}
+        for row, composite_key in enumerate(columns.keys):
+            existing_part = None
+            if composite_key is None:
+                errors[row] = 'Missing part number'
+            else:
+                try:
+                    existing_part = self._find_line_part(columns, row, resolved_parts)
+                    if not existing_part and interactive_discovery:
+                        try:
+                            self.discovery_service.discover_and_add_parts({'parts': [parts[row]]}, resolved_parts)
+                        except Exception as e:
+                            self.logger.debug(f"Discovery failed for {columns.part_numbers[row]}: {e}")
+                        existing_part = self._find_line_part(columns, row, resolved_parts)
+                except Exception as e:
+                    errors[row] = f'Validation error: {str(e)}'
+            line_parts.append(existing_part)
+        
+        # Price each distinct part once, on the invoice date
+        price_date = self._price_date(invoice_metadata) if self._refresh_price_history() else None
+        default_tolerance = to_money_units(self.config.price_tolerance)
+        pricing: Dict[str, Tuple[int, int]] = {}
+        database_units: List[int] = []
+        tolerance_units: List[int] = []
+        for composite_key, existing_part in zip(columns.keys, line_parts):
+            if not existing_part:
+                database_units.append(0)
+                tolerance_units.append(0)
+                continue
+            part_pricing = pricing.get(composite_key)
+            if part_pricing is None:
+                authorized_units = self._authorized_units(existing_part, price_date)
+                part_pricing = pricing[composite_key] = (
+                    authorized_units,
+                    self.tolerance_table.tolerance_units(existing_part, authorized_units, default_tolerance)
+                )
+            database_units.append(part_pricing[0])
+            tolerance_units.append(part_pricing[1])
+        
+        results = evaluate(columns,
+                           np.array(database_units, dtype=np.int64),
+                           np.array([bool(existing_part) for existing_part in line_parts], dtype=bool),
+                           np.array(tolerance_units, dtype=np.int64),
+                           errors)
+        validated_parts = ValidatedParts.from_results(parts, results)
+        
+        rollups = LineRollups()
+        actual_units = results.actual_total_units.tolist()
+        expected_units = results.expected_total_units.tolist()
+        rollups.add_columns(columns.wearers, columns.part_numbers, columns.item_types, columns.quantities,
+                            actual_units, expected_units, (results.status == FAILED).tolist())
+        
+        # Materialize dicts for error lines and rate outliers only
+        error_lines = [
+            self._create_error_line(validated_parts[row], invoice_metadata, (actual_units[row], expected_units[row]))
+            for row in np.flatnonzero(results.status != PASSED).tolist()
+        ]
+        rate_outliers = []
+        rate_stats = self._load_rate_stats(columns.keys)
+        if rate_stats:
+            for row, composite_key in enumerate(columns.keys):
+                stats = rate_stats.get(composite_key) if composite_key else None
+                if (stats is not None and columns.has_price[row] and
+                        self._is_rate_outlier(stats, money_units_to_decimal(int(columns.extracted_units[row])))):
+                    rate_outliers.append(self._check_rate_outlier(validated_parts[row], rate_stats))
+        
+        status_counts = np.bincount(results.status, minlength=3)
+        validation_result = {
+            'invoice_metadata': invoice_metadata,
+            'validation_mode': validation_mode,
+            'parts': validated_parts,
+            'error_lines': error_lines,
+            'rate_outliers': rate_outliers,
+            'validation_summary': {
+                'total_parts': len(validated_parts),
+                'passed_parts': int(status_counts[PASSED]),
+                'failed_parts': int(status_counts[FAILED]),
+                'unknown_parts': len(validated_parts) - int(status_counts[PASSED]) - int(status_counts[FAILED]),
+                'validation_errors': []
+            }
+        }
+        if 'reconciliation' in extraction_json:
+            validation_result['reconciliation'] = extraction_json['reconciliation']
+        validation_result['rollups'] = rollups.to_dict()
+        
+        summary = validation_result['validation_summary']
+        self.logger.debug(f"Validation completed for invoice {invoice_number}: "
+                         f"{summary['passed_parts']} passed, "
+                         f"{summary['failed_parts']} failed, "
+                         f"{summary['unknown_parts']} unknown")
+        
+        return validation_result
+    
+    def _find_line_part(self, columns: LineColumns, row: int,
+                        resolved_parts: Dict[str, Optional[Part]]) -> Optional[Part]:
+        """
+        Look up the part of one gathered line, answered by the resolution pass when possible.
+        
+        Parts found by a direct lookup are added to ``resolved_parts``, so other
+        lines of the same part are not looked up again.
+        """
+        composite_key = columns.keys[row]
+        if composite_key in resolved_parts:
+            return resolved_parts[composite_key]
+        existing_part = self.parts_lookup.find_part_by_components(
+            columns.item_types[row], columns.descriptions[row], columns.part_numbers[row]
+        )
+        if existing_part:
+            resolved_parts[composite_key] = existing_part
+        return existing_part
+    
     def validate_invoice(self, invoice_path: Path) -> InvoiceValidationResult:
         """
         Validate a single invoice file.
@@ -249,7 +441,232 @@ class ValidationEngine:
         except:
             return 'parts_based'
     
-    def _validate_single_part(self, part_data: Dict[str, Any], validation_mode: str) -> Dict[str, Any]:
+    def resolve_parts(self, parts: List[Dict[str, Any]],
+                      resolved_parts: Optional[Dict[str, Optional[Part]]] = None) -> Dict[str, Optional[Part]]:
+        """
+        Look up each distinct composite key of an invoice's parts once.
+        
+        The resulting map is shared by discovery and validation, so each line
+        costs at most one lookup. Keys whose lookup fails are left out; they
+        are looked up again per line so the error is reported on the line.
+        A PartsArray is read from its batch columns without building part dicts.
+        
+        Args:
+            parts: Parts array from extraction JSON
+            resolved_parts: Map from an earlier call to extend, e.g. to resolve
+                a whole batch once; keys already in it are not looked up again
+            
+        Returns:
+            Dict mapping composite key to Part, or None if the part is not in the database
+        """
+        if resolved_parts is None:
+            resolved_parts = {}
+        if isinstance(parts, PartsArray):
+            batch = parts.batch
+            lines = zip(batch.item_types, batch.descriptions, batch.item_codes)
+        else:
+            lines = ((db_fields.get('item_type'), db_fields.get('description'), db_fields.get('part_number'))
+                     for db_fields in (part_data.get('database_fields', {}) for part_data in parts))
+        
+        for item_type, description, part_number in lines:
+            if not part_number:
+                continue
+            
+            composite_key = build_composite_key(item_type, description, part_number)
+            if composite_key in resolved_parts:
+                continue
+            
+            try:
+                resolved_parts[composite_key] = self.parts_lookup.find_part_by_components(
+                    item_type, description, part_number
+                )
+            except Exception as e:
+                self.logger.debug(f"Could not resolve part {part_number}: {e}")
+        
+        return resolved_parts
+    
+    @property
+    def tolerance_table(self) -> ToleranceTable:
+        """Tolerance rules compiled for this engine; compiled on first use."""
+        if self._tolerance_table is None:
+            return self.reload_tolerance_rules()
+        return self._tolerance_table
+    
+    def reload_tolerance_rules(self) -> ToleranceTable:
+        """
+        Compile the tolerance rules stored in the database.
+        
+        Rules are compiled once and reused for every invoice the engine
+        validates; call this to pick up rules changed since then. If the
+        rules cannot be read, the global price tolerance applies to every line.
+        
+        Returns:
+            ToleranceTable: The newly compiled rules
+        """
+        try:
+            rules = list(self.db_manager.list_tolerance_rules())
+        except Exception as e:
+            self.logger.debug(f"Could not load tolerance rules, using the global price tolerance: {e}")
+            rules = []
+        self._tolerance_table = ToleranceTable(rules)
+        return self._tolerance_table
+    
+    def _refresh_price_history(self) -> bool:
+        """
+        Bring the price history index up to date before validating.
+        
+        Returns:
+            bool: True if lines should be validated against the price in effect
+            on their invoice date; False if disabled or the history cannot be read
+        """
+        if not self.config.validate_as_of_invoice_date:
+            return False
+        try:
+            self.price_history.refresh()
+            return True
+        except Exception as e:
+            self.logger.debug(f"Could not load price history, validating against current prices: {e}")
+            return False
+    
+    def _price_date(self, invoice_metadata: Dict[str, Any]) -> Optional[date]:
+        """Get the date whose authorized prices an invoice is validated against."""
+        price_date = parse_invoice_date(invoice_metadata.get('invoice_date'))
+        if price_date is None and invoice_metadata.get('invoice_date'):
+            self.logger.debug(f"Unrecognized invoice date {invoice_metadata.get('invoice_date')!r}, "
+                              f"validating against current prices")
+        return price_date
+    
+    def _authorized_units(self, part: Part, price_date: Optional[date]) -> int:
+        """Authorized price of a part on a date, in integer ten-thousandths."""
+        if price_date is None:
+            return part.price_units
+        return self.price_history.price_units_on(part.composite_key, price_date, part.price_units)
+    
+    def _load_rate_stats(self, composite_keys: Iterable[Optional[str]]) -> Dict[str, PartRateStats]:
+        """
+        Load the rate statistics of an invoice's parts in one query.
+        
+        Statistics are read before the invoice's own rates are recorded, so
+        each line is scored against the part's earlier history only.
+        
+        Args:
+            composite_keys: Rate key of each line, None for lines without a part number
+            
+        Returns:
+            Dict mapping composite key to PartRateStats; empty when rate
+            tracking is disabled or the statistics cannot be read
+        """
+        if not self.config.track_rate_stats:
+            return {}
+        composite_keys = set(composite_keys)
+        composite_keys.discard(None)
+        if not composite_keys:
+            return {}
+        try:
+            return self.db_manager.get_part_rate_stats(composite_keys)
+        except Exception as e:
+            self.logger.debug(f"Could not load part rate statistics: {e}")
+            return {}
+    
+    @staticmethod
+    def _rate_key(db_fields: Dict[str, Any]) -> Optional[str]:
+        """Composite key a line's rate statistics are kept under, or None without a part number."""
+        part_number = db_fields.get('part_number')
+        if not part_number:
+            return None
+        return build_composite_key(db_fields.get('item_type'), db_fields.get('description'), part_number)
+    
+    def _check_rate_outlier(self, validated_part: Dict[str, Any],
+                            rate_stats: Dict[str, PartRateStats]) -> Optional[Dict[str, Any]]:
+        """
+        Flag a line whose rate is a statistical outlier for its part.
+        
+        The check is a constant-time z-score against the part's running
+        statistics and does not change the line's validation status.
+        
+        Args:
+            validated_part: Validated part data
+            rate_stats: Statistics from ``_load_rate_stats``
+            
+        Returns:
+            Outlier details, or None if the rate is not an outlier
+        """
+        db_fields = validated_part.get('database_fields', {})
+        part_number = db_fields.get('part_number')
+        price = db_fields.get('authorized_price')
+        composite_key = self._rate_key(db_fields)
+        stats = rate_stats.get(composite_key) if composite_key else None
+        if stats is None or price is None or not self._is_rate_outlier(stats, price):
+            return None
+        
+        return {
+            'part_number': part_number,
+            'description': db_fields.get('description', ''),
+            'line_number': validated_part.get('lineitem_fields', {}).get('line_number'),
+            'price': price,
+            'mean_price': stats.mean_price,
+            'stddev': stats.stddev,
+            'z_score': stats.z_score(price),
+            'observation_count': stats.observation_count,
+            'min_price': float(stats.min_price) if stats.min_price is not None else None,
+            'max_price': float(stats.max_price) if stats.max_price is not None else None
+        }
+    
+    def _is_rate_outlier(self, stats: PartRateStats, price: Any) -> bool:
+        """Check a rate against a part's statistics, treating prices that are not numbers as no outlier."""
+        try:
+            return stats.is_outlier(price, self.config.rate_outlier_z_threshold,
+                                    self.config.rate_outlier_min_observations)
+        except ValueError:
+            return False
+    
+    def record_rates(self, validation_json: Dict[str, Any], source_key: Optional[str]) -> None:
+        """
+        Fold a validated invoice's rates into the per-part statistics.
+        
+        Call once per invoice, after its validation is final. Lines that failed
+        validation are left out so a mispriced line does not skew its part's
+        history; lines of unknown parts are kept, as their statistics back the
+        price suggestions offered in discovery. An invoice without a source key
+        cannot be told apart from a re-run of itself, so it is not recorded.
+        Recording is best-effort: a failure is logged and never fails processing.
+        
+        Args:
+            validation_json: Result of ``validate_invoice_json`` or ``validate_columnar``
+            source_key: Stable identity of the invoice the rates are deduplicated
+                by, normally its invoice number
+        """
+        if not self.config.track_rate_stats or not source_key:
+            return
+        parts = validation_json.get('parts', [])
+        if isinstance(parts, ValidatedParts):
+            observations = parts.rate_observations(source_key)
+        else:
+            observations = self._rate_observations(parts, source_key)
+        if not observations:
+            return
+        try:
+            self.db_manager.record_part_rates(observations)
+        except Exception as e:
+            self.logger.warning(f"Could not record part rates for invoice {source_key}: {e}")
+    
+    def _rate_observations(self, validated_parts: List[Dict[str, Any]], source_key: str) -> List[Tuple[str, str, Any, str]]:
+        """Build the rate observations of the validated part dicts that did not fail."""
+        observations = []
+        for validated_part in validated_parts:
+            if validated_part.get('validation_status') == 'FAILED':
+                continue
+            db_fields = validated_part.get('database_fields', {})
+            price = db_fields.get('authorized_price')
+            composite_key = self._rate_key(db_fields)
+            if composite_key and price is not None:
+                observations.append((composite_key, db_fields['part_number'], price, source_key))
+        return observations
+    
+    def _validate_single_part(self, part_data: Dict[str, Any], validation_mode: str,
+                              interactive_discovery: bool = True,
+                              resolved_parts: Optional[Dict[str, Optional[Part]]] = None,
+                              price_date: Optional[date] = None) -> Dict[str, Any]:
         """
         Simple, effective validation following v2.0 streamlined workflow.
         
@@ -257,12 +674,18 @@ class ValidationEngine:
         1. Extract part components
         2. Look up part by composite key
         3. If not found, trigger discovery
-        4. Compare prices (binary match/no match)
+        4. Compare prices (binary match/no match) against the price in effect on the
+           invoice date, within the part's tolerance rule or the global tolerance
         5. Return validation result
         
         Args:
             part_data: Part data from extraction JSON
             validation_mode: Validation mode (ignored - always uses streamlined approach)
+            interactive_discovery: Whether to trigger discovery for unknown parts
+            resolved_parts: Optional part map from ``resolve_parts``; keys found
+                in it are not looked up again
+            price_date: Invoice date to take the authorized price from; the
+                current price is used when None
             
         Returns:
             Validated part data with validation status
@@ -292,7 +715,8 @@ class ValidationEngine:
                 'line_number': line_fields.get('line_number'),
                 'quantity': line_fields.get('quantity'),
                 'total': line_fields.get('total'),
-                'raw_text': line_fields.get('raw_text')
+                'raw_text': line_fields.get('raw_text'),
+                'wearer': line_fields.get('wearer')
             },
             # Additional validation fields
             'validation_status': 'UNKNOWN',
@@ -307,29 +731,40 @@ class ValidationEngine:
             return validated_part
         
         try:
-            # Composite key lookup
-            existing_part = self.db_manager.find_part_by_components(item_type, description, part_number)
+            # Composite key lookup, answered by the resolution pass when available
+            composite_key = build_composite_key(item_type, description, part_number)
+            if resolved_parts is not None and composite_key in resolved_parts:
+                existing_part = resolved_parts[composite_key]
+            else:
+                existing_part = self.parts_lookup.find_part_by_components(item_type, description, part_number)
             
-            if not existing_part:
+            if not existing_part and interactive_discovery:
                 # Interactive discovery (fail-fast for unknown parts)
                 try:
                     discovery_result = self.discovery_service.discover_and_add_parts({
                         'parts': [part_data]
-                    })
-                    existing_part = self.db_manager.find_part_by_components(item_type, description, part_number)
+                    }, resolved_parts)
+                    if resolved_parts is not None and composite_key in resolved_parts:
+                        existing_part = resolved_parts[composite_key]
+                    else:
+                        existing_part = self.parts_lookup.find_part_by_components(item_type, description, part_number)
                 except Exception as e:
                     self.logger.debug(f"Discovery failed for {part_number}: {e}")
             
             if existing_part:
-                # Price comparison (binary validation)
-                authorized_price = float(existing_part.authorized_price)
+                # Price comparison (binary validation) in exact fixed-point units
+                authorized_units = self._authorized_units(existing_part, price_date)
+                authorized_price = money_units_to_float(authorized_units)
                 validated_part['database_price'] = authorized_price
                 
                 if extracted_price is not None:
-                    price_diff = abs(float(extracted_price) - authorized_price)
-                    validated_part['price_difference'] = price_diff
+                    difference_units = abs(to_money_units(extracted_price) - authorized_units)
+                    validated_part['price_difference'] = money_units_to_float(difference_units)
                     
-                    if price_diff <= float(self.config.price_tolerance):
+                    tolerance_units = self.tolerance_table.tolerance_units(
+                        existing_part, authorized_units, to_money_units(self.config.price_tolerance)
+                    )
+                    if difference_units <= tolerance_units:
                         validated_part['validation_status'] = 'PASSED'
                     else:
                         validated_part['validation_status'] = 'FAILED'
@@ -408,13 +843,54 @@ class ValidationEngine:
         self.logger.info(f"[H4] Validation complete: {len(validation_results)} results generated")
         return validation_results
 
-    def _create_error_line(self, validated_part: Dict[str, Any], invoice_metadata: Dict[str, Any]) -> Dict[str, Any]:
+    def _line_total_units(self, validated_part: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Get the invoiced and expected totals of a validated line.
+        
+        The invoiced total is the line's total, or its price times its
+        quantity if the total is missing. The expected total is the database
+        price times the quantity, or the invoiced total for unknown parts.
+        
+        Returns:
+            Tuple of (actual, expected) totals in ten-thousandths
+        """
+        db_fields = validated_part.get('database_fields', {})
+        line_fields = validated_part.get('lineitem_fields', {})
+        
+        line_total_units = money_units_or_zero(line_fields.get('total', 0) or 0)
+        database_units = money_units_or_zero(validated_part.get('database_price', 0) or 0)
+        multiplier = quantity_or_one(line_fields.get('quantity', 1) or 1)
+        if line_total_units > 0:
+            actual_units = line_total_units
+        else:
+            actual_units = round(money_units_or_zero(db_fields.get('authorized_price', 0) or 0) * multiplier)
+        expected_units = round(database_units * multiplier) if database_units > 0 else actual_units
+        return actual_units, expected_units
+    
+    def _add_to_rollups(self, rollups: LineRollups, validated_part: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Add a validated line to the invoice's rollups.
+        
+        Returns:
+            Tuple of (actual, expected) line totals in ten-thousandths
+        """
+        db_fields = validated_part.get('database_fields', {})
+        line_fields = validated_part.get('lineitem_fields', {})
+        actual_units, expected_units = self._line_total_units(validated_part)
+        rollups.add_line(line_fields.get('wearer'), db_fields.get('part_number'), db_fields.get('item_type'),
+                         quantity_or_one(line_fields.get('quantity')), actual_units, expected_units,
+                         validated_part.get('validation_status') == 'FAILED')
+        return actual_units, expected_units
+    
+    def _create_error_line(self, validated_part: Dict[str, Any], invoice_metadata: Dict[str, Any],
+                           line_totals: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
         """
         Create error line for CSV reporting.
         
         Args:
             validated_part: Validated part data
             invoice_metadata: Invoice metadata
+            line_totals: Line totals from ``_line_total_units``, computed when omitted
             
         Returns:
             Error line dictionary for CSV export
@@ -427,11 +903,11 @@ class ValidationEngine:
         quantity = line_fields.get('quantity', 1) or 1
         extracted_price = db_fields.get('authorized_price', 0) or 0
         database_price = validated_part.get('database_price', 0) or 0
-        line_total = line_fields.get('total', 0) or 0
         
-        # Calculate totals if not available
-        actual_total = line_total if line_total > 0 else (extracted_price * quantity)
-        expected_total = database_price * quantity if database_price > 0 else actual_total
+        # Totals in fixed-point units
+        actual_units, expected_units = line_totals or self._line_total_units(validated_part)
+        actual_total = money_units_to_float(actual_units)
+        expected_total = money_units_to_float(expected_units)
         
         return {
             'invoice_number': invoice_metadata.get('invoice_number', 'UNKNOWN'),
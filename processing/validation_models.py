@@ -49,6 +49,16 @@ class ValidationConfiguration:
     interactive_discovery: bool = True
     batch_collect_unknown_parts: bool = True
     
+    # Per-part rate statistics, updated as invoices are validated
+    track_rate_stats: bool = True
+    # Rates more than this many standard deviations from a part's mean are outliers
+    rate_outlier_z_threshold: float = 3.0
+    # Observations a part needs before its rates are checked for outliers
+    rate_outlier_min_observations: int = 5
+    
+    # Validate lines against the authorized price in effect on the invoice date
+    validate_as_of_invoice_date: bool = True
+    
     # Legacy attributes kept for backward compatibility with existing tests
     # These are deprecated and should not be used in new code
     price_discrepancy_warning_threshold: Decimal = Decimal("1.00")  # DEPRECATED
@@ -8,6 +8,7 @@ This module tests the batch processing implementation including:
 - Integration tests with actual PDF files
 """
 
+import json
 import pytest
 import tempfile
 import shutil
@@ -19,10 +20,25 @@ from decimal import Decimal
 from concurrent.futures import ThreadPoolExecutor
 
 from cli.main import cli
-from cli.commands.invoice_commands import _process_batch, _find_invoice_folders
+from cli.commands.invoice_commands import _process_batch, _find_invoice_folders, _init_folder_worker
 from cli.exceptions import ProcessingError
 from database.database import DatabaseManager
 from database.models import Part
+from processing.invoice_processor import InvoiceProcessor
+from processing.batch_pipeline import END_OF_STREAM, MeteredQueue, PipelineStopped
+
+
+SAMPLE_INVOICES_DIR = Path(__file__).resolve().parent.parent / "docs" / "invoices"
+
+
+def _thread_folder_executor(max_workers, db_manager):
+    """Run batch folders in threads, so calls to a patched _process_invoices are counted here."""
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=_init_folder_worker,
+                              initargs=(db_manager,))
+
+
+def _in_process_folder_workers():
+    return patch('cli.commands.invoice_commands._create_folder_executor', _thread_folder_executor)
 
 
 class TestBatchProcessingUnit:
@@ -32,6 +48,8 @@ class TestBatchProcessingUnit:
         """Set up test environment before each test."""
         self.temp_dir = tempfile.mkdtemp()
         self.db_path = Path(self.temp_dir) / "test.db"
+        self.folder_workers = _in_process_folder_workers()
+        self.folder_workers.start()
         self.db_manager = DatabaseManager(str(self.db_path))
         
         # Create test folder structure with realistic content
@@ -59,6 +77,7 @@ class TestBatchProcessingUnit:
     
     def teardown_method(self):
         """Clean up test environment after each test."""
+        self.folder_workers.stop()
         if hasattr(self, 'db_manager'):
             self.db_manager.close()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
@@ -246,6 +265,8 @@ class TestBatchProcessingIntegration:
         self.runner = CliRunner()
         self.temp_dir = tempfile.mkdtemp()
         self.db_path = Path(self.temp_dir) / "integration_test.db"
+        self.folder_workers = _in_process_folder_workers()
+        self.folder_workers.start()
         self.env = {'INVOICE_CHECKER_DB': str(self.db_path)}
         
         # Initialize database with real data
@@ -278,6 +299,7 @@ class TestBatchProcessingIntegration:
     
     def teardown_method(self):
         """Clean up test environment."""
+        self.folder_workers.stop()
         if hasattr(self, 'db_manager'):
             self.db_manager.close()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
@@ -396,6 +418,8 @@ class TestBatchProcessingScalability:
         """Set up scalability test environment."""
         self.temp_dir = tempfile.mkdtemp()
         self.db_path = Path(self.temp_dir) / "scalability_test.db"
+        self.folder_workers = _in_process_folder_workers()
+        self.folder_workers.start()
         self.db_manager = DatabaseManager(str(self.db_path))
         
         # Create test dataset with realistic structure
@@ -422,6 +446,7 @@ class TestBatchProcessingScalability:
     
     def teardown_method(self):
         """Clean up scalability test environment."""
+        self.folder_workers.stop()
         if hasattr(self, 'db_manager'):
             self.db_manager.close()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
@@ -538,6 +563,915 @@ class TestBatchProcessingScalability:
             assert len(result['processing_errors']) == 0
 
 
+class TestParallelDirectoryProcessing:
+    """Tests for process-pool directory processing with deferred discovery."""
+    
+    def setup_method(self):
+        """Set up a directory of invoices and a fresh database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.invoice_dir = Path(self.temp_dir) / "invoices"
+        self.invoice_dir.mkdir()
+        self.db_manager = DatabaseManager(str(Path(self.temp_dir) / "parallel.db"))
+        self.processor = InvoiceProcessor(self.db_manager)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _copy_sample_invoices(self, count):
+        samples = sorted(SAMPLE_INVOICES_DIR.glob("*.pdf"))[:count]
+        if len(samples) < count:
+            pytest.skip("Sample invoices not available")
+        for sample in samples:
+            shutil.copy(sample, self.invoice_dir / sample.name)
+        return samples
+    
+    def test_parallel_matches_sequential_with_single_prompt(self):
+        """Test parallel mode prompts once for the batch and validates identically."""
+        samples = self._copy_sample_invoices(2)
+        discovery = self.processor.discovery_service
+        
+        with patch.object(discovery, '_process_unknown_parts_interactive') as mock_prompt:
+            parallel_result = self.processor.process_directory(
+                self.invoice_dir, parallel=True, max_workers=2
+            )
+        
+        # Unknown parts from every invoice are offered in one deduplicated prompt session
+        assert mock_prompt.call_count == 1
+        unknown_parts = mock_prompt.call_args[0][0]
+        keys = {
+            (p['database_fields']['item_type'], p['database_fields']['description'],
+             p['database_fields']['part_number'])
+            for p in unknown_parts
+        }
+        assert len(keys) == len(unknown_parts)
+        
+        with patch.object(discovery, '_process_unknown_parts_interactive'), \
+                patch.object(self.processor.validation_engine.discovery_service,
+                             '_process_unknown_parts_interactive'):
+            sequential_result = self.processor.process_directory(self.invoice_dir)
+        
+        assert parallel_result.successful_files == len(samples)
+        assert [r.invoice_path for r in parallel_result.processing_results] == \
+            [r.invoice_path for r in sequential_result.processing_results]
+        assert [r.validation_json['validation_summary'] for r in parallel_result.processing_results] == \
+            [r.validation_json['validation_summary'] for r in sequential_result.processing_results]
+        assert parallel_result.total_unknown_parts == sequential_result.total_unknown_parts
+    
+    def test_parallel_extraction_failures_are_reported(self):
+        """Test unreadable files fail individually without stopping the batch."""
+        for i in range(2):
+            (self.invoice_dir / f"broken_{i}.pdf").write_text("not a pdf")
+        
+        with patch.object(self.processor.discovery_service, 'discover_and_add_parts_batch') as mock_discover:
+            result = self.processor.process_directory(self.invoice_dir, parallel=True, max_workers=2)
+        
+        assert result.total_files == 2
+        assert result.failed_files == 2
+        assert all(r.error_message for r in result.processing_results)
+        mock_discover.assert_not_called()
+
+
+class TestBatchPipeline:
+    """Tests for the staged extract -> validate -> report pipeline."""
+    
+    def setup_method(self):
+        """Set up a directory of placeholder invoices."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.invoice_dir = Path(self.temp_dir) / "invoices"
+        self.invoice_dir.mkdir()
+        for i in range(5):
+            (self.invoice_dir / f"invoice_{i}.pdf").write_text("placeholder")
+        self.db_manager = DatabaseManager(str(Path(self.temp_dir) / "pipeline.db"))
+        self.processor = InvoiceProcessor(self.db_manager, pipeline_queue_size=2)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _fake_extraction(pdf_processor, pdf_path, logger):
+        return {
+            'extraction_json': {
+                'invoice_metadata': {'invoice_number': pdf_path.stem, 'pdf_path': str(pdf_path)},
+                'format_sections': [],
+                'parts': []
+            },
+            'error_message': None,
+            'error_type': None,
+            'processing_time': 0.0
+        }
+    
+    def test_queue_applies_backpressure_and_records_depth(self):
+        """Test a full queue blocks the producer and records the wait."""
+        metered = MeteredQueue('test', maxsize=1)
+        metered.put(1)
+        
+        def consume():
+            time.sleep(0.2)
+            metered.get()
+        
+        import threading
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        metered.put(2)
+        consumer.join()
+        
+        metrics = metered.metrics.to_dict()
+        assert metrics['items'] == 2
+        assert metrics['max_depth'] == 1
+        assert metrics['blocked_puts'] == 1
+        assert metrics['blocked_seconds'] > 0
+    
+    def test_stopped_queue_raises(self):
+        """Test blocked stages give up once the pipeline stops."""
+        import threading
+        stop_event = threading.Event()
+        metered = MeteredQueue('test', maxsize=1, stop_event=stop_event)
+        metered.put(END_OF_STREAM)
+        stop_event.set()
+        
+        with pytest.raises(PipelineStopped):
+            metered.put(1)
+        assert metered.get() is END_OF_STREAM
+        with pytest.raises(PipelineStopped):
+            metered.get()
+    
+    def test_reports_written_by_writer_thread_as_results_arrive(self):
+        """Test per-invoice reports are written off the validation thread, in order."""
+        import threading
+        written = []
+        
+        def record_report(validation_json, output_dir, base_name, **kwargs):
+            written.append((base_name, threading.current_thread().name))
+            return {}
+        
+        output_dir = Path(self.temp_dir) / "reports"
+        with patch('processing.invoice_processor._run_extraction', side_effect=self._fake_extraction), \
+                patch.object(self.processor, 'generate_reports', side_effect=record_report), \
+                patch.object(self.processor, '_generate_batch_reports', return_value={}):
+            result = self.processor.process_directory(self.invoice_dir, output_dir)
+        
+        assert result.successful_files == 5
+        assert [name for name, _ in written] == [f"invoice_{i}_validation" for i in range(5)]
+        assert {thread for _, thread in written} == {'invoice-reports'}
+        assert result.stage_metrics['extraction']['items'] == 5
+        assert result.stage_metrics['extraction']['capacity'] == 2
+        assert result.stage_metrics['reports']['items'] == 5
+    
+    def test_report_writer_failure_is_raised(self):
+        """Test a failing report writer stops the pipeline and surfaces the error."""
+        with patch('processing.invoice_processor._run_extraction', side_effect=self._fake_extraction), \
+                patch.object(self.processor, 'generate_reports', side_effect=OSError("disk full")):
+            with pytest.raises(OSError, match="disk full"):
+                self.processor.process_directory(self.invoice_dir, Path(self.temp_dir) / "reports")
+    
+    def test_extraction_stage_failure_marks_remaining_invoices_failed(self):
+        """Test invoices never extracted are reported as failures instead of hanging."""
+        calls = []
+        
+        def flaky_extraction(pdf_processor, pdf_path, logger):
+            calls.append(pdf_path)
+            if len(calls) == 3:
+                raise RuntimeError("extractor crashed")
+            return self._fake_extraction(pdf_processor, pdf_path, logger)
+        
+        with patch('processing.invoice_processor._run_extraction', side_effect=flaky_extraction):
+            result = self.processor.process_directory(self.invoice_dir)
+        
+        assert result.successful_files == 2
+        assert result.failed_files == 3
+        assert result.processing_results[4].error_message == "Extraction did not complete"
+
+
+class TestIncrementalProcessing:
+    """Tests for the processed-files manifest and incremental directory runs."""
+    
+    def setup_method(self):
+        """Set up placeholder invoices and a processor with fast fake extraction."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.invoice_dir = Path(self.temp_dir) / "invoices"
+        self.invoice_dir.mkdir()
+        for i in range(3):
+            (self.invoice_dir / f"invoice_{i}.pdf").write_text(f"placeholder {i}")
+        self.db_manager = DatabaseManager(str(Path(self.temp_dir) / "incremental.db"))
+        self.processor = InvoiceProcessor(self.db_manager)
+        self.extracted = []
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _fake_extraction(self, pdf_processor, pdf_path, logger):
+        self.extracted.append(pdf_path.name)
+        if "broken" in pdf_path.read_text():
+            return {'extraction_json': None, 'error_message': "unreadable",
+                    'error_type': 'PDFProcessingError', 'processing_time': 0.0}
+        return TestBatchPipeline._fake_extraction(pdf_processor, pdf_path, logger)
+    
+    def _run(self, incremental=True):
+        self.extracted = []
+        with patch('processing.invoice_processor._run_extraction', side_effect=self._fake_extraction):
+            return self.processor.process_directory(self.invoice_dir, incremental=incremental)
+    
+    def test_manifest_records_every_processed_file(self):
+        """Test each processed PDF is fingerprinted with its outcome."""
+        (self.invoice_dir / "invoice_2.pdf").write_text("broken")
+        self._run(incremental=False)
+        
+        entries = self.db_manager.get_processed_files()
+        assert len(entries) == 3
+        entry = entries[str((self.invoice_dir / "invoice_0.pdf").resolve())]
+        assert entry.status == 'success'
+        assert entry.file_size == len("placeholder 0")
+        assert len(entry.content_hash) == 64
+        assert entry.invoice_number == "invoice_0"
+        failed = entries[str((self.invoice_dir / "invoice_2.pdf").resolve())]
+        assert failed.status == 'failed'
+        assert failed.error_message == "unreadable"
+    
+    def test_incremental_run_skips_unchanged_successful_files(self):
+        """Test only new, changed or previously failed files are processed again."""
+        (self.invoice_dir / "invoice_2.pdf").write_text("broken")
+        self._run()
+        assert len(self.extracted) == 3
+        
+        (self.invoice_dir / "invoice_1.pdf").write_text("placeholder 1 revised")
+        (self.invoice_dir / "invoice_3.pdf").write_text("placeholder 3")
+        result = self._run()
+        
+        assert sorted(self.extracted) == ["invoice_1.pdf", "invoice_2.pdf", "invoice_3.pdf"]
+        assert result.total_files == 4
+        assert result.skipped_files == 1
+        assert result.successful_files == 2
+        assert result.failed_files == 1
+    
+    def test_touched_file_with_same_content_is_skipped(self):
+        """Test a new modification time alone does not force re-extraction."""
+        import os
+        self._run()
+        touched = self.invoice_dir / "invoice_0.pdf"
+        stat = touched.stat()
+        os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        
+        result = self._run()
+        
+        assert self.extracted == []
+        assert result.skipped_files == 3
+        entry = self.db_manager.get_processed_files([str(touched.resolve())])[str(touched.resolve())]
+        assert entry.file_mtime_ns == stat.st_mtime_ns + 5_000_000_000
+    
+    def test_extractor_version_change_reprocesses_files(self):
+        """Test files processed by an older extractor are extracted again."""
+        self._run()
+        self.processor.manifest.extractor_version = "next"
+        
+        self._run()
+        
+        assert len(self.extracted) == 3
+    
+    def test_rates_of_unnumbered_invoices_are_folded_once(self):
+        """Test invoices without a number are deduplicated by content when run again."""
+        def unnumbered_extraction(pdf_processor, pdf_path, logger):
+            return {'extraction_json': {
+                        'invoice_metadata': {'invoice_number': None},
+                        'parts': [{'database_fields': {'part_number': 'GP0001', 'item_type': 'Rent',
+                                                       'description': 'SHIRT', 'authorized_price': 1.50},
+                                   'lineitem_fields': {'line_number': 1, 'quantity': 1}}]},
+                    'error_message': None, 'error_type': None, 'processing_time': 0.0}
+        
+        self.db_manager.create_part(Part(part_number='GP0001', authorized_price=Decimal('1.50'),
+                                         description='SHIRT', item_type='Rent'))
+        for _ in range(2):
+            with patch('processing.invoice_processor._run_extraction', side_effect=unnumbered_extraction):
+                self.processor.process_directory(self.invoice_dir)
+        
+        stats = self.db_manager.get_part_rate_stats_by_part_number(['GP0001'])['GP0001']
+        assert stats.observation_count == 3
+        assert stats.last_invoice.startswith('sha256:')
+
+
+class TestRunJournal:
+    """Tests for journaled directory runs and resuming interrupted runs."""
+    
+    def setup_method(self):
+        """Set up placeholder invoices and a processor with fast fake extraction."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.invoice_dir = Path(self.temp_dir) / "invoices"
+        self.invoice_dir.mkdir()
+        for i in range(5):
+            (self.invoice_dir / f"invoice_{i}.pdf").write_text(f"placeholder {i}")
+        self.output_dir = Path(self.temp_dir) / "reports"
+        self.output_dir.mkdir()
+        self.db_manager = DatabaseManager(str(Path(self.temp_dir) / "journal.db"))
+        self.processor = InvoiceProcessor(self.db_manager)
+        self.extracted = []
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _fake_extraction(self, pdf_processor, pdf_path, logger):
+        self.extracted.append(pdf_path.name)
+        return TestBatchPipeline._fake_extraction(pdf_processor, pdf_path, logger)
+    
+    def _run(self, run_id, interrupt_at=None, parallel=False):
+        self.extracted = []
+        complete_invoice = self.processor._complete_invoice
+        
+        def complete(result, interactive_discovery=True, resolved_parts=None):
+            if Path(result.invoice_path).name == interrupt_at:
+                raise KeyboardInterrupt()
+            complete_invoice(result, interactive_discovery, resolved_parts)
+        
+        with patch('processing.invoice_processor._run_extraction', side_effect=self._fake_extraction), \
+                patch.object(self.processor, '_complete_invoice', side_effect=complete):
+            return self.processor.process_directory(self.invoice_dir, self.output_dir,
+                                                    run_id=run_id, parallel=parallel, max_workers=2)
+    
+    def test_each_file_is_journaled_as_it_completes(self):
+        """Test an interrupted run keeps the files finished before the interruption."""
+        with pytest.raises(KeyboardInterrupt):
+            self._run("run-1", interrupt_at="invoice_3.pdf")
+        
+        run = self.db_manager.get_processing_run("run-1")
+        assert run.status == 'interrupted'
+        assert run.total_files == 5
+        journaled = self.db_manager.get_run_files("run-1")
+        assert sorted(Path(path).name for path in journaled) == [
+            "invoice_0.pdf", "invoice_1.pdf", "invoice_2.pdf"
+        ]
+        assert all(entry.status == 'success' for entry in journaled.values())
+    
+    def test_resume_skips_journaled_files_and_rebuilds_report(self):
+        """Test resuming processes only the remaining files and reports on all of them."""
+        with pytest.raises(KeyboardInterrupt):
+            self._run("run-2", interrupt_at="invoice_3.pdf")
+        
+        result = self._run("run-2")
+        
+        assert self.extracted == ["invoice_3.pdf", "invoice_4.pdf"]
+        assert result.run_id == "run-2"
+        assert result.resumed_files == 3
+        assert result.successful_files == 5
+        assert [Path(r.invoice_path).name for r in result.processing_results] == [
+            f"invoice_{i}.pdf" for i in range(5)
+        ]
+        assert result.aggregated_validation_json['batch_summary']['total_invoices'] == 5
+        assert self.db_manager.get_processing_run("run-2").status == 'completed'
+        assert self.db_manager.count_run_files("run-2") == 5
+    
+    def test_parallel_runs_are_journaled(self):
+        """Test deferred-discovery runs journal every validated file."""
+        result = self._run("run-3", parallel=True)
+        
+        assert result.successful_files == 5
+        assert self.db_manager.count_run_files("run-3") == 5
+        assert self.db_manager.list_processing_runs(status='completed')[0].run_id == "run-3"
+    
+    def test_resume_reads_json_journal_entries(self):
+        """Test entries journaled as JSON text before the binary codec still resume."""
+        from database.models import RunFileResult
+        from processing.binary_codec import decode_value
+        from processing.file_manifest import manifest_key
+        
+        with pytest.raises(KeyboardInterrupt):
+            self._run("run-4", interrupt_at="invoice_1.pdf")
+        first = self.invoice_dir / "invoice_0.pdf"
+        entry = self.db_manager.get_run_files("run-4")[manifest_key(first)]
+        self.db_manager.record_run_file(RunFileResult(
+            run_id="run-4", file_path=entry.file_path, status=entry.status,
+            # Parts arrays were plain lists in JSON journals
+            result_json=json.dumps(decode_value(entry.result_json), default=lambda parts: parts.to_list()),
+            invoice_number=entry.invoice_number, processing_time=entry.processing_time
+        ))
+        
+        result = self._run("run-4")
+        
+        assert result.resumed_files == 1
+        assert "invoice_0.pdf" not in self.extracted
+        assert result.successful_files == 5
+    
+    def test_resume_unknown_run_fails(self):
+        """Test the CLI rejects a run ID that was never journaled."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ['--database', str(Path(self.temp_dir) / "journal.db"),
+                                     'invoice', 'process', '--resume', 'missing-run'])
+        assert result.exit_code != 0
+        assert "Processing run not found" in str(result.exception)
+
+    def test_folder_with_one_pdf_is_journaled(self):
+        """Test a folder holding a single PDF still runs through the journaled directory path."""
+        from cli.commands.invoice_commands import _process_invoices
+
+        for path in list(self.invoice_dir.glob("*.pdf"))[1:]:
+            path.unlink()
+        with patch('processing.invoice_processor._run_extraction', side_effect=self._fake_extraction), \
+                patch.object(InvoiceProcessor, 'process_single_invoice') as single:
+            stats = _process_invoices(self.invoice_dir, self.output_dir, 'csv', 'parts_based', None,
+                                      interactive=False, collect_unknown=False, session_id="s",
+                                      db_manager=self.db_manager, auto_open=False, run_id="run-5")
+
+        single.assert_not_called()
+        assert stats['run_id'] == "run-5"
+        assert self.db_manager.count_run_files("run-5") == 1
+
+    def test_resume_rejects_single_file(self):
+        """Test the CLI refuses to resume a run for a single PDF instead of ignoring --resume."""
+        with pytest.raises(KeyboardInterrupt):
+            self._run("run-6", interrupt_at="invoice_1.pdf")
+
+        runner = CliRunner()
+        result = runner.invoke(cli, ['--database', str(Path(self.temp_dir) / "journal.db"),
+                                     'invoice', 'process', str(self.invoice_dir / "invoice_0.pdf"),
+                                     '--resume', 'run-6'])
+        assert result.exit_code != 0
+        assert "--resume applies to folder runs" in str(result.exception) + result.output
+
+
+class TestFolderWatcher:
+    """Tests for the inbox watcher used by the watch command."""
+    
+    def setup_method(self):
+        """Set up an inbox, a processor with fake extraction and a watcher."""
+        from processing.folder_watcher import FolderWatcher, RollingReport
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.inbox = Path(self.temp_dir) / "inbox"
+        self.inbox.mkdir()
+        self.report_dir = Path(self.temp_dir) / "reports"
+        self.db_manager = DatabaseManager(str(Path(self.temp_dir) / "watch.db"))
+        self.processor = InvoiceProcessor(self.db_manager, defer_discovery=True)
+        self.extracted = []
+        self.watcher = FolderWatcher(self.processor, self.inbox, RollingReport(self.report_dir),
+                                     settle_seconds=0.2, use_inotify=False)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _fake_extract(self, pdf_path):
+        self.extracted.append(pdf_path.name)
+        return TestBatchPipeline._fake_extraction(None, pdf_path, None)['extraction_json']
+    
+    def _poll(self):
+        with patch.object(self.processor, '_extract_invoice_data', side_effect=self._fake_extract):
+            return self.watcher.poll_once()
+    
+    def test_files_are_processed_only_after_settling(self):
+        """Test a file is picked up once its size and mtime stop changing."""
+        pdf = self.inbox / "invoice_1.pdf"
+        pdf.write_text("partial")
+        assert self._poll() == []
+        
+        pdf.write_text("partial plus more")
+        assert self._poll() == []
+        
+        time.sleep(0.25)
+        results = self._poll()
+        assert [r.invoice_number for r in results] == ["invoice_1"]
+        assert self._poll() == []
+        assert self.extracted == ["invoice_1.pdf"]
+    
+    def test_results_append_to_rolling_report(self):
+        """Test each processed invoice adds a row to the daily report."""
+        import csv
+        
+        for name in ("a.pdf", "b.PDF", "notes.txt", ".hidden.pdf"):
+            (self.inbox / name).write_text(name)
+        self._poll()
+        time.sleep(0.25)
+        self._poll()
+        
+        (self.inbox / "c.pdf").write_text("c")
+        self._poll()
+        time.sleep(0.25)
+        self._poll()
+        
+        report_path = self.watcher.report.current_path()
+        with open(report_path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['invoice_number'] for row in rows] == ["a", "b", "c"]
+        assert all(row['status'] == 'success' for row in rows)
+    
+    def test_unknown_parts_are_reported_without_prompting(self):
+        """Test unknown parts go to the report and the discovery log instead of a prompt."""
+        import csv
+        
+        def extract_with_unknown_part(pdf_path):
+            extraction_json = self._fake_extract(pdf_path)
+            extraction_json['parts'] = [{
+                'database_fields': {'part_number': 'NEWSKU', 'description': 'JACKET',
+                                    'item_type': 'Rent', 'authorized_price': 4.0},
+                'lineitem_fields': {'line_number': 1, 'quantity': 1, 'total': 4.0}
+            }]
+            return extraction_json
+        
+        (self.inbox / "invoice_1.pdf").write_text("one")
+        with patch.object(self.processor, '_extract_invoice_data', side_effect=extract_with_unknown_part), \
+                patch('builtins.input', side_effect=AssertionError("the watcher must not prompt")):
+            self.watcher.poll_once()
+            time.sleep(0.25)
+            results = self.watcher.poll_once()
+        
+        assert [r.success for r in results] == [True]
+        with open(self.watcher.report.current_path(), newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]['unknown_part_numbers'] == 'NEWSKU'
+        logs = self.db_manager.get_discovery_logs(session_id=self.watcher.discovery_session_id)
+        assert [(log.part_number, log.invoice_number, log.action_taken) for log in logs] == [
+            ('NEWSKU', 'invoice_1', 'discovered')
+        ]
+        assert self.processor.deferred_unknown_parts == []
+    
+    def test_restart_skips_files_already_processed(self):
+        """Test a new watcher skips inbox files recorded in the manifest."""
+        from processing.folder_watcher import FolderWatcher, RollingReport
+        
+        (self.inbox / "invoice_1.pdf").write_text("one")
+        self._poll()
+        time.sleep(0.25)
+        self._poll()
+        
+        self.watcher = FolderWatcher(self.processor, self.inbox, RollingReport(self.report_dir),
+                                     settle_seconds=0.0, use_inotify=False)
+        self._poll()
+        self._poll()
+        assert self.extracted == ["invoice_1.pdf"]
+        assert self.watcher.files_skipped == 1
+    
+    def test_run_with_inotify_or_fallback(self):
+        """Test the watch loop processes a file with the best available event source."""
+        import threading
+        
+        self.watcher.use_inotify = None
+        stop = threading.Event()
+        
+        def drop_file():
+            time.sleep(0.2)
+            (self.inbox / "invoice_9.pdf").write_text("nine")
+            deadline = time.time() + 5
+            while not self.extracted and time.time() < deadline:
+                time.sleep(0.05)
+            stop.set()
+        
+        dropper = threading.Thread(target=drop_file)
+        dropper.start()
+        with patch.object(self.processor, '_extract_invoice_data', side_effect=self._fake_extract):
+            self.watcher.poll_interval = 0.1
+            self.watcher.run(stop_event=stop)
+        dropper.join()
+        
+        assert self.extracted == ["invoice_9.pdf"]
+    
+    def test_watch_command_is_registered(self):
+        """Test the watch command is available at the top level and under invoice."""
+        runner = CliRunner()
+        assert runner.invoke(cli, ['watch', '--help']).exit_code == 0
+        assert runner.invoke(cli, ['invoice', 'watch', '--help']).exit_code == 0
+
+
+class TestPdfFileDiscovery:
+    """Tests for the single-pass scandir PDF walker and cost ordering."""
+    
+    def setup_method(self):
+        """Set up a nested tree of PDFs and other files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = Path(self.temp_dir)
+        for relative in ("b.pdf", "a.PDF", "notes.txt", "sub/c.Pdf", "sub/deep/d.pdf", "a b.pdf", "zz/x.txt"):
+            path = self.root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(relative)
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_walker_matches_sorted_case_insensitive_glob(self):
+        """Test one pass finds every extension casing in sorted path order."""
+        from processing.file_discovery import find_pdf_files
+        
+        expected = sorted(p for p in self.root.rglob("*") if p.suffix.lower() == ".pdf")
+        assert find_pdf_files(self.root) == expected
+        assert find_pdf_files(self.root, recursive=False) == [
+            self.root / "a b.pdf", self.root / "a.PDF", self.root / "b.pdf"
+        ]
+        assert InvoiceProcessor(Mock())._find_pdf_files(self.root) == expected
+    
+    def test_walker_yields_lazily(self):
+        """Test files are yielded before the rest of the tree is enumerated."""
+        from processing import file_discovery
+        from processing.file_discovery import iter_pdf_files
+        
+        with patch.object(file_discovery.os, 'scandir', wraps=file_discovery.os.scandir) as scandir:
+            walker = iter_pdf_files(self.root)
+            assert next(walker) == self.root / "a b.pdf"
+            assert scandir.call_count == 1
+            assert len(list(walker)) == 4
+            assert scandir.call_count == 4
+    
+    def test_symlinked_directories_are_not_followed(self):
+        """Test a directory link cycle does not cause an endless walk."""
+        from processing.file_discovery import find_pdf_files
+        
+        (self.root / "sub" / "loop").symlink_to(self.root, target_is_directory=True)
+        assert len(find_pdf_files(self.root)) == 5
+    
+    def test_order_by_cost_puts_largest_first(self):
+        """Test cost ordering sorts by file size, unreadable files last."""
+        from processing.file_discovery import order_by_cost
+        
+        small = self.root / "small.pdf"
+        large = self.root / "large.pdf"
+        small.write_bytes(b"x" * 10)
+        large.write_bytes(b"x" * 1000)
+        missing = self.root / "missing.pdf"
+        
+        assert order_by_cost([small, missing, large]) == [large, small, missing]
+
+
+class TestSpillingBatchAggregation:
+    """Tests for disk-backed batch aggregation and streamed batch reports."""
+    
+    def setup_method(self):
+        """Set up invoices and an output directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.invoice_dir = Path(self.temp_dir) / "invoices"
+        self.invoice_dir.mkdir()
+        for i in range(4):
+            (self.invoice_dir / f"invoice_{i}.pdf").write_text("placeholder")
+        self.output_dir = Path(self.temp_dir) / "reports"
+        self.db_manager = DatabaseManager(str(Path(self.temp_dir) / "spill.db"))
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _validation_json(i):
+        return {
+            'invoice_metadata': {'invoice_number': f"INV{i}", 'invoice_date': '2024-01-0' + str(i + 1)},
+            'validation_summary': {'total_parts': 2, 'passed_parts': 1, 'failed_parts': 1, 'unknown_parts': i},
+            'parts': [{'part_number': f"P{i}", 'description': 'Shirt é', 'quantity': 2,
+                       'price': 1.5, 'details': {'sizes': ['M', 'L']}}],
+            'error_lines': [] if i == 1 else [{
+                'line_number': 1, 'part_number': f"P{i}", 'description': 'Shirt',
+                'quantity': 2, 'expected_price': 1.0, 'actual_price': 1.5, 'raw_text': 'raw'
+            }]
+        }
+    
+    def test_aggregator_keeps_counters_and_reads_back_in_index_order(self):
+        """Test invoices spilled out of order are read back by index and counted once."""
+        from processing.batch_aggregator import SpillingBatchAggregator
+        
+        with SpillingBatchAggregator(spill_dir=self.temp_dir) as aggregator:
+            for i in (2, 0, 1):
+                aggregator.add(i, self._validation_json(i))
+            aggregator.add(2, self._validation_json(2))
+            
+            assert len(aggregator) == 3
+            assert [inv['invoice_metadata']['invoice_number'] for inv in aggregator.iter_invoices()] == [
+                "INV0", "INV1", "INV2"
+            ]
+            assert [line['part_number'] for line in aggregator.iter_error_lines()] == ["P0", "P2"]
+            assert aggregator.summary_json()['batch_summary'] == {
+                'total_parts': 6, 'passed_parts': 3, 'failed_parts': 3, 'unknown_parts': 3, 'total_invoices': 3
+            }
+            spill_file = aggregator.path
+            assert spill_file.exists()
+        assert not spill_file.parent.exists()
+    
+    def test_streamed_reports_match_in_memory_reports(self):
+        """Test streamed batch reports are identical to reports built from the full batch JSON."""
+        from processing.batch_aggregator import SpillingBatchAggregator
+        from processing.report_generator import SimpleReportGenerator
+        
+        invoices = [self._validation_json(i) for i in range(3)]
+        generator = SimpleReportGenerator()
+        with SpillingBatchAggregator() as aggregator:
+            for i, invoice in enumerate(invoices):
+                aggregator.add(i, invoice)
+            paths = generator.write_batch_reports(aggregator, str(self.output_dir), auto_open=False)
+            batch_json = InvoiceProcessor(self.db_manager)._create_batch_validation_json(invoices)
+        
+        streamed_json = paths['json'].read_text(encoding='utf-8')
+        batch_json['batch_metadata']['processing_timestamp'] = \
+            json.loads(streamed_json)['batch_metadata']['processing_timestamp']
+        assert streamed_json == generator.generate_json_report(batch_json)
+        assert paths['csv'].read_bytes() == generator.generate_csv_report(batch_json).encode('utf-8')
+        assert 'rollups_csv' not in paths and generator.generate_rollups_csv_report(batch_json) == ""
+        
+        def without_timestamp(text):
+            return [line for line in text.splitlines() if not line.startswith("Generated:")]
+        assert without_timestamp(paths['txt'].read_text(encoding='utf-8')) == \
+            without_timestamp(generator.generate_txt_report(batch_json))
+    
+    def test_batch_rollups_merge_each_invoice_once(self):
+        """Test invoice rollups are summed into the batch and a replaced invoice is counted once."""
+        from processing.batch_aggregator import SpillingBatchAggregator
+        from processing.report_generator import SimpleReportGenerator
+        from processing.rollups import LineRollups
+        
+        def validation_json(i, overcharge_units):
+            rollups = LineRollups()
+            rollups.add_line("JOHN DOE", "GP0001", "Rent", 2, 30000 + overcharge_units, 30000, bool(overcharge_units))
+            rollups.add_line(None, f"MAT{i}", "Rent", 1, 5000, 5000, False)
+            return dict(self._validation_json(i), rollups=rollups.to_dict())
+        
+        with SpillingBatchAggregator(spill_dir=self.temp_dir) as aggregator:
+            aggregator.add(0, validation_json(0, 2500))
+            aggregator.add(1, validation_json(1, 0))
+            aggregator.add(1, validation_json(1, 1000))
+            rollups = aggregator.summary_json()['rollups']
+            paths = SimpleReportGenerator().write_batch_reports(aggregator, str(self.output_dir), auto_open=False)
+        
+        assert rollups['wearer'] == [
+            {'key': "JOHN DOE", 'line_count': 2, 'quantity': 4, 'actual_total': 6.35, 'expected_total': 6.0,
+             'overcharge': 0.35, 'failed_lines': 2},
+            {'key': "(none)", 'line_count': 2, 'quantity': 2, 'actual_total': 1.0, 'expected_total': 1.0,
+             'overcharge': 0.0, 'failed_lines': 0}
+        ]
+        assert [group['key'] for group in rollups['item_code']] == ["GP0001", "MAT0", "MAT1"]
+        assert rollups['item_type'][0]['line_count'] == 4
+        
+        assert "Rollup" not in paths['csv'].read_text(encoding='utf-8-sig')
+        assert paths['rollups_csv'].name == paths['csv'].stem + "_rollups.csv"
+        csv_text = paths['rollups_csv'].read_text(encoding='utf-8-sig')
+        assert csv_text.startswith("Rollup,Key,Lines,Quantity,Actual Total,Expected Total,Overcharge,Failed Lines")
+        assert "Wearer,JOHN DOE,2,4,$6.35,$6.00,$0.35,2" in csv_text
+        txt = paths['txt'].read_text(encoding='utf-8')
+        assert "  JOHN DOE: 2 lines, $6.35 invoiced, $6.00 expected, $0.35 overcharged (2 failed)" in txt
+        assert json.loads(paths['json'].read_text(encoding='utf-8'))['rollups'] == rollups
+    
+    def test_directory_run_releases_results_and_writes_batch_reports(self):
+        """Test per-invoice JSON is released once spilled and the batch reports cover every invoice."""
+        processor = InvoiceProcessor(self.db_manager, pipeline_queue_size=2)
+        with patch('processing.invoice_processor._run_extraction', side_effect=TestBatchPipeline._fake_extraction), \
+                patch('processing.report_generator.auto_open_reports'):
+            result = processor.process_directory(self.invoice_dir, self.output_dir)
+        
+        assert result.successful_files == 4
+        assert all(r.validation_json is None and r.extraction_json is None for r in result.processing_results)
+        assert result.aggregated_validation_json['batch_summary']['total_invoices'] == 4
+        assert 'invoices' not in result.aggregated_validation_json
+        
+        batch_json = json.loads(result.report_files['json'].read_text(encoding='utf-8'))
+        assert [inv['invoice_metadata']['invoice_number'] for inv in batch_json['invoices']] == [
+            f"invoice_{i}" for i in range(4)
+        ]
+        assert result.report_files['csv'].exists()
+        assert result.report_files['txt'].exists()
+
+
+def _record_worker_folder(input_path, output_path, db_manager, defer_discovery=False, **kwargs):
+    """Stand-in for _process_invoices that records where each folder ran."""
+    import os
+    with open(output_path.with_suffix('.worker'), 'a') as f:
+        f.write(f"{os.getpid()}|{db_manager.db_path}|{defer_discovery}\n")
+    unknown_part = {'database_fields': {'part_number': 'NEWSKU', 'item_type': 'Rental',
+                                        'description': 'NEW GARMENT', 'authorized_price': 1.25},
+                    'lineitem_fields': {'raw_text': 'NEWSKU NEW GARMENT 1.25'}}
+    return {'files_processed': 1, 'anomalies_found': 0, 'deferred_unknown_parts': [unknown_part]}
+
+
+def _fork_folder_workers():
+    """
+    Start folder worker processes by forking, so they inherit the patched _process_invoices.
+    
+    Spawned workers (the macOS and Windows default) import the module afresh
+    and would run the real function.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        pytest.skip("worker processes cannot be forked on this platform")
+    return patch('cli.commands.invoice_commands.ProcessPoolExecutor',
+                 partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('fork')))
+
+
+class TestProcessFolderWorkers:
+    """Tests for running batch folders in worker processes."""
+    
+    def setup_method(self):
+        """Set up folders and a file database."""
+        self.fork_workers = _fork_folder_workers()
+        self.fork_workers.start()
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.temp_dir) / "workers.db"
+        self.db_manager = DatabaseManager(str(self.db_path))
+        self.folders = []
+        for i in range(3):
+            folder = Path(self.temp_dir) / f"folder_{i}"
+            folder.mkdir()
+            (folder / "invoice.pdf").write_text("placeholder")
+            self.folders.append(folder)
+        self.output_dir = Path(self.temp_dir) / "output"
+        self.output_dir.mkdir()
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        self.fork_workers.stop()
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _worker_records(self):
+        return [line.split('|') for path in sorted(self.output_dir.glob("*.worker"))
+                for line in path.read_text().splitlines()]
+    
+    def test_folders_run_in_worker_processes_with_own_database(self):
+        """Test each folder is processed outside this process, on its own handle to the same database."""
+        import os
+        with patch('cli.commands.invoice_commands._process_invoices', side_effect=_record_worker_folder), \
+                patch('builtins.input', return_value='S'):
+            result = _process_batch(self.folders, self.output_dir, parallel=True, max_workers=2,
+                                    continue_on_error=False, db_manager=self.db_manager)
+        
+        assert result['folders_processed'] == 3
+        # The unknown part was skipped, so no folder is processed again
+        records = self._worker_records()
+        assert len(records) == 3
+        assert all(int(pid) != os.getpid() for pid, _, _ in records)
+        assert {db_path for _, db_path, _ in records} == {str(self.db_path)}
+        assert {deferred for _, _, deferred in records} == {'True'}
+    
+    def test_unknown_parts_from_workers_are_added_once_by_parent(self):
+        """Test unknown parts returned by every worker are offered once and committed in the parent."""
+        with patch('cli.commands.invoice_commands._process_invoices', side_effect=_record_worker_folder), \
+                patch('builtins.input', return_value='A') as mock_input:
+            result = _process_batch(self.folders, self.output_dir, parallel=True, max_workers=3,
+                                    continue_on_error=False, db_manager=self.db_manager)
+        
+        assert result['unknown_parts_found'] == 1
+        assert mock_input.call_count == 1
+        part = self.db_manager.find_part_by_components('Rental', 'NEW GARMENT', 'NEWSKU')
+        assert part is not None
+        assert part.authorized_price == Decimal('1.25')
+        # Every folder had the added part, so every folder's report is written again
+        assert len(self._worker_records()) == 6
+    
+    def test_worker_writes_are_committed_by_parent(self):
+        """Test workers journal and record rates through the parent, on a read-only handle of their own."""
+        self.db_manager.create_part(Part(part_number='GP0001', authorized_price=Decimal('1.50'),
+                                         description='SHIRT', item_type='Rent'))
+        
+        def extraction(pdf_processor, pdf_path, logger):
+            from cli.commands import invoice_commands
+            # A write the worker does not defer fails instead of reaching the database
+            with pytest.raises(Exception, match="readonly"):
+                invoice_commands._folder_worker_db.create_part(
+                    Part(part_number='STRAY', authorized_price=Decimal('1.00')))
+            outcome = TestBatchPipeline._fake_extraction(pdf_processor, pdf_path, logger)
+            outcome['extraction_json']['invoice_metadata']['invoice_number'] = pdf_path.parent.name
+            outcome['extraction_json']['parts'] = [{
+                'database_fields': {'part_number': 'GP0001', 'item_type': 'Rent',
+                                    'description': 'SHIRT', 'authorized_price': 1.50},
+                'lineitem_fields': {'line_number': 1, 'quantity': 1, 'raw_text': 'GP0001 SHIRT'}
+            }]
+            return outcome
+        
+        with patch('processing.invoice_processor._run_extraction', side_effect=extraction):
+            result = _process_batch(self.folders, self.output_dir, parallel=True, max_workers=2,
+                                    continue_on_error=False, db_manager=self.db_manager, run_id="batch")
+        
+        assert result['folders_processed'] == 3
+        for folder in self.folders:
+            assert self.db_manager.get_processing_run(f"batch/{folder.name}").status == 'completed'
+            assert len(self.db_manager.get_run_files(f"batch/{folder.name}")) == 1
+        assert self.db_manager.get_part_rate_stats_by_part_number(['GP0001'])['GP0001'].observation_count == 3
+    
+    def test_processor_defers_discovery_without_prompting(self):
+        """Test a deferring processor collects each distinct unknown part instead of prompting."""
+        invoice_dir = Path(self.temp_dir) / "invoices"
+        invoice_dir.mkdir()
+        for i in range(3):
+            (invoice_dir / f"invoice_{i}.pdf").write_text("placeholder")
+        
+        def extraction(pdf_processor, pdf_path, logger):
+            outcome = TestBatchPipeline._fake_extraction(pdf_processor, pdf_path, logger)
+            outcome['extraction_json']['parts'] = [{
+                'database_fields': {'part_number': 'NEWSKU', 'item_type': 'Rental',
+                                    'description': 'NEW GARMENT', 'authorized_price': 1.25},
+                'lineitem_fields': {'quantity': 1, 'rate': 1.25, 'total': 1.25, 'raw_text': 'NEWSKU'}
+            }]
+            return outcome
+        
+        processor = InvoiceProcessor(self.db_manager, defer_discovery=True)
+        with patch('processing.invoice_processor._run_extraction', side_effect=extraction), \
+                patch('builtins.input', side_effect=AssertionError("prompted")):
+            result = processor.process_directory(invoice_dir)
+        
+        assert result.successful_files == 3
+        assert [p['database_fields']['part_number'] for p in processor.deferred_unknown_parts] == ['NEWSKU']
+
+
 class TestFindInvoiceFolders:
     """Test the helper function for finding invoice folders."""
     
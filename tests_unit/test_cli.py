@@ -192,6 +192,33 @@ class TestCLIIntegration:
         assert 'list_test' in result.output
         assert 'list_value' in result.output
     
+    def test_config_tolerance_commands(self):
+        """Test tolerance rules can be set, listed and removed."""
+        result = self.runner.invoke(
+            cli,
+            ['config', 'tolerance', 'set', 'item_type', 'Ruin Charge', '--percent', '10'],
+            env=self.env
+        )
+        assert result.exit_code == 0
+        assert "RUIN CHARGE" in result.output
+        
+        # A rule needs at least one tolerance
+        result = self.runner.invoke(cli, ['config', 'tolerance', 'set', 'part', 'GS0448'], env=self.env)
+        assert result.exit_code != 0
+        
+        result = self.runner.invoke(cli, ['config', 'tolerance', 'list'], env=self.env)
+        assert result.exit_code == 0
+        assert 'RUIN CHARGE' in result.output
+        assert '10%' in result.output
+        
+        result = self.runner.invoke(
+            cli,
+            ['config', 'tolerance', 'remove', 'item_type', 'ruin charge', '--force'],
+            env=self.env
+        )
+        assert result.exit_code == 0
+        assert self.db_manager.list_tolerance_rules() == []
+    
     def test_database_backup_command(self):
         """Test database backup command."""
         result = self.runner.invoke(cli, ['database', 'backup'], env=self.env)
@@ -9,13 +9,15 @@ import unittest
 import tempfile
 import shutil
 import uuid
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from pathlib import Path
 
 from database import DatabaseManager
 from database.models import (
-    Part, Configuration, PartDiscoveryLog, DEFAULT_CONFIG,
+    Part, PartRecord, Configuration, PartDiscoveryLog, PartRateStats, PriceInterval, ToleranceRule, DEFAULT_CONFIG,
+    build_composite_key, clear_composite_key_cache, normalize_component,
+    format_money_units, money_units_to_decimal, money_units_to_float, to_money_units,
     ValidationError, DatabaseError, PartNotFoundError, ConfigurationError
 )
 from database.db_migration import DatabaseMigration
@@ -80,6 +82,47 @@ class TestDatabaseManager(unittest.TestCase):
         with self.assertRaises(ConfigurationError):
             self.db_manager.get_config('test_key2')
 
+    
+    def test_reopen_skips_verification_when_fingerprint_matches(self):
+        """Test that reopening an unchanged database skips schema verification."""
+        from unittest.mock import patch
+        
+        with patch.object(DatabaseManager, '_verify_database_schema') as verify:
+            DatabaseManager(str(self.test_db_path))
+        verify.assert_not_called()
+    
+    def test_schema_change_triggers_full_verification(self):
+        """Test that a schema change invalidates the stored fingerprint."""
+        import sqlite3
+        from unittest.mock import patch
+        
+        with sqlite3.connect(str(self.test_db_path)) as conn:
+            conn.execute("CREATE TABLE extra_table (id INTEGER)")
+        
+        with patch.object(DatabaseManager, '_verify_database_schema') as verify:
+            DatabaseManager(str(self.test_db_path))
+        verify.assert_called_once()
+        
+        # The new schema is fingerprinted after verification
+        with patch.object(DatabaseManager, '_verify_database_schema') as verify:
+            DatabaseManager(str(self.test_db_path))
+        verify.assert_not_called()
+    
+    def test_out_of_date_version_detected_after_schema_change(self):
+        """Test that the version check still runs when the fingerprint is stale."""
+        import sqlite3
+        
+        with sqlite3.connect(str(self.test_db_path)) as conn:
+            conn.execute("UPDATE config SET value = '0.9' WHERE key = 'database_version'")
+            conn.execute("PRAGMA user_version = 0")
+        
+        with self.assertRaises(RuntimeError):
+            DatabaseManager(str(self.test_db_path))
+        
+        # Migration tooling can still open it, without fingerprinting it
+        DatabaseManager(str(self.test_db_path), skip_version_check=True)
+        with self.assertRaises(RuntimeError):
+            DatabaseManager(str(self.test_db_path))
 
 class TestPartsOperations(unittest.TestCase):
     """Test cases for Parts CRUD operations."""
@@ -298,6 +341,87 @@ class TestPartsOperations(unittest.TestCase):
         self.assertEqual(len(first_page_numbers.intersection(second_page_numbers)), 0)
 
 
+class TestTrustedPartRows(unittest.TestCase):
+    """Test cases for trusted row mapping and record-based part listing."""
+    
+    def setUp(self):
+        """Set up test database for each test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_db_path = Path(self.test_dir) / "test_invoice_detection.db"
+        self.db_manager = DatabaseManager(str(self.test_db_path))
+        self.db_manager.create_part(Part(
+            part_number="GS0448",
+            authorized_price=Decimal("15.5000"),
+            description="SHIRT WORK LS BTN COTTON",
+            item_type="Rent",
+            category="Shirts"
+        ))
+        self.db_manager.create_part(Part(
+            part_number="GP0171NAVY",
+            authorized_price=Decimal("2.6750"),
+            is_active=False
+        ))
+    
+    def tearDown(self):
+        """Clean up test database after each test."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_from_trusted_row_skips_key_regeneration(self):
+        """Test that the trusted constructor keeps the stored key and skips validation."""
+        row = ("STORED|KEY|X1", "x1", 1.25, None, None, None, "manual", None,
+               "2024-01-02 03:04:05", None, 1, None)
+        part = Part.from_trusted_row(row)
+        
+        self.assertEqual(part.composite_key, "STORED|KEY|X1")
+        self.assertEqual(part.authorized_price, Decimal("1.25"))
+        self.assertIs(part.is_active, True)
+        self.assertIsNone(part.last_updated)
+    
+    def test_timestamps_parsed_lazily(self):
+        """Test that stored timestamp text is only parsed on first access."""
+        row = ("||X1", "X1", 1.0, None, None, None, "manual", None,
+               "2024-01-02 03:04:05", "2024-01-03T00:00:00", 1, None)
+        part = Part.from_trusted_row(row)
+        
+        self.assertEqual(part.__dict__['created_date'], "2024-01-02 03:04:05")
+        self.assertEqual(part.created_date, datetime(2024, 1, 2, 3, 4, 5))
+        self.assertIsInstance(part.__dict__['created_date'], datetime)
+        self.assertEqual(part.to_dict()['last_updated'], "2024-01-03T00:00:00")
+    
+    def test_listed_parts_equal_fetched_parts(self):
+        """Test that listed parts compare equal to parts built through validation."""
+        listed = {part.part_number: part for part in self.db_manager.list_parts()}
+        fetched = self.db_manager.get_part("GS0448")
+        
+        self.assertEqual(listed["GS0448"], fetched)
+        self.assertEqual(listed["GS0448"], Part.from_dict(fetched.to_dict()))
+        self.assertIsInstance(listed["GS0448"].created_date, datetime)
+    
+    def test_list_parts_as_records(self):
+        """Test listing parts as lightweight records."""
+        records = self.db_manager.list_parts(as_records=True)
+        
+        self.assertEqual(len(records), 2)
+        self.assertTrue(all(isinstance(record, PartRecord) for record in records))
+        by_number = {record.part_number: record for record in records}
+        self.assertEqual(by_number["GP0171NAVY"].is_active, 0)
+        self.assertEqual(by_number["GP0171NAVY"].price_units, 26750)
+        self.assertEqual(by_number["GS0448"].to_part(), self.db_manager.get_part("GS0448"))
+        
+        active = self.db_manager.list_parts(active_only=True, as_records=True)
+        self.assertEqual([record.part_number for record in active], ["GS0448"])
+    
+    def test_export_from_records(self):
+        """Test CSV export from records keeps the previous price and flag formatting."""
+        csv_path = Path(self.test_dir) / "parts.csv"
+        count = self.db_manager.export_parts_to_csv(str(csv_path))
+        
+        self.assertEqual(count, 2)
+        content = csv_path.read_text(encoding="utf-8")
+        self.assertIn("GP0171NAVY,2.68,", content)
+        self.assertIn(",false,", content)
+
+
 class TestConfigurationOperations(unittest.TestCase):
     """Test cases for Configuration CRUD operations."""
     
@@ -657,6 +781,130 @@ class TestPartDiscoveryLogOperations(unittest.TestCase):
         self.assertNotIn(created_log.id, log_ids)
 
 
+class TestDiscoverySessionSummaries(unittest.TestCase):
+    """Test cases for the materialized discovery session summaries."""
+    
+    def setUp(self):
+        """Set up test database for each test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.test_db_path = Path(self.test_dir) / "test_invoice_detection.db"
+        self.db_manager = DatabaseManager(str(self.test_db_path))
+    
+    def tearDown(self):
+        """Clean up test database after each test."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def _log(self, part_number, action_taken, session_id):
+        return self.db_manager.create_discovery_log(PartDiscoveryLog(
+            part_number=part_number,
+            action_taken=action_taken,
+            processing_session_id=session_id
+        ))
+    
+    def test_summary_tracks_inserts(self):
+        """Test that session summaries are maintained as logs are written."""
+        session_id = str(uuid.uuid4())
+        self._log("TEST001", "discovered", session_id)
+        self._log("TEST001", "added", session_id)
+        self._log("TEST002", "skipped", session_id)
+        self._log("TEST003", "discovered", None)
+        
+        sessions = self.db_manager.list_discovery_sessions()
+        self.assertEqual(len(sessions), 1)
+        summary = sessions[0]
+        self.assertEqual(summary['session_id'], session_id)
+        self.assertEqual(summary['total_entries'], 3)
+        self.assertEqual(summary['distinct_parts'], 2)
+        self.assertEqual(summary['parts_added'], 1)
+        self.assertEqual(summary['parts_skipped'], 1)
+        self.assertLessEqual(summary['first_seen'], summary['last_seen'])
+        self.assertEqual(self.db_manager.get_discovery_session_parts(session_id), ["TEST001", "TEST002"])
+    
+    def test_list_sessions_orders_and_limits(self):
+        """Test that sessions are listed most recent first."""
+        session_ids = [str(uuid.uuid4()) for _ in range(3)]
+        for session_id in session_ids:
+            self._log("TEST001", "discovered", session_id)
+        
+        sessions = self.db_manager.list_discovery_sessions(limit=2)
+        self.assertEqual([s['session_id'] for s in sessions], session_ids[::-1][:2])
+    
+    def test_session_stats(self):
+        """Test aggregate statistics across sessions."""
+        session1, session2 = str(uuid.uuid4()), str(uuid.uuid4())
+        self._log("TEST001", "added", session1)
+        self._log("TEST002", "skipped", session1)
+        self._log("TEST001", "added", session2)
+        
+        stats = self.db_manager.get_discovery_session_stats(days_back=30)
+        self.assertEqual(stats['active_sessions'], 2)
+        self.assertEqual(stats['total_discoveries'], 3)
+        self.assertEqual(stats['unique_parts'], 2)
+        self.assertEqual(stats['parts_added'], 2)
+        self.assertEqual(stats['parts_skipped'], 1)
+        self.assertAlmostEqual(stats['success_rate'], 200 / 3)
+    
+    def test_session_stats_window_on_boundary_day(self):
+        """Test sessions on the first day of the window are classified by time, not text format."""
+        inside, outside = str(uuid.uuid4()), str(uuid.uuid4())
+        self._log("TEST001", "added", inside)
+        self._log("TEST002", "added", outside)
+        cutoff = datetime.now() - timedelta(days=7)
+        with self.db_manager.get_connection() as conn:
+            for session_id, last_seen in ((inside, (cutoff + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')),
+                                          (outside, (cutoff - timedelta(hours=1)).isoformat())):
+                conn.execute("UPDATE discovery_sessions SET last_seen = ? WHERE session_id = ?",
+                             (last_seen, session_id))
+            conn.commit()
+        
+        stats = self.db_manager.get_discovery_session_stats(days_back=7)
+        self.assertEqual(stats['active_sessions'], 1)
+        self.assertEqual(stats['unique_parts'], 1)
+    
+    def test_cleanup_rebuilds_affected_sessions(self):
+        """Test that log retention cleanup keeps summaries consistent."""
+        session_id = str(uuid.uuid4())
+        old_log = self._log("TEST001", "added", session_id)
+        self._log("TEST002", "discovered", session_id)
+        
+        with self.db_manager.transaction() as conn:
+            old_date = (datetime.now() - timedelta(days=400)).isoformat()
+            conn.execute(
+                "UPDATE part_discovery_log SET discovery_date = ? WHERE id = ?",
+                (old_date, old_log.id)
+            )
+        
+        self.db_manager.cleanup_old_discovery_logs(retention_days=365)
+        
+        summary = self.db_manager.list_discovery_sessions()[0]
+        self.assertEqual(summary['total_entries'], 1)
+        self.assertEqual(summary['distinct_parts'], 1)
+        self.assertEqual(summary['parts_added'], 0)
+        self.assertEqual(self.db_manager.get_discovery_session_parts(session_id), ["TEST002"])
+    
+    def test_existing_database_is_backfilled(self):
+        """Test that opening a database without summaries backfills them."""
+        session_id = str(uuid.uuid4())
+        self._log("TEST001", "added", session_id)
+        self._log("TEST002", "discovered", session_id)
+        
+        with self.db_manager.transaction() as conn:
+            conn.execute("DROP TRIGGER update_discovery_session_summary")
+            conn.execute("DROP TRIGGER update_discovery_session_distinct_parts")
+            conn.execute("DROP TABLE discovery_session_parts")
+            conn.execute("DROP TABLE discovery_sessions")
+        
+        reopened = DatabaseManager(str(self.test_db_path))
+        summary = reopened.list_discovery_sessions()[0]
+        self.assertEqual(summary['total_entries'], 2)
+        self.assertEqual(summary['distinct_parts'], 2)
+        self.assertEqual(summary['parts_added'], 1)
+        
+        reopened.create_discovery_log(PartDiscoveryLog(
+            part_number="TEST003", action_taken="skipped", processing_session_id=session_id
+        ))
+        self.assertEqual(reopened.list_discovery_sessions()[0]['distinct_parts'], 3)
+
 class TestBackupAndRestore(unittest.TestCase):
     """Test cases for backup and restore operations."""
     
@@ -723,6 +971,108 @@ class TestBackupAndRestore(unittest.TestCase):
         self.assertEqual(len(restored_parts), 1)
         self.assertEqual(restored_parts[0].part_number, "TEST001")
     
+    def test_backup_captures_uncheckpointed_wal_pages(self):
+        """Test that online backups include pages still in the WAL file."""
+        import sqlite3
+        
+        writer = sqlite3.connect(str(self.test_db_path))
+        try:
+            writer.execute("PRAGMA wal_autocheckpoint = 0")
+            writer.execute(
+                "INSERT INTO parts (composite_key, part_number, authorized_price) VALUES (?, ?, ?)",
+                ("WAL001", "WAL001", 5.0)
+            )
+            writer.commit()
+            
+            backup_path = str(Path(self.test_dir) / "wal_backup.db")
+            self.db_manager.create_backup(backup_path, verify=True)
+        finally:
+            writer.close()
+        
+        backup_db = DatabaseManager(backup_path)
+        part_numbers = {part.part_number for part in backup_db.list_parts()}
+        self.assertEqual(part_numbers, {"TEST001", "WAL001"})
+    
+    def test_compressed_backup_round_trip(self):
+        """Test gzip and lzma backups can be verified and restored."""
+        from database.db_backup import verify_backup
+        
+        for compression, suffix in (("gzip", ".gz"), ("lzma", ".xz")):
+            with self.subTest(compression=compression):
+                backup_path = str(Path(self.test_dir) / f"backup.db{suffix}")
+                progress = []
+                self.db_manager.create_backup(
+                    backup_path, compression=compression,
+                    progress=lambda copied, total: progress.append((copied, total))
+                )
+                
+                self.assertTrue(progress)
+                self.assertEqual(progress[-1][0], progress[-1][1])
+                with open(backup_path, 'rb') as f:
+                    self.assertNotEqual(f.read(16), b"SQLite format 3\x00")
+                verify_backup(backup_path)
+                
+                self.db_manager.create_part(Part(part_number=f"EXTRA_{compression}",
+                                                 authorized_price=Decimal("1.00")))
+                self.db_manager.restore_backup(backup_path)
+                
+                parts = self.db_manager.list_parts()
+                self.assertEqual([part.part_number for part in parts], ["TEST001"])
+    
+    def test_failed_compression_leaves_no_partial_backup(self):
+        """Test a backup that fails while compressing is not published under its final name."""
+        from unittest.mock import patch
+
+        backup_path = Path(self.test_dir) / "backup.db.gz"
+        with patch('database.db_backup.shutil.copyfileobj', side_effect=OSError("disk full")):
+            with self.assertRaises(DatabaseError):
+                self.db_manager.create_backup(str(backup_path), compression="gzip")
+
+        self.assertEqual(list(Path(self.test_dir).glob("*backup.db.gz*")), [])
+
+    def test_stepped_backup_falls_back_to_one_step_under_writes(self):
+        """Test a backup restarted by every concurrent write still finishes."""
+        import sqlite3
+        from database.db_backup import backup_database
+
+        for number in range(50):
+            self.db_manager.create_part(Part(part_number=f"BULK{number:03d}", authorized_price=Decimal("1.00"),
+                                             description="X" * 500))
+        writer = sqlite3.connect(str(self.test_db_path))
+        writes = []
+
+        def write(copied, total):
+            writes.append(copied)
+            writer.execute("UPDATE parts SET notes = ? WHERE part_number = 'TEST001'", (str(len(writes)),))
+            writer.commit()
+
+        backup_path = Path(self.test_dir) / "busy_backup.db"
+        try:
+            backup_database(str(self.test_db_path), backup_path, pages_per_step=1, step_sleep=0,
+                            progress=write, max_restarts=2)
+        finally:
+            writer.close()
+
+        # Two restarts are tolerated, the third abandons the stepped copy for one step
+        self.assertEqual(len(writes), 4)
+        backup_db = DatabaseManager(str(backup_path))
+        self.assertEqual(backup_db.get_part("TEST001").notes, "3")
+        backup_db.close()
+
+    def test_verify_backup_rejects_corrupt_file(self):
+        """Test that verification fails for files that are not databases."""
+        from database.db_backup import verify_backup
+        
+        corrupt_path = Path(self.test_dir) / "corrupt.db"
+        corrupt_path.write_bytes(b"not a database" * 100)
+        
+        with self.assertRaises(DatabaseError):
+            verify_backup(corrupt_path)
+        with self.assertRaises(DatabaseError):
+            self.db_manager.restore_backup(str(corrupt_path))
+        
+        self.assertEqual(len(self.db_manager.list_parts()), 1)
+    
     def test_restore_backup_file_not_found(self):
         """Test restore from non-existent backup file raises error."""
         with self.assertRaises(DatabaseError) as context:
@@ -757,6 +1107,114 @@ class TestBackupAndRestore(unittest.TestCase):
         self.assertTrue(recent_backup.exists())
 
 
+class TestIncrementalBackupRepository(unittest.TestCase):
+    """Test cases for the deduplicating incremental backup repository."""
+    
+    def setUp(self):
+        """Set up test database and repository for each test."""
+        from database.backup_repository import BackupRepository
+        
+        self.test_dir = tempfile.mkdtemp()
+        self.test_db_path = Path(self.test_dir) / "test_invoice_detection.db"
+        self.db_manager = DatabaseManager(str(self.test_db_path))
+        for i in range(1, 201):
+            self.db_manager.create_part(Part(
+                part_number=f"BULK{i:04d}",
+                authorized_price=Decimal("10.00"),
+                description=f"Bulk part {i} " + "x" * 100
+            ))
+        self.repository = BackupRepository(Path(self.test_dir) / "repo")
+    
+    def tearDown(self):
+        """Clean up test database after each test."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_unchanged_pages_are_deduplicated(self):
+        """Test that a second backup only stores changed chunks."""
+        first = self.repository.create_backup(str(self.test_db_path), pages_per_chunk=1)
+        self.assertEqual(first['chunks_written'], len(set(
+            self.repository.get_manifest(first['backup_id']).chunks
+        )))
+        
+        self.db_manager.update_part("BULK0001", authorized_price=Decimal("11.00"))
+        second = self.repository.create_backup(str(self.test_db_path), pages_per_chunk=1)
+        
+        self.assertGreater(second['chunks_total'], 5)
+        self.assertLess(second['chunks_written'], second['chunks_total'] // 2)
+        self.assertEqual(len(self.repository.list_backups()), 2)
+    
+    def test_excluding_logs_keeps_pages_deduplicated(self):
+        """Test that dropping discovery logs does not renumber the remaining pages."""
+        import sqlite3
+
+        for i in range(1, 101):
+            self.db_manager.create_discovery_log(PartDiscoveryLog(
+                part_number=f"LOG{i:04d}", action_taken="discovered", notes="y" * 200
+            ))
+            self.db_manager.create_part(Part(part_number=f"LATE{i:04d}", authorized_price=Decimal("10.00"),
+                                             description="z" * 100))
+
+        first = self.repository.create_backup(str(self.test_db_path), pages_per_chunk=1)
+        second = self.repository.create_backup(str(self.test_db_path), pages_per_chunk=1,
+                                               include_logs=False)
+
+        self.assertEqual(second['chunks_total'], first['chunks_total'])
+        self.assertLess(second['chunks_written'], second['chunks_total'] // 2)
+
+        restored_path = Path(self.test_dir) / "restored.db"
+        self.repository.restore_backup(second['backup_id'], str(restored_path))
+        conn = sqlite3.connect(str(restored_path))
+        try:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM part_discovery_log").fetchone()[0], 0)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM parts").fetchone()[0], 300)
+        finally:
+            conn.close()
+
+    def test_restore_from_manifest(self):
+        """Test that restoring an older manifest rebuilds its exact contents."""
+        first = self.repository.create_backup(str(self.test_db_path))
+        self.db_manager.delete_part("BULK0001", soft_delete=False)
+        self.repository.create_backup(str(self.test_db_path))
+        
+        self.db_manager.restore_backup(first['manifest_path'])
+        
+        self.assertEqual(len(self.db_manager.list_parts()), 200)
+        self.assertEqual(self.db_manager.get_part("BULK0001").authorized_price, Decimal("10.00"))
+    
+    def test_verify_detects_corrupt_chunk(self):
+        """Test that verification fails when a stored chunk is damaged."""
+        result = self.repository.create_backup(str(self.test_db_path), pages_per_chunk=4)
+        self.repository.verify_backup(result['backup_id'])
+        
+        digest = self.repository.get_manifest(result['backup_id']).chunks[1]
+        chunk_path = self.repository.chunks_dir / digest[:2] / digest
+        chunk_path.write_bytes(b"garbage")
+        
+        with self.assertRaises(DatabaseError):
+            self.repository.verify_backup(result['backup_id'])
+    
+    def test_prune_reclaims_unreferenced_chunks(self):
+        """Test that pruning deletes expired manifests and their unique chunks."""
+        import json
+        
+        old = self.repository.create_backup(str(self.test_db_path), pages_per_chunk=1)
+        self.db_manager.update_part("BULK0001", authorized_price=Decimal("12.00"))
+        self.repository.create_backup(str(self.test_db_path), pages_per_chunk=1)
+        
+        manifest_path = Path(old['manifest_path'])
+        data = json.loads(manifest_path.read_text())
+        data['created'] = (datetime.now() - timedelta(days=40)).isoformat()
+        manifest_path.write_text(json.dumps(data))
+        
+        deleted = self.db_manager.cleanup_old_backups(str(self.repository.root), retention_days=30)
+        
+        self.assertEqual(deleted, 1)
+        remaining = self.repository.list_backups()
+        self.assertEqual(len(remaining), 1)
+        stored = {path.name for path in self.repository.chunks_dir.glob("*/*")}
+        self.assertEqual(stored, set(remaining[0].chunks))
+        self.repository.verify_backup(remaining[0].backup_id)
+
 class TestDatabaseMigration(unittest.TestCase):
     """Test cases for database migration functionality."""
     
@@ -1001,6 +1459,601 @@ class TestModelValidation(unittest.TestCase):
             )
 
 
+class TestCompositeKeyNormalization(unittest.TestCase):
+    """Test cases for memoized composite key normalization."""
+    
+    def setUp(self):
+        """Start each test with empty normalization caches."""
+        clear_composite_key_cache()
+    
+    def test_normalize_component(self):
+        """Test whitespace collapsing, case folding and empty values."""
+        self.assertEqual(normalize_component("  shirt \t work\n ls  "), "SHIRT WORK LS")
+        self.assertEqual(normalize_component(None), "")
+        self.assertEqual(normalize_component(""), "")
+        self.assertEqual(normalize_component(1234), "1234")
+        self.assertEqual(Part.normalize_component(" gs0448 "), "GS0448")
+    
+    def test_build_composite_key_matches_part(self):
+        """Test the single-call key builder agrees with Part key generation."""
+        part = Part(part_number="gs0448", authorized_price=Decimal("1.00"),
+                    description="shirt  work ls", item_type="Rent")
+        
+        key = build_composite_key("Rent", "shirt  work ls", "gs0448")
+        self.assertEqual(key, "RENT|SHIRT WORK LS|GS0448")
+        self.assertEqual(part.composite_key, key)
+        self.assertEqual(Part.generate_identifier_from_components("Rent", "shirt  work ls", "gs0448"), key)
+        self.assertEqual(build_composite_key(None, None, "X1"), "||X1")
+    
+    def test_repeated_keys_are_memoized(self):
+        """Test repeated components are served from the cache."""
+        from database.models import _build_key
+        
+        for _ in range(100):
+            build_composite_key("Rent", "SHIRT WORK LS BTN COTTON", "GS0448")
+        
+        info = _build_key.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 99)
+    
+    def test_unhashable_component_falls_back(self):
+        """Test unhashable component values are still normalized."""
+        self.assertEqual(build_composite_key(["a"], None, "X1"), "['A']||X1")
+
+
+
+class TestFixedPointMoney(unittest.TestCase):
+    """Test cases for integer ten-thousandths money conversions."""
+    
+    def test_to_money_units(self):
+        """Test each accepted input type converts to the same units."""
+        self.assertEqual(to_money_units(Decimal("2.6750")), 26750)
+        self.assertEqual(to_money_units(2.675), 26750)
+        self.assertEqual(to_money_units("2.675"), 26750)
+        self.assertEqual(to_money_units(3), 30000)
+        self.assertEqual(to_money_units(Decimal("0.00005")), 1)
+        self.assertEqual(to_money_units(-0.1), -1000)
+    
+    def test_invalid_amounts_raise(self):
+        """Test values that are not finite numbers raise ValueError."""
+        for value in ("abc", None, float("nan"), float("inf"), Decimal("NaN")):
+            with self.assertRaises(ValueError):
+                to_money_units(value)
+    
+    def test_units_round_trip(self):
+        """Test units convert back to Decimal and float without loss."""
+        self.assertEqual(money_units_to_decimal(26750), Decimal("2.675"))
+        self.assertEqual(str(money_units_to_decimal(26750)), "2.6750")
+        self.assertEqual(money_units_to_float(26750), 2.675)
+    
+    def test_format_rounds_half_up(self):
+        """Test formatting rounds exact half cents away from zero."""
+        # Formatting the float 2.675 gives 2.67 because of binary rounding
+        self.assertEqual(f"{2.675:.2f}", "2.67")
+        self.assertEqual(format_money_units(26750), "2.68")
+        self.assertEqual(format_money_units(-26750), "-2.68")
+        self.assertEqual(format_money_units(26750, 4), "2.6750")
+        self.assertEqual(format_money_units(26750, 0), "3")
+        self.assertEqual(format_money_units(49), "0.00")
+    
+    def test_part_price_units(self):
+        """Test parts and stored records keep their price in units with a Decimal view."""
+        part = Part(part_number="GS0448", authorized_price=Decimal("15.5"), item_type="Rent")
+        self.assertEqual(part.price_units, 155000)
+        part.authorized_price = 16.25
+        self.assertEqual(part.price_units, 162500)
+        self.assertEqual(part.authorized_price, Decimal("16.2500"))
+        with self.assertRaises(ValidationError):
+            part.authorized_price = Decimal("1.00001")
+        
+        record = PartRecord("RENT||GS0448", "GS0448", 155000, None, "Rent", None, "manual",
+                            None, None, None, 1, None)
+        self.assertEqual(record.authorized_price, Decimal("15.5"))
+        self.assertEqual(record.to_part().price_units, 155000)
+
+class TestPartRateStats(unittest.TestCase):
+    """Test cases for the running per-part rate statistics."""
+    
+    def setUp(self):
+        """Set up test database for each test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(str(Path(self.test_dir) / "rate_stats.db"))
+    
+    def tearDown(self):
+        """Clean up test database after each test."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_welford_matches_batch_statistics(self):
+        """Test the running mean and variance equal those computed over all rates."""
+        import statistics
+        
+        prices = [1.50, 1.55, 1.45, 1.60, 1.50, 1.52]
+        stats = PartRateStats(part_number="GS0448")
+        for price in prices:
+            stats.add(price, "INV1")
+        
+        self.assertEqual(stats.observation_count, 6)
+        self.assertAlmostEqual(stats.mean_price, statistics.mean(prices))
+        self.assertAlmostEqual(stats.variance, statistics.variance(prices))
+        self.assertEqual(stats.min_price, Decimal("1.45"))
+        self.assertEqual(stats.max_price, Decimal("1.60"))
+        self.assertEqual(stats.suggested_price, Decimal("1.5200"))
+    
+    def test_outliers(self):
+        """Test z-scores and outlier flags, including parts always billed at one rate."""
+        stats = PartRateStats(part_number="GS0448")
+        self.assertIsNone(stats.z_score(1.50))
+        for price in (1.50, 1.50, 1.50):
+            stats.add(price)
+        
+        self.assertEqual(stats.z_score("1.50"), 0.0)
+        self.assertEqual(stats.z_score(3.00), float("inf"))
+        self.assertFalse(stats.is_outlier(3.00, z_threshold=3.0, min_observations=5))
+        self.assertTrue(stats.is_outlier(3.00, z_threshold=3.0, min_observations=3))
+        
+        stats.add(1.60)
+        self.assertFalse(stats.is_outlier(1.55, z_threshold=3.0, min_observations=3))
+        self.assertTrue(stats.is_outlier(2.00, z_threshold=3.0, min_observations=3))
+    
+    def test_record_and_read_back(self):
+        """Test rates recorded in batches are folded into stored statistics."""
+        self.db_manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 1.50, "INV1"),
+                                           ("RENT|SHIRT|GS0448", "GS0448", Decimal("1.70"), "INV1"),
+                                           ("RENT|PANTS|GP0002", "GP0002", "0.75", "INV1"),
+                                           (None, None, 1.00, "INV1"),
+                                           ("RENT|COAT|GP0003", "GP0003", None, "INV1")])
+        self.db_manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 1.60, "INV2")])
+        
+        stats = self.db_manager.get_part_rate_stats(["RENT|SHIRT|GS0448", "RENT|PANTS|GP0002", "MISSING"])
+        self.assertEqual(set(stats), {"RENT|SHIRT|GS0448", "RENT|PANTS|GP0002"})
+        shirt = stats["RENT|SHIRT|GS0448"]
+        self.assertEqual(shirt.part_number, "GS0448")
+        self.assertEqual(shirt.observation_count, 3)
+        self.assertAlmostEqual(shirt.mean_price, 1.60)
+        self.assertAlmostEqual(shirt.variance, 0.01)
+        self.assertEqual(shirt.min_price, Decimal("1.5"))
+        self.assertEqual(shirt.last_invoice, "INV2")
+        self.assertEqual(stats["RENT|PANTS|GP0002"].observation_count, 1)
+    
+    def test_same_invoice_is_not_counted_twice(self):
+        """Test re-recording any earlier invoice leaves the statistics unchanged."""
+        for invoice_number in ("INV1", "INV2", "INV3"):
+            self.db_manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 1.50, invoice_number)])
+        # Re-running the same folder
+        for invoice_number in ("INV1", "INV2", "INV3"):
+            updated = self.db_manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 1.50, invoice_number)])
+            self.assertEqual(updated, {})
+        
+        self.assertEqual(self.db_manager.get_part_rate_stats(["RENT|SHIRT|GS0448"])["RENT|SHIRT|GS0448"]
+                         .observation_count, 3)
+    
+    def test_every_line_of_a_new_invoice_is_counted(self):
+        """Test several lines for one part on one invoice each add an observation."""
+        self.db_manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 10.00, "INV1")])
+        self.db_manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 10.00, "INV2"),
+                                           ("RENT|SHIRT|GS0448", "GS0448", 12.00, "INV2")])
+        
+        stats = self.db_manager.get_part_rate_stats(["RENT|SHIRT|GS0448"])["RENT|SHIRT|GS0448"]
+        self.assertEqual(stats.observation_count, 3)
+        self.assertEqual(stats.max_price, Decimal("12"))
+    
+    def test_statistics_are_kept_per_composite_key(self):
+        """Test a rental and a charge sharing a part number keep separate statistics."""
+        self.db_manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 1.50, "INV1"),
+                                           ("RUIN|SHIRT|GS0448", "GS0448", 25.00, "INV1"),
+                                           ("RENT|SHIRT|GS0448", "GS0448", 1.60, "INV2")])
+        
+        stats = self.db_manager.get_part_rate_stats(["RENT|SHIRT|GS0448", "RUIN|SHIRT|GS0448"])
+        self.assertAlmostEqual(stats["RENT|SHIRT|GS0448"].mean_price, 1.55)
+        self.assertEqual(stats["RUIN|SHIRT|GS0448"].observation_count, 1)
+        by_part_number = self.db_manager.get_part_rate_stats_by_part_number(["GS0448"])
+        self.assertEqual(by_part_number["GS0448"].composite_key, "RENT|SHIRT|GS0448")
+    
+    def test_existing_database_is_migrated(self):
+        """Test databases created before rate statistics gain the table when opened."""
+        import sqlite3
+        
+        self.db_manager.close()
+        db_path = Path(self.test_dir) / "rate_stats.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("DROP TABLE part_rate_stats")
+            conn.execute("PRAGMA user_version = 0")
+        
+        manager = DatabaseManager(str(db_path))
+        manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 1.50, "INV1")])
+        self.assertEqual(manager.get_part_rate_stats(["RENT|SHIRT|GS0448"])["RENT|SHIRT|GS0448"]
+                         .observation_count, 1)
+    
+    def test_statistics_by_part_number_are_rebuilt(self):
+        """Test statistics kept by part number alone are replaced by composite key statistics."""
+        import sqlite3
+        
+        self.db_manager.close()
+        db_path = Path(self.test_dir) / "rate_stats.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("DROP TABLE part_rate_stats")
+            conn.execute("DROP TABLE part_rate_invoices")
+            conn.execute("CREATE TABLE part_rate_stats (part_number TEXT PRIMARY KEY, observation_count INTEGER)")
+            conn.execute("INSERT INTO part_rate_stats VALUES ('GS0448', 4)")
+            conn.execute("PRAGMA user_version = 0")
+        
+        manager = DatabaseManager(str(db_path))
+        self.assertEqual(manager.get_part_rate_stats_by_part_number(["GS0448"]), {})
+        manager.record_part_rates([("RENT|SHIRT|GS0448", "GS0448", 1.50, "INV1")])
+        self.assertEqual(manager.get_part_rate_stats_by_part_number(["GS0448"])["GS0448"].observation_count, 1)
+    
+    def test_decimal_price_range_is_migrated_to_units(self):
+        """Test a price range kept as decimals is converted to ten-thousandths."""
+        import sqlite3
+        
+        self.db_manager.close()
+        db_path = Path(self.test_dir) / "rate_stats.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("DROP TABLE part_rate_stats")
+            conn.execute("""
+                CREATE TABLE part_rate_stats (
+                    composite_key TEXT PRIMARY KEY, part_number TEXT NOT NULL,
+                    observation_count INTEGER NOT NULL DEFAULT 0, mean_price REAL NOT NULL DEFAULT 0,
+                    m2 REAL NOT NULL DEFAULT 0, min_price DECIMAL(10,4), max_price DECIMAL(10,4),
+                    last_seen TIMESTAMP, last_invoice TEXT
+                )
+            """)
+            conn.execute("INSERT INTO part_rate_stats VALUES ('RENT|SHIRT|GS0448', 'GS0448', 2, 1.55, 0.005, "
+                         "1.5, 1.6, NULL, 'INV2')")
+            conn.execute("PRAGMA user_version = 0")
+        
+        manager = DatabaseManager(str(db_path))
+        stats = manager.get_part_rate_stats_by_part_number(["GS0448"])["GS0448"]
+        self.assertEqual((stats.min_price, stats.max_price), (Decimal("1.5"), Decimal("1.6")))
+        with manager.get_connection() as conn:
+            row = conn.execute("SELECT min_price_units, max_price_units FROM part_rate_stats").fetchone()
+        self.assertEqual(tuple(row), (15000, 16000))
+        manager.close()
+
+
+
+class TestPriceHistory(unittest.TestCase):
+    """Test cases for authorized price history and the price history index."""
+    
+    def setUp(self):
+        """Set up test database with one part for each test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(str(Path(self.test_dir) / "price_history.db"))
+        self.part = self.db_manager.create_part(Part(
+            part_number="GS0448",
+            authorized_price=Decimal("1.50"),
+            description="SHIRT WORK LS BTN COTTON",
+            item_type="Rent"
+        ))
+        self.key = self.part.composite_key
+    
+    def tearDown(self):
+        """Clean up test database after each test."""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_triggers_record_price_changes(self):
+        """Test creating a part opens an interval and same-day changes replace it."""
+        history = self.db_manager.get_price_history(self.key)
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0].authorized_price, Decimal("1.5"))
+        self.assertEqual(history[0].effective_from, date.today())
+        self.assertIsNone(history[0].effective_to)
+        
+        self.db_manager.update_part(self.key, description="SHIRT WORK LS BTN COTTON", category="Shirts")
+        self.db_manager.update_part(self.key, authorized_price=Decimal("1.75"))
+        
+        history = self.db_manager.get_price_history(self.key)
+        self.assertEqual([interval.authorized_price for interval in history], [Decimal("1.75")])
+    
+    def test_backdated_prices_form_contiguous_intervals(self):
+        """Test backdated prices split the history and the latest one becomes current."""
+        self.db_manager.record_price_change(self.key, "1.20", date(2024, 1, 1))
+        self.db_manager.record_price_change(self.key, Decimal("1.35"), date(2024, 7, 1))
+        
+        history = self.db_manager.get_price_history(self.key)
+        self.assertEqual([(interval.effective_from, interval.effective_to, interval.authorized_price)
+                          for interval in history],
+                         [(date(2024, 1, 1), date(2024, 7, 1), Decimal("1.2")),
+                          (date(2024, 7, 1), date.today(), Decimal("1.35")),
+                          (date.today(), None, Decimal("1.5"))])
+        self.assertEqual(self.db_manager.get_price_on(self.key, date(2024, 3, 15)), Decimal("1.2"))
+        self.assertEqual(self.db_manager.get_price_on(self.key, date(2024, 7, 1)), Decimal("1.35"))
+        self.assertIsNone(self.db_manager.get_price_on(self.key, date(2023, 12, 31)))
+        self.assertEqual(self.db_manager.get_part(self.key).authorized_price, Decimal("1.5"))
+        
+        with self.assertRaises(ValidationError):
+            self.db_manager.record_price_change(self.key, "1.60", date.today() + timedelta(days=1))
+        with self.assertRaises(PartNotFoundError):
+            self.db_manager.record_price_change("RENT|MISSING|X1", "1.60", date(2024, 1, 1))
+    
+    def test_latest_backdated_price_updates_part(self):
+        """Test a backdated price newer than every interval becomes the part's price."""
+        import sqlite3
+        
+        with sqlite3.connect(str(Path(self.test_dir) / "price_history.db")) as conn:
+            conn.execute("UPDATE part_price_history SET effective_from = '2024-01-01'")
+        
+        interval = self.db_manager.record_price_change(self.key, "1.65", date(2024, 6, 1))
+        
+        self.assertIsNone(interval.effective_to)
+        self.assertEqual(self.db_manager.get_part(self.key).authorized_price, Decimal("1.65"))
+        self.assertEqual(len(self.db_manager.get_price_history(self.key)), 2)
+    
+    def test_history_follows_renamed_part(self):
+        """Test renaming a part's composite key keeps its price history."""
+        self.db_manager.record_price_change(self.key, "1.20", date(2024, 1, 1))
+        renamed = self.db_manager.update_part(self.key, description="SHIRT WORK SS BTN COTTON")
+        
+        self.assertEqual(self.db_manager.get_price_history(self.key), [])
+        self.assertEqual(len(self.db_manager.get_price_history(renamed.composite_key)), 2)
+    
+    def test_parts_without_key_skip_history(self):
+        """Test writing a part with no composite key does not fail in the history triggers."""
+        import sqlite3
+
+        db_path = str(Path(self.test_dir) / "price_history.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("INSERT INTO parts (part_number, authorized_price) VALUES ('NOKEY', 2.00)")
+            conn.execute("UPDATE parts SET authorized_price = 2.50 WHERE part_number = 'NOKEY'")
+            count = conn.execute("SELECT COUNT(*) FROM part_price_history").fetchone()[0]
+
+        self.assertEqual(count, 1)
+
+    def test_migration_adds_key_guard_to_triggers(self):
+        """Test databases with the unguarded triggers get them replaced on open."""
+        import sqlite3
+
+        db_path = str(Path(self.test_dir) / "price_history.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("DROP TRIGGER record_part_price_insert")
+            conn.execute("""
+                CREATE TRIGGER record_part_price_insert AFTER INSERT ON parts FOR EACH ROW
+                BEGIN
+                    INSERT INTO part_price_history (composite_key, authorized_price, effective_from)
+                    VALUES (NEW.composite_key, NEW.authorized_price, date('now'));
+                END
+            """)
+
+        DatabaseManager(db_path).close()
+
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("INSERT INTO parts (part_number, authorized_price) VALUES ('NOKEY', 2.00)")
+
+    def test_index_answers_with_price_in_effect(self):
+        """Test the index bisects intervals and keeps the current price for recent dates."""
+        from database.price_history import PriceHistoryIndex
+        
+        self.db_manager.record_price_change(self.key, "1.20", date(2024, 1, 1))
+        self.db_manager.record_price_change(self.key, "1.35", date(2024, 7, 1))
+        index = PriceHistoryIndex(self.db_manager)
+        current = self.part.price_units
+        
+        self.assertEqual(index.price_units_on(self.key, date(2023, 6, 1), current), 12000)
+        self.assertEqual(index.price_units_on(self.key, date(2024, 6, 30), current), 12000)
+        self.assertEqual(index.price_units_on(self.key, date(2024, 7, 1), current), 13500)
+        self.assertEqual(index.price_units_on(self.key, date.today(), current), current)
+        self.assertEqual(index.price_units_on(self.key, None, current), current)
+        self.assertEqual(index.price_units_on("RENT|OTHER|X1", date(2024, 1, 1), 999), 999)
+        self.assertEqual(index.loads, 1)
+        
+        self.assertFalse(index.refresh())
+        self.db_manager.record_price_change(self.key, "1.25", date(2024, 3, 1))
+        self.assertTrue(index.refresh())
+        self.assertEqual(index.price_units_on(self.key, date(2024, 4, 1), current), 12500)
+    
+    def test_parse_invoice_date(self):
+        """Test the invoice date formats found on invoices and in JSON are recognized."""
+        from database.price_history import parse_invoice_date
+        
+        self.assertEqual(parse_invoice_date("06/30/2025"), date(2025, 6, 30))
+        self.assertEqual(parse_invoice_date("6/3/2025"), date(2025, 6, 3))
+        self.assertEqual(parse_invoice_date("2025-06-30"), date(2025, 6, 30))
+        self.assertEqual(parse_invoice_date(datetime(2025, 6, 30, 12)), date(2025, 6, 30))
+        self.assertIsNone(parse_invoice_date("June 30"))
+        self.assertIsNone(parse_invoice_date(""))
+        self.assertIsNone(parse_invoice_date(None))
+    
+    def test_interval_validation(self):
+        """Test intervals must have a positive price and end after they start."""
+        with self.assertRaises(ValidationError):
+            PriceInterval(composite_key=self.key, authorized_price=Decimal("0"), effective_from=date(2024, 1, 1))
+        with self.assertRaises(ValidationError):
+            PriceInterval(composite_key=self.key, authorized_price=Decimal("1"), effective_from=date(2024, 1, 1),
+                          effective_to=date(2024, 1, 1))
+        interval = PriceInterval(composite_key=self.key, authorized_price=1.2, effective_from=date(2024, 1, 1),
+                                 effective_to=date(2024, 2, 1))
+        self.assertTrue(interval.covers(date(2024, 1, 31)))
+        self.assertFalse(interval.covers(date(2024, 2, 1)))
+        self.assertEqual(interval.price_units, 12000)
+    
+    def test_existing_database_is_backfilled(self):
+        """Test databases created before price history get an interval per part when opened."""
+        import sqlite3
+        
+        self.db_manager.close()
+        db_path = Path(self.test_dir) / "price_history.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("DROP TABLE part_price_history")
+            conn.execute("UPDATE parts SET created_date = '2023-05-04T10:00:00'")
+            conn.execute("PRAGMA user_version = 0")
+        
+        manager = DatabaseManager(str(db_path))
+        history = manager.get_price_history()
+        self.assertEqual([(interval.composite_key, interval.effective_from) for interval in history],
+                         [(self.key, date(2023, 5, 4))])
+        
+        manager.update_part(self.key, authorized_price=Decimal("1.80"))
+        self.assertEqual(manager.get_price_on(self.key, date(2024, 1, 1)), Decimal("1.5"))
+
+class TestToleranceRules(unittest.TestCase):
+    """Test cases for price tolerance rules and the compiled tolerance table."""
+    
+    def setUp(self):
+        """Set up test database for each test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(str(Path(self.test_dir) / "tolerance.db"))
+    
+    def tearDown(self):
+        """Clean up test database after each test."""
+        self.db_manager.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_rule_validation(self):
+        """Test rules need a known scope, a match value and a sensible tolerance."""
+        with self.assertRaises(ValidationError):
+            ToleranceRule(scope="customer", match_value="X", absolute_tolerance=Decimal("1"))
+        with self.assertRaises(ValidationError):
+            ToleranceRule(scope="part", match_value="  ", absolute_tolerance=Decimal("1"))
+        with self.assertRaises(ValidationError):
+            ToleranceRule(scope="part", match_value="GS0448")
+        with self.assertRaises(ValidationError):
+            ToleranceRule(scope="part", match_value="GS0448", absolute_tolerance=Decimal("-0.01"))
+        with self.assertRaises(ValidationError):
+            ToleranceRule(scope="category", match_value="Shirts", percent_tolerance=Decimal("101"))
+        
+        rule = ToleranceRule(scope="item_type", match_value=" ruin  charge ", percent_tolerance=Decimal("2.5"))
+        self.assertEqual(rule.match_value, "RUIN CHARGE")
+        self.assertEqual(rule.percent_ppm, 25000)
+        self.assertEqual(rule.tolerance_units(100000), 2500)
+    
+    def test_set_list_and_delete_rules(self):
+        """Test rules are upserted by scope and match value and keep their creation date."""
+        first = self.db_manager.set_tolerance_rule(ToleranceRule(
+            scope="part", match_value="gs0448", absolute_tolerance=Decimal("0.05")))
+        self.db_manager.set_tolerance_rule(ToleranceRule(
+            scope="item_type", match_value="Ruin Charge", percent_tolerance=Decimal("10")))
+        updated = self.db_manager.set_tolerance_rule(ToleranceRule(
+            scope="part", match_value="GS0448", absolute_tolerance=Decimal("0.10"), description="Contract"))
+        
+        self.assertEqual(updated.created_date, first.created_date)
+        rules = self.db_manager.list_tolerance_rules()
+        self.assertEqual([(rule.scope, rule.match_value) for rule in rules],
+                         [("item_type", "RUIN CHARGE"), ("part", "GS0448")])
+        self.assertEqual(rules[1].absolute_tolerance, Decimal("0.1"))
+        self.assertEqual(len(self.db_manager.list_tolerance_rules(scope="part")), 1)
+        
+        self.assertTrue(self.db_manager.delete_tolerance_rule("part", "gs0448"))
+        self.assertFalse(self.db_manager.delete_tolerance_rule("part", "gs0448"))
+        self.assertEqual(len(self.db_manager.list_tolerance_rules()), 1)
+    
+    def test_decimal_tolerances_are_migrated_to_units(self):
+        """Test absolute tolerances kept as decimals are converted to ten-thousandths."""
+        import sqlite3
+        
+        self.db_manager.close()
+        db_path = Path(self.test_dir) / "tolerance.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("DROP TABLE tolerance_rules")
+            conn.execute("""
+                CREATE TABLE tolerance_rules (
+                    scope TEXT NOT NULL, match_value TEXT NOT NULL,
+                    absolute_tolerance DECIMAL(10,4), percent_tolerance DECIMAL(7,4), description TEXT,
+                    created_date TIMESTAMP, last_updated TIMESTAMP, PRIMARY KEY (scope, match_value)
+                )
+            """)
+            conn.execute("INSERT INTO tolerance_rules VALUES ('part', 'GS0448', 0.05, NULL, 'Contract', NULL, NULL)")
+            conn.execute("PRAGMA user_version = 0")
+        
+        self.db_manager = DatabaseManager(str(db_path))
+        rule = self.db_manager.list_tolerance_rules()[0]
+        self.assertEqual(rule.absolute_tolerance, Decimal("0.05"))
+        self.assertEqual(rule.absolute_units, 500)
+        self.assertEqual(rule.description, "Contract")
+    
+    def test_table_precedence(self):
+        """Test part rules win over category rules and category rules over item type rules."""
+        from processing.tolerance_rules import ToleranceTable
+        
+        table = ToleranceTable([
+            ToleranceRule(scope="item_type", match_value="Ruin Charge", percent_tolerance=Decimal("10")),
+            ToleranceRule(scope="category", match_value="Jackets", absolute_tolerance=Decimal("0.50")),
+            ToleranceRule(scope="part", match_value="GS0448", absolute_tolerance=Decimal("0.01"),
+                          percent_tolerance=Decimal("1"))
+        ])
+        ruin = Part(part_number="GS0001", authorized_price=Decimal("20.00"), item_type="Ruin Charge")
+        jacket = Part(part_number="GS0002", authorized_price=Decimal("20.00"), item_type="Ruin Charge",
+                      category="jackets")
+        shirt = Part(part_number="gs0448", authorized_price=Decimal("20.00"), item_type="Ruin Charge",
+                     category="Jackets")
+        rental = Part(part_number="GS0003", authorized_price=Decimal("20.00"), item_type="Rent")
+        
+        self.assertEqual(table.tolerance_units(ruin, 200000, 1), 20000)
+        self.assertEqual(table.tolerance_units(jacket, 200000, 1), 5000)
+        self.assertEqual(table.tolerance_units(shirt, 200000, 1), 2000)
+        self.assertEqual(table.tolerance_units(rental, 200000, 1), 1)
+        self.assertIsNone(table.rule_for(rental))
+        self.assertEqual(table.rule_for(shirt).scope, "part")
+        self.assertEqual(ToleranceTable().tolerance_units(ruin, 200000, 7), 7)
+    
+    def test_existing_database_gets_rules_table(self):
+        """Test databases created before tolerance rules get the table when opened."""
+        import sqlite3
+        
+        self.db_manager.close()
+        db_path = Path(self.test_dir) / "tolerance.db"
+        with sqlite3.connect(str(db_path)) as conn:
+            conn.execute("DROP TABLE tolerance_rules")
+            conn.execute("PRAGMA user_version = 0")
+        
+        self.db_manager = DatabaseManager(str(db_path))
+        self.assertEqual(self.db_manager.list_tolerance_rules(), [])
+
+
+class TestPartsIndex(unittest.TestCase):
+    """Test cases for the cached in-memory parts index."""
+    
+    def setUp(self):
+        """Set up test database for each test."""
+        from database.parts_index import PartsIndex
+        
+        self.test_dir = tempfile.mkdtemp()
+        self.db_manager = DatabaseManager(str(Path(self.test_dir) / "parts_index.db"))
+        self.db_manager.create_part(Part(
+            part_number="GS0448",
+            authorized_price=Decimal("15.5000"),
+            description="SHIRT WORK LS BTN COTTON",
+            item_type="Rent"
+        ))
+        self.index = PartsIndex(self.db_manager)
+    
+    def tearDown(self):
+        """Clean up test database after each test."""
+        self.db_manager.close()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+    
+    def test_lookups_are_served_from_memory(self):
+        """Test repeated lookups load the table once and then hit the cache."""
+        for _ in range(3):
+            part = self.index.find_part_by_components("Rent", "shirt work ls btn cotton", "gs0448")
+            self.assertEqual(part.authorized_price, Decimal("15.5000"))
+        
+        self.assertFalse(self.index.refresh())
+        self.assertEqual(self.index.get_stats(), {'parts': 1, 'loads': 1, 'hits': 3, 'misses': 0})
+    
+    def test_new_parts_are_found_without_refresh(self):
+        """Test a cache miss falls through to the database."""
+        self.index.refresh()
+        self.assertIsNone(self.index.find_part_by_components(None, None, "GP0171NAVY"))
+        
+        self.db_manager.create_part(Part(part_number="GP0171NAVY", authorized_price=Decimal("2.6750")))
+        part = self.index.find_part_by_components(None, None, "GP0171NAVY")
+        self.assertEqual(part.part_number, "GP0171NAVY")
+        self.assertEqual(len(self.index), 2)
+    
+    def test_refresh_picks_up_changes(self):
+        """Test price changes and deletions reload the index."""
+        key = build_composite_key("Rent", "SHIRT WORK LS BTN COTTON", "GS0448")
+        self.index.refresh()
+        
+        self.db_manager.update_part(key, authorized_price=Decimal("16.0000"))
+        self.assertTrue(self.index.refresh())
+        self.assertEqual(self.index.get_part_by_composite_key(key).authorized_price, Decimal("16.0000"))
+        
+        self.db_manager.delete_part(key, soft_delete=False)
+        self.assertTrue(self.index.refresh())
+        self.assertIsNone(self.index.get_part_by_composite_key(key))
+
+
 class TestDatabaseUtilities(unittest.TestCase):
     """Test cases for database utility functions."""
     
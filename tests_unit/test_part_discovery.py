@@ -9,15 +9,16 @@ This module tests all aspects of the part discovery system including:
 - Integration with validation engine
 """
 
+import io
 import pytest
 import uuid
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
 # Use the actual existing part discovery service
-from processing.part_discovery import SimplePartDiscoveryService
+from processing.part_discovery import BatchDiscoverySession, SimplePartDiscoveryService
 
 # Create simple data classes for testing since the complex ones don't exist
 class UnknownPartContext:
@@ -144,7 +145,7 @@ class ValidationEngine:
         for result in results:
             result.processing_successful = True
         return results, []
-from database.models import Part, PartDiscoveryLog, DatabaseError, ValidationError
+from database.models import Part, PartDiscoveryLog, DatabaseError, ValidationError, build_composite_key
 from database.database import DatabaseManager
 from processing.validation_models import ValidationConfiguration
 from cli.exceptions import UserCancelledError
@@ -774,5 +775,569 @@ class TestDiscoveryLogging:
         assert unknown_contexts[0].part_number == "UNKNOWN_PART"
 
 
+
+class TestBatchDiscoverySession:
+    """Test batch-wide deduplication of unknown part discovery."""
+    
+    @staticmethod
+    def _extraction(*part_numbers):
+        return {'parts': [
+            {'database_fields': {'part_number': number, 'item_type': 'Rental',
+                                 'description': f"GARMENT {number}", 'authorized_price': 1.25},
+             'lineitem_fields': {'raw_text': number}}
+            for number in part_numbers
+        ]}
+    
+    @pytest.fixture
+    def db_manager(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / "session.db"))
+        yield manager
+        manager.close()
+    
+    def test_skipped_part_is_not_offered_again_in_the_batch(self, db_manager):
+        """Test a part skipped on one invoice is neither looked up nor prompted for on later ones."""
+        service = SimplePartDiscoveryService(db_manager)
+        
+        with patch('builtins.input', return_value='S') as mock_input, \
+                patch.object(db_manager, 'find_part_by_components', wraps=db_manager.find_part_by_components) as lookup:
+            with service.batch_session() as session:
+                for _ in range(50):
+                    service.discover_and_add_parts(self._extraction('NEWSKU'))
+        
+        assert mock_input.call_count == 1
+        assert lookup.call_count == 1
+        assert session.get_stats()['skipped'] == 1
+        assert session.lookups_saved == 49
+        assert service.session is None
+    
+    def test_added_and_known_parts_are_answered_from_memory(self, db_manager):
+        """Test added parts and parts found in the database are remembered for the session."""
+        db_manager.create_part(Part(part_number='OLD', authorized_price=Decimal('2.00'),
+                                    description='GARMENT OLD', item_type='Rental'))
+        service = SimplePartDiscoveryService(db_manager)
+        
+        with patch('builtins.input', return_value='A') as mock_input:
+            with service.batch_session() as session:
+                service.discover_and_add_parts(self._extraction('OLD', 'NEWSKU'))
+                assert service.find_unknown_parts_batch([self._extraction('OLD', 'NEWSKU')]) == []
+        
+        assert mock_input.call_count == 1
+        assert session.get_stats()['known'] == 1
+        assert session.get_stats()['added'] == 1
+        assert db_manager.find_part_by_components('Rental', 'GARMENT NEWSKU', 'NEWSKU') is not None
+    
+    def test_quit_stops_prompting_for_rest_of_batch(self, db_manager):
+        """Test quitting discovery is honoured by every later invoice in the batch."""
+        service = SimplePartDiscoveryService(db_manager)
+        
+        with patch('builtins.input', return_value='Q') as mock_input:
+            with service.batch_session() as session:
+                service.discover_and_add_parts(self._extraction('NEW1'))
+                service.discover_and_add_parts(self._extraction('NEW2'))
+        
+        assert mock_input.call_count == 1
+        assert session.cancelled
+    
+    def test_sessions_are_reentrant_and_shareable(self, db_manager):
+        """Test nested blocks reuse the active session and a given session can span services."""
+        shared = BatchDiscoverySession()
+        first = SimplePartDiscoveryService(db_manager)
+        second = SimplePartDiscoveryService(db_manager)
+        
+        with patch('builtins.input', return_value='S') as mock_input:
+            with first.batch_session(shared):
+                with first.batch_session() as inner:
+                    assert inner is shared
+                first.discover_and_add_parts(self._extraction('NEWSKU'))
+            with second.batch_session(shared):
+                second.discover_and_add_parts(self._extraction('NEWSKU'))
+        
+        assert mock_input.call_count == 1
+        assert shared.get(build_composite_key('Rental', 'GARMENT NEWSKU', 'NEWSKU')) == BatchDiscoverySession.SKIPPED
+
+    
+    def test_directory_run_prompts_once_per_unknown_part(self, db_manager, tmp_path):
+        """Test a new SKU on every invoice of a directory run is offered once, not per invoice."""
+        from processing.invoice_processor import InvoiceProcessor
+        
+        for i in range(5):
+            (tmp_path / f"invoice_{i}.pdf").write_text("placeholder")
+        
+        def extraction(pdf_processor, pdf_path, logger):
+            extraction_json = self._extraction('NEWSKU')
+            extraction_json['invoice_metadata'] = {'invoice_number': pdf_path.stem}
+            return {'extraction_json': extraction_json, 'error_message': None,
+                    'error_type': None, 'processing_time': 0.0}
+        
+        processor = InvoiceProcessor(db_manager)
+        with patch('processing.invoice_processor._run_extraction', side_effect=extraction), \
+                patch('builtins.input', return_value='S') as mock_input:
+            result = processor.process_directory(tmp_path)
+        
+        assert result.successful_files == 5
+        assert mock_input.call_count == 1
+        assert result.total_unknown_parts == 5
+
+
+class TestPartResolutionPass:
+    """Test that discovery and validation share one lookup per composite key."""
+    
+    @pytest.fixture
+    def db_manager(self, tmp_path):
+        manager = DatabaseManager(str(tmp_path / "resolution.db"))
+        manager.create_part(Part(part_number='KNOWN', authorized_price=Decimal('2.00'),
+                                 description='GARMENT KNOWN', item_type='Rental'))
+        yield manager
+        manager.close()
+    
+    @staticmethod
+    def _line(part_number, price):
+        return {'database_fields': {'part_number': part_number, 'item_type': 'Rental',
+                                    'description': f"GARMENT {part_number}", 'authorized_price': price},
+                'lineitem_fields': {'quantity': 1, 'total': price, 'raw_text': part_number}}
+    
+    def _process(self, db_manager, answer):
+        from processing.invoice_processor import InvoiceProcessor, ProcessingResult
+        
+        processor = InvoiceProcessor(db_manager)
+        result = ProcessingResult(success=False, invoice_path="invoice.pdf", extraction_json={
+            'invoice_metadata': {'invoice_number': 'INV1'},
+            'parts': [self._line('KNOWN', 2.00), self._line('KNOWN', 2.50),
+                      self._line('NEWSKU', 1.25), self._line('NEWSKU', 1.25)]
+        })
+        with patch.object(db_manager, 'find_part_by_components',
+                          wraps=db_manager.find_part_by_components) as lookup, \
+                patch('builtins.input', return_value=answer) as mock_input:
+            processor._complete_invoice(result)
+        return result, lookup, mock_input
+    
+    def test_each_composite_key_is_looked_up_once(self, db_manager):
+        """Test discovery and validation reuse the resolution pass instead of querying per line."""
+        result, lookup, mock_input = self._process(db_manager, 'A')
+        
+        assert lookup.call_count == 2
+        assert mock_input.call_count == 1
+        summary = result.validation_json['validation_summary']
+        assert (summary['passed_parts'], summary['failed_parts'], summary['unknown_parts']) == (3, 1, 0)
+    
+    def test_skipped_part_stays_unknown_without_another_lookup(self, db_manager):
+        """Test a part skipped in discovery is reported unknown from the shared map."""
+        result, lookup, mock_input = self._process(db_manager, 'S')
+        
+        assert lookup.call_count == 2
+        assert mock_input.call_count == 1
+        summary = result.validation_json['validation_summary']
+        assert (summary['passed_parts'], summary['failed_parts'], summary['unknown_parts']) == (1, 1, 2)
+
+class TestPriceTolerance:
+    """Test the price tolerance boundary of per-line validation."""
+    
+    @pytest.fixture
+    def engine(self, tmp_path):
+        from processing.validation_engine import ValidationEngine
+        
+        manager = DatabaseManager(str(tmp_path / "tolerance.db"))
+        manager.create_part(Part(part_number='GP0002', authorized_price=Decimal('0.75'),
+                                 description='PANTS', item_type='Rent'))
+        yield ValidationEngine(manager)
+        manager.close()
+    
+    @staticmethod
+    def _line(line_number, part_number, description, price, quantity=2, total=None):
+        return {'database_fields': {'part_number': part_number, 'item_type': 'Rent',
+                                    'description': description, 'authorized_price': price},
+                'lineitem_fields': {'line_number': line_number, 'quantity': quantity,
+                                    'total': total, 'raw_text': f"{part_number} {description}"}}
+
+    def test_tolerance_boundary_is_exact(self, engine):
+        """Test a difference equal to the tolerance passes."""
+        # 0.75 - 0.749 is slightly more than 0.001 in binary floating point
+        assert abs(0.749 - 0.75) > 0.001
+        invoice = {'invoice_metadata': {'invoice_number': 'INV1'},
+                   'parts': [self._line(1, 'GP0002', 'PANTS', 0.749),
+                             self._line(2, 'GP0002', 'PANTS', 0.7489)]}
+        
+        result = engine.validate_invoice_json(invoice, interactive_discovery=False)
+        
+        assert [part['validation_status'] for part in result['parts']] == ['PASSED', 'FAILED']
+
+
+class TestColumnarValidation:
+    """Test the columnar validation path against per-line validation."""
+    
+    @pytest.fixture
+    def engine(self, tmp_path):
+        from processing.validation_engine import ValidationEngine
+        
+        manager = DatabaseManager(str(tmp_path / "columnar.db"))
+        manager.create_part(Part(part_number='GP0001', authorized_price=Decimal('1.50'),
+                                 description='SHIRT', item_type='Rent'))
+        manager.create_part(Part(part_number='GP0002', authorized_price=Decimal('0.75'),
+                                 description='PANTS', item_type='Rent'))
+        engine = ValidationEngine(manager, ValidationConfiguration(rate_outlier_min_observations=3))
+        for invoice_number, price in (('H1', 4.00), ('H2', 4.10), ('H3', 3.90)):
+            engine.record_rates({'parts': [{'validation_status': 'UNKNOWN', 'database_fields': {
+                'part_number': 'NEWSKU', 'item_type': 'Rent', 'description': 'JACKET',
+                'authorized_price': price}}]}, invoice_number)
+        yield engine
+        manager.close()
+    
+    @staticmethod
+    def _invoice():
+        lines = [TestPriceTolerance._line(1, 'GP0001', 'SHIRT', 1.50, total=3.00),
+                 TestPriceTolerance._line(2, 'GP0002', 'PANTS', 0.80),
+                 TestPriceTolerance._line(3, 'NEWSKU', 'JACKET', 9.00, quantity=1),
+                 TestPriceTolerance._line(4, None, 'NO NUMBER', 2.00),
+                 TestPriceTolerance._line(5, 'GP0001', 'SHIRT', 'n/a'),
+                 TestPriceTolerance._line(6, 'GP0002', 'PANTS', None),
+                 TestPriceTolerance._line(7, 'GP0001', 'SHIRT', 1.40, quantity=None)]
+        lines[1]['lineitem_fields']['wearer'] = 'JOHN DOE'
+        return {'invoice_metadata': {'invoice_number': 'INV1', 'invoice_date': '2024-01-05'}, 'parts': lines}
+    
+    @staticmethod
+    def _assert_same(columnar, per_line):
+        assert set(columnar) == set(per_line)
+        for key in ('validation_summary', 'error_lines', 'rate_outliers', 'rollups', 'invoice_metadata'):
+            assert columnar[key] == per_line[key], key
+        assert columnar['parts'] == per_line['parts']
+    
+    def test_matches_per_line_validation(self, engine):
+        """Test summary, error lines, rollups, outliers and parts equal validate_invoice_json."""
+        per_line = engine.validate_invoice_json(self._invoice(), interactive_discovery=False)
+        columnar = engine.validate_columnar(self._invoice(), interactive_discovery=False)
+        
+        self._assert_same(columnar, per_line)
+        assert [outlier['line_number'] for outlier in columnar['rate_outliers']] == [3]
+        assert columnar['validation_summary']['failed_parts'] == 4
+    
+    def test_matches_per_line_validation_of_parts_array(self, engine):
+        """Test the batch columns of an extraction PartsArray validate like its part dicts."""
+        from processing.models import LineItem, LineItemBatch
+        
+        batch = LineItemBatch([
+            LineItem(item_code='GP0001', description='SHIRT', item_type='Rent', rate=Decimal('1.50'),
+                     quantity=2, line_number=1, wearer='JOHN DOE'),
+            LineItem(item_code='GP0002', description='PANTS', item_type='Rent', rate=Decimal('0.80'),
+                     quantity=3, total=Decimal('2.50'), line_number=2),
+            LineItem(item_code='NEWSKU', description='JACKET', item_type='Rent', rate=Decimal('9.00'),
+                     quantity=1, line_number=3)
+        ])
+        extraction_json = {'invoice_metadata': {'invoice_number': 'INV2'}, 'parts': batch.to_parts_json('INV2')}
+        listed = dict(extraction_json, parts=extraction_json['parts'].to_list())
+        
+        self._assert_same(engine.validate_columnar(extraction_json, interactive_discovery=False),
+                          engine.validate_invoice_json(listed, interactive_discovery=False))
+    
+    def test_only_error_lines_are_materialized(self, engine):
+        """Test validation builds part dicts for error lines and rate outliers only."""
+        from processing.columnar_validation import ValidatedParts
+        
+        with patch.object(ValidatedParts, '_part', autospec=True, side_effect=ValidatedParts._part) as build:
+            result = engine.validate_columnar(self._invoice(), interactive_discovery=False)
+        
+        # Row 2 is both an error line and a rate outlier
+        assert sorted(call.args[1] for call in build.call_args_list) == [1, 2, 2, 3, 4, 6]
+        assert len(result['error_lines']) == 5
+    
+    def test_only_unknown_parts_go_through_discovery(self, engine):
+        """Test discovery is run per line for unknown parts and the discovered part is then validated."""
+        def discover(extraction_json, resolved_parts=None):
+            part_data = extraction_json['parts'][0]
+            assert part_data['database_fields']['part_number'] == 'NEWSKU'
+            engine.db_manager.create_part(Part(part_number='NEWSKU', authorized_price=Decimal('9.00'),
+                                               description='JACKET', item_type='Rent'))
+            resolved_parts.pop(build_composite_key('Rent', 'JACKET', 'NEWSKU'), None)
+            return extraction_json
+        
+        with patch.object(engine.discovery_service, 'discover_and_add_parts', side_effect=discover) as discovery:
+            result = engine.validate_columnar(self._invoice())
+        
+        assert discovery.call_count == 1
+        assert result['parts'][2]['validation_status'] == 'PASSED'
+        assert result['validation_summary']['unknown_parts'] == 0
+    
+    def test_validated_parts_survive_the_codec_and_record_rates(self, engine):
+        """Test encoded validation JSON decodes equal and rates are recorded from the columns."""
+        from processing.binary_codec import decode_value, encode_value
+        
+        result = engine.validate_columnar(self._invoice(), interactive_discovery=False)
+        decoded = decode_value(encode_value(result))
+        
+        assert decoded == result
+        engine.record_rates(decoded, 'INV1')
+        stats = engine.db_manager.get_part_rate_stats([build_composite_key('Rent', 'SHIRT', 'GP0001')])
+        assert stats[build_composite_key('Rent', 'SHIRT', 'GP0001')].observation_count == 1
+
+
+class TestRateStatistics:
+    """Test rate statistics maintained for validated invoices and the outlier rule."""
+    
+    @pytest.fixture
+    def engine(self, tmp_path):
+        from processing.validation_engine import ValidationEngine
+        
+        manager = DatabaseManager(str(tmp_path / "rates.db"))
+        manager.create_part(Part(part_number='GP0001', authorized_price=Decimal('1.50'),
+                                 description='SHIRT', item_type='Rent'))
+        yield ValidationEngine(manager, ValidationConfiguration(rate_outlier_min_observations=3))
+        manager.close()
+    
+    @staticmethod
+    def _invoice(invoice_number, *lines):
+        return {'invoice_metadata': {'invoice_number': invoice_number},
+                'parts': [TestPriceTolerance._line(line_number, part_number, description, price)
+                          for line_number, (part_number, description, price) in enumerate(lines, 1)]}
+    
+    def _validate(self, engine, invoice_number, *lines):
+        """Validate an invoice and record its rates, as the invoice processor does."""
+        result = engine.validate_invoice_json(self._invoice(invoice_number, *lines), interactive_discovery=False)
+        engine.record_rates(result, invoice_number)
+        return result
+    
+    def test_validation_records_rates(self, engine):
+        """Test every priced line is folded into its part's statistics once per invoice."""
+        self._validate(engine, 'INV1', ('GP0001', 'SHIRT', 1.50), ('NEWSKU', 'JACKET', 4.00),
+                       ('GP0001', 'SHIRT', 1.5001), ('GP0002', 'PANTS', None))
+        self._validate(engine, 'INV1', ('GP0001', 'SHIRT', 1.50))
+        
+        stats = engine.db_manager.get_part_rate_stats_by_part_number(['GP0001', 'NEWSKU', 'GP0002'])
+        assert set(stats) == {'GP0001', 'NEWSKU'}
+        assert stats['GP0001'].observation_count == 2
+        assert stats['GP0001'].mean_price == pytest.approx(1.50005)
+    
+    def test_validation_alone_writes_nothing(self, engine):
+        """Test validating an invoice leaves the statistics to the caller to record."""
+        with patch.object(engine.db_manager, 'record_part_rates') as record:
+            engine.validate_invoice_json(self._invoice('INV1', ('GP0001', 'SHIRT', 1.50)),
+                                         interactive_discovery=False)
+        
+        record.assert_not_called()
+    
+    def test_failed_lines_are_not_recorded(self, engine):
+        """Test a line that failed validation does not enter its part's history."""
+        self._validate(engine, 'INV1', ('GP0001', 'SHIRT', 1.50), ('GP0001', 'SHIRT', 9.99))
+        
+        stats = engine.db_manager.get_part_rate_stats_by_part_number(['GP0001'])['GP0001']
+        assert stats.observation_count == 1
+        assert stats.max_price == Decimal('1.5')
+    
+    def test_invoice_without_source_key_is_not_recorded(self, engine):
+        """Test rates that could not be deduplicated on a re-run are skipped."""
+        self._validate(engine, None, ('GP0001', 'SHIRT', 1.50))
+        
+        assert engine.db_manager.get_part_rate_stats_by_part_number(['GP0001']) == {}
+    
+    def test_rerun_does_not_count_rates_twice(self, engine):
+        """Test validating a folder of invoices again leaves the statistics unchanged."""
+        for _ in range(2):
+            for invoice_number in ('INV1', 'INV2', 'INV3'):
+                self._validate(engine, invoice_number, ('GP0001', 'SHIRT', 1.50))
+        
+        stats = engine.db_manager.get_part_rate_stats_by_part_number(['GP0001'])
+        assert stats['GP0001'].observation_count == 3
+    
+    def test_outlier_is_flagged_without_changing_status(self, engine):
+        """Test a rate far outside the part's history is reported as an outlier."""
+        for number, price in enumerate((4.00, 4.02, 3.98, 4.00)):
+            result = self._validate(engine, f'INV{number}', ('NEWSKU', 'JACKET', price))
+            assert result['rate_outliers'] == []
+        
+        result = self._validate(engine, 'INV9', ('GP0001', 'SHIRT', 1.50), ('NEWSKU', 'JACKET', 5.00))
+        
+        assert [outlier['part_number'] for outlier in result['rate_outliers']] == ['NEWSKU']
+        outlier = result['rate_outliers'][0]
+        assert outlier['line_number'] == 2
+        assert outlier['observation_count'] == 4
+        assert outlier['z_score'] > 3
+        assert result['validation_summary']['unknown_parts'] == 1
+    
+    def test_tracking_can_be_disabled(self, engine):
+        """Test no statistics are read or written when tracking is off."""
+        engine.config.track_rate_stats = False
+        with patch.object(engine.db_manager, 'record_part_rates') as record:
+            self._validate(engine, 'INV1', ('GP0001', 'SHIRT', 1.50))
+        
+        record.assert_not_called()
+    
+    def test_discovery_suggests_prices_from_statistics(self, engine):
+        """Test price suggestions come from the rate statistics, not the discovery logs."""
+        self._validate(engine, 'INV1', ('NEWSKU', 'JACKET', 4.00), ('NEWSKU', 'JACKET', 4.50))
+        
+        with patch.object(engine.db_manager, 'get_discovery_logs') as logs:
+            suggestions = engine.discovery_service.suggest_prices(['NEWSKU', 'OTHER'])
+        
+        logs.assert_not_called()
+        assert list(suggestions) == ['NEWSKU']
+        assert suggestions['NEWSKU'].suggested_price == Decimal('4.25')
+        assert suggestions['NEWSKU'].min_price == Decimal('4.00')
+        assert suggestions['NEWSKU'].max_price == Decimal('4.50')
+
+
+class TestAsOfPriceValidation:
+    """Test lines are validated against the price in effect on the invoice date."""
+    
+    @pytest.fixture
+    def engine(self, tmp_path):
+        from processing.validation_engine import ValidationEngine
+        
+        manager = DatabaseManager(str(tmp_path / "history.db"))
+        part = manager.create_part(Part(part_number='GP0001', authorized_price=Decimal('1.50'),
+                                        description='SHIRT', item_type='Rent'))
+        manager.record_price_change(part.composite_key, '1.20', date(2024, 1, 1))
+        manager.record_price_change(part.composite_key, '1.35', date(2024, 7, 1))
+        yield ValidationEngine(manager, ValidationConfiguration(track_rate_stats=False))
+        manager.close()
+    
+    @staticmethod
+    def _invoice(invoice_date, price):
+        return {'invoice_metadata': {'invoice_number': f'INV-{invoice_date}', 'invoice_date': invoice_date},
+                'parts': [TestPriceTolerance._line(1, 'GP0001', 'SHIRT', price)]}
+    
+    def test_historical_invoices_pass_after_price_change(self, engine):
+        """Test old invoices are checked against the price of their date, not today's."""
+        cases = [('03/15/2024', 1.20, 'PASSED'), ('2024-09-30', 1.35, 'PASSED'),
+                 ('09/30/2024', 1.20, 'FAILED'), (date.today().strftime('%m/%d/%Y'), 1.50, 'PASSED'),
+                 ('not a date', 1.50, 'PASSED'), (None, 1.35, 'FAILED')]
+        
+        for invoice_date, price, status in cases:
+            result = engine.validate_invoice_json(self._invoice(invoice_date, price), interactive_discovery=False)
+            assert result['parts'][0]['validation_status'] == status, invoice_date
+        
+        failed = engine.validate_invoice_json(self._invoice('09/30/2024', 1.20), interactive_discovery=False)
+        assert failed['parts'][0]['database_price'] == 1.35
+        assert failed['error_lines'][0]['expected_price'] == 1.35
+    
+    def test_as_of_validation_can_be_disabled(self, engine):
+        """Test the current price is used for every invoice when as-of validation is off."""
+        engine.config.validate_as_of_invoice_date = False
+        
+        result = engine.validate_invoice_json(self._invoice('03/15/2024', 1.20), interactive_discovery=False)
+        
+        assert result['parts'][0]['validation_status'] == 'FAILED'
+        assert result['parts'][0]['database_price'] == 1.50
+        assert engine.price_history.loads == 0
+
+class TestToleranceRuleValidation:
+    """Test tolerance rules override the global price tolerance per line."""
+    
+    @pytest.fixture
+    def engine(self, tmp_path):
+        from database.models import ToleranceRule
+        from processing.validation_engine import ValidationEngine
+        
+        manager = DatabaseManager(str(tmp_path / "tolerance.db"))
+        manager.create_part(Part(part_number='GP0001', authorized_price=Decimal('1.50'),
+                                 description='SHIRT', item_type='Rent'))
+        manager.create_part(Part(part_number='GP0001', authorized_price=Decimal('20.00'),
+                                 description='SHIRT', item_type='Ruin Charge'))
+        manager.set_tolerance_rule(ToleranceRule(scope='item_type', match_value='Ruin Charge',
+                                                 percent_tolerance=Decimal('5')))
+        yield ValidationEngine(manager, ValidationConfiguration(track_rate_stats=False))
+        manager.close()
+    
+    @staticmethod
+    def _invoice(*lines):
+        return {'invoice_metadata': {'invoice_number': 'INV1'},
+                'parts': [{'database_fields': {'part_number': 'GP0001', 'item_type': item_type,
+                                               'description': 'SHIRT', 'authorized_price': price},
+                           'lineitem_fields': {'line_number': line_number, 'quantity': 1,
+                                               'raw_text': f"GP0001 SHIRT {item_type}"}}
+                          for line_number, (item_type, price) in enumerate(lines, 1)]}
+    
+    def test_rules_apply_per_item_type(self, engine):
+        """Test a ruin charge within its percentage passes while a rental must match exactly."""
+        result = engine.validate_invoice_json(
+            self._invoice(('Ruin Charge', 20.90), ('Ruin Charge', 21.10), ('Rent', 1.51)),
+            interactive_discovery=False
+        )
+        
+        assert [part['validation_status'] for part in result['parts']] == ['PASSED', 'FAILED', 'FAILED']
+    
+    def test_rules_are_compiled_once(self, engine):
+        """Test rules are read when first needed and only reloaded on request."""
+        from database.models import ToleranceRule
+        
+        with patch.object(engine.db_manager, 'list_tolerance_rules',
+                          wraps=engine.db_manager.list_tolerance_rules) as rules:
+            for _ in range(3):
+                engine.validate_invoice_json(self._invoice(('Ruin Charge', 20.90)), interactive_discovery=False)
+            assert rules.call_count == 1
+        
+        engine.db_manager.set_tolerance_rule(ToleranceRule(scope='part', match_value='GP0001',
+                                                           absolute_tolerance=Decimal('0.01')))
+        engine.reload_tolerance_rules()
+        result = engine.validate_invoice_json(self._invoice(('Ruin Charge', 20.90)), interactive_discovery=False)
+        assert result['parts'][0]['validation_status'] == 'FAILED'
+    
+    def test_processor_applies_configured_tolerance(self, engine):
+        """Test the price tolerance given to the processor reaches its validation engine."""
+        from processing.invoice_processor import InvoiceProcessor
+        
+        processor = InvoiceProcessor(engine.db_manager,
+                                     validation_config=ValidationConfiguration(price_tolerance=Decimal('0.05')))
+        result = processor.validation_engine.validate_invoice_json(self._invoice(('Rent', 1.54)),
+                                                                   interactive_discovery=False)
+        
+        assert result['parts'][0]['validation_status'] == 'PASSED'
+
+class TestLineRollups:
+    """Test validation rolls lines up by wearer, item code and item type as it goes."""
+    
+    @pytest.fixture
+    def engine(self, tmp_path):
+        from processing.validation_engine import ValidationEngine
+        
+        manager = DatabaseManager(str(tmp_path / "rollups.db"))
+        manager.create_part(Part(part_number='GP0001', authorized_price=Decimal('1.50'),
+                                 description='SHIRT', item_type='Rent'))
+        manager.create_part(Part(part_number='GP0002', authorized_price=Decimal('0.75'),
+                                 description='PANTS', item_type='Rent'))
+        yield ValidationEngine(manager, ValidationConfiguration(track_rate_stats=False))
+        manager.close()
+    
+    @staticmethod
+    def _invoice():
+        lines = [(1, 'GP0001', 'SHIRT', 1.50, 'JOHN DOE'), (2, 'GP0002', 'PANTS', 0.85, 'JOHN DOE'),
+                 (3, 'GP0001', 'SHIRT', 1.60, 'JANE ROE'), (4, 'NEWSKU', 'MAT', 4.00, None)]
+        parts = []
+        for line_number, part_number, description, price, wearer in lines:
+            part = TestPriceTolerance._line(line_number, part_number, description, price)
+            part['lineitem_fields']['wearer'] = wearer
+            parts.append(part)
+        return {'invoice_metadata': {'invoice_number': 'INV1'}, 'parts': parts}
+    
+    def test_rollups_are_built_during_validation(self, engine):
+        """Test each dimension sums line totals, expected totals and overcharges."""
+        result = engine.validate_invoice_json(self._invoice(), interactive_discovery=False)
+        
+        rollups = result['rollups']
+        assert rollups['wearer'][0] == {'key': 'JOHN DOE', 'line_count': 2, 'quantity': 4, 'actual_total': 4.7,
+                                        'expected_total': 4.5, 'overcharge': 0.2, 'failed_lines': 1}
+        assert [group['key'] for group in rollups['wearer']] == ['JOHN DOE', 'JANE ROE', '(none)']
+        assert rollups['item_code'][0]['key'] == 'GP0001'
+        assert rollups['item_code'][0]['overcharge'] == pytest.approx(0.2)
+        assert rollups['item_type'] == [{'key': 'Rent', 'line_count': 4, 'quantity': 8, 'actual_total': 15.9,
+                                         'expected_total': 15.5, 'overcharge': 0.4, 'failed_lines': 2}]
+        assert result['error_lines'][0]['actual_total'] == 1.7
+    
+    def test_single_invoice_reports_include_rollups(self, engine):
+        """Test the TXT report ends with the rollup section and the rollups get their own CSV."""
+        import csv
+        from processing.report_generator import BATCH_CSV_FIELDS, SimpleReportGenerator
+        
+        result = engine.validate_invoice_json(self._invoice(), interactive_discovery=False)
+        generator = SimpleReportGenerator()
+        
+        txt = generator.generate_txt_report(result)
+        assert "By Wearer:" in txt
+        assert "  JANE ROE: 1 lines, $3.20 invoiced, $3.00 expected, $0.20 overcharged (1 failed)" in txt
+        rows = list(csv.DictReader(io.StringIO(generator.generate_csv_report(result).lstrip('\ufeff'))))
+        assert len(rows) == len(result['parts']) + 1
+        assert all(list(row) == BATCH_CSV_FIELDS and None not in row.values() for row in rows)
+        rollups_csv = generator.generate_rollups_csv_report(result)
+        assert rollups_csv.startswith('\ufeffRollup,Key,Lines')
+        assert "Item Type,Rent,4,8,$15.90,$15.50,$0.40,2" in rollups_csv
+        assert generator.generate_rollups_csv_report(dict(result, rollups={})) == ""
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
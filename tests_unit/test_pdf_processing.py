@@ -8,7 +8,7 @@ from decimal import Decimal
 from unittest.mock import Mock, patch
 
 from processing.pdf_processor import PDFProcessor
-from processing.models import InvoiceData, LineItem, FormatSection
+from processing.models import InvoiceData, LineItem, LineItemBatch, FormatSection
 from processing.exceptions import (
     PDFReadabilityError,
     InvoiceParsingError,
@@ -277,6 +277,389 @@ class TestLineItem:
         assert line_item.rate == Decimal('1.50')
 
 
+class TestLineItemBatch:
+    """Test cases for the columnar LineItemBatch."""
+    
+    @staticmethod
+    def _line_items():
+        return [
+            LineItem(item_code="GP0001", description="SHIRT", item_type="Rent",
+                     rate=Decimal('1.50'), quantity=2, line_number=1, raw_text="GP0001 SHIRT"),
+            LineItem(item_code="GP0002", description="PANTS", rate="0.7525", quantity="3",
+                     total=Decimal('2.26'), line_number=2),
+            LineItem(item_code="GP0003", description="NO RATE", line_number=3),
+            LineItem(item_code="GP0004", description="  ", rate=Decimal('1.00'), line_number=4)
+        ]
+    
+    def test_records_have_no_instance_dict(self):
+        """Test the record classes are slotted."""
+        line_item = LineItem(item_code="TEST001", description="Test Item", rate=Decimal('1.50'))
+        
+        assert not hasattr(line_item, '__dict__')
+        assert not hasattr(FormatSection('TOTAL', Decimal('1.00')), '__dict__')
+        with pytest.raises(AttributeError):
+            line_item.unknown_field = 1
+    
+    def test_round_trips_line_items(self):
+        """Test rows read back as LineItem objects equal to the ones added."""
+        line_items = self._line_items()
+        batch = LineItemBatch(line_items)
+        
+        assert len(batch) == 4
+        assert list(batch) == line_items
+        assert batch[-1] == line_items[-1]
+        assert batch[1:3] == line_items[1:3]
+        assert batch[1].total == Decimal('2.26')
+        with pytest.raises(IndexError):
+            batch[4]
+    
+    def test_add_normalizes_like_line_item(self):
+        """Test add applies the same conversions as LineItem, dropping unparseable rates."""
+        batch = LineItemBatch()
+        batch.add(item_code="X", description="ITEM", rate="bad", quantity="oops", total=None)
+        batch.add(item_code="Y", description="ITEM", rate="2.50", quantity=None)
+        
+        assert batch[0] == LineItem(item_code="X", description="ITEM", rate=None, quantity=1)
+        assert batch[1] == LineItem(item_code="Y", description="ITEM", rate="2.50", quantity=None)
+        assert batch[1].total == Decimal('2.5')
+    
+    def test_valid_rows_match_line_item_validation(self):
+        """Test row validity agrees with LineItem.is_valid."""
+        line_items = self._line_items()
+        batch = LineItemBatch(line_items)
+        
+        assert batch.valid_rows() == [row for row, item in enumerate(line_items) if item.is_valid()]
+    
+    def test_parts_json_matches_line_item_extraction(self):
+        """Test the batch builds the same extraction parts as a list of line items."""
+        from processing.invoice_processor import build_extraction_json
+        
+        line_items = self._line_items()
+        from_list = InvoiceData(invoice_number="INV1", line_items=line_items)
+        from_batch = InvoiceData(invoice_number="INV1", line_items=LineItemBatch(line_items))
+        
+        expected = build_extraction_json(from_list, Path("inv.pdf"))['parts']
+        assert from_batch.line_items.to_parts_json("INV1") == expected
+        assert build_extraction_json(from_batch, Path("inv.pdf"))['parts'] == expected
+        assert from_batch.get_valid_line_items() == from_list.get_valid_line_items()
+    
+    def test_batch_uses_less_memory_than_line_items(self):
+        """Test a batch holds line items in a fraction of the memory of LineItem objects."""
+        import tracemalloc
+        
+        def measure(build):
+            tracemalloc.start()
+            try:
+                held = build()
+                return tracemalloc.get_traced_memory()[0], held
+            finally:
+                tracemalloc.stop()
+        
+        codes = [f"GP{row:04d}" for row in range(2000)]
+        objects_size, _ = measure(lambda: [LineItem(item_code=code, description="SHIRT", rate=Decimal('1.50'),
+                                                    quantity=2, line_number=row)
+                                           for row, code in enumerate(codes)])
+        batch_size, _ = measure(lambda: self._fill(codes))
+        
+        assert batch_size * 3 < objects_size
+    
+    def test_extraction_parts_use_less_memory_than_part_dicts(self):
+        """Test the extraction parts array holds columns, not two dicts per line."""
+        import tracemalloc
+        
+        batch = self._fill([f"GP{row:04d}" for row in range(2000)])
+        
+        tracemalloc.start()
+        try:
+            parts = batch.to_parts_json("INV1")
+            columnar_size = tracemalloc.get_traced_memory()[0]
+            part_dicts = parts.to_list()
+            dicts_size = tracemalloc.get_traced_memory()[0] - columnar_size
+        finally:
+            tracemalloc.stop()
+        
+        assert len(part_dicts) == len(parts) == 2000
+        assert columnar_size * 5 < dicts_size
+    
+    def test_rows_write_through_to_the_batch(self):
+        """Test a line edited in place is edited in the batch and bumps its version."""
+        batch = LineItemBatch(self._line_items())
+        version = batch.version
+        
+        line_item = batch[0]
+        line_item.rate = Decimal('1.75')
+        line_item.quantity = "4"
+        line_item.description = "SHIRT LS"
+        batch[1].total = None
+        
+        assert batch[0].rate == Decimal('1.75')
+        assert batch[0].quantity == 4
+        assert batch[0].description == "SHIRT LS"
+        assert batch[1].total is None
+        assert batch.rate_units[0] == 17500
+        assert batch.version == version + 4
+        copy = batch[0].to_line_item()
+        copy.rate = Decimal('9.99')
+        assert batch[0].rate == Decimal('1.75')
+    
+    @staticmethod
+    def _fill(codes):
+        batch = LineItemBatch()
+        for row, code in enumerate(codes):
+            batch.add(item_code=code, description="SHIRT", rate=Decimal('1.50'), quantity=2, line_number=row)
+        return batch
+
+
+class TestBinaryCodec:
+    """Test cases for the binary record codec."""
+    
+    def test_value_round_trip(self):
+        """Test JSON-like values decode to what was encoded."""
+        from processing.binary_codec import decode_value, encode_value
+        
+        value = {
+            'invoice_metadata': {'invoice_number': 'INV1', 'page_count': 3},
+            'parts': [{'description': 'SHIRT é', 'price': 1.5, 'quantity': -2, 'big': 2 ** 70,
+                       'valid': True, 'skipped': False, 'total': None, 'exact': Decimal('2.6750')}
+                      for _ in range(3)],
+            'empty': {}, 'items': [], 'raw': b'\x00\xff'
+        }
+        
+        assert decode_value(encode_value(value)) == value
+    
+    def test_parts_array_round_trip(self):
+        """Test an extraction parts array is encoded as columns and decodes to the same parts."""
+        from processing.binary_codec import decode_value, encode_value
+        from processing.models import PartsArray
+        
+        parts = LineItemBatch(TestLineItemBatch._line_items()).to_parts_json("INV1")
+        
+        decoded = decode_value(encode_value({'parts': parts}))['parts']
+        
+        assert isinstance(decoded, PartsArray)
+        assert decoded == parts.to_list()
+    
+    def test_values_are_converted_like_json(self):
+        """Test tuples, non-string keys and other objects are encoded as JSON would encode them."""
+        from processing.binary_codec import decode_value, encode_value
+        
+        decoded = decode_value(encode_value({1: (1, 2), 'path': Path('a.pdf')}))
+        
+        assert decoded == {'1': [1, 2], 'path': 'a.pdf'}
+    
+    def test_repeated_strings_are_stored_once(self):
+        """Test records are smaller than JSON when descriptions repeat."""
+        import json
+        from processing.binary_codec import encode_value
+        
+        parts = [{'description': 'SHIRT WORK LS BTN COTTON', 'part_number': 'GS0448NVOT', 'price': 1.5}
+                 for _ in range(100)]
+        encoded = encode_value(parts)
+        
+        assert encoded.count(b'SHIRT WORK LS BTN COTTON') == 1
+        assert len(encoded) * 3 < len(json.dumps(parts))
+    
+    def test_invalid_records_are_rejected(self):
+        """Test foreign, truncated and newer records raise CodecError."""
+        from processing.binary_codec import CodecError, decode_invoice_data, decode_value, encode_value
+        
+        encoded = encode_value({'invoice_number': 'INV1'})
+        with pytest.raises(CodecError):
+            decode_value(b'{"invoice_number": "INV1"}')
+        with pytest.raises(CodecError):
+            decode_value(encoded[:-2])
+        with pytest.raises(CodecError):
+            decode_value(encoded[:3] + bytes([99]) + encoded[4:])
+        with pytest.raises(CodecError):
+            decode_invoice_data(encoded)
+    
+    def test_invoice_data_round_trip(self):
+        """Test invoice data decodes with the same fields and line items."""
+        from processing.binary_codec import decode_invoice_data, encode_invoice_data
+        
+        line_items = TestLineItemBatch._line_items()
+        invoice_data = InvoiceData(
+            invoice_number="12345678", invoice_date="01/05/2024", customer_name="ACME",
+            line_items=line_items,
+            format_sections=[FormatSection('SUBTOTAL', Decimal('10.00'), 'SUBTOTAL 10.00', 7)],
+            pdf_path="invoice.pdf", page_count=2, processing_notes=["note"]
+        )
+        
+        decoded = decode_invoice_data(encode_invoice_data(invoice_data))
+        
+        assert isinstance(decoded.line_items, LineItemBatch)
+        assert list(decoded.line_items) == line_items
+        assert decoded.format_sections == invoice_data.format_sections
+        assert decoded.extraction_timestamp == invoice_data.extraction_timestamp
+        assert decoded.to_dict() == invoice_data.to_dict()
+    
+    def test_version_one_invoice_records_are_read(self):
+        """Test records written before the wearer column decode without wearers."""
+        from processing import binary_codec
+        
+        invoice_data = InvoiceData(invoice_number="INV1", line_items=[
+            LineItem(item_code="GP0001", description="SHIRT", rate=Decimal('1.50'), wearer="JOHN DOE")
+        ])
+        encoded = binary_codec.encode_invoice_data(invoice_data)
+        assert binary_codec.decode_invoice_data(encoded).line_items[0].wearer == "JOHN DOE"
+        
+        # Version 1 records had no wearer column
+        invoice_data.line_items = LineItemBatch(invoice_data.line_items)
+        invoice_data.line_items.wearers = []
+        with patch.object(binary_codec, 'FORMAT_VERSION', 1):
+            old_record = binary_codec.encode_invoice_data(invoice_data)
+        decoded = binary_codec.decode_invoice_data(old_record)
+        
+        assert decoded.line_items[0].wearer is None
+        assert decoded.line_items[0].item_code == "GP0001"
+
+
+class TestInvoiceReconciliation:
+    """Test cases for vectorized invoice total reconciliation."""
+    
+    @staticmethod
+    def _invoice(line_items, subtotal='6.76', freight='1.00', tax='0.50', total='8.26'):
+        sections = [FormatSection(section_type, Decimal(amount))
+                    for section_type, amount in (('SUBTOTAL', subtotal), ('FREIGHT', freight),
+                                                 ('TAX', tax), ('TOTAL', total))
+                    if amount is not None]
+        return InvoiceData(invoice_number="INV1", line_items=line_items, format_sections=sections)
+    
+    @staticmethod
+    def _line_items():
+        return [
+            LineItem(item_code="GP0001", description="SHIRT", rate=Decimal('1.50'), quantity=2,
+                     total=Decimal('3.00'), line_number=1, wearer="JOHN DOE"),
+            LineItem(item_code="GP0002", description="PANTS", rate=Decimal('0.75'), quantity=3,
+                     total=Decimal('2.26'), line_number=2, wearer="JANE ROE"),
+            LineItem(item_code="GP0003", description="MAT", rate=Decimal('1.50'), quantity=1,
+                     line_number=3),
+        ]
+    
+    def test_balanced_invoice(self):
+        """Test an invoice whose lines and sections add up reconciles as passed."""
+        invoice_data = self._invoice(self._line_items())
+        reconciliation = invoice_data.reconcile()
+        
+        assert reconciliation.line_sum_units == 67600
+        assert reconciliation.expected_total_units == 82600
+        assert reconciliation.total_discrepancy_units == 0
+        assert reconciliation.subtotal_discrepancy_units == 0
+        assert reconciliation.mismatched_lines().tolist() == []
+        assert reconciliation.status() == 'PASSED'
+        assert reconciliation.wearer_subtotals == {"JOHN DOE": 30000, "JANE ROE": 22600}
+        assert invoice_data.validate_total_calculation()
+        assert invoice_data.calculate_expected_total() == Decimal('8.26')
+        assert invoice_data.get_total_calculation_discrepancy() == Decimal('0')
+    
+    def test_discrepancies_are_reported(self):
+        """Test line, subtotal and total differences are found beyond the tolerance."""
+        line_items = self._line_items()
+        line_items[1] = LineItem(item_code="GP0002", description="PANTS", rate=Decimal('0.75'), quantity=3,
+                                 total=Decimal('2.50'), line_number=2, wearer="JANE ROE")
+        invoice_data = self._invoice(line_items, subtotal='6.76', total='8.36')
+        
+        result = invoice_data.reconcile().to_dict()
+        
+        assert result['status'] == 'FAILED'
+        assert result['line_total'] == pytest.approx(7.00)
+        assert result['subtotal_discrepancy'] == pytest.approx(-0.24)
+        assert result['total_discrepancy'] == pytest.approx(0.10)
+        assert result['line_discrepancies'] == [{'line_number': 2, 'wearer': "JANE ROE", 'expected_total': 2.25,
+                                                 'actual_total': 2.5, 'difference': 0.25}]
+        assert result['wearer_subtotals'][1] == {'wearer': "JANE ROE", 'line_count': 1, 'subtotal': 2.5}
+        assert not invoice_data.validate_total_calculation()
+        assert invoice_data.validate_total_calculation(Decimal('0.10'))
+        assert invoice_data.get_total_calculation_discrepancy() == Decimal('0.10')
+    
+    def test_missing_sections(self):
+        """Test invoices without every section cannot be balanced."""
+        invoice_data = self._invoice(self._line_items(), freight=None)
+        
+        assert invoice_data.calculate_expected_total() is None
+        assert invoice_data.get_total_calculation_discrepancy() is None
+        assert not invoice_data.validate_total_calculation()
+        assert invoice_data.reconcile().status() == 'INCOMPLETE'
+    
+    def test_in_place_edits_are_reflected(self):
+        """Test totals and the reconciliation follow sections and lines edited in place."""
+        invoice_data = self._invoice(LineItemBatch(self._line_items()))
+        assert invoice_data.validate_total_calculation()
+        
+        position = next(index for index, section in enumerate(invoice_data.format_sections)
+                        if section.section_type == 'TOTAL')
+        invoice_data.format_sections[position] = FormatSection('TOTAL', Decimal('99'))
+        assert invoice_data.get_total_amount() == Decimal('99')
+        assert not invoice_data.validate_total_calculation()
+        assert invoice_data.reconcile().total_units == 990000
+        
+        invoice_data.line_items.add(item_code="GP0004", description="TOWEL", rate="0.10", wearer="JOHN DOE")
+        assert invoice_data.reconcile().wearer_subtotals["JOHN DOE"] == 31000
+    
+    def test_edited_line_changes_cached_totals(self):
+        """Test the cached reconciliation is recomputed when a line or section is edited."""
+        from processing import reconciliation
+        
+        invoice_data = self._invoice(LineItemBatch(self._line_items()))
+        with patch.object(reconciliation, 'reconcile_invoice', wraps=reconciliation.reconcile_invoice) as reconcile:
+            assert invoice_data.validate_total_calculation()
+            assert invoice_data.calculate_expected_total() == Decimal('8.26')
+            assert invoice_data.get_total_calculation_discrepancy() == Decimal('0')
+            assert reconcile.call_count == 1
+            
+            invoice_data.line_items[1] = LineItem(item_code="GP0002", description="PANTS", rate=Decimal('0.75'),
+                                                  quantity=3, total=Decimal('2.50'), line_number=2,
+                                                  wearer="JANE ROE")
+            assert invoice_data.reconcile().line_sum_units == 70000
+            assert invoice_data.reconcile().wearer_subtotals["JANE ROE"] == 25000
+            assert reconcile.call_count == 2
+            
+            invoice_data.get_format_section('tax').amount = Decimal('0.60')
+            assert invoice_data.get_total_calculation_discrepancy() == Decimal('-0.10')
+            assert reconcile.call_count == 3
+    
+    def test_edited_list_line_changes_totals(self):
+        """Test lines held in a plain list are reconciled as they are now."""
+        invoice_data = self._invoice(self._line_items())
+        assert invoice_data.reconcile().subtotal_discrepancy_units == 0
+        
+        invoice_data.line_items[0].total = Decimal('3.10')
+        
+        assert invoice_data.reconcile().subtotal_discrepancy_units == -1000
+    
+    def test_thousand_line_invoice(self):
+        """Test a large batch reconciles every line and wearer in one call."""
+        batch = LineItemBatch()
+        for row in range(1000):
+            batch.add(item_code=f"GP{row % 50:04d}", description="SHIRT", rate="1.25", quantity=row % 3 + 1,
+                      line_number=row + 1, wearer=f"WEARER {row % 40}")
+        subtotal = sum(125 * (row % 3 + 1) for row in range(1000)) / 100
+        invoice_data = self._invoice(batch, subtotal=str(subtotal), total=str(subtotal + 1.5))
+        
+        reconciliation = invoice_data.reconcile()
+        
+        assert reconciliation.status() == 'PASSED'
+        assert len(reconciliation.wearer_subtotals) == 40
+        assert sum(reconciliation.wearer_line_counts.values()) == 1000
+        assert sum(reconciliation.wearer_subtotals.values()) == reconciliation.line_sum_units
+    
+    def test_reconciliation_reaches_text_report(self):
+        """Test extraction JSON carries the reconciliation through validation into the TXT report."""
+        from processing.invoice_processor import build_extraction_json
+        from processing.report_generator import SimpleReportGenerator
+        
+        extraction_json = build_extraction_json(self._invoice(self._line_items()), Path("inv.pdf"))
+        report = SimpleReportGenerator().generate_txt_report({
+            'invoice_metadata': extraction_json['invoice_metadata'],
+            'reconciliation': extraction_json['reconciliation']
+        })
+        
+        assert extraction_json['reconciliation']['status'] == 'PASSED'
+        assert "Line Items: $6.76 (3 lines)" in report
+        assert "Validation: PASSED" in report
+        assert "  JOHN DOE: $3.00 (1 lines)" in report
+
+
 class TestFormatSection:
     """Test cases for FormatSection model."""
     